@@ -1,5 +1,5 @@
 from __future__ import annotations
-from threading import Thread, Lock
+from threading import Thread, Lock, Event
 
 import fnmatch
 import time
@@ -11,6 +11,7 @@ import pandas as pd
 import requests  # type: ignore
 
 from directionalscalper.core.utils import send_public_request
+from directionalscalper.core.http_client import http_client
 from directionalscalper.core.strategies.logger import Logger
 
 logging = Logger(logger_name="Manager", filename="Manager.log", stream=True) 
@@ -19,6 +20,56 @@ logging = Logger(logger_name="Manager", filename="Manager.log", stream=True)
 
 from time import sleep
 
+# Remote volume-data datasets kept warm by the Manager's refresher: name -> URL template.
+# {source} is the data source exchange, {exchange} the traded one.
+DATASETS = {
+    'quantdata': "https://api.quantumvoid.org/volumedata/quantdatav2_{source}.json",
+    'funding': "https://api.quantumvoid.org/volumedata/funding_{source}.json",
+    'everything': "https://api.quantumvoid.org/volumedata/everything_{exchange}.json",
+    'rotator': "https://api.quantumvoid.org/volumedata/rotatorsymbols_{source}.json",
+    'rotator_atrp': "https://api.quantumvoid.org/volumedata/rotatorsymbols_{source}_atrp.json",
+    'rotator_bullish': "https://api.quantumvoid.org/volumedata/rotatorsymbols_{source}_bullish.json",
+    'rotator_bearish': "https://api.quantumvoid.org/volumedata/rotatorsymbols_{source}_bearish.json",
+}
+
+# Fields of a quantdata asset: name -> (key checked for presence, key returned)
+ASSET_FIELDS = {
+    "Price": ("Price", "Price"),
+    "1mVol": ("1m 1x Volume (USDT)", "1m 1x Volume (USDT)"),
+    "5mVol": ("5m 1x Volume (USDT)", "5m 1x Volume (USDT)"),
+    "1hVol": ("1m 1h Volume (USDT)", "1h 1x Volume (USDT)"),
+    "1mSpread": ("1m Spread", "1m Spread"),
+    "5mSpread": ("5m Spread", "5m Spread"),
+    "15mSpread": ("15m Spread", "15m Spread"),
+    "30mSpread": ("30m Spread", "30m Spread"),
+    "1hSpread": ("1h Spread", "1h Spread"),
+    "4hSpread": ("4h Spread", "4h Spread"),
+    "MFI": ("MFI", "MFI"),
+    "ERI Bull Power": ("ERI Bull Power", "ERI Bull Power"),
+    "ERI Bear Power": ("ERI Bear Power", "ERI Bear Power"),
+    "ERI Trend": ("ERI Trend", "ERI Trend"),
+    "HMA Trend": ("HMA Trend", "HMA Trend"),
+    "Top Signal 5m": ("Top Signal 5m", "Top Signal 5m"),
+    "Bottom Signal 5m": ("Bottom Signal 5m", "Bottom signal 5m"),
+    "Top Signal 1m": ("Top Signal 1m", "Top Signal 1m"),
+    "Bottom Signal 1m": ("Bottom Signal 1m", "Bottom signal 1m"),
+    "MA Trend": ("MA Trend", "MA Trend"),
+    "EMA Trend": ("EMA Trend", "EMA Trend"),
+}
+
+# Quantdata fields of the per-symbol record returned by get_api_data
+API_DATA_FIELDS = ('1mVol', '5mVol', '1hVol', '1mSpread', '5mSpread', '30mSpread', '1hSpread', '4hSpread', 'MA Trend',
+                   'HMA Trend', 'MFI', 'ERI Trend', 'Top Signal 5m', 'Bottom Signal 5m', 'Top Signal 1m',
+                   'Bottom Signal 1m', 'EMA Trend')
+
+
+def asset_field(asset_data, value):
+    check_key, value_key = ASSET_FIELDS[value]
+    if check_key in asset_data:
+        return asset_data.get(value_key)
+    return None
+
+
 class InvalidAPI(Exception):
     def __init__(self, message="Invalid Manager setup"):
         self.message = message
@@ -35,6 +86,7 @@ class Manager:
         asset_value_cache_life_seconds: int = 60,
         path: Path | None = None,
         url: str = "",
+        refresh_intervals: dict | None = None,
     ):
         self.exchange = exchange
         self.exchange_name = exchange_name
@@ -54,23 +106,24 @@ class Manager:
         # Initialize the main data cache and its expiry
         self.data = {}
         self.data_cache_expiry = datetime.now() - timedelta(seconds=self.cache_life_seconds)
+
+        # One cache entry per URL for fetch_data_from_url, with validators for conditional requests
+        self.url_cache = {}
+        self.url_cache_lock = Lock()
+
+        # Background refresher keeping fetched URLs warm; refresh_intervals overrides the cadence per dataset name
+        self.refresh_intervals = refresh_intervals or {}
+        self.refresher_thread = None
+        self.refresher_stop = Event()
         
         # Initialize the asset value cache and its expiry
         self.asset_value_cache = {}
         self.asset_value_cache_expiry = datetime.now() - timedelta(seconds=self.asset_value_cache_life_seconds)
 
-        # Attributes for caching
-        self.rotator_symbols_cache = None
-        self.rotator_symbols_cache_expiry = datetime.now() - timedelta(seconds=1)  # Initialize to an old timestamp to force first fetch
-
         # Initialize the API data cache and its expiry
         self.api_data_cache = None
         self.api_data_cache_expiry = datetime.now() - timedelta(seconds=self.cache_life_seconds)
 
-        # Attributes for 'everything' data cache
-        self.everything_cache = None
-        self.everything_cache_expiry = datetime.now() - timedelta(seconds=1)  # Initialize to an old timestamp to force first fetch
-
         # # Attributes for caching API data
         # self.api_data_cache = None
         # self.api_data_cache_expiry = datetime.now() - timedelta(seconds=1)
@@ -96,78 +149,40 @@ class Manager:
 
         self.update_last_checked()
 
-    def is_everything_cache_expired(self):
-        return datetime.now() > self.everything_cache_expiry
-
     def get_everything(self, min_qty_threshold: float = None, blacklist: list = None, whitelist: list = None, max_usd_value: float = None, max_retries: int = 5):
-        if self.everything_cache and not self.is_everything_cache_expired():
-            return self.everything_cache
-
-        symbols = []
-        url = f"https://api.quantumvoid.org/volumedata/everything_{self.exchange_name.replace('_', '')}.json"
-
-        for retry in range(max_retries):
-            delay = 2**retry  # exponential backoff
-            delay = min(58, delay)  # cap the delay to 58 seconds
-
-            try:
-                logging.info(f"Sending request to {url} (Attempt: {retry + 1})")
-                header, raw_json = send_public_request(url=url)
-
-                if isinstance(raw_json, list):
-                    logging.info(f"Received {len(raw_json)} assets from API")
-
-                    for asset in raw_json:
-                        symbol = asset.get("Asset", "")
-                        min_qty = asset.get("Min qty", 0)
-                        usd_price = asset.get("Price", float('inf'))
-
-                        if blacklist and any(fnmatch.fnmatch(symbol, pattern) for pattern in blacklist):
-                            logging.debug(f"Skipping {symbol} as it's in blacklist")
-                            continue
-
-                        if whitelist:
-                            logging.debug(f"Whitelist provided: {whitelist}")
-                            if symbol not in whitelist:
-                                logging.debug(f"Skipping {symbol} as it's not in whitelist")
-                                continue
-
-                        # Check against the max_usd_value, if provided
-                        if max_usd_value is not None and usd_price > max_usd_value:
-                            logging.debug(f"Skipping {symbol} as its USD price {usd_price} is greater than the max allowed {max_usd_value}")
-                            continue
-
-                        logging.debug(f"Processing symbol {symbol} with min_qty {min_qty} and USD price {usd_price}")
-
-                        if min_qty_threshold is None or min_qty <= min_qty_threshold:
-                            symbols.append(symbol)
-
-                    logging.info(f"Returning {len(symbols)} symbols")
-
-                    # If successfully fetched, update the cache and its expiry time
-                    if symbols:
-                        self.everything_cache = symbols
-                        self.everything_cache_expiry = datetime.now() + timedelta(seconds=self.cache_life_seconds)
+        assets = self._filter_assets(self.get_dataset('everything', max_retries), min_qty_threshold, blacklist, whitelist, max_usd_value)
+        symbols = [asset.get("Asset", "") for asset in assets]
+        logging.debug(f"Returning {len(symbols)} symbols")
+        return symbols
+
+    def _filter_assets(self, raw_json, min_qty_threshold, blacklist, whitelist, max_usd_value):
+        """Assets of a dataset passing the blacklist, whitelist, max USD price and min qty filters."""
+        if not isinstance(raw_json, list):
+            logging.warning("Unexpected data format. Expected a list of assets.")
+            return []
 
-                    return symbols
+        filtered = []
+        for asset in raw_json:
+            symbol = asset.get("Asset", "")
+            min_qty = asset.get("Min qty", 0)
+            usd_price = asset.get("Price", float('inf'))
 
-                else:
-                    logging.warning("Unexpected data format. Expected a list of assets.")
+            if blacklist and any(fnmatch.fnmatch(symbol, pattern) for pattern in blacklist):
+                logging.debug(f"Skipping {symbol} as it's in blacklist")
+                continue
 
-            except requests.exceptions.RequestException as e:
-                logging.warning(f"Request failed: {e}")
-            except json.decoder.JSONDecodeError as e:
-                logging.warning(f"Failed to parse JSON: {e}. Response: {raw_json}")
-            except Exception as e:
-                logging.warning(f"Unexpected error occurred: {e}")
+            if whitelist and symbol not in whitelist:
+                logging.debug(f"Skipping {symbol} as it's not in whitelist")
+                continue
 
-            # Wait before the next retry
-            if retry < max_retries - 1:
-                time.sleep(delay)
+            # Check against the max_usd_value, if provided
+            if max_usd_value is not None and usd_price > max_usd_value:
+                logging.debug(f"Skipping {symbol} as its USD price {usd_price} is greater than the max allowed {max_usd_value}")
+                continue
 
-        # Return cached symbols if all retries fail
-        logging.warning(f"Couldn't fetch every symbols after {max_retries} attempts. Using cached symbols.")
-        return self.everything_cache or []
+            if min_qty_threshold is None or min_qty <= min_qty_threshold:
+                filtered.append(asset)
+        return filtered
 
 
     # def get_everything(self, min_qty_threshold: float = None, blacklist: list = None, whitelist: list = None, max_usd_value: float = None, max_retries: int = 5):
@@ -246,31 +261,136 @@ class Manager:
         self.last_checked = datetime.now().timestamp()
 
     def fetch_data_from_url(self, url, max_retries: int = 5):
-        current_time = datetime.now()
-        if current_time <= self.data_cache_expiry:
-            return self.data
-        for retry in range(max_retries):
-            delay = 2**retry  # exponential backoff
-            delay = min(60, delay)  # cap the delay to 60 seconds
-            try:
-                header, raw_json = send_public_request(url=url)
-                # Update the data cache and its expiry time
-                self.data = raw_json
-                self.data_cache_expiry = current_time + timedelta(seconds=self.cache_life_seconds)
-                return raw_json
-            except requests.exceptions.RequestException as e:
-                logging.error(f"Request failed: {e}")
-            except json.decoder.JSONDecodeError as e:
-                logging.error(f"Failed to parse JSON: {e}")
-            except Exception as e:
-                logging.error(f"Unexpected error occurred: {e}")
-            
-            # Wait before the next retry
-            if retry < max_retries - 1:
-                sleep(delay)
-
-        # Return cached data if all retries fail
-        return self.data
+        return self.get_url_entry(url, max_retries)['data']
+
+    def dataset_url(self, name):
+        return DATASETS[name].format(source=self.data_source_exchange.replace('_', ''), exchange=self.exchange_name.replace('_', ''))
+
+    def get_dataset_entry(self, name, max_retries: int = 5):
+        return self.get_url_entry(self.dataset_url(name), max_retries, self.refresh_intervals.get(name))
+
+    def get_dataset(self, name, max_retries: int = 5):
+        """Last good snapshot of a dataset from DATASETS (an empty list until its first fetch succeeded)."""
+        return self.get_dataset_entry(name, max_retries)['data']
+
+    def staleness(self, name_or_url):
+        """Seconds since a dataset (name or URL) was last confirmed fresh, None if it was never fetched."""
+        url = self.dataset_url(name_or_url) if name_or_url in DATASETS else name_or_url
+        entry = self.url_cache.get(url)
+        if entry is None or entry['fetched_at'] is None:
+            return None
+        return time.time() - entry['fetched_at']
+
+    def get_url_entry(self, url, max_retries: int = 5, interval: float = None):
+        """
+        Cache entry for a URL: {'data', 'index', 'symbols', 'etag', 'last_modified', 'fetched_at', 'expires_at', ...}.
+
+        Stale-while-revalidate: the background refresher revalidates each watched URL
+        every ``interval`` seconds (default cache_life_seconds) with a conditional
+        request (If-None-Match / If-Modified-Since), and callers get the last good
+        snapshot at once however old it is; ``staleness`` tells how old. The first
+        request for a URL makes one attempt in the caller's thread; if it fails the
+        entry stays empty and the refresher retries it with backoff, so callers never
+        wait on retries. ``max_retries`` is kept for the callers' signatures.
+        """
+        entry = self._watch(url, interval)
+        if entry['fetched_at'] is None and time.time() >= entry['retry_at']:
+            self._refresh(url, entry)
+        return entry
+
+    def _watch(self, url, interval=None):
+        with self.url_cache_lock:
+            entry = self.url_cache.get(url)
+            if entry is None:
+                entry = {'data': [], 'index': {}, 'symbols': [], 'etag': None, 'last_modified': None,
+                         'fetched_at': None, 'expires_at': 0.0, 'retry_at': 0.0, 'failures': 0,
+                         'interval': interval or self.cache_life_seconds, 'lock': Lock()}
+                self.url_cache[url] = entry
+            elif interval:
+                entry['interval'] = interval
+        self.start_refresher()
+        return entry
+
+    def _revalidate(self, url, entry):
+        headers = {}
+        if entry['data']:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = http_client.get(url, headers=headers)
+        if response.status_code == 304:
+            now = time.time()
+            entry.update(fetched_at=now, expires_at=now + entry['interval'], failures=0)
+            return
+        response.raise_for_status()
+
+        data = response.json()
+        index = {}
+        if isinstance(data, list):
+            for asset in data:
+                if isinstance(asset, dict) and "Asset" in asset:
+                    index.setdefault(asset["Asset"], asset)
+        now = time.time()
+        entry.update(
+            data=data,
+            index=index,
+            symbols=list(index.keys()),
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            fetched_at=now,
+            expires_at=now + entry['interval'],
+            failures=0,
+        )
+        logging.info(f"Refreshed {url}: {len(index)} assets indexed")
+
+    def start_refresher(self):
+        with self.url_cache_lock:
+            if self.refresher_thread is not None and self.refresher_thread.is_alive():
+                return
+            self.refresher_stop.clear()
+            self.refresher_thread = Thread(target=self._refresh_loop, name="ManagerRefresher", daemon=True)
+            self.refresher_thread.start()
+
+    def stop_refresher(self):
+        self.refresher_stop.set()
+
+    def _refresh_loop(self):
+        while not self.refresher_stop.wait(1):
+            self._refresh_due()
+
+    def _refresh_due(self):
+        now = time.time()
+        with self.url_cache_lock:
+            entries = list(self.url_cache.items())
+        for url, entry in entries:
+            # URLs never fetched have no expiry and are retried as their backoff allows
+            if now < max(entry['expires_at'], entry['retry_at']):
+                continue
+            self._refresh(url, entry)
+
+    def _refresh(self, url, entry):
+        if not entry['lock'].acquire(blocking=False):
+            return
+        try:
+            self._revalidate(url, entry)
+        except Exception as e:
+            entry['failures'] += 1
+            delay = min(60, 2**entry['failures'])
+            entry['retry_at'] = time.time() + delay
+            staleness = self.staleness(url)
+            serving = "No data yet" if staleness is None else f"Serving data {staleness:.0f}s old"
+            logging.warning(f"Refreshing {url} failed: {e}. {serving}, retrying in {delay} seconds")
+        finally:
+            entry['lock'].release()
+
+    def _index_for(self, data):
+        """Asset index of ``data`` if it is a cached URL payload, else None."""
+        for entry in list(self.url_cache.values()):
+            if entry['data'] is data:
+                return entry['index']
+        return None
     
     def get_data(self):
         if self.api == "remote":
@@ -293,10 +413,6 @@ class Manager:
         self.update_last_checked()
         return self.data
 
-    def is_cache_expired(self):
-        """Checks if the cache has expired based on cache_life_seconds."""
-        return datetime.now() > self.rotator_symbols_cache_expiry
-
     def get_all_possible_symbols(self, max_retries: int = 5):
         url = f"https://api.quantumvoid.org/volumedata/quantdatav2_{self.exchange_name.replace('_', '')}.json"
         
@@ -333,199 +449,24 @@ class Manager:
         return []
 
     def get_atrp_sorted_rotator_symbols(self, min_qty_threshold: float = None, blacklist: list = None, whitelist: list = None, max_usd_value: float = None, max_retries: int = 5):
-        url = f"https://api.quantumvoid.org/volumedata/rotatorsymbols_{self.data_source_exchange.replace('_', '')}_atrp.json"
-        
-        for retry in range(max_retries):
-            delay = 2**retry  # exponential backoff
-            delay = min(58, delay)  # cap the delay to 30 seconds
-
-            try:
-                logging.info(f"Sending request to {url} (Attempt: {retry + 1})")
-                header, raw_json = send_public_request(url=url)
-                
-                if isinstance(raw_json, list):
-                    logging.info(f"Received {len(raw_json)} ATRP sorted rotator symbols from API")
-                    
-                    filtered_symbols = []
-                    for asset in raw_json:
-                        symbol = asset.get("Asset", "")
-                        min_qty = asset.get("Min qty", 0)
-                        usd_price = asset.get("Price", float('inf'))
-
-                        logging.info(f"Processing symbol {symbol} with min_qty {min_qty} and USD price {usd_price}")
-
-                        if blacklist and any(fnmatch.fnmatch(symbol, pattern) for pattern in blacklist):
-                            logging.debug(f"Skipping {symbol} as it's in blacklist")
-                            continue
-
-                        if whitelist and symbol not in whitelist:
-                            logging.debug(f"Skipping {symbol} as it's not in whitelist")
-                            continue
-
-                        # Check against the max_usd_value, if provided
-                        if max_usd_value is not None and usd_price > max_usd_value:
-                            logging.debug(f"Skipping {symbol} as its USD price {usd_price} is greater than the max allowed {max_usd_value}")
-                            continue
-
-                        logging.debug(f"Processing symbol {symbol} with min_qty {min_qty} and USD price {usd_price}")
-
-                        if min_qty_threshold is None or min_qty <= min_qty_threshold:
-                            filtered_symbols.append(asset)
-
-                    logging.info(f"Returning {len(filtered_symbols)} ATRP sorted rotator symbols")
-                    return filtered_symbols
-                else:
-                    logging.warning("Unexpected data format. Expected a list of ATRP sorted rotator symbols.")
-                    
-            except requests.exceptions.RequestException as e:
-                logging.warning(f"Request failed: {e}")
-            except json.decoder.JSONDecodeError as e:
-                logging.warning(f"Failed to parse JSON: {e}. Response: {raw_json}")
-            except Exception as e:
-                logging.warning(f"Unexpected error occurred: {e}")
-
-            # Wait before the next retry
-            if retry < max_retries - 1:
-                sleep(delay)
-        
-        # If all retries fail, return an empty list
-        logging.warning(f"Couldn't fetch ATRP sorted rotator symbols after {max_retries} attempts.")
-        return []
+        filtered_symbols = self._filter_assets(self.get_dataset('rotator_atrp', max_retries), min_qty_threshold, blacklist, whitelist, max_usd_value)
+        logging.debug(f"Returning {len(filtered_symbols)} ATRP sorted rotator symbols")
+        return filtered_symbols
 
     def get_bullish_rotator_symbols(self, min_qty_threshold: float = None, blacklist: list = None, whitelist: list = None, max_usd_value: float = None, max_retries: int = 5):
-        url = f"https://api.quantumvoid.org/volumedata/rotatorsymbols_{self.data_source_exchange.replace('_', '')}_bullish.json"
-        return self._get_rotator_symbols(url, min_qty_threshold, blacklist, whitelist, max_usd_value, max_retries)
+        return self._get_rotator_symbols('rotator_bullish', min_qty_threshold, blacklist, whitelist, max_usd_value, max_retries)
 
     def get_bearish_rotator_symbols(self, min_qty_threshold: float = None, blacklist: list = None, whitelist: list = None, max_usd_value: float = None, max_retries: int = 5):
-        url = f"https://api.quantumvoid.org/volumedata/rotatorsymbols_{self.data_source_exchange.replace('_', '')}_bearish.json"
-        return self._get_rotator_symbols(url, min_qty_threshold, blacklist, whitelist, max_usd_value, max_retries)
-
-    def _get_rotator_symbols(self, url, min_qty_threshold, blacklist, whitelist, max_usd_value, max_retries):
-        for retry in range(max_retries):
-            delay = 2**retry  # exponential backoff
-            delay = min(58, delay)  # cap the delay to 30 seconds
-
-            try:
-                logging.info(f"Sending request to {url} (Attempt: {retry + 1})")
-                header, raw_json = send_public_request(url=url)
-
-                if isinstance(raw_json, list):
-                    logging.info(f"Received {len(raw_json)} assets from API")
-                    symbols = []
-                    for asset in raw_json:
-                        symbol = asset.get("Asset", "")
-                        min_qty = asset.get("Min qty", 0)
-                        usd_price = asset.get("Price", float('inf'))
-
-                        logging.info(f"Processing symbol {symbol} with min_qty {min_qty} and USD price {usd_price}")
-
-                        if blacklist and any(fnmatch.fnmatch(symbol, pattern) for pattern in blacklist):
-                            logging.debug(f"Skipping {symbol} as it's in blacklist")
-                            continue
-
-                        if whitelist and symbol not in whitelist:
-                            logging.debug(f"Skipping {symbol} as it's not in whitelist")
-                            continue
-
-                        # Check against the max_usd_value, if provided
-                        if max_usd_value is not None and usd_price > max_usd_value:
-                            logging.debug(f"Skipping {symbol} as its USD price {usd_price} is greater than the max allowed {max_usd_value}")
-                            continue
-
-                        logging.debug(f"Processing symbol {symbol} with min_qty {min_qty} and USD price {usd_price}")
-
-                        if min_qty_threshold is None or min_qty <= min_qty_threshold:
-                            symbols.append(symbol)
-
-                    logging.info(f"Returning {len(symbols)} symbols")
-                    return symbols
-                else:
-                    logging.warning("Unexpected data format. Expected a list of assets.")
-
-            except requests.exceptions.RequestException as e:
-                logging.warning(f"Request failed: {e}")
-            except json.decoder.JSONDecodeError as e:
-                logging.warning(f"Failed to parse JSON: {e}. Response: {raw_json}")
-            except Exception as e:
-                logging.warning(f"Unexpected error occurred: {e}")
-
-            # Wait before the next retry
-            if retry < max_retries - 1:
-                sleep(delay)
+        return self._get_rotator_symbols('rotator_bearish', min_qty_threshold, blacklist, whitelist, max_usd_value, max_retries)
 
-        # If all retries fail, return an empty list
-        logging.warning(f"Couldn't fetch rotator symbols after {max_retries} attempts.")
-        return []
+    def _get_rotator_symbols(self, name, min_qty_threshold, blacklist, whitelist, max_usd_value, max_retries):
+        assets = self._filter_assets(self.get_dataset(name, max_retries), min_qty_threshold, blacklist, whitelist, max_usd_value)
+        symbols = [asset.get("Asset", "") for asset in assets]
+        logging.debug(f"Returning {len(symbols)} symbols from {name}")
+        return symbols
 
     def get_auto_rotate_symbols(self, min_qty_threshold: float = None, blacklist: list = None, whitelist: list = None, max_usd_value: float = None, max_retries: int = 5):
-        if self.rotator_symbols_cache and not self.is_cache_expired():
-            return self.rotator_symbols_cache
-
-        symbols = []
-        url = f"https://api.quantumvoid.org/volumedata/rotatorsymbols_{self.data_source_exchange.replace('_', '')}.json"
-        
-        for retry in range(max_retries):
-            delay = 2**retry  # exponential backoff
-            delay = min(58, delay)  # cap the delay to 30 seconds
-
-            try:
-                logging.info(f"Sending request to {url} (Attempt: {retry + 1})")
-                header, raw_json = send_public_request(url=url)
-                
-                if isinstance(raw_json, list):
-                    logging.info(f"Received {len(raw_json)} assets from API")
-                    
-                    for asset in raw_json:
-                        symbol = asset.get("Asset", "")
-                        min_qty = asset.get("Min qty", 0)
-                        usd_price = asset.get("Price", float('inf')) 
-                        
-                        logging.info(f"Processing symbol {symbol} with min_qty {min_qty} and USD price {usd_price}")
-
-                        if blacklist and any(fnmatch.fnmatch(symbol, pattern) for pattern in blacklist):
-                            logging.debug(f"Skipping {symbol} as it's in blacklist")
-                            continue
-
-                        if whitelist and symbol not in whitelist:
-                            logging.debug(f"Skipping {symbol} as it's not in whitelist")
-                            continue
-
-                        # Check against the max_usd_value, if provided
-                        if max_usd_value is not None and usd_price > max_usd_value:
-                            logging.debug(f"Skipping {symbol} as its USD price {usd_price} is greater than the max allowed {max_usd_value}")
-                            continue
-
-                        logging.debug(f"Processing symbol {symbol} with min_qty {min_qty} and USD price {usd_price}")
-
-                        if min_qty_threshold is None or min_qty <= min_qty_threshold:
-                            symbols.append(symbol)
-
-                    logging.info(f"Returning {len(symbols)} symbols")
-                    
-                    # If successfully fetched, update the cache and its expiry time
-                    if symbols:
-                        self.rotator_symbols_cache = symbols
-                        self.rotator_symbols_cache_expiry = datetime.now() + timedelta(seconds=self.cache_life_seconds)
-
-                    return symbols
-
-                else:
-                    logging.warning("Unexpected data format. Expected a list of assets.")
-                    
-            except requests.exceptions.RequestException as e:
-                logging.warning(f"Request failed: {e}")
-            except json.decoder.JSONDecodeError as e:
-                logging.warning(f"Failed to parse JSON: {e}. Response: {raw_json}")
-            except Exception as e:
-                logging.warning(f"Unexpected error occurred: {e}")
-
-            # Wait before the next retry
-            if retry < max_retries - 1:
-                time.sleep(delay)
-        
-        # Return cached symbols if all retries fail
-        logging.warning(f"Couldn't fetch rotator symbols after {max_retries} attempts. Using cached symbols.")
-        return self.rotator_symbols_cache or []
+        return self._get_rotator_symbols('rotator', min_qty_threshold, blacklist, whitelist, max_usd_value, max_retries)
 
     def get_symbols(self):
         url = f"https://api.quantumvoid.org/volumedata/quantdatav2_{self.exchange_name.replace('_', '')}.json"
@@ -568,6 +509,9 @@ class Manager:
         return datetime.now().timestamp() - self.last_checked > self.cache_life_seconds
 
     def get_asset_data(self, symbol: str, data):
+        index = self._index_for(data)
+        if index is not None:
+            return index.get(symbol)
         try:
             for asset in data:
                 if asset["Asset"] == symbol:
@@ -584,55 +528,12 @@ class Manager:
 
     def get_asset_value(self, symbol: str, data, value: str):
         try:
-            if value == "Funding":
-                for asset_data in data:
-                    if asset_data.get("Asset") == symbol:
-                        return asset_data.get("Funding", 0)
-            else:
-                asset_data = self.get_asset_data(symbol, data)
-                if asset_data is not None:
-                    if value == "Price" and "Price" in asset_data:
-                        return asset_data["Price"]
-                    if value == "1mVol" and "1m 1x Volume (USDT)" in asset_data:
-                        return asset_data["1m 1x Volume (USDT)"]
-                    if value == "5mVol" and "5m 1x Volume (USDT)" in asset_data:
-                        return asset_data["5m 1x Volume (USDT)"]
-                    if value == "1hVol" and "1m 1h Volume (USDT)" in asset_data:
-                        return asset_data["1h 1x Volume (USDT)"]
-                    if value == "1mSpread" and "1m Spread" in asset_data:
-                        return asset_data["1m Spread"]
-                    if value == "5mSpread" and "5m Spread" in asset_data:
-                        return asset_data["5m Spread"]
-                    if value == "15mSpread" and "15m Spread" in asset_data:
-                        return asset_data["15m Spread"]
-                    if value == "30mSpread" and "30m Spread" in asset_data:
-                        return asset_data["30m Spread"]
-                    if value == "1hSpread" and "1h Spread" in asset_data:
-                        return asset_data["1h Spread"]
-                    if value == "4hSpread" and "4h Spread" in asset_data:
-                        return asset_data["4h Spread"]
-                    if value == "MFI" and "MFI" in asset_data:
-                        return asset_data["MFI"]
-                    if value == "ERI Bull Power" in asset_data:
-                        return asset_data["ERI Bull Power"]
-                    if value == "ERI Bear Power" in asset_data:
-                        return asset_data["ERI Bear Power"]
-                    if value == "ERI Trend" in asset_data:
-                        return asset_data["ERI Trend"]
-                    if value == "HMA Trend" in asset_data:
-                        return asset_data["HMA Trend"]
-                    if value == "Top Signal 5m" in asset_data:
-                        return asset_data["Top Signal 5m"]
-                    if value == "Bottom Signal 5m" in asset_data:
-                        return asset_data["Bottom signal 5m"]
-                    if value == "Top Signal 1m" in asset_data:
-                        return asset_data["Top Signal 1m"]
-                    if value == "Bottom Signal 1m" in asset_data:
-                        return asset_data["Bottom signal 1m"]
-                    if value == "MA Trend" in asset_data:
-                        return asset_data["MA Trend"]
-                    if value == "EMA Trend" in asset_data:
-                        return asset_data["EMA Trend"]
+            asset_data = self.get_asset_data(symbol, data)
+            if asset_data is not None:
+                if value == "Funding":
+                    return asset_data.get("Funding", 0)
+                if value in ASSET_FIELDS:
+                    return asset_field(asset_data, value)
         except Exception as e:
             logging.info(f"{e}")
         return None
@@ -641,37 +542,16 @@ class Manager:
         return datetime.now() > self.api_data_cache_expiry
 
     def get_api_data(self, symbol):
-        api_data_url = f"https://api.quantumvoid.org/volumedata/quantdatav2_{self.data_source_exchange.replace('_', '')}.json"
-        data = self.fetch_data_from_url(api_data_url)
-        symbols = [asset.get("Asset", "") for asset in data if "Asset" in asset]
-
-        # Fetch funding rate data from the new URL
-        funding_data_url = f"https://api.quantumvoid.org/volumedata/funding_{self.data_source_exchange.replace('_', '')}.json"
-        funding_data = self.fetch_data_from_url(funding_data_url)
-
-        #logging.info(f"Funding data: {funding_data}")
-
-        api_data = {
-            '1mVol': self.get_asset_value(symbol, data, "1mVol"),
-            '5mVol': self.get_asset_value(symbol, data, "5mVol"),
-            '1hVol': self.get_asset_value(symbol, data, "1hVol"),
-            '1mSpread': self.get_asset_value(symbol, data, "1mSpread"),
-            '5mSpread': self.get_asset_value(symbol, data, "5mSpread"),
-            '30mSpread': self.get_asset_value(symbol, data, "30mSpread"),
-            '1hSpread': self.get_asset_value(symbol, data, "1hSpread"),
-            '4hSpread': self.get_asset_value(symbol, data, "4hSpread"),
-            'MA Trend': self.get_asset_value(symbol, data, "MA Trend"),
-            'HMA Trend': self.get_asset_value(symbol, data, "HMA Trend"),
-            'MFI': self.get_asset_value(symbol, data, "MFI"),
-            'ERI Trend': self.get_asset_value(symbol, data, "ERI Trend"),
-            'Funding': self.get_asset_value(symbol, funding_data, "Funding"),  # Use funding_data instead of data
-            'Symbols': symbols,
-            'Top Signal 5m': self.get_asset_value(symbol, data, "Top Signal 5m"),
-            'Bottom Signal 5m': self.get_asset_value(symbol, data, "Bottom Signal 5m"),
-            'Top Signal 1m': self.get_asset_value(symbol, data, "Top Signal 1m"),
-            'Bottom Signal 1m': self.get_asset_value(symbol, data, "Bottom Signal 1m"),
-            'EMA Trend': self.get_asset_value(symbol, data, "EMA Trend")
-        }
+        """Quantdata and funding record for a symbol, looked up in the per-URL Asset indexes."""
+        data_entry = self.get_dataset_entry('quantdata')
+        funding_entry = self.get_dataset_entry('funding')
+
+        asset_data = data_entry['index'].get(symbol)
+        api_data = {value: asset_field(asset_data, value) if asset_data is not None else None for value in API_DATA_FIELDS}
+
+        funding_asset = funding_entry['index'].get(symbol)
+        api_data['Funding'] = funding_asset.get("Funding", 0) if funding_asset is not None else None
+        api_data['Symbols'] = data_entry['symbols']
         return api_data
 
     def extract_metrics(self, api_data, symbol):
@@ -25,11 +25,27 @@ log = Logger(filename="combined_scraper.log", stream=True)
 
 funding_cache = {}  # We will handle cache differently in multiprocessing if needed
 
+# Candle length of each timeframe in milliseconds
+TIMEFRAME_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+}
+
+# Base series buffered per symbol across cycles: timeframe -> number of candles.
+# 5m covers the 128 15m candles of the ERI (plus room to drop a partial first 15m candle),
+# 4h the significant levels.
+BASE_CANDLES = {"1m": 240, "5m": 390, "4h": 200}
+
 class CombinedScraper:
     def __init__(self, exchange_name, filters: dict):
         self.funding_cache = {}  # Local cache for each process
         self.exchange_name = exchange_name
         self.FUNDING_CACHE_DURATION = timedelta(hours=4)  # Set cache duration
+        self.symbol_states = {}  # Per symbol candle buffers and indicators, kept between cycles
 
         if exchange_name == "binance":
             self.exchange = Binance()
@@ -40,9 +56,13 @@ class CombinedScraper:
         
         log.info("Scraper initializing for " + exchange_name)
         self.filters = filters
+        self.refresh_symbols()
+
+    def refresh_symbols(self):
+        """Fetch the symbols and prices for a new cycle, dropping the state of symbols no longer scraped."""
         self.symbols = self.exchange.get_futures_symbols()
         self.prices = self.exchange.get_futures_prices()
-        log.info(f"{len(self.symbols)} symbols found for " + exchange_name)
+        log.info(f"{len(self.symbols)} symbols found for " + self.exchange_name)
         
         if "quote_symbols" in self.filters:
             self.symbols = self.filter_quote(symbols=self.symbols, quotes=self.filters["quote_symbols"])
@@ -51,6 +71,14 @@ class CombinedScraper:
             self.volumes = self.exchange.get_futures_volumes()
             self.symbols = self.filter_volume(symbols=self.symbols, volumes=self.volumes, limit=self.filters["top_volume"])
 
+        self.symbol_states = {symbol: state for symbol, state in self.symbol_states.items() if symbol in self.symbols}
+
+    def __getstate__(self):
+        # Pool workers get their symbol's state as an argument, not every state along with the scraper
+        state = self.__dict__.copy()
+        state["symbol_states"] = {}
+        return state
+
     def get_all_historical_volume(self, exchange_name: str, interval: str, limit: int) -> dict:
         all_volume = {}
 
@@ -169,6 +197,41 @@ class CombinedScraper:
             return round((highest_high - lowest_low) / highest_high * 100, 4)
         return 0.0
 
+    def resample_candles(self, candles: list, base: str, timeframe: str) -> list:
+        """
+        Candles of ``timeframe`` built from ``candles`` of the shorter ``base`` timeframe.
+
+        Base candles are grouped on ``timeframe`` boundaries. A first group missing base
+        candles is dropped. So is an incomplete last group, unless the base series ends
+        with a candle that is still open (Binance returns it, Bybit does not): then the
+        last group is the open candle of ``timeframe``, as the exchange would return it.
+        """
+        period = TIMEFRAME_MS[timeframe]
+        per_candle = period // TIMEFRAME_MS[base]
+
+        groups = []
+        for candle in candles:
+            start = candle["timestamp"] - candle["timestamp"] % period
+            if groups and groups[-1]["timestamp"] == start:
+                group = groups[-1]
+                group["high"] = max(group["high"], candle["high"])
+                group["low"] = min(group["low"], candle["low"])
+                group["close"] = candle["close"]
+                group["volume"] += candle["volume"]
+                group["count"] += 1
+            else:
+                groups.append({**candle, "timestamp": start, "count": 1})
+
+        if groups and groups[0]["count"] < per_candle:
+            groups.pop(0)
+        last_open = bool(candles) and candles[-1]["timestamp"] + TIMEFRAME_MS[base] > time.time() * 1000
+        if groups and groups[-1]["count"] < per_candle and not last_open:
+            groups.pop()
+
+        for group in groups:
+            del group["count"]
+        return groups
+
     def spread_calc(self, data):
         data["high-low"] = abs(data["high"] - abs(data["low"]))
         spread = data[["high-low"]].max(axis=1)
@@ -194,8 +257,8 @@ class CombinedScraper:
 
         return df
 
-    def get_candle_data(self, symbol: str, interval: str, limit: int):
-        bars = self.exchange.get_futures_kline(
+    def get_candle_data(self, symbol: str, interval: str, limit: int, data: list | None = None):
+        bars = data[-limit:] if data is not None else self.exchange.get_futures_kline(
             symbol=symbol, interval=interval, limit=limit
         )
         df = pd.DataFrame(
@@ -214,8 +277,8 @@ class CombinedScraper:
             "low_6": df["MA_6_Low"].iat[-1],
         }
 
-    def get_hma(self, symbol: str, interval: str, limit: int, column: str, window: int):
-        bars = self.exchange.get_futures_kline(
+    def get_hma(self, symbol: str, interval: str, limit: int, column: str, window: int, data: list | None = None):
+        bars = data[-limit:] if data is not None else self.exchange.get_futures_kline(
             symbol=symbol, interval=interval, limit=limit
         )
         df = pd.DataFrame(
@@ -255,8 +318,8 @@ class CombinedScraper:
             self.symbols["price_scale"],
         )
 
-    def get_sma(self, symbol: str, interval: str, limit: int, column: str, window: int):
-        bars = self.exchange.get_futures_kline(
+    def get_sma(self, symbol: str, interval: str, limit: int, column: str, window: int, data: list | None = None):
+        bars = data[-limit:] if data is not None else self.exchange.get_futures_kline(
             symbol=symbol, interval=interval, limit=limit
         )
         df = pd.DataFrame(
@@ -286,7 +349,7 @@ class CombinedScraper:
         tr = data[["high-low", "high-pc", "low-pc"]].max(axis=1)
         return tr
 
-    def calculate_advanced_eri(self, symbol, timeframe, len_slow_ma=64, len_power_ema=13, limit=128):
+    def calculate_advanced_eri(self, symbol, timeframe, len_slow_ma=64, len_power_ema=13, limit=128, data=None):
         """
         Calculate an Elder-ray Index (ERI) similar to RustyC's approach, using VWMA followed by EMA.
 
@@ -295,10 +358,13 @@ class CombinedScraper:
         :param len_slow_ma: Length for slow moving average (VWMA followed by EMA).
         :param len_power_ema: Length for EMA of bull and bear power.
         :param limit: Number of candlesticks to fetch.
+        :param data: Candles of ``timeframe`` already at hand; fetched when None.
         :return: A dictionary containing ERI trend, bull power, and bear power.
         """
         # Fetching data
-        data = self.exchange.get_futures_kline(symbol=symbol, interval=timeframe, limit=limit)
+        if data is None:
+            data = self.exchange.get_futures_kline(symbol=symbol, interval=timeframe, limit=limit)
+        data = data[-limit:]
 
         # Create a DataFrame from the data
         df = pd.DataFrame(data, columns=["timestamp", "open", "high", "low", "close", "volume"])
@@ -445,8 +511,8 @@ class CombinedScraper:
         return eri_trend, bull_power_smoothed.values[-1], bear_power_smoothed.values[-1]
 
     # Get MFIRSI
-    def get_mfi(self, symbol: str, interval: str, limit: int, lookback: int = 30) -> str:
-        bars = self.exchange.get_futures_kline(symbol=symbol, interval=interval, limit=limit)
+    def get_mfi(self, symbol: str, interval: str, limit: int, lookback: int = 30, data: list | None = None) -> str:
+        bars = data[-limit:] if data is not None else self.exchange.get_futures_kline(symbol=symbol, interval=interval, limit=limit)
         df = pd.DataFrame(bars, columns=["timestamp", "open", "high", "low", "close", "volume"])
 
         # Calculate MFI, RSI, MA and whether open < close
@@ -529,9 +595,9 @@ class CombinedScraper:
         # Return the latest signals
         return df_1m['top_signal'].iloc[-1], df_1m['bottom_signal'].iloc[-1]
     
-    def detect_top_bottom_signals_5m(self, symbol: str):
-        # Fetching 1-minute kline data
-        data_1m = self.exchange.get_futures_kline(symbol=symbol, interval="5m", limit=240)
+    def detect_top_bottom_signals_5m(self, symbol: str, data: list | None = None):
+        # Fetching 5-minute kline data
+        data_1m = data[-240:] if data is not None else self.exchange.get_futures_kline(symbol=symbol, interval="5m", limit=240)
         df_1m = pd.DataFrame(data_1m, columns=["timestamp", "open", "high", "low", "close", "volume"])
         df_1m[['open', 'high', 'low', 'close', 'volume']] = df_1m[['open', 'high', 'low', 'close', 'volume']].apply(pd.to_numeric)
 
@@ -555,9 +621,9 @@ class CombinedScraper:
         # Return the latest signals
         return df_1m['top_signal'].iloc[-1], df_1m['bottom_signal'].iloc[-1]
 
-    def detect_top_bottom_signals_1m(self, symbol: str):
+    def detect_top_bottom_signals_1m(self, symbol: str, data: list | None = None):
         # Fetching 1-minute kline data for the last 240 minutes
-        data_1m = self.exchange.get_futures_kline(symbol=symbol, interval="1m", limit=240)
+        data_1m = data[-240:] if data is not None else self.exchange.get_futures_kline(symbol=symbol, interval="1m", limit=240)
         df_1m = pd.DataFrame(data_1m, columns=["timestamp", "open", "high", "low", "close", "volume"])
         df_1m[['open', 'high', 'low', 'close', 'volume']] = df_1m[['open', 'high', 'low', 'close', 'volume']].apply(pd.to_numeric)
 
@@ -620,10 +686,54 @@ class CombinedScraper:
         return df
 
 
-    def analyse_symbol(self, symbol: str) -> dict:
+    def update_candles(self, symbol: str, state: dict) -> dict:
+        """
+        Bring the symbol's candle buffers (state["candles"]) up to date, fetching only new candles.
+
+        A buffer whose last candle was closed only needs the candles closed since; while
+        the next one is still open no request is made at all. A buffer whose last candle
+        was still open (Binance returns it) refetches that candle and any after it. An
+        empty buffer, or one older than its length, is fetched in full.
+
+        :param symbol: Trading pair symbol.
+        :param state: The symbol's state, kept by analyse_all_symbols between cycles.
+        :return: Candle buffers by timeframe, each at most BASE_CANDLES[timeframe] long.
+        """
+        buffers = state.setdefault("candles", {})
+        open_last = state.setdefault("open_last", {})
+        now = time.time() * 1000
+
+        for timeframe, length in BASE_CANDLES.items():
+            period = TIMEFRAME_MS[timeframe]
+            buffer = buffers.get(timeframe) or []
+
+            limit = length
+            if buffer:
+                elapsed = int((now - buffer[-1]["timestamp"]) // period)  # Candles opened since the last one
+                limit = elapsed + 1 if open_last.get(timeframe) else elapsed - 1
+                if limit <= 0:
+                    continue
+                limit = min(limit, length)
+
+            bars = self.exchange.get_futures_kline(symbol=symbol, interval=timeframe, limit=limit)
+            if not bars:
+                continue
+            if limit < length:
+                bars = [candle for candle in buffer if candle["timestamp"] < bars[0]["timestamp"]] + bars
+            buffers[timeframe] = bars[-length:]
+            open_last[timeframe] = bars[-1]["timestamp"] + period > now
+
+        return buffers
+
+    def analyse_symbol(self, symbol: str, state: dict | None = None) -> dict:
+        """
+        Analyse a symbol for the current cycle.
 
-        len_slow_ma = 64
-        len_power_ema = 13
+        :param symbol: Trading pair symbol.
+        :param state: The symbol's candle buffers and last indicators from previous cycles,
+            updated in place; a fresh state fetches everything.
+        :return: The symbol's row of the quant data.
+        """
         log.info(f"Analysing: {symbol}")
         values = {"Asset": symbol}
 
@@ -633,59 +743,67 @@ class CombinedScraper:
 
         values["Price"] = self.prices[symbol]
 
-        candles_1h = self.exchange.get_futures_kline(
-            symbol=symbol, interval="1h", limit=5
-        )
+        # Indicators only change with the candles: recompute them when a candle was added or updated
+        state = {} if state is None else state
+        candles = self.update_candles(symbol, state)
+        key = tuple((timeframe, bars[-1]["timestamp"], bars[-1]["close"], bars[-1]["volume"]) for timeframe, bars in candles.items() if bars)
+        if state.get("key") != key:
+            state["indicators"] = self.analyse_candles(symbol, candles)
+            state["key"] = key
+        indicators = state["indicators"]
 
-        candles_30m = self.exchange.get_futures_kline(
-            symbol=symbol, interval="30m", limit=5
-        )
-        candles_5m = self.exchange.get_futures_kline(
-            symbol=symbol, interval="5m", limit=5
-        )
-        candles_1m = self.exchange.get_futures_kline(
-            symbol=symbol, interval="1m", limit=5
-        )
+        # Define 1x candle volumes at the current price
+        for timeframe in ("1m", "5m", "30m", "1h"):
+            values[f"{timeframe} 1x Volume (USDT)"] = round(values["Price"] * indicators["volumes"][timeframe])
 
-        data = self.exchange.get_futures_kline(symbol=symbol, interval="1m", limit=240)
-        df = pd.DataFrame(data, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].apply(pd.to_numeric)
+        values.update(indicators["values"])
+
+        # Define funding rates
+        #values["Funding"] = self.exchange.get_funding_rate(symbol=symbol) * 100
+        values["Funding"] = self.get_cached_funding(symbol)
+
+        values["Timestamp"] = str(int(datetime.now().timestamp()))
+
+        return values
+
+    def analyse_candles(self, symbol: str, candles: dict) -> dict:
+        """
+        Indicators of a symbol computed from its candle buffers.
+
+        :param symbol: Trading pair symbol.
+        :param candles: Candle buffers by timeframe, as returned by update_candles.
+        :return: {"volumes": last candle volume by timeframe, "values": indicator values for the quant data}.
+        """
+        # Every indicator below works on the base series or on candles resampled from them
+        data = candles["1m"]
+        candles_5m = candles["5m"]
+        candles_15m = self.resample_candles(candles_5m, "5m", "15m")
+        candles_30m = self.resample_candles(candles_5m, "5m", "30m")
+        candles_1h = self.resample_candles(candles_5m, "5m", "1h")
+
+        volumes = {
+            "1m": data[-1]["volume"],
+            "5m": candles_5m[-1]["volume"],
+            "30m": candles_30m[-1]["volume"],
+            "1h": candles_1h[-1]["volume"],
+        }
 
+        values = {}
         values["1m Spread"] = self.get_spread(symbol=symbol, limit=1, data=data[-1:])
         values["5m Spread"] = self.get_spread(symbol=symbol, limit=5, data=data[-5:])
         values["30m Spread"] = self.get_spread(symbol=symbol, limit=30, data=data[-30:])
         values["1h Spread"] = self.get_spread(symbol=symbol, limit=60, data=data[-60:])
         values["4h Spread"] = self.get_spread(symbol=symbol, limit=240, data=data)
 
-        # Define 1x 5m candle volume
-        onexcandlevol = candles_5m[-1]["volume"]
-        volume_1x_5m = values["Price"] * onexcandlevol
-        values["5m 1x Volume (USDT)"] = round(volume_1x_5m)
-
-        # Define 1x 1m candle volume
-        onex1mcandlevol = candles_1m[-1]["volume"]
-        volume_1x = values["Price"] * onex1mcandlevol
-        values["1m 1x Volume (USDT)"] = round(volume_1x)
-
-        # Define 1x 30m candle volume
-        onex30mcandlevol = candles_30m[-1]["volume"]
-        volume_1x_30m = values["Price"] * onex30mcandlevol
-        values["30m 1x Volume (USDT)"] = round(volume_1x_30m)
-
-        onex1hcandlevol = candles_1h[-1]["volume"]
-        volume_1x_1h = values["Price"] * onex1hcandlevol
-        values["1h 1x Volume (USDT)"] = round(volume_1x_1h)
-
         # Define MA data
-        values["5m MA6 high"] = self.get_candle_data(
-            symbol=symbol, interval="5m", limit=20
-        )["high_6"]
-        values["5m MA6 low"] = self.get_candle_data(
-            symbol=symbol, interval="5m", limit=20
-        )["low_6"]
+        candle_data_5m = self.get_candle_data(
+            symbol=symbol, interval="5m", limit=20, data=candles_5m
+        )
+        values["5m MA6 high"] = candle_data_5m["high_6"]
+        values["5m MA6 low"] = candle_data_5m["low_6"]
 
         ma_order_pct = self.get_sma(
-            symbol=symbol, interval="1m", limit=30, column="close", window=14
+            symbol=symbol, interval="1m", limit=30, column="close", window=14, data=data
         )
         values["trend%"] = ma_order_pct
 
@@ -694,12 +812,6 @@ class CombinedScraper:
         else:
             values["Trend"] = "long"
 
-        # Define funding rates
-        #values["Funding"] = self.exchange.get_funding_rate(symbol=symbol) * 100
-        values["Funding"] = self.get_cached_funding(symbol)
-
-        values["Timestamp"] = str(int(datetime.now().timestamp()))
-
         # Get MFI
         #mfi = self.get_mfi(symbol=symbol, interval="1m", limit=200, lookback=200)
         # mfi = self.get_mfi(symbol=symbol, interval="1m", limit=200)
@@ -708,12 +820,8 @@ class CombinedScraper:
         # Most recent: 
         #mfi = self.get_mfi(symbol=symbol, interval="5m", limit=200, lookback=100)
 
-        mfi = self.get_mfi(symbol=symbol, interval="1m", limit=200, lookback=30)
-
+        mfi = self.get_mfi(symbol=symbol, interval="1m", limit=200, lookback=30, data=data)
 
-        # mfi = self.get_mfi(symbol=symbol, interval="1m", limit=200, lookback=100)
-
-        # mfi = self.get_mfi(symbol=symbol, interval="1m", limit=500, short_lookback=200, long_lookback=500)
         values["MFI"] = mfi
 
         # Get ERI
@@ -722,78 +830,43 @@ class CombinedScraper:
         eri_timeframe = "15m"  # 60 minutes for 1 hour
 
         # Calculating ERI
-        eri_result = self.calculate_advanced_eri(symbol, eri_timeframe)
+        eri_result = self.calculate_advanced_eri(symbol, eri_timeframe, data=candles_15m)
         # eri_result = self.calculate_original_eri(symbol, eri_timeframe)
 
         # Adding ERI values to the dictionary
         values.update(eri_result)
 
         # Calculate HMA trend
-        hma_order_pct = self.get_hma(symbol=symbol, interval="1m", limit=30, column="close", window=14)
+        hma_order_pct = self.get_hma(symbol=symbol, interval="1m", limit=30, column="close", window=14, data=data)
         values["hma_trend%"] = hma_order_pct
 
-        #print(f"HMA ORDER PCT {hma_order_pct}")
-
         if hma_order_pct > 0:
             values["HMA Trend"] = "short"
         else:
             values["HMA Trend"] = "long"
 
-
-        # # Call the new function for top and bottom signal detection
-        # top_signal_1m, bottom_signal_1m = self.detect_top_bottom_signals_1m(symbol)
-
-        # # Add the signals to the values dictionary
-        # values["Top Signal 1m"] = top_signal_1m
-        # values["Bottom Signal 1m"] = bottom_signal_1m
-
-        top_signal_5m, bottom_signal_5m = self.detect_top_bottom_signals_5m(symbol)
+        top_signal_5m, bottom_signal_5m = self.detect_top_bottom_signals_5m(symbol, data=candles_5m)
 
         values["Top Signal 5m"] = top_signal_5m
         values["Bottom Signal 5m"] = bottom_signal_5m
 
-        top_signal_1m, bottom_signal_1m = self.detect_top_bottom_signals_1m(symbol)
+        top_signal_1m, bottom_signal_1m = self.detect_top_bottom_signals_1m(symbol, data=data)
 
         values["Top Signal 1m"] = top_signal_1m
         values["Bottom Signal 1m"] = bottom_signal_1m
 
-        significant_levels = self.lin_peaks_troughs_highlow_algo(symbol, '4h')
+        significant_levels = self.lin_peaks_troughs_highlow_algo(symbol, '4h', data=candles["4h"])
 
         #print(f"Significant levels for {symbol} : {significant_levels}")
         log.info(f"Significant levels for {symbol} : {significant_levels}")
 
+        return {"volumes": volumes, "values": values}
 
-        return values
-
-        # df["close"] = pd.to_numeric(df["close"])
-        # df["high"] = pd.to_numeric(df["high"])
-        # df["low"] = pd.to_numeric(df["low"])
-
-        # # Calculate slow EMA of closing prices
-        # slow_ma = df['close'].ewm(span=len_slow_ma, adjust=False).mean()
-
-        # # Determine the trend
-        # last_price = df['close'].values[-1]
-        # eri_trend = "bullish" if last_price > slow_ma.values[-1] else "bearish"
-
-        # # Calculate bull power and bear power
-        # bull_power = df['high'] - slow_ma
-        # bear_power = df['low'] - slow_ma
-
-        # # Smooth the power values using EMA
-        # bull_power_smoothed = bull_power.ewm(span=len_power_ema, adjust=False).mean()
-        # bear_power_smoothed = bear_power.ewm(span=len_power_ema, adjust=False).mean()
-
-        # # Add to the values dict
-        # values["ERI Bull Power"] = bull_power_smoothed.values[-1]
-        # values["ERI Bear Power"] = bear_power_smoothed.values[-1]
-        # values["ERI Trend"] = eri_trend
-
-    def retry_analyse_symbol(self, symbol: str, retry_limit: int):
+    def retry_analyse_symbol(self, symbol: str, retry_limit: int, state: dict | None = None):
         retry_count = 0
         while retry_count < retry_limit:
             try:
-                return self.analyse_symbol(symbol)
+                return self.analyse_symbol(symbol, state)
             except Exception as e:
                 retry_count += 1
                 log.error(f"Exception while analysing {symbol}. Retry attempt {retry_count}. Exception: {e}")
@@ -823,8 +896,9 @@ class CombinedScraper:
         line_price = (slope * index) + intercept
         return abs(line_price - price)
 
-    def lin_peaks_troughs_highlow_algo(self, symbol, interval, threshold_percentage=0.05):
-        data = self.exchange.get_futures_kline(symbol, interval)
+    def lin_peaks_troughs_highlow_algo(self, symbol, interval, threshold_percentage=0.05, data=None):
+        if data is None:
+            data = self.exchange.get_futures_kline(symbol, interval)
         close_prices = [candle['close'] for candle in data]
 
         peaks, troughs = self.detect_peaks_and_troughs(close_prices)
@@ -849,16 +923,23 @@ class CombinedScraper:
 
     def analyse_symbol_wrapper(self, args):
         # This wrapper will be used to pass multiple arguments to the function used with Pool
-        return self.retry_analyse_symbol(*args)
+        # The symbol's state is updated in the worker and sent back with the result
+        symbol, retry_limit, state = args
+        state = {} if state is None else state
+        return symbol, self.retry_analyse_symbol(symbol, retry_limit, state), state
 
     def analyse_all_symbols(self, retry_limit: int = 5):
         # Create a pool of 14 worker processes
         with Pool(processes=14) as pool:
-            # Map the analyse_symbol_wrapper function to all symbols with the retry_limit
-            data = pool.map(self.analyse_symbol_wrapper, [(symbol, retry_limit) for symbol in self.symbols])
+            # Map the analyse_symbol_wrapper function to all symbols with the retry_limit and their state from the last cycle
+            results = pool.map(self.analyse_symbol_wrapper, [(symbol, retry_limit, self.symbol_states.get(symbol)) for symbol in self.symbols])
 
-        # Filter out None results if any failed analyses returned None
-        data = [result for result in data if result is not None]
+        data = []
+        for symbol, values, state in results:
+            self.symbol_states[symbol] = state
+            # Filter out None results if any failed analyses returned None
+            if values is not None:
+                data.append(values)
 
         # Create the DataFrame with the collected data
         df = pd.DataFrame(
@@ -905,11 +986,17 @@ def run_scraper_for_exchange(exchange_name: str):
     top_volume = 400
     filters = {"quote_symbols": quote_symbols, "top_volume": top_volume}
 
+    # Kept across cycles, so each cycle only fetches the candles that are new
+    scraper = None
+
     while True:
         start_time = time.time()
         try:
             with pidfile.PIDFile(f"{exchange_name}_scraper.pid"):
-                scraper = CombinedScraper(exchange_name=exchange_name, filters=filters)
+                if scraper is None:
+                    scraper = CombinedScraper(exchange_name=exchange_name, filters=filters)
+                else:
+                    scraper.refresh_symbols()
                 
                 # Analyzing all symbols with multiprocessing
                 df = scraper.analyse_all_symbols()
@@ -0,0 +1,209 @@
+import asyncio
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from directionalscalper.core.strategies.logger import Logger
+
+try:
+    import ccxt.async_support as ccxt_async
+except ImportError:
+    ccxt_async = None
+
+logging = Logger(logger_name="AsyncRuntime", filename="AsyncRuntime.log", stream=True)
+
+_DONE = object()
+
+
+class SymbolTask:
+    """
+    Handle for one symbol side running as a coroutine on the runtime's loop.
+
+    It stands in for the (thread, thread_completed) pair of the threaded runner:
+    ``is_alive`` and ``join`` behave like the thread's, ``completed`` is set once the
+    coroutine has finished, and ``cancel`` stops it at its next await.
+    """
+
+    def __init__(self, runtime, key):
+        self.runtime = runtime
+        self.key = key
+        self.future = None
+        self.completed = threading.Event()
+
+    def is_alive(self):
+        return not self.completed.is_set()
+
+    def join(self, timeout=None):
+        return self.completed.wait(timeout)
+
+    def cancel(self):
+        if self.future is not None and not self.future.done():
+            self.runtime.loop.call_soon_threadsafe(self.future.cancel)
+
+
+class AsyncRuntime:
+    """
+    Event loop that runs every symbol side as a coroutine instead of two OS threads per symbol.
+
+    The loop lives on one thread. Blocking work (a strategy's trading step, a signal
+    computation) runs on a small shared worker pool; the pauses between steps are
+    plain ``asyncio.sleep`` calls that hold no thread, so hundreds of symbol sides
+    fit in ``max_workers`` threads. Strategies that expose ``run_steps`` (a generator
+    yielding the delay before their next step) are driven step by step and can be
+    cancelled at any pause; others run whole on a worker.
+
+    The account snapshot is refreshed on the loop with a ``ccxt.async_support``
+    client, its fetches drawing from the shared rate budget.
+    """
+
+    def __init__(self, exchange, max_workers=16):
+        self.exchange = exchange  # Our Exchange wrapper, used for credentials and the account state service
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="AsyncRuntimeWorker")
+        self.loop = None
+        self.thread = None
+        self.client = None
+        self.running = False
+        self.ready = threading.Event()
+        self.tasks = {}
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run_loop, name="AsyncRuntime", daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout=10)
+        logging.info(f"Async runtime started with {self.max_workers} workers")
+
+    def stop(self, timeout=30):
+        if not self.running:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            logging.info(f"Error stopping async runtime: {e}")
+        self.running = False
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.executor.shutdown(wait=False)
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.set_default_executor(self.executor)
+        try:
+            self.client = self._create_client()
+            account_state = getattr(self.exchange, 'account_state', None)
+            if self.client is not None and account_state is not None:
+                self.loop.create_task(account_state.run_async(self.client))
+            self.ready.set()
+            self.loop.run_forever()
+        except Exception as e:
+            logging.info(f"Async runtime loop stopped: {e}")
+            logging.info(traceback.format_exc())
+        finally:
+            self.running = False
+            self.ready.set()
+
+    def _create_client(self):
+        if ccxt_async is None or not self.exchange.api_key:
+            logging.info("ccxt.async_support unavailable or no API key, account state keeps its refresh thread")
+            return None
+        params = {
+            'apiKey': self.exchange.api_key,
+            'secret': self.exchange.secret_key,
+            'enableRateLimit': False,  # Requests are paced by the shared rate budget instead
+            'options': {
+                'defaultType': self.exchange.market_type,
+                'adjustForTimeDifference': True,
+            },
+        }
+        return getattr(ccxt_async, self.exchange.exchange.id)(params)
+
+    async def _shutdown(self):
+        with self.lock:
+            tasks = list(self.tasks.values())
+        for task in tasks:
+            task.future.cancel()
+        await asyncio.gather(*(task.future for task in tasks), return_exceptions=True)
+        account_state = getattr(self.exchange, 'account_state', None)
+        if account_state is not None and self.client is not None:
+            account_state.running = False
+        if self.client is not None:
+            await self.client.close()
+
+    # Symbol sides
+
+    def submit(self, key, coroutine_function, *args):
+        """
+        Run ``coroutine_function(*args)`` as the task for ``key`` (e.g. (symbol, 'long')). Thread-safe.
+
+        :return: SymbolTask handle, or the running one if ``key`` is already active.
+        """
+        with self.lock:
+            task = self.tasks.get(key)
+            if task is not None and task.is_alive():
+                return task
+            task = SymbolTask(self, key)
+            self.tasks[key] = task
+        task.future = asyncio.run_coroutine_threadsafe(self._supervise(task, coroutine_function, *args), self.loop)
+        return task
+
+    async def _supervise(self, task, coroutine_function, *args):
+        try:
+            await coroutine_function(*args)
+        except asyncio.CancelledError:
+            logging.info(f"Task {task.key} cancelled")
+        except Exception as e:
+            logging.info(f"Task {task.key} failed: {e}")
+            logging.info(traceback.format_exc())
+        finally:
+            with self.lock:
+                if self.tasks.get(task.key) is task:
+                    del self.tasks[task.key]
+            task.completed.set()
+
+    def cancel(self, key):
+        with self.lock:
+            task = self.tasks.get(key)
+        if task is not None:
+            task.cancel()
+        return task
+
+    def active_keys(self):
+        with self.lock:
+            return [key for key, task in self.tasks.items() if task.is_alive()]
+
+    # Helpers for coroutines running on the loop
+
+    async def run_blocking(self, function, *args):
+        """Run a blocking call on the worker pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def drive_steps(self, steps):
+        """
+        Drive a ``run_steps`` generator: each step runs on a worker, each yielded delay is awaited.
+
+        On cancellation the step in progress is allowed to finish (it cannot be interrupted
+        mid-request), then the generator is closed so its cleanup and lock release run.
+        """
+        step = None
+        try:
+            while True:
+                step = asyncio.ensure_future(self.run_blocking(next, steps, _DONE))
+                delay = await asyncio.shield(step)
+                step = None
+                if delay is _DONE:
+                    return
+                await asyncio.sleep(delay)
+        finally:
+            if step is not None:
+                await asyncio.wait([step])
+            await self.run_blocking(steps.close)
+
+    def metrics(self):
+        with self.lock:
+            active = sum(1 for task in self.tasks.values() if task.is_alive())
+        return {'tasks': active, 'workers': self.max_workers, 'threads': threading.active_count()}
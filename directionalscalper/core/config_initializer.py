@@ -39,7 +39,9 @@ class ConfigInitializer:
             strategy_instance.stop_loss_enabled = config.linear_grid['stop_loss_enabled']
             strategy_instance.stop_loss_long = config.linear_grid['stop_loss_long']
             strategy_instance.stop_loss_short = config.linear_grid['stop_loss_short']
+            strategy_instance.stop_loss_native = config.linear_grid.get('stop_loss_native', False)
             strategy_instance.drawdown_behavior = config.linear_grid.get('drawdown_behavior', 'maxqtypercent')
+            strategy_instance.tp_use_trading_stop = config.linear_grid.get('tp_use_trading_stop', False)
             strategy_instance.upnl_threshold_pct = config.upnl_threshold_pct
             strategy_instance.volume_check = config.volume_check
             strategy_instance.max_usd_value = config.max_usd_value
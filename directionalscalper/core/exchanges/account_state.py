@@ -0,0 +1,286 @@
+import time
+import asyncio
+import threading
+import traceback
+from collections import namedtuple
+
+from ..strategies.logger import Logger
+from .order_tracker import fetch_all_open_orders, fetch_all_open_orders_async
+from rate_limit import rate_budget
+from retry_policy import retry_policy
+
+logging = Logger(logger_name="AccountState", filename="AccountState.log", stream=True)
+
+# Published snapshots are never mutated; a refresh or stream update replaces the whole tuple.
+# Each part carries the time it was last successfully fetched or patched, and ``timestamp``
+# is the oldest of the three, so a snapshot is only as fresh as its stalest part.
+AccountSnapshot = namedtuple('AccountSnapshot', ['version', 'timestamp', 'positions', 'open_orders', 'balance',
+                                                 'positions_time', 'open_orders_time', 'balance_time'])
+
+COMPONENTS = ('positions', 'open_orders', 'balance')
+
+
+class AccountStateService:
+    """
+    Single source of account state (open positions, open orders, balance) per exchange account.
+
+    A background thread refreshes everything over REST on one cadence and private
+    websocket events from the market feed patch the latest snapshot in between.
+    Readers just grab ``self.snapshot``, which is swapped atomically, so no reader
+    ever takes a lock or calls the API; ``version`` increases with every published
+    snapshot. Nothing is published until every part has been fetched once.
+    """
+
+    def __init__(self, exchange, refresh_interval=10, max_age=30, retries=4, delay_factor=1, max_delay=5, deadline=8):
+        self.exchange = exchange  # Our Exchange wrapper
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age  # Snapshots older than this are logged as stale
+        self.retries = retries
+        self.delay_factor = delay_factor
+        self.max_delay = max_delay
+        self.deadline = deadline  # Per fetch, and how long a reader waits for the very first snapshot
+
+        self.snapshot = None
+        self.parts = {}  # Part name -> (value, time) of the last successful fetch or stream patch
+        self.part_versions = dict.fromkeys(COMPONENTS, 0)  # Bumped by every REST result or stream patch of the part
+        self.ready = threading.Event()
+        self.stale_version = None
+        self.shared_source = None  # SharedMarketDataReader in a sharded worker process; the coordinator refreshes
+        self.refresh_lock = threading.Lock()
+        self.publish_lock = threading.Lock()
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="AccountStateService", daemon=True)
+        self.thread.start()
+        logging.info(f"Account state service started, refreshing every {self.refresh_interval} seconds")
+
+    def stop(self):
+        self.running = False
+
+    def _run(self):
+        while self.running:
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.info(f"Account state refresh failed: {e}")
+                logging.info(traceback.format_exc())
+            time.sleep(self.refresh_interval)
+
+    def get_snapshot(self, max_age=None):
+        """
+        Last published snapshot; the refresh thread keeps it current, readers never fetch.
+
+        Until the first snapshot is published a reader waits up to ``deadline`` seconds
+        for it and then gets None.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        if self.shared_source is not None:
+            snapshot = self.shared_source.get_account_snapshot()
+            if snapshot is not None and time.time() - snapshot.timestamp <= max_age:
+                return snapshot
+
+        if not self.running:
+            self.start()
+
+        snapshot = self.snapshot
+        if snapshot is None and self.ready.wait(self.deadline):
+            snapshot = self.snapshot
+        if snapshot is not None and time.time() - snapshot.timestamp > max_age and self.stale_version != snapshot.version:
+            self.stale_version = snapshot.version
+            logging.info(f"Account snapshot {snapshot.version} is {time.time() - snapshot.timestamp:.0f}s old, refreshes are failing")
+        return snapshot
+
+    def get_open_positions(self, max_age=None):
+        snapshot = self.get_snapshot(max_age)
+        return list(snapshot.positions) if snapshot is not None else []
+
+    def get_open_orders(self, symbol=None, max_age=None):
+        snapshot = self.get_snapshot(max_age)
+        orders = snapshot.open_orders if snapshot is not None else ()
+        if symbol is None:
+            return list(orders)
+        return [order for order in orders if order.get('info', {}).get('symbol') == symbol or order.get('symbol') == symbol]
+
+    def get_balance(self, max_age=None):
+        snapshot = self.get_snapshot(max_age)
+        return snapshot.balance if snapshot is not None else None
+
+    def refresh(self):
+        with self.refresh_lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self):
+        versions = self._part_versions()
+        if self.exchange.market_type == 'spot':
+            positions = self._fetch_with_retry('positions', 'fetch_positions', self.exchange.exchange.fetch_positions, params={'type': 'spot'})
+        else:
+            positions = self._fetch_with_retry('positions', 'fetch_positions', self.exchange.exchange.fetch_positions, params={'limit': 200})
+        orders_fetched_at = time.time()
+        # Every page is charged by fetch_all_open_orders itself
+        open_orders = self._fetch_with_retry('open orders', None, fetch_all_open_orders, self.exchange.exchange.fetch_open_orders)
+        balance = self._fetch_with_retry('balance', 'fetch_balance', self.exchange.exchange.fetch_balance, {'type': self.exchange.market_type})
+        self._apply_refresh(positions, open_orders, balance, orders_fetched_at, versions)
+
+    async def refresh_async(self, client):
+        """
+        Refresh the snapshot with a ccxt.async_support client, fetching the three parts concurrently.
+
+        Used by the asyncio runtime in place of the refresh thread; each fetch draws
+        from the shared rate budget. A part that fails keeps its previous value.
+        """
+        position_params = {'type': 'spot'} if self.exchange.market_type == 'spot' else {'limit': 200}
+        versions = self._part_versions()
+        orders_fetched_at = time.time()
+        results = await asyncio.gather(
+            self._fetch_async('fetch_positions', client.fetch_positions, params=position_params),
+            fetch_all_open_orders_async(client.fetch_open_orders),
+            self._fetch_async('fetch_balance', client.fetch_balance, {'type': self.exchange.market_type}),
+            return_exceptions=True,
+        )
+        positions, open_orders, balance = [None if isinstance(result, BaseException) else result for result in results]
+        for result in results:
+            if isinstance(result, BaseException):
+                logging.info(f"Error in async account refresh: {result}. Keeping previous value.")
+        self._apply_refresh(positions, open_orders, balance, orders_fetched_at, versions)
+
+    async def run_async(self, client):
+        """Refresh loop for the asyncio runtime; marks the service running so no refresh thread is started."""
+        self.running = True
+        while self.running:
+            try:
+                await self.refresh_async(client)
+            except Exception as e:
+                logging.info(f"Account state refresh failed: {e}")
+                logging.info(traceback.format_exc())
+            await asyncio.sleep(self.refresh_interval)
+
+    @staticmethod
+    async def _fetch_async(endpoint, function, *args, **kwargs):
+        # Each part draws from its own bucket (position, order_query, account), not all from 'position'
+        await rate_budget.endpoint(endpoint).acquire_async()
+        return await function(*args, **kwargs)
+
+    def _part_versions(self):
+        with self.publish_lock:
+            return dict(self.part_versions)
+
+    def _apply_refresh(self, positions, open_orders, balance, orders_fetched_at, versions=None):
+        """
+        Publish a REST refresh. ``open_orders`` is the (orders, complete) pair of fetch_all_open_orders.
+        ``versions`` are the part versions taken before fetching; a part that a stream event
+        patched in the meantime keeps the newer patched value.
+        """
+        orders_complete = True
+        if open_orders is not None:
+            open_orders, orders_complete = open_orders
+        if positions is not None:
+            positions = [position for position in positions if float(position.get('contracts', position.get('size', 0)) or 0) != 0]
+            market_metadata = getattr(self.exchange, 'market_metadata', None)
+            if market_metadata is not None:
+                market_metadata.update_leverage(positions)
+
+        # Every refresh doubles as the periodic REST reconciliation of the order tracker
+        order_tracker = getattr(self.exchange, 'order_tracker', None)
+        if order_tracker is not None and open_orders is not None:
+            order_tracker.reconcile(open_orders, fetched_at=orders_fetched_at, complete=orders_complete)
+
+        with self.publish_lock:
+            if versions is not None:
+                fetched = {'positions': positions, 'open_orders': open_orders, 'balance': balance}
+                for name in COMPONENTS:
+                    if fetched[name] is not None and self.part_versions[name] != versions[name]:
+                        logging.info(f"Dropping REST {name}, a stream update landed while it was fetched")
+                        fetched[name] = None
+                positions, open_orders, balance = fetched['positions'], fetched['open_orders'], fetched['balance']
+            self._publish_locked(positions=positions, open_orders=open_orders, balance=balance)
+
+    def _fetch_with_retry(self, name, endpoint, function, *args, **kwargs):
+        def attempt():
+            if endpoint is None:
+                return function(*args, **kwargs)
+            with rate_budget.endpoint(endpoint):
+                return function(*args, **kwargs)
+        try:
+            # None (keep the previous value) once the shared retry policy gives up or the endpoint's circuit is open
+            return retry_policy.call(attempt, endpoint=f"account_state.{name}", max_attempts=self.retries,
+                                     deadline=self.deadline, base_delay=self.delay_factor, max_delay=self.max_delay,
+                                     fallback=lambda: None)
+        except Exception as e:
+            logging.info(f"Error fetching {name}: {e}. Keeping previous value.")
+            return None
+
+    def _publish_locked(self, positions=None, open_orders=None, balance=None):
+        """
+        Record the supplied parts and publish a new snapshot, carrying over any part that was not
+        supplied. Nothing is published until all three parts have been fetched successfully.
+        """
+        now = time.time()
+        for name, value in (('positions', positions), ('open_orders', open_orders), ('balance', balance)):
+            if value is not None:
+                self.parts[name] = (tuple(value) if name != 'balance' else value, now)
+                self.part_versions[name] += 1
+
+        if len(self.parts) < len(COMPONENTS):
+            return self.snapshot
+
+        previous = self.snapshot
+        (positions, positions_time), (open_orders, open_orders_time), (balance, balance_time) = (self.parts[name] for name in COMPONENTS)
+        self.snapshot = AccountSnapshot(
+            version=previous.version + 1 if previous else 1,
+            timestamp=min(positions_time, open_orders_time, balance_time),
+            positions=positions,
+            open_orders=open_orders,
+            balance=balance,
+            positions_time=positions_time,
+            open_orders_time=open_orders_time,
+            balance_time=balance_time,
+        )
+        self.ready.set()
+        return self.snapshot
+
+    # Private websocket events
+
+    @staticmethod
+    def _position_key(position):
+        info = position.get('info', {})
+        return position.get('symbol'), info.get('positionIdx', position.get('side'))
+
+    def apply_position_update(self, updates):
+        """Merge unified position updates (e.g. from watch_positions) into the latest snapshot."""
+        with self.publish_lock:
+            previous = self.snapshot
+            if previous is None:
+                return
+            positions = {self._position_key(position): position for position in previous.positions}
+            for position in updates:
+                key = self._position_key(position)
+                if float(position.get('contracts', 0) or 0) == 0:
+                    positions.pop(key, None)
+                else:
+                    positions[key] = position
+            self._publish_locked(positions=list(positions.values()))
+
+    def apply_order_update(self, updates):
+        """Merge unified order updates (e.g. from watch_orders) into the latest snapshot."""
+        with self.publish_lock:
+            previous = self.snapshot
+            if previous is None:
+                return
+            orders = {order['id']: order for order in previous.open_orders}
+            for order in updates:
+                if order.get('status') == 'open':
+                    orders[order['id']] = order
+                else:
+                    orders.pop(order['id'], None)
+            self._publish_locked(open_orders=list(orders.values()))
+
+    def apply_balance_update(self, balance):
+        with self.publish_lock:
+            if self.snapshot is None:
+                return
+            self._publish_locked(balance=balance)
@@ -1,5 +1,10 @@
 import uuid
 from .exchange import Exchange
+from .market_feed import MarketDataFeed
+from .account_state import AccountStateService
+from .market_metadata import MarketMetadataCache
+from .order_tracker import OrderTracker, fetch_all_open_orders
+import threading
 import logging
 import time
 import random
@@ -10,7 +15,8 @@ import ccxt
 import traceback
 from directionalscalper.core.strategies.logger import Logger
 
-from rate_limit import RateLimit
+from rate_limit import rate_budget
+from retry_policy import retry_policy
 
 logging = Logger(logger_name="BybitExchange", filename="BybitExchange.log", stream=True)
 
@@ -26,9 +32,41 @@ class BybitExchange(Exchange):
         self.last_active_long_order_time = {}
         self.last_active_short_order_time = {}
         self.last_active_time = {}
-        self.rate_limiter = RateLimit(10, 1)
-        self.general_rate_limiter = RateLimit(50, 1)
-        self.order_rate_limiter = RateLimit(5, 1) 
+        self.rate_limiter = rate_budget.limiter('position')
+        self.general_rate_limiter = rate_budget.limiter('market_data')
+        self.order_rate_limiter = rate_budget.limiter('order')
+        self.batch_order_size = 10  # Orders per batch request; Bybit accepts up to 10 per call on every category
+        self.market_feed = None
+        self.market_feed_lock = threading.Lock()
+        self.account_state = AccountStateService(self)
+        self.market_metadata = MarketMetadataCache(self)
+        self.order_tracker = OrderTracker(self)
+
+    def get_market_feed(self, replay_path=None, record_path=None):
+        """
+        Return the websocket market feed shared by every strategy thread on this account,
+        starting it on first use. Returns None if the feed could not be started.
+        """
+        with self.market_feed_lock:
+            if self.market_feed is None:
+                self.market_feed = MarketDataFeed(self, replay_path=replay_path, record_path=record_path)
+                self.market_feed.start()
+            return self.market_feed if self.market_feed.enabled else None
+
+    def order_stream_live(self):
+        """
+        True when the order tracker is kept current by the private order stream.
+
+        Events sent while the stream was down are lost, so after every (re)connect the
+        tracker is only trusted again once a full REST snapshot fetched after the
+        reconnect has been reconciled (the account state refresh does one each cycle).
+        """
+        market_feed = self.market_feed
+        if market_feed is None or not market_feed.enabled or not market_feed.connected.get('order', False):
+            return False
+        reconciled_at = self.order_tracker.reconciled_at
+        connected_since = market_feed.connected_since.get('order')
+        return reconciled_at is not None and connected_since is not None and reconciled_at >= connected_since
 
     def log_order_active_times(self):
         try:
@@ -85,21 +123,20 @@ class BybitExchange(Exchange):
     def get_market_data_bybit(self, symbol: str) -> dict:
         values = {"precision": 0.0, "leverage": 0.0, "min_qty": 0.0}
         try:
-            time.sleep(1)  # Adding a fixed delay of 1 second to avoid hitting the rate limit
-            with self.general_rate_limiter:
-                self.exchange.load_markets()
-                symbol_data = self.exchange.market(symbol)
-                
-                if "info" in symbol_data:
-                    values["precision"] = symbol_data["precision"]["price"]
-                    values["min_qty"] = symbol_data["limits"]["amount"]["min"]
-
-                # Fetch positions
-                positions = self.exchange.fetch_positions()
-
-                for position in positions:
-                    if position['symbol'] == symbol:
-                        values["leverage"] = float(position['leverage'])
+            # Served from the market metadata cache; no network call on the trading loop
+            symbol_data = self.market_metadata.market(symbol)
+
+            if symbol_data and "info" in symbol_data:
+                values["precision"] = symbol_data["precision"]["price"]
+                values["min_qty"] = symbol_data["limits"]["amount"]["min"]
+
+            leverage = self.market_metadata.get_leverage(symbol)
+            if leverage is None:
+                # Seed from the shared account snapshot; the position stream keeps it current afterwards
+                self.market_metadata.update_leverage(self.account_state.get_open_positions())
+                leverage = self.market_metadata.get_leverage(symbol)
+            if leverage is not None:
+                values["leverage"] = leverage
 
         except Exception as e:
             logging.info(f"An unknown error occurred in get_market_data_bybit(): {e}")
@@ -182,11 +219,11 @@ class BybitExchange(Exchange):
     def get_balance_bybit(self, quote):
         if self.exchange.has['fetchBalance']:
             try:
-                # Fetch the balance with params to specify the account type if needed
-                balance_response = self.exchange.fetch_balance({'type': 'swap'})
-
-                # Log the raw response for debugging purposes
-                #logging.info(f"Raw balance response from Bybit: {balance_response}")
+                # Served from the shared account snapshot instead of a fetch per caller
+                balance_response = self.account_state.get_balance()
+                if balance_response is None:
+                    logging.info(f"No balance available in the account snapshot for {quote}.")
+                    return None
 
                 # Parse the balance
                 if quote in balance_response['total']:
@@ -202,11 +239,11 @@ class BybitExchange(Exchange):
     def get_available_balance_bybit(self, quote):
         if self.exchange.has['fetchBalance']:
             try:
-                # Fetch the balance with params to specify the account type
-                balance_response = self.exchange.fetch_balance({'type': 'swap'})
-
-                # Log the raw response for debugging purposes
-                #logging.info(f"Raw available balance response from Bybit: {balance_response}")
+                # Served from the shared account snapshot instead of a fetch per caller
+                balance_response = self.account_state.get_balance()
+                if balance_response is None:
+                    logging.info(f"No balance available in the account snapshot for {quote}.")
+                    return None
 
                 # Check for the required keys in the response
                 if 'free' in balance_response and quote in balance_response['free']:
@@ -246,6 +283,7 @@ class BybitExchange(Exchange):
                     price=price,
                     params={**params, 'positionIdx': positionIdx}  # Pass the 'positionIdx' parameter here
                 )
+                self.order_tracker.record_placement(order, symbol, side, qty, price, params.get('orderLinkId'), params.get('reduceOnly', False), positionIdx)
                 return order
             else:
                 logging.info(f"side {side} does not exist")
@@ -281,49 +319,117 @@ class BybitExchange(Exchange):
             logging.info(f"An error occurred while creating limit order on Bybit: {e}")
             return None
         
+    def _tagged_limit_order_request(self, symbol: str, side: str, qty: float, price: float, positionIdx=0, isLeverage=False, orderLinkId=None, postOnly=True, params={}):
+        # Directly prepare the parameters required by the `create_order` method
+        order_type = "limit"  # For limit orders
+        time_in_force = "PostOnly" if postOnly else "GTC"
+
+        # Include additional parameters
+        extra_params = {
+            "positionIdx": positionIdx,
+            "timeInForce": time_in_force
+        }
+        if isLeverage:
+            extra_params["isLeverage"] = 1
+        if orderLinkId:
+            extra_params["orderLinkId"] = orderLinkId
+
+        # Merge any additional user-provided parameters
+        extra_params.update(params)
+
+        return {
+            "symbol": symbol,
+            "type": order_type,
+            "side": side,
+            "amount": qty,
+            "price": price,
+            "params": extra_params,
+        }
+
+    def _log_order_time(self, symbol, side):
+        # Log the time of order creation for side-specific tracking
+        current_time = time.time()
+        if side.lower() == 'buy':
+            self.last_active_long_order_time[symbol] = current_time
+            logging.info(f"Logged long order time for {symbol}")
+        elif side.lower() == 'sell':
+            self.last_active_short_order_time[symbol] = current_time
+            logging.info(f"Logged short order time for {symbol}")
+
     def create_tagged_limit_order_bybit(self, symbol: str, side: str, qty: float, price: float, positionIdx=0, isLeverage=False, orderLinkId=None, postOnly=True, params={}):
         try:
-            # Directly prepare the parameters required by the `create_order` method
-            order_type = "limit"  # For limit orders
-            time_in_force = "PostOnly" if postOnly else "GTC"
-            
-            # Include additional parameters
-            extra_params = {
-                "positionIdx": positionIdx,
-                "timeInForce": time_in_force
-            }
-            if isLeverage:
-                extra_params["isLeverage"] = 1
-            if orderLinkId:
-                extra_params["orderLinkId"] = orderLinkId
-            
-            # Merge any additional user-provided parameters
-            extra_params.update(params)
+            request = self._tagged_limit_order_request(symbol, side, qty, price, positionIdx, isLeverage, orderLinkId, postOnly, params)
 
             # Create the order
-            order = self.exchange.create_order(
-                symbol=symbol,
-                type=order_type,
-                side=side,
-                amount=qty,
-                price=price,
-                params=extra_params  # Pass extra params here
-            )
+            order = self.exchange.create_order(**request)
 
-            # Log the time of order creation for side-specific tracking
-            current_time = time.time()
-            if side.lower() == 'buy':
-                self.last_active_long_order_time[symbol] = current_time
-                logging.info(f"Logged long order time for {symbol}")
-            elif side.lower() == 'sell':
-                self.last_active_short_order_time[symbol] = current_time
-                logging.info(f"Logged short order time for {symbol}")
+            self._log_order_time(symbol, side)
+            self.order_tracker.record_placement(order, symbol, side, qty, price, orderLinkId, params.get('reduceOnly', False), positionIdx)
 
             return order
         except Exception as e:
             logging.info(f"An error occurred in create_tagged_limit_order_bybit() for {symbol}: {e}")
             return {"error": str(e)}
 
+    @staticmethod
+    def _batch_order_result(request, order):
+        """Normalise one order returned by a batch or single create into a status dict."""
+        if not order or order.get('error'):
+            error = order.get('error') if order else "no response"
+            return {"request": request, "order": None, "status": "failed", "error": error}
+
+        info = order.get('info') or {}
+        code = info.get('code')
+        if not order.get('id') or code not in (None, 0, '0'):
+            error = info.get('msg') or f"code {code}"
+            return {"request": request, "order": order, "status": "failed", "error": error}
+
+        return {"request": request, "order": order, "status": "placed", "error": None}
+
+    def create_tagged_limit_orders_bybit(self, orders, batch_size=None):
+        """
+        Place several tagged limit orders through Bybit's batch create endpoint.
+
+        Orders are sent in chunks of ``batch_size`` per request. If a whole batch
+        request fails (network error, endpoint unavailable) that chunk is placed
+        through create_tagged_limit_order_bybit one order at a time instead.
+
+        :param orders: List of dicts with the create_tagged_limit_order_bybit keyword arguments
+                       (symbol, side, qty, price and optionally positionIdx, isLeverage, orderLinkId, postOnly, params).
+        :param batch_size: Orders per request, defaults to self.batch_order_size.
+        :return: One dict per input order, in the same order, with keys
+                 request, order, status ('placed' or 'failed') and error.
+        """
+        batch_size = batch_size or self.batch_order_size
+        results = []
+
+        for start in range(0, len(orders), batch_size):
+            chunk = orders[start:start + batch_size]
+            requests = [self._tagged_limit_order_request(**order) for order in chunk]
+
+            try:
+                with rate_budget.endpoint('create_orders', len(chunk)):
+                    placed = self.exchange.create_orders(requests)
+            except Exception as e:
+                logging.info(f"Batch order create failed for {len(chunk)} orders: {e}. Falling back to single orders.")
+                for order in chunk:
+                    results.append(self._batch_order_result(order, self.create_tagged_limit_order_bybit(**order)))
+                continue
+
+            placed = list(placed or [])
+            for index, order in enumerate(chunk):
+                result = self._batch_order_result(order, placed[index] if index < len(placed) else None)
+                if result["status"] == "placed":
+                    self._log_order_time(order["symbol"], order["side"])
+                    self.order_tracker.record_placement(result["order"], order["symbol"], order["side"], order["qty"], order["price"],
+                                                        order.get("orderLinkId"), order.get("params", {}).get("reduceOnly", False), order.get("positionIdx"))
+                results.append(result)
+
+        failed = [result for result in results if result["status"] == "failed"]
+        if failed:
+            logging.info(f"Batch order create: {len(results) - len(failed)} placed, {len(failed)} failed: {[result['error'] for result in failed]}")
+        return results
+
         
     def create_limit_order_bybit_unified(self, symbol: str, side: str, qty: float, price: float, positionIdx=0, params={}):
         try:
@@ -377,6 +483,8 @@ class BybitExchange(Exchange):
                 params['symbol'] = market['id']
 
             response = self.exchange.cancel_all_orders(params=params)
+            for order in response if isinstance(response, list) else []:
+                self.order_tracker.record_cancel(order.get('id'))
             
             logging.info(f"Successfully cancelled orders {response}")
             return response
@@ -394,6 +502,7 @@ class BybitExchange(Exchange):
         try:
             # Call the cancel_order method of the ccxt instance
             response = self.exchange.cancel_order(order_id, symbol)
+            self.order_tracker.record_cancel(order_id)
             logging.info(f"Order {order_id} for {symbol} cancelled successfully.")
             return response
         except Exception as e:
@@ -402,32 +511,25 @@ class BybitExchange(Exchange):
             return None
         
     def get_precision_and_limits_bybit(self, symbol):
-        # Fetch the market data
-        markets = self.exchange.fetch_markets()
+        # Look up the cached market data
+        market = self.market_metadata.market_by_symbol(symbol)
 
-        # Filter for the specific symbol
-        for market in markets:
-            if market['symbol'] == symbol:
-                precision_amount = market['precision']['amount']
-                precision_price = market['precision']['price']
-                min_amount = market['limits']['amount']['min']
+        if market:
+            precision_amount = market['precision']['amount']
+            precision_price = market['precision']['price']
+            min_amount = market['limits']['amount']['min']
 
-                return precision_amount, precision_price, min_amount
+            return precision_amount, precision_price, min_amount
 
         return None, None, None
 
     def get_market_precision_data_bybit(self, symbol):
-        # Fetch the market data
-        markets = self.exchange.fetch_markets()
-        
-        # Print the first market from the list
-        logging.info(markets[0])
+        # Look up the cached market data
+        market = self.market_metadata.market_by_symbol(symbol)
+
+        if market:
+            return market['precision']
 
-        # Filter for the specific symbol
-        for market in markets:
-            if market['symbol'] == symbol:
-                return market['precision']
-        
         return None
     
     def transfer_funds_bybit(self, code: str, amount: float, from_account: str, to_account: str, params={}):
@@ -506,11 +608,11 @@ class BybitExchange(Exchange):
     def get_futures_balance_bybit(self, quote):
         if self.exchange.has['fetchBalance']:
             try:
-                # Fetch the balance with params to specify the account type if needed
-                balance_response = self.exchange.fetch_balance({'type': 'swap'})
-
-                # Log the raw response for debugging purposes
-                #logging.info(f"Raw balance response from Bybit: {balance_response}")
+                # Served from the shared account snapshot instead of a fetch per caller
+                balance_response = self.account_state.get_balance()
+                if balance_response is None:
+                    logging.info(f"No balance available in the account snapshot for {quote}.")
+                    return None
 
                 # Parse the balance
                 if quote in balance_response['total']:
@@ -525,11 +627,8 @@ class BybitExchange(Exchange):
 
     def get_symbol_precision_bybit(self, symbol):
         try:
-            # Use fetch_markets to retrieve data for all markets
-            all_markets = self.exchange.fetch_markets()
-
-            # Find the market data for the specific symbol
-            market_data = next((market for market in all_markets if market['id'] == symbol), None)
+            # Find the cached market data for the specific symbol
+            market_data = self.market_metadata.market_by_id(symbol)
 
             if market_data:
                 # Extract precision data
@@ -544,7 +643,7 @@ class BybitExchange(Exchange):
             logging.info("Traceback: %s", traceback.format_exc())
             return None, None
 
-    def get_positions_bybit(self, symbol, max_retries=100, retry_delay=5) -> dict:
+    def get_positions_bybit(self, symbol, max_retries=None, deadline=None) -> dict:
         values = {
             "long": {
                 "qty": 0.0,
@@ -568,28 +667,19 @@ class BybitExchange(Exchange):
             },
         }
 
-        for i in range(max_retries):
-            try:
-                data = self.exchange.fetch_positions(symbol)
-                if len(data) == 2:
-                    sides = ["long", "short"]
-                    for side in [0, 1]:
-                        values[sides[side]]["qty"] = float(data[side]["contracts"])
-                        values[sides[side]]["price"] = float(data[side]["entryPrice"] or 0)
-                        values[sides[side]]["realised"] = round(float(data[side]["info"]["unrealisedPnl"] or 0), 4)
-                        values[sides[side]]["cum_realised"] = round(float(data[side]["info"]["cumRealisedPnl"] or 0), 4)
-                        values[sides[side]]["upnl"] = round(float(data[side]["info"]["unrealisedPnl"] or 0), 4)
-                        values[sides[side]]["upnl_pct"] = round(float(data[side]["percentage"] or 0), 4)
-                        values[sides[side]]["liq_price"] = float(data[side]["liquidationPrice"] or 0)
-                        values[sides[side]]["entry_price"] = float(data[side]["entryPrice"] or 0)
-                break  # If the fetch was successful, break out of the loop
-            except Exception as e:
-                if i < max_retries - 1:  # If not the last attempt
-                    logging.info(f"An unknown error occurred in get_positions_bybit(): {e}. Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                else:
-                    logging.info(f"Failed to fetch positions after {max_retries} attempts: {e}")
-                    raise e  # If it's still failing after max_retries, re-raise the exception.
+        # Raises RetryError when the retry policy gives up, as the old loop re-raised after its last attempt
+        data = retry_policy.call(self.exchange.fetch_positions, (symbol,), max_attempts=max_retries, deadline=deadline)
+        if len(data) == 2:
+            sides = ["long", "short"]
+            for side in [0, 1]:
+                values[sides[side]]["qty"] = float(data[side]["contracts"])
+                values[sides[side]]["price"] = float(data[side]["entryPrice"] or 0)
+                values[sides[side]]["realised"] = round(float(data[side]["info"]["unrealisedPnl"] or 0), 4)
+                values[sides[side]]["cum_realised"] = round(float(data[side]["info"]["cumRealisedPnl"] or 0), 4)
+                values[sides[side]]["upnl"] = round(float(data[side]["info"]["unrealisedPnl"] or 0), 4)
+                values[sides[side]]["upnl_pct"] = round(float(data[side]["percentage"] or 0), 4)
+                values[sides[side]]["liq_price"] = float(data[side]["liquidationPrice"] or 0)
+                values[sides[side]]["entry_price"] = float(data[side]["entryPrice"] or 0)
 
         return values
 
@@ -606,11 +696,10 @@ class BybitExchange(Exchange):
         
     def get_current_max_leverage_bybit(self, symbol):
         try:
-            # Fetch leverage tiers for the symbol
-            leverage_tiers = self.exchange.fetch_market_leverage_tiers(symbol)
-
-            # Process leverage tiers to find the maximum leverage
-            max_leverage = max([tier['maxLeverage'] for tier in leverage_tiers if 'maxLeverage' in tier])
+            # Maximum leverage from the cached leverage tiers
+            max_leverage = self.market_metadata.get_max_leverage(symbol)
+            if max_leverage is None:
+                raise ValueError("no leverage tiers available")
             logging.info(f"Maximum leverage for symbol {symbol}: {max_leverage}")
 
             return max_leverage
@@ -622,6 +711,7 @@ class BybitExchange(Exchange):
     def set_leverage_bybit(self, leverage, symbol):
         try:
             self.exchange.set_leverage(leverage, symbol)
+            self.market_metadata.set_leverage(symbol, leverage)
             logging.info(f"Leverage set to {leverage} for symbol {symbol}")
         except Exception as e:
             logging.info(f"Error setting leverage: {e}")
@@ -655,115 +745,20 @@ class BybitExchange(Exchange):
         except Exception as e:
             logging.info(f"An unknown error occurred in with set_position_mode: {e}")
 
-    def get_all_open_positions_bybit_spot(self, retries=10, delay_factor=10, max_delay=60) -> List[dict]:
-        now = datetime.now()
-        # Check if the shared cache is still valid
-        cache_duration = timedelta(seconds=30)  # Cache duration is 30 seconds
-        if self.open_positions_shared_cache and self.last_open_positions_time_shared and now - self.last_open_positions_time_shared < cache_duration:
-            return self.open_positions_shared_cache
+    def get_all_open_positions_bybit_spot(self) -> List[dict]:
+        # Served from the shared account snapshot, which refreshes with spot params when market_type is 'spot'
+        return self.account_state.get_open_positions()
 
-        # Using a semaphore to limit concurrent API requests
-        with self.open_positions_semaphore:
-            # Double-checking the cache inside the semaphore to ensure no other thread has refreshed it in the meantime
-            if self.open_positions_shared_cache and self.last_open_positions_time_shared and now - self.last_open_positions_time_shared < cache_duration:
-                return self.open_positions_shared_cache
+    def get_all_open_positions_bybit(self) -> List[dict]:
+        """
+        Open positions across all symbols from the shared account snapshot.
+
+        Every symbol thread reads the same snapshot, which the account state service
+        refreshes on one cadence and patches from the private position stream, so
+        this never hits the API; retries are configured on the service.
+        """
+        return self.account_state.get_open_positions()
 
-            for attempt in range(retries):
-                try:
-                    params = {
-                        'type': 'spot',  # Set the type to 'spot' for Bybit Spot trading
-                    }
-                    all_positions = self.exchange.fetch_positions(params=params)
-                    open_positions = [position for position in all_positions if float(position.get('contracts', position.get('size', 0))) != 0]
-                    
-                    # Update the shared cache with the new data
-                    self.open_positions_shared_cache = open_positions
-                    self.last_open_positions_time_shared = now
-                    return open_positions
-                except Exception as e:
-                    is_rate_limit_error = "Too many visits" in str(e) or (hasattr(e, 'response') and e.response.status_code == 403)
-                    if is_rate_limit_error and attempt < retries - 1:
-                        delay = min(delay_factor * (attempt + 1), max_delay)  # Exponential delay with a cap
-                        logging.info(f"Rate limit on get_all_open_positions_bybit_spot hit, waiting for {delay} seconds before retrying...")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        logging.info(f"Error fetching open positions: {e}")
-                        return []
-                    
-    def get_all_open_positions_bybit(self, retries=10, delay_factor=10, max_delay=60) -> List[dict]:
-        now = datetime.now()
-
-        # Check if the shared cache is still valid
-        cache_duration = timedelta(seconds=30)  # Cache duration is 30 seconds
-        if self.open_positions_shared_cache and self.last_open_positions_time_shared and now - self.last_open_positions_time_shared < cache_duration:
-            return self.open_positions_shared_cache
-
-        # Using a semaphore to limit concurrent API requests
-        with self.open_positions_semaphore:
-            # Double-checking the cache inside the semaphore to ensure no other thread has refreshed it in the meantime
-            if self.open_positions_shared_cache and self.last_open_positions_time_shared and now - self.last_open_positions_time_shared < cache_duration:
-                return self.open_positions_shared_cache
-
-            for attempt in range(retries):
-                try:
-                    # all_positions = self.exchange.fetch_positions() 
-                    all_positions = self.exchange.fetch_positions(params={'limit': 200})
-                    open_positions = [position for position in all_positions if float(position.get('contracts', 0)) != 0] 
-
-                    # Update the shared cache with the new data
-                    self.open_positions_shared_cache = open_positions
-                    self.last_open_positions_time_shared = now
-
-                    return open_positions
-                except Exception as e:
-                    is_rate_limit_error = "Too many visits" in str(e) or (hasattr(e, 'response') and e.response.status_code == 403)
-                    
-                    if is_rate_limit_error and attempt < retries - 1:
-                        delay = min(delay_factor * (attempt + 1), max_delay)  # Exponential delay with a cap
-                        logging.info(f"Rate limit on get_all_open_positions_bybit hit, waiting for {delay} seconds before retrying...")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        logging.info(f"Error fetching open positions: {e}")
-                        return []
-
-    def get_all_open_positions_bybit_spot(self, retries=10, delay_factor=10, max_delay=60) -> List[dict]:
-        now = datetime.now()
-        # Check if the shared cache is still valid
-        cache_duration = timedelta(seconds=30)  # Cache duration is 30 seconds
-        if self.open_positions_shared_cache and self.last_open_positions_time_shared and now - self.last_open_positions_time_shared < cache_duration:
-            return self.open_positions_shared_cache
-
-        # Using a semaphore to limit concurrent API requests
-        with self.open_positions_semaphore:
-            # Double-checking the cache inside the semaphore to ensure no other thread has refreshed it in the meantime
-            if self.open_positions_shared_cache and self.last_open_positions_time_shared and now - self.last_open_positions_time_shared < cache_duration:
-                return self.open_positions_shared_cache
-
-            for attempt in range(retries):
-                try:
-                    params = {
-                        'type': 'spot',  # Set the type to 'spot' for Bybit Spot trading
-                    }
-                    all_positions = self.exchange.fetch_positions(params=params)
-                    open_positions = [position for position in all_positions if float(position.get('contracts', position.get('size', 0))) != 0]
-                    
-                    # Update the shared cache with the new data
-                    self.open_positions_shared_cache = open_positions
-                    self.last_open_positions_time_shared = now
-                    return open_positions
-                except Exception as e:
-                    is_rate_limit_error = "Too many visits" in str(e) or (hasattr(e, 'response') and e.response.status_code == 403)
-                    if is_rate_limit_error and attempt < retries - 1:
-                        delay = min(delay_factor * (attempt + 1), max_delay)  # Exponential delay with a cap
-                        logging.info(f"Rate limit on get_all_open_positions_bybit_spot hit, waiting for {delay} seconds before retrying...")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        logging.info(f"Error fetching open positions: {e}")
-                        return []
-                    
     def fetch_leverage_tiers(self, symbol: str) -> dict:
         """
         Fetch leverage tiers for a given symbol using CCXT's fetch_market_leverage_tiers method.
@@ -772,9 +767,8 @@ class BybitExchange(Exchange):
         :return: A dictionary containing leverage tiers information if successful, None otherwise.
         """
         try:
-            params = {'category': 'linear'}  # Adjust parameters based on the specific needs and API documentation
-            leverage_tiers = self.exchange.fetch_derivatives_market_leverage_tiers(symbol, params)
-            return leverage_tiers
+            # Served from the market metadata cache, refreshed on its TTL
+            return self.market_metadata.get_leverage_tiers(symbol)
         except Exception as e:
             logging.info(f"Error fetching leverage tiers for {symbol}: {e}")
             return None
@@ -829,8 +823,7 @@ class BybitExchange(Exchange):
         """Fetches open orders for all symbols."""
         for _ in range(self.max_retries):
             try:
-                with self.rate_limiter:
-                    open_orders = self.exchange.fetch_open_orders()
+                open_orders, _ = fetch_all_open_orders(self.exchange.fetch_open_orders)
                 return open_orders
             except RateLimitExceeded:
                 logging.info(f"Rate limit exceeded when fetching open orders. Retrying in {self.retry_wait} seconds...")
@@ -841,27 +834,30 @@ class BybitExchange(Exchange):
         logging.info(f"Failed to fetch open orders after {self.max_retries} retries.")
         return []
 
-    def get_open_orders(self, symbol, max_retries=100, retry_wait=1):
-        """Fetches open orders for the given symbol with exponential backoff."""
-        backoff = retry_wait
-        for attempt in range(max_retries):
-            try:
-                with self.rate_limiter:
-                    open_orders = self.exchange.fetch_open_orders(symbol)
-                return open_orders
-            except RateLimitExceeded:
-                logging.info(f"Rate limit exceeded when fetching open orders for {symbol}. Retrying in {retry_wait} seconds...")
-                time.sleep(retry_wait)
-            except NetworkError as e:
-                logging.error(f"Network error fetching open orders for {symbol}: {e}. Retrying in {backoff} seconds...")
-                time.sleep(backoff)
-                backoff *= 2  # Exponential backoff
-            except Exception as e:
-                logging.error(f"Error fetching open orders for {symbol}: {e}")
-                logging.error(traceback.format_exc())
-                break
-        logging.info(f"Failed to fetch open orders for {symbol} after {max_retries} retries.")
-        return []
+    def get_open_orders(self, symbol, max_retries=None, deadline=None):
+        """
+        Open orders for the given symbol.
+
+        Served from the order tracker while the private order stream keeps it current,
+        otherwise fetched under the shared retry policy (and used to reconcile the tracker).
+        If the policy gives up, the tracker's last known open orders are returned instead.
+        """
+        if self.order_stream_live():
+            return self.order_tracker.get_open_orders(symbol)
+
+        def fetch():
+            fetched_at = time.time()
+            open_orders, complete = fetch_all_open_orders(self.exchange.fetch_open_orders, symbol)
+            self.order_tracker.reconcile(open_orders, symbol=symbol, fetched_at=fetched_at, complete=complete)
+            return open_orders
+
+        try:
+            return retry_policy.call(fetch, endpoint='fetch_open_orders', max_attempts=max_retries, deadline=deadline,
+                                     fallback=lambda: self.order_tracker.get_open_orders(symbol))
+        except Exception as e:
+            logging.error(f"Error fetching open orders for {symbol}: {e}")
+            logging.error(traceback.format_exc())
+            return []
 
     # def get_open_orders(self, symbol):
     #     """Fetches open orders for the given symbol."""
@@ -1005,6 +1001,77 @@ class BybitExchange(Exchange):
         else:
             raise ValueError(f"Unsupported order type: {order_type}")
 
+    def set_take_profit_trading_stop_bybit(self, symbol, take_profit, positionIdx=1, tpsl_mode="Full", trigger_by="LastPrice"):
+        """
+        Attach a take profit to the position itself through the v5 trading-stop endpoint.
+
+        :param symbol: The market symbol.
+        :param take_profit: TP trigger price; 0 removes the position TP.
+        :param positionIdx: 1 for the long side, 2 for the short side in hedge mode.
+        :param tpsl_mode: 'Full' closes the whole position at market when triggered.
+        :param trigger_by: Price type that triggers the TP.
+        :return: Dict with status ('set' or 'failed'), error and the exchange response.
+        """
+        return self._set_trading_stop_bybit(symbol, 'take profit', positionIdx, {
+            'takeProfit': self.exchange.price_to_precision(symbol, take_profit) if take_profit else '0',
+            'tpTriggerBy': trigger_by,
+            'tpslMode': tpsl_mode,
+        }, take_profit)
+
+    def set_stop_loss_trading_stop_bybit(self, symbol, stop_loss, positionIdx=1, tpsl_mode="Full", trigger_by="MarkPrice"):
+        """
+        Attach a stop loss to the position itself through the v5 trading-stop endpoint.
+
+        The exchange closes the position at market once the trigger is hit, whether or not the bot is running.
+
+        :param symbol: The market symbol.
+        :param stop_loss: SL trigger price; 0 removes the position SL.
+        :param positionIdx: 1 for the long side, 2 for the short side in hedge mode.
+        :param tpsl_mode: 'Full' closes the whole position when triggered.
+        :param trigger_by: Price type that triggers the SL.
+        :return: Dict with status ('set' or 'failed'), error and the exchange response.
+        """
+        return self._set_trading_stop_bybit(symbol, 'stop loss', positionIdx, {
+            'stopLoss': self.exchange.price_to_precision(symbol, stop_loss) if stop_loss else '0',
+            'slTriggerBy': trigger_by,
+            'tpslMode': tpsl_mode,
+        }, stop_loss)
+
+    def _set_trading_stop_bybit(self, symbol, name, positionIdx, stop_params, price):
+        try:
+            market = self.market_metadata.market(symbol) or self.exchange.market(symbol)
+            params = dict(stop_params, category='linear', symbol=market['id'], positionIdx=positionIdx)
+            with rate_budget.endpoint('trading_stop'):
+                response = self.exchange.private_post_v5_position_trading_stop(params)
+            # 34040 is "not modified": the position already has this stop
+            ret_code = str(response.get('retCode', '0')) if isinstance(response, dict) else '0'
+            if ret_code not in ('0', '34040'):
+                logging.error(f"Trading stop {name} for {symbol} rejected: {response.get('retMsg')} (code {ret_code})")
+                return {"status": "failed", "error": response.get('retMsg') or f"code {ret_code}", "response": response}
+            logging.info(f"Set trading stop {name} for {symbol} (positionIdx {positionIdx}) at {price}")
+            return {"status": "set", "error": None, "response": response}
+        except Exception as e:
+            if '34040' in str(e):
+                return {"status": "set", "error": None, "response": None}
+            logging.error(f"Error setting trading stop {name} for {symbol}: {e}")
+            return {"status": "failed", "error": str(e), "response": None}
+
+    def create_reduce_only_market_order_bybit(self, symbol, side, qty, positionIdx=0):
+        """
+        Close (part of) a position with a reduce-only market order.
+
+        :return: The created order, or a dict with an 'error' key on failure.
+        """
+        try:
+            with self.order_rate_limiter:
+                order = self.exchange.create_order(symbol, 'market', side, qty, None, {'reduceOnly': True, 'positionIdx': positionIdx})
+            self.order_tracker.record_placement(order, symbol, side, qty, None, reduce_only=True, position_idx=positionIdx)
+            logging.info(f"Placed reduce-only market {side} order for {qty} {symbol}")
+            return order
+        except Exception as e:
+            logging.info(f"An error occurred in create_reduce_only_market_order_bybit() for {symbol}: {e}")
+            return {"error": str(e)}
+
     def postonly_create_take_profit_order_bybit(self, symbol, order_type, side, amount, price=None, positionIdx=1, reduce_only=True, post_only=True):
         if order_type == 'limit':
             if price is None:
@@ -1063,28 +1130,207 @@ class BybitExchange(Exchange):
         try:
             # Call the updated cancel_order method
             result = self.exchange.cancel_order(id=order_id, symbol=symbol)
+            self.order_tracker.record_cancel(order_id)
             logging.info(f"Canceled order - ID: {order_id}, Response: {result}")
         except Exception as e:
             logging.info(f"Error occurred in cancel_order_by_id: {e}")
            
+    def cancel_orders_by_id_bybit(self, symbol, order_ids, batch_size=None):
+        """
+        Cancel a list of orders through Bybit's batch cancel endpoint.
+
+        Orders are cancelled ``batch_size`` per request. If a batch request fails
+        as a whole, that chunk is cancelled one order at a time instead.
+
+        :param symbol: The symbol the orders belong to.
+        :param order_ids: Exchange order IDs to cancel.
+        :param batch_size: Orders per request, defaults to self.batch_order_size.
+        :return: One dict per order ID with keys id, status ('canceled' or 'failed') and error.
+        """
+        batch_size = batch_size or self.batch_order_size
+        order_ids = list(order_ids)
+        results = []
+
+        for start in range(0, len(order_ids), batch_size):
+            chunk = order_ids[start:start + batch_size]
+            try:
+                with rate_budget.endpoint('cancel_orders', len(chunk)):
+                    canceled = self.exchange.cancel_orders(chunk, symbol)
+            except Exception as e:
+                logging.info(f"Batch cancel failed for {len(chunk)} orders on {symbol}: {e}. Falling back to single cancels.")
+                for order_id in chunk:
+                    try:
+                        with self.order_rate_limiter:
+                            self.exchange.cancel_order(order_id, symbol)
+                        results.append({"id": order_id, "status": "canceled", "error": None})
+                    except Exception as cancel_error:
+                        results.append({"id": order_id, "status": "failed", "error": str(cancel_error)})
+                continue
+
+            canceled = list(canceled or [])
+            for index, order_id in enumerate(chunk):
+                order = canceled[index] if index < len(canceled) else None
+                info = (order or {}).get('info') or {}
+                code = info.get('code')
+                # ccxt does not merge retExtInfo into cancel rows; Bybit leaves orderId empty on the rows it rejected
+                if order is None or not (order.get('id') or info.get('orderId')) or code not in (None, 0, '0'):
+                    error = info.get('msg') or (f"code {code}" if code is not None else "rejected" if order else "no response")
+                    results.append({"id": order_id, "status": "failed", "error": error})
+                else:
+                    results.append({"id": order_id, "status": "canceled", "error": None})
+
+        for result in results:
+            if result["status"] == "canceled":
+                self.order_tracker.record_cancel(result["id"])
+
+        failed = [result for result in results if result["status"] == "failed"]
+        if failed:
+            logging.info(f"Batch cancel on {symbol}: {len(results) - len(failed)} canceled, {len(failed)} failed: {[result['error'] for result in failed]}")
+        return results
+
+    def amend_orders_bybit(self, symbol, amendments, batch_size=None):
+        """
+        Amend the price and/or quantity of open orders in place through Bybit's batch amend endpoint.
+
+        Amended orders keep their order ID and orderLinkId. If a batch request
+        fails as a whole, that chunk is amended one order at a time instead.
+
+        :param symbol: The symbol the orders belong to.
+        :param amendments: List of dicts with keys id, side and optionally qty and price (omitted or None = unchanged).
+        :param batch_size: Orders per request, defaults to self.batch_order_size.
+        :return: One dict per amendment, in the same order, with keys amendment, status ('amended' or 'failed') and error.
+        """
+        batch_size = batch_size or self.batch_order_size
+        results = []
+        market = self.market_metadata.market(symbol) or self.exchange.market(symbol)
+
+        for start in range(0, len(amendments), batch_size):
+            chunk = amendments[start:start + batch_size]
+            requests = []
+            for amendment in chunk:
+                request = {'symbol': market['id'], 'orderId': amendment['id']}
+                if amendment.get('qty') is not None:
+                    request['qty'] = self.exchange.amount_to_precision(symbol, amendment['qty'])
+                if amendment.get('price') is not None:
+                    request['price'] = self.exchange.price_to_precision(symbol, amendment['price'])
+                requests.append(request)
+
+            try:
+                with rate_budget.endpoint('amend_orders', len(chunk)):
+                    response = self.exchange.private_post_v5_order_amend_batch({'category': 'linear', 'request': requests})
+                statuses = response.get('retExtInfo', {}).get('list', [])
+                if str(response.get('retCode', '0')) != '0':
+                    raise Exception(response.get('retMsg'))
+            except Exception as e:
+                logging.info(f"Batch amend failed for {len(chunk)} orders on {symbol}: {e}. Falling back to single amends.")
+                for amendment in chunk:
+                    try:
+                        with self.order_rate_limiter:
+                            self.exchange.edit_order(amendment['id'], symbol, 'limit', amendment['side'], amendment.get('qty'), amendment.get('price'))
+                        results.append({"amendment": amendment, "status": "amended", "error": None})
+                    except Exception as amend_error:
+                        results.append({"amendment": amendment, "status": "failed", "error": str(amend_error)})
+                continue
+
+            for index, amendment in enumerate(chunk):
+                status = statuses[index] if index < len(statuses) else {}
+                if str(status.get('code', 0)) == '0':
+                    results.append({"amendment": amendment, "status": "amended", "error": None})
+                else:
+                    results.append({"amendment": amendment, "status": "failed", "error": status.get('msg')})
+
+        for result in results:
+            if result["status"] == "amended":
+                amendment = result["amendment"]
+                self.order_tracker.record_amend(amendment['id'], amendment.get('price'), amendment.get('qty'))
+
+        failed = [result for result in results if result["status"] == "failed"]
+        if failed:
+            logging.info(f"Batch amend on {symbol}: {len(results) - len(failed)} amended, {len(failed)} failed: {[result['error'] for result in failed]}")
+        return results
+
+    @staticmethod
+    def _order_matches(order, side=None, reduce_only=None, order_link_id_prefix=None, position_idx=None, statuses=None):
+        info = order.get('info') or {}
+        if statuses is not None and order.get('status') not in statuses:
+            return False
+        if side is not None and (order.get('side') or '').lower() != side:
+            return False
+        if reduce_only is not None:
+            order_reduce_only = order.get('reduceOnly')
+            if order_reduce_only is None:
+                order_reduce_only = info.get('reduceOnly')
+            if bool(order_reduce_only) != reduce_only:
+                return False
+        if order_link_id_prefix is not None:
+            order_link_id = order.get('clientOrderId') or info.get('orderLinkId') or ''
+            if not order_link_id.startswith(order_link_id_prefix):
+                return False
+        if position_idx is not None and str(info.get('positionIdx')) != str(position_idx):
+            return False
+        return True
+
+    def cancel_orders_filtered_bybit(self, symbol, side=None, reduce_only=None, order_link_id_prefix=None, position_idx=None, open_orders=None, statuses=None):
+        """
+        Cancel the open orders of a symbol that match every given filter.
+
+        With no filters this is a single cancel-all request. Otherwise the matching
+        order IDs are picked from the open orders and cancelled in batches.
+
+        :param symbol: The symbol to cancel orders for.
+        :param side: 'buy' or 'sell' ('long'/'short' are accepted as well).
+        :param reduce_only: True for reduce-only orders only, False for entries only.
+        :param order_link_id_prefix: Only orders whose orderLinkId starts with this prefix.
+        :param position_idx: Only orders on this position index (1 long, 2 short in hedge mode).
+        :param open_orders: Open orders already fetched by the caller, to save a request.
+        :param statuses: Only orders whose ccxt status is one of these.
+        :return: Results from cancel_orders_by_id_bybit, or the cancel-all response when unfiltered.
+        """
+        if side is not None:
+            side = {"long": "buy", "short": "sell"}.get(side.lower(), side.lower())
+
+        if side is None and reduce_only is None and order_link_id_prefix is None and position_idx is None and open_orders is None and statuses is None:
+            return self.cancel_all_open_orders_bybit(symbol)
+
+        if open_orders is None:
+            open_orders = self.get_open_orders(symbol)
+
+        order_ids = [
+            order['id'] for order in open_orders
+            if self._order_matches(order, side, reduce_only, order_link_id_prefix, position_idx, statuses)
+        ]
+        if not order_ids:
+            return []
+        return self.cancel_orders_by_id_bybit(symbol, order_ids)
+
+    def cancel_all_entries_bybit(self, symbol: str) -> None:
+        try:
+            orders = self.get_open_orders(symbol)
+            logging.info(f"[Thread ID: {threading.get_ident()}] cancel_all_entries function in exchange class accessed")
+            logging.info(f"Fetched orders: {orders}")
+
+            # Entries are the open or partially filled orders that are not reduce-only
+            results = self.cancel_orders_filtered_bybit(symbol, reduce_only=False, open_orders=orders, statuses=('open', 'partially_filled'))
+            for result in results:
+                if result["status"] == "canceled":
+                    logging.info(f"Cancelling order: {result['id']}")
+                else:
+                    logging.info(f"Failed to cancel order {result['id']}: {result['error']}")
+        except Exception as e:
+            logging.info(f"An unknown error occurred in cancel_all_entries_bybit(): {e}")
+
     def cancel_take_profit_orders_bybit(self, symbol, side):
         side = side.lower()
         side_map = {"long": "buy", "short": "sell"}
         side = side_map.get(side, side)
         
         try:
-            open_orders = self.exchange.fetch_open_orders(symbol)
             position_idx_map = {"buy": 1, "sell": 2}
 
-            for order in open_orders:
-                if (
-                    order['side'].lower() == side
-                    and order['info'].get('reduceOnly')
-                    and order['info'].get('positionIdx') == position_idx_map[side]
-                ):
-                    order_id = order['id']  # Assuming 'id' is the standard format expected by cancel_order
-                    self.exchange.cancel_order(order_id, symbol)
-                    logging.info(f"Canceled take profit order - ID: {order_id}")
+            results = self.cancel_orders_filtered_bybit(symbol, side=side, reduce_only=True, position_idx=position_idx_map[side])
+            for result in results:
+                if result["status"] == "canceled":
+                    logging.info(f"Canceled take profit order - ID: {result['id']}")
 
         except Exception as e:
             logging.info(f"An unknown error occurred in cancel_take_profit_orders: {e}")
@@ -1111,17 +1357,10 @@ class BybitExchange(Exchange):
 
         return total_qty
 
-    def retry_api_call(self, function, *args, max_retries=100, base_delay=10, max_delay=60, **kwargs):
-        retries = 0
-        while retries < max_retries:
-            try:
-                return function(*args, **kwargs)
-            except Exception as e:  # Catch all exceptions
-                retries += 1
-                delay = min(base_delay * (2 ** retries) + random.uniform(0, 0.1 * (2 ** retries)), max_delay)
-                logging.info(f"Error occurred: {e}. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-        raise Exception(f"Failed to execute the API function after {max_retries} retries.")
+    def retry_api_call(self, function, *args, max_retries=None, base_delay=None, max_delay=None, deadline=None, **kwargs):
+        """Call an API function under the shared retry policy; raises RetryError once the policy gives up."""
+        return retry_policy.call(function, args, kwargs, max_attempts=max_retries, deadline=deadline,
+                                 base_delay=base_delay, max_delay=max_delay)
 
     def get_contract_size_bybit(self, symbol):
         positions = self.exchange.fetch_derivatives_positions([symbol])
@@ -1131,7 +1370,10 @@ class BybitExchange(Exchange):
         #logging.info(f"Called get_max_leverage_bybit with symbol: {symbol}")
         for retry in range(max_retries):
             try:
-                tiers = self.exchange.fetch_derivatives_market_leverage_tiers(symbol)
+                # Cached tiers; only the first call per symbol (or after the TTL) reaches the API
+                tiers = self.market_metadata.get_leverage_tiers(symbol)
+                if tiers is None:
+                    raise NetworkError(f"Leverage tiers unavailable for {symbol}")
                 for tier in tiers:
                     info = tier.get('info', {})
                     if info.get('symbol') == symbol:
@@ -0,0 +1,165 @@
+import time
+import threading
+from collections import deque
+
+from rate_limit import rate_budget
+from ..strategies.logger import Logger
+
+logging = Logger(logger_name="CandleStore", filename="CandleStore.log", stream=True)
+
+# Rows Bybit returns for a kline request without a limit
+DEFAULT_KLINE_LIMIT = 200
+
+
+class CandleStore:
+    """
+    Process-wide OHLCV cache keyed by (exchange, symbol, timeframe).
+
+    Each series is kept in a ring buffer of raw ccxt rows
+    ``[timestamp, open, high, low, close, volume]``. The last row is the candle
+    that is still forming, so a refresh only asks the exchange for bars from that
+    timestamp onwards and replaces the tail. A full download only happens on the
+    first request, when a caller asks for a deeper window than is buffered, or
+    when the buffer has fallen too far behind to be patched.
+    """
+
+    def __init__(self, min_refresh_interval=1.0, max_incremental_bars=500, stream_stale_after=10.0):
+        self.min_refresh_interval = min_refresh_interval  # Serve cached rows if refreshed more recently than this
+        self.max_incremental_bars = max_incremental_bars  # Fall back to a full fetch past this many missing bars
+        self.stream_stale_after = stream_stale_after  # Skip REST refreshes while a kline stream keeps the series current
+        self.shared_source = None  # SharedMarketDataReader in a sharded worker process
+        self.series = {}
+        self.last_refresh_time = {}
+        self.stream_update_time = {}
+        self.series_locks = {}
+        self.lock = threading.Lock()
+
+    def _get_series_lock(self, key):
+        with self.lock:
+            if key not in self.series_locks:
+                self.series_locks[key] = threading.Lock()
+            return self.series_locks[key]
+
+    @staticmethod
+    def timeframe_to_ms(exchange, timeframe):
+        return int(exchange.parse_timeframe(timeframe) * 1000)
+
+    def get_ohlcv(self, exchange, symbol, timeframe, limit):
+        """
+        Return the latest ``limit`` OHLCV rows for symbol/timeframe.
+
+        :param exchange: ccxt exchange instance used for fetching.
+        :param symbol: Trading symbol.
+        :param timeframe: Timeframe string.
+        :param limit: Number of rows to return.
+        :return: List of OHLCV rows, oldest first, in ccxt format.
+        """
+        if self.shared_source is not None:
+            # Sharded worker: the coordinator keeps the series current in shared memory
+            rows = self.shared_source.get_ohlcv(symbol, timeframe, limit or DEFAULT_KLINE_LIMIT)
+            if rows is not None:
+                return rows
+
+        if not limit:
+            # Without a window size there is nothing to buffer against
+            return self._fetch(exchange, symbol, timeframe, limit=limit)
+
+        key = (exchange.id, symbol, timeframe)
+        with self._get_series_lock(key):
+            buffer = self.series.get(key)
+            now = time.time()
+
+            if buffer is None or buffer.maxlen < limit or len(buffer) == 0:
+                buffer = self._full_fetch(exchange, key, symbol, timeframe, limit)
+            elif now - self.stream_update_time.get(key, 0) < self.stream_stale_after:
+                pass
+            elif now - self.last_refresh_time.get(key, 0) >= self.min_refresh_interval:
+                buffer = self._incremental_fetch(exchange, key, symbol, timeframe, buffer)
+
+            rows = list(buffer)
+
+        return [list(row) for row in rows[-limit:]]
+
+    def get_cached_ohlcv(self, exchange_id, symbol, timeframe, limit=None):
+        """Buffered rows for symbol/timeframe without touching the exchange (possibly stale); [] if none."""
+        key = (exchange_id, symbol, timeframe)
+        with self._get_series_lock(key):
+            rows = list(self.series.get(key) or [])
+        if limit:
+            rows = rows[-limit:]
+        return [list(row) for row in rows]
+
+    @staticmethod
+    def _fetch(exchange, symbol, timeframe, since=None, limit=None):
+        # Only requests that reach the exchange are charged, at one kline weight per page
+        with rate_budget.endpoint('fetch_ohlcv', rate_budget.kline_pages(limit)):
+            return exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+
+    def _full_fetch(self, exchange, key, symbol, timeframe, limit):
+        ohlcv = self._fetch(exchange, symbol, timeframe, limit=limit)
+        buffer = deque(ohlcv or [], maxlen=limit)
+        self.series[key] = buffer
+        self.last_refresh_time[key] = time.time()
+        logging.info(f"Full OHLCV fetch for {symbol} {timeframe}: {len(buffer)} bars buffered")
+        return buffer
+
+    def _incremental_fetch(self, exchange, key, symbol, timeframe, buffer):
+        timeframe_ms = self.timeframe_to_ms(exchange, timeframe)
+        last_timestamp = buffer[-1][0]
+        now_ms = int(time.time() * 1000)
+        missing_bars = (now_ms - last_timestamp) // timeframe_ms + 1
+
+        if missing_bars > self.max_incremental_bars or missing_bars >= buffer.maxlen:
+            logging.info(f"OHLCV buffer for {symbol} {timeframe} is {missing_bars} bars behind, refetching")
+            return self._full_fetch(exchange, key, symbol, timeframe, buffer.maxlen)
+
+        new_rows = self._fetch(exchange, symbol, timeframe, since=last_timestamp, limit=missing_bars + 1)
+        if not new_rows:
+            self.last_refresh_time[key] = time.time()
+            return buffer
+
+        first_new_timestamp = new_rows[0][0]
+        if first_new_timestamp > last_timestamp + timeframe_ms:
+            logging.info(f"Gap detected in OHLCV buffer for {symbol} {timeframe}, refetching")
+            return self._full_fetch(exchange, key, symbol, timeframe, buffer.maxlen)
+
+        # Replace the forming candle (and anything after it) with the fresh rows
+        while buffer and buffer[-1][0] >= first_new_timestamp:
+            buffer.pop()
+        buffer.extend(new_rows)
+
+        self.last_refresh_time[key] = time.time()
+        return buffer
+
+    def apply_stream_update(self, exchange_id, symbol, timeframe, timeframe_ms, rows):
+        """
+        Merge candles pushed by a websocket kline stream into an existing series.
+
+        Series that have not been seeded by a REST fetch yet are ignored, as are
+        updates that would leave a gap; the next get_ohlcv call repairs those.
+        """
+        if not rows:
+            return
+
+        key = (exchange_id, symbol, timeframe)
+        with self._get_series_lock(key):
+            buffer = self.series.get(key)
+            if not buffer:
+                return
+
+            first_new_timestamp = rows[0][0]
+            if first_new_timestamp > buffer[-1][0] + timeframe_ms:
+                return
+
+            while buffer and buffer[-1][0] >= first_new_timestamp:
+                buffer.pop()
+            buffer.extend([list(row) for row in rows])
+            self.stream_update_time[key] = time.time()
+
+    def invalidate(self, symbol=None, timeframe=None):
+        with self.lock:
+            for key in list(self.series.keys()):
+                if (symbol is None or key[1] == symbol) and (timeframe is None or key[2] == timeframe):
+                    del self.series[key]
+                    self.last_refresh_time.pop(key, None)
+                    self.stream_update_time.pop(key, None)
@@ -26,7 +26,11 @@ from ccxt.base.errors import NetworkError
 
 logging = Logger(logger_name="Exchange", filename="Exchange.log", stream=True)
 
-from rate_limit import RateLimit
+from rate_limit import rate_budget
+from retry_policy import retry_policy, RetryError
+from .candle_store import CandleStore
+from .feature_engine import FeatureEngine
+from .order_book import OrderBookEngine
 
 class Exchange:
     # Shared class-level cache variables
@@ -34,9 +38,14 @@ class Exchange:
     symbols_cache_time = None
     symbols_cache_duration = 300  # Cache duration in seconds
 
-    open_positions_shared_cache = None
-    last_open_positions_time_shared = None
-    open_positions_semaphore = threading.Semaphore()
+    # Shared OHLCV ring buffers, refreshed incrementally across all symbol threads
+    candle_store = CandleStore()
+
+    # Shared incremental Lorentzian features, updated once per closed candle
+    feature_engine = FeatureEngine()
+
+    # Shared NumPy order books, fed by REST snapshots and the websocket feed
+    order_book_engine = OrderBookEngine()
 
     def __init__(self, exchange_id, api_key, secret_key, passphrase=None, market_type='swap'):
         self.order_timestamps = None
@@ -54,11 +63,14 @@ class Exchange:
 
         self.entry_order_ids = {}  # Initialize order history
         self.entry_order_ids_lock = threading.Lock()  # For thread safety
-        self.rate_limiter = RateLimit(10, 1)
+        self.rate_limiter = rate_budget.limiter('market_data')
 
         self.last_signal = {}
         self.last_signal_time = {}
         self.signal_duration = 60  # Duration in seconds (1 minute)
+
+        self.use_feature_engine = False  # Incremental closed-candle features for generate_l_signals
+        self.l_signal_cache = {}
         
     def initialise(self):
         exchange_class = getattr(ccxt, self.exchange_id)
@@ -122,7 +134,7 @@ class Exchange:
 
     def get_mfirsi_ema_secondary_ema(self, symbol: str, limit: int = 100, lookback: int = 1, ema_period: int = 5, secondary_ema_period: int = 3) -> str:
         # Fetch OHLCV data
-        ohlcv_data = self.exchange.fetch_ohlcv(symbol=symbol, timeframe='1m', limit=limit)
+        ohlcv_data = self.candle_store.get_ohlcv(self.exchange, symbol, '1m', limit)
         df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
 
         # Calculate MFI and RSI
@@ -336,65 +348,149 @@ class Exchange:
         distances = np.log(1 + np.abs(feature_series - feature_arrays))
         return distances.sum(axis=1)
 
-    def generate_l_signals(self, symbol, limit=3000, neighbors_count=8, use_adx_filter=False, adx_threshold=20):
-        try:
-            # Fetch OHLCV data
-            ohlcv_data = self.fetch_ohlcv(symbol=symbol, timeframe='3m', limit=limit)
-            df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
-            df.set_index('timestamp', inplace=True)
+    def lorentzian_prediction(self, feature_series, feature_arrays, y_train_series, neighbors_count=8, compat=True, sample_step=4):
+        """
+        Sum of the neighbour labels for the latest feature row.
+
+        Distances to every sampled bar are computed in a single array op. With compat=True
+        neighbours are chosen exactly like the original loop did (every 4th bar, only accepting
+        distances >= the running lastDistance threshold), so signals are unchanged. With
+        compat=False the true k nearest sampled bars are picked with argpartition.
+        """
+        sampled = np.arange(0, len(feature_arrays), sample_step)
+        if len(sampled) == 0:
+            return 0
+
+        distances_all = self.lorentzian_distance(feature_series, feature_arrays[sampled])
+        labels = np.asarray(y_train_series)[sampled]
+
+        if not compat:
+            valid = np.flatnonzero(~np.isnan(distances_all))
+            k = min(neighbors_count, len(valid))
+            if k == 0:
+                return 0
+            nearest = valid[np.argpartition(distances_all[valid], k - 1)[:k]]
+            return np.sum(labels[nearest])
+
+        predictions = []
+        distances = []
+        lastDistance = -1
+
+        # Only scalar comparisons are left in the loop
+        for d, label in zip(distances_all.tolist(), labels.tolist()):
+            if d >= lastDistance:
+                lastDistance = d
+                distances.append(d)
+                predictions.append(label)
+                if len(predictions) > neighbors_count:
+                    lastDistance = distances[int(neighbors_count * 3 / 4)]
+                    distances.pop(0)
+                    predictions.pop(0)
+
+        return np.sum(predictions)
+
+    def generate_l_signal_incremental(self, symbol, limit=3000, neighbors_count=8, use_adx_filter=False, adx_threshold=20, compat_knn=True, timeframe='3m'):
+        """
+        Lorentzian signal from the shared incremental feature engine.
+
+        Features are only updated for candles that closed since the last call and the
+        kNN is only re-run once a new candle closed; until then the cached signal for
+        the same series and settings is returned.
+
+        :return: (signal, kNN prediction) tuple.
+        """
+        ohlcv = self.candle_store.get_ohlcv(self.exchange, symbol, timeframe, limit)
+
+        key = (self.exchange.id, symbol, timeframe)
+        self.feature_engine.update(key, ohlcv, maxlen=limit)
+        # The engine is shared, so another caller may have consumed the new bars: compare the last closed candle instead
+        cache_key = (key, limit, neighbors_count, use_adx_filter, adx_threshold, compat_knn)
+        last_closed = ohlcv[-2][0] if len(ohlcv) > 1 else None
+        cached = self.l_signal_cache.get(cache_key)
+        if cached is not None and cached[0] == last_closed:
+            return cached[1]
+
+        snapshot = self.feature_engine.snapshot(key)
+        if snapshot is None:
+            return 'neutral', 0
+        features, closes, adx, ema, sma = snapshot
+
+        feature_series = features[-1]
+        feature_arrays = features[:-1]
+
+        # Same labels as close.shift(-4) > close: the last 4 bars have no future close and are -1
+        rising = np.zeros(len(closes), dtype=bool)
+        rising[:-4] = closes[4:] > closes[:-4]
+        y_train_series = np.where(rising, 1, -1)[:-1]
+
+        prediction = self.lorentzian_prediction(feature_series, feature_arrays, y_train_series, neighbors_count, compat=compat_knn)
 
-            # Calculate technical indicators
-            df['rsi'] = self.n_rsi(df['close'], 14, 1)
-            df['adx'] = self.n_adx(df['high'], df['low'], df['close'], 14)  # ADX is always calculated
-            df['cci'] = self.n_cci(df['high'], df['low'], df['close'], 20, 1)
-            df['wt'] = self.n_wt((df['high'] + df['low'] + df['close']) / 3, 10, 11)
-
-            # Feature engineering
-            features = df[['rsi', 'adx', 'cci', 'wt']].values  # ADX included in feature set
-            feature_series = features[-1]
-            feature_arrays = features[:-1]
-
-            # Calculate Lorentzian distances and predictions
-            y_train_series = np.where(df['close'].shift(-4) > df['close'], 1, -1)
-            y_train_series = y_train_series[:-1]
-
-            predictions = []
-            distances = []
-            lastDistance = -1
-
-            for i in range(len(feature_arrays)):
-                if i % 4 == 0:
-                    d = np.log(1 + np.abs(feature_series - feature_arrays[i])).sum()
-                    if d >= lastDistance:
-                        lastDistance = d
-                        distances.append(d)
-                        predictions.append(y_train_series[i])
-                        if len(predictions) > neighbors_count:
-                            lastDistance = distances[int(neighbors_count * 3 / 4)]
-                            distances.pop(0)
-                            predictions.pop(0)
-
-            prediction = np.sum(predictions)
-
-            # Calculate EMA and SMA
-            df['ema'] = EMAIndicator(df['close'], window=200).ema_indicator()
-            df['sma'] = SMAIndicator(df['close'], window=200).sma_indicator()
-
-            # Determine trends
-            is_ema_uptrend = df['close'] > df['ema']
-            is_ema_downtrend = df['close'] < df['ema']
-            is_sma_uptrend = df['close'] > df['sma']
-            is_sma_downtrend = df['close'] < df['sma']
-
-            # Apply ADX filter if enabled
-            adx_filter = self.filter_adx(df['close'], df['high'], df['low'], adx_threshold, use_adx_filter)
-
-            # Generate signal based on prediction and trends
-            new_signal = 'neutral'
-            if prediction > 0 and is_ema_uptrend.iloc[-1] and is_sma_uptrend.iloc[-1] and adx_filter.iloc[-1]:
-                new_signal = 'long'
-            elif prediction < 0 and is_ema_downtrend.iloc[-1] and is_sma_downtrend.iloc[-1] and adx_filter.iloc[-1]:
-                new_signal = 'short'
+        last_close = closes[-1]
+        adx_ok = not use_adx_filter or adx > adx_threshold
+
+        new_signal = 'neutral'
+        if prediction > 0 and last_close > ema and last_close > sma and adx_ok:
+            new_signal = 'long'
+        elif prediction < 0 and last_close < ema and last_close < sma and adx_ok:
+            new_signal = 'short'
+
+        self.l_signal_cache[cache_key] = (last_closed, (new_signal, prediction))
+        return new_signal, prediction
+
+    def generate_l_signals(self, symbol, limit=3000, neighbors_count=8, use_adx_filter=False, adx_threshold=20, compat_knn=True, use_feature_engine=None, with_prediction=False):
+        """
+        Lorentzian entry signal for a symbol: 'long', 'short' or 'neutral'.
+
+        :param with_prediction: Return (signal, kNN prediction) instead of the signal alone,
+            so callers ranking signals get the vote computed by this very call.
+        """
+        if use_feature_engine is None:
+            use_feature_engine = self.use_feature_engine
+
+        prediction = 0
+        try:
+            if use_feature_engine:
+                new_signal, prediction = self.generate_l_signal_incremental(symbol, limit, neighbors_count, use_adx_filter, adx_threshold, compat_knn)
+            else:
+                # Fetch OHLCV data
+                df = self.fetch_ohlcv(symbol=symbol, timeframe='3m', limit=limit)
+
+                # Calculate technical indicators
+                df['rsi'] = self.n_rsi(df['close'], 14, 1)
+                df['adx'] = self.n_adx(df['high'], df['low'], df['close'], 14)  # ADX is always calculated
+                df['cci'] = self.n_cci(df['high'], df['low'], df['close'], 20, 1)
+                df['wt'] = self.n_wt((df['high'] + df['low'] + df['close']) / 3, 10, 11)
+
+                # Feature engineering
+                features = df[['rsi', 'adx', 'cci', 'wt']].values  # ADX included in feature set
+                feature_series = features[-1]
+                feature_arrays = features[:-1]
+
+                # Calculate Lorentzian distances and predictions
+                y_train_series = np.where(df['close'].shift(-4) > df['close'], 1, -1)
+                y_train_series = y_train_series[:-1]
+
+                prediction = self.lorentzian_prediction(feature_series, feature_arrays, y_train_series, neighbors_count, compat=compat_knn)
+
+                # Calculate EMA and SMA
+                df['ema'] = EMAIndicator(df['close'], window=200).ema_indicator()
+                df['sma'] = SMAIndicator(df['close'], window=200).sma_indicator()
+
+                # Determine trends
+                is_ema_uptrend = df['close'] > df['ema']
+                is_ema_downtrend = df['close'] < df['ema']
+                is_sma_uptrend = df['close'] > df['sma']
+                is_sma_downtrend = df['close'] < df['sma']
+
+                # Apply ADX filter if enabled
+                adx_filter = self.filter_adx(df['close'], df['high'], df['low'], adx_threshold, use_adx_filter)
+
+                # Generate signal based on prediction and trends
+                new_signal = 'neutral'
+                if prediction > 0 and is_ema_uptrend.iloc[-1] and is_sma_uptrend.iloc[-1] and adx_filter.iloc[-1]:
+                    new_signal = 'long'
+                elif prediction < 0 and is_ema_downtrend.iloc[-1] and is_sma_downtrend.iloc[-1] and adx_filter.iloc[-1]:
+                    new_signal = 'short'
 
             current_time = time.time()
             logging.info(f"New signal for {symbol} : {new_signal}")
@@ -406,21 +502,21 @@ class Exchange:
                     # Check if sufficient time has passed to act on the same signal
                     if current_time - self.last_signal_time[symbol] < 15:  # 15 second buffer
                         logging.info(f"Returning {new_signal} because {self.last_signal[symbol]} is same as new signal and time difference is within buffer")
-                        return new_signal  # Return the same signal if within the buffer time
+                        return (new_signal, prediction) if with_prediction else new_signal  # Return the same signal if within the buffer time
                     else:
                         self.last_signal_time[symbol] = current_time
-                        return new_signal
+                        return (new_signal, prediction) if with_prediction else new_signal
                 else:
                     self.last_signal[symbol] = new_signal
                     self.last_signal_time[symbol] = current_time
-                    return new_signal
+                    return (new_signal, prediction) if with_prediction else new_signal
             else:
                 self.last_signal[symbol] = new_signal
                 self.last_signal_time[symbol] = current_time
-                return new_signal
+                return (new_signal, prediction) if with_prediction else new_signal
         except Exception as e:
             logging.info(f"Error in calculating signal: {e}")
-            return 'neutral'
+            return ('neutral', 0) if with_prediction else 'neutral'
         
     # def generate_l_signals(self, symbol, limit=3000, neighbors_count=8, use_adx_filter=False, adx_threshold=20):
     #     try:
@@ -1296,14 +1392,12 @@ class Exchange:
             logging.error(f"Error fetching trades for {symbol}: {e}")
             return []
 
-    def retry_api_call(self, function, *args, max_retries=100, delay=10, **kwargs):
-        for i in range(max_retries):
-            try:
-                return function(*args, **kwargs)
-            except Exception as e:
-                logging.info(f"Error occurred during API call: {e}. Retrying in {delay} seconds...")
-                time.sleep(delay)
-        raise Exception(f"Failed to execute the API function after {max_retries} retries.")
+    def retry_api_call(self, function, *args, max_retries=None, deadline=None, **kwargs):
+        """
+        Call an API function under the shared retry policy (deadline, jittered backoff, circuit breaker).
+        Raises RetryError (an Exception) once the policy gives up; rejections are raised as they are.
+        """
+        return retry_policy.call(function, args, kwargs, max_attempts=max_retries, deadline=deadline)
     
     def get_price_precision(self, symbol):
         market = self.exchange.market(symbol)
@@ -1359,73 +1453,71 @@ class Exchange:
             logging.error(traceback.format_exc())
             return False
 
-    def fetch_ohlcv(self, symbol, timeframe='1d', limit=None, max_retries=100, base_delay=10, max_delay=60):
+    def fetch_ohlcv(self, symbol, timeframe='1d', limit=None, max_retries=None, deadline=None):
         """
         Fetch OHLCV data for the given symbol and timeframe.
+
+        Network and rate limit errors are retried under the shared retry policy. Once
+        it gives up (deadline, attempts or open circuit) the rows already buffered by
+        the candle store are returned, stale as they may be, rather than nothing.
         
         :param symbol: Trading symbol.
         :param timeframe: Timeframe string.
         :param limit: Limit the number of returned data points.
-        :param max_retries: Maximum number of retries for API calls.
-        :param base_delay: Base delay for exponential backoff.
-        :param max_delay: Maximum delay for exponential backoff.
+        :param max_retries: Maximum number of attempts, None for the policy default.
+        :param deadline: Seconds to keep retrying, None for the policy default.
         :return: DataFrame with OHLCV data.
         """
-        retries = 0
+        def fetch():
+            # Fetch the OHLCV data through the shared candle store (only new bars hit the exchange
+            # and are charged to the market data budget)
+            return self.candle_store.get_ohlcv(self.exchange, symbol, timeframe, limit)
 
-        while retries < max_retries:
+        try:
             try:
-                with self.rate_limiter:
-                    # Fetch the OHLCV data from the exchange
-                    ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)  # Pass the limit parameter
-                    
-                    # Create a DataFrame from the OHLCV data
-                    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                    
-                    # Convert the timestamp to datetime
-                    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                    
-                    # Set the timestamp as the index
-                    df.set_index('timestamp', inplace=True)
-                    
-                    return df
+                ohlcv = retry_policy.call(fetch, endpoint='fetch_ohlcv', max_attempts=max_retries, deadline=deadline)
+            except RetryError as e:
+                ohlcv = self.candle_store.get_cached_ohlcv(self.exchange.id, symbol, timeframe, limit)
+                logging.info(f"Serving {len(ohlcv)} cached OHLCV rows for {symbol} {timeframe}: {e}")
 
-            except ccxt.RateLimitExceeded as e:
-                retries += 1
-                delay = min(base_delay * (2 ** retries) + random.uniform(0, 0.1 * (2 ** retries)), max_delay)
-                logging.info(f"Rate limit exceeded: {e}. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-
-            except ccxt.BaseError as e:
-                # Log the error message
-                logging.info(f"Failed to fetch OHLCV data: {self.exchange.id} {e}")
-                # Log the traceback for further debugging
-                logging.error(traceback.format_exc())
-                return pd.DataFrame()
+            # Create a DataFrame from the OHLCV data
+            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            
+            # Convert the timestamp to datetime
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+            
+            # Set the timestamp as the index
+            df.set_index('timestamp', inplace=True)
+            
+            return df
 
-            except Exception as e:
-                # Log the error message and traceback
-                logging.info(f"Unexpected error occurred while fetching OHLCV data: {e}")
-                logging.info(traceback.format_exc())
+        except ccxt.BaseError as e:
+            # Log the error message
+            logging.info(f"Failed to fetch OHLCV data: {self.exchange.id} {e}")
+            # Log the traceback for further debugging
+            logging.error(traceback.format_exc())
+            return pd.DataFrame()
+
+        except Exception as e:
+            # Log the error message and traceback
+            logging.info(f"Unexpected error occurred while fetching OHLCV data: {e}")
+            logging.info(traceback.format_exc())
+            
+            # Attempt to handle the specific 'string indices must be integers' error
+            if isinstance(e, TypeError) and 'string indices must be integers' in str(e):
+                logging.info(f"TypeError occurred: {e}")
                 
-                # Attempt to handle the specific 'string indices must be integers' error
-                if isinstance(e, TypeError) and 'string indices must be integers' in str(e):
-                    logging.info(f"TypeError occurred: {e}")
-                    
-                    # Print the response for debugging
-                    logging.info(f"Response content: {self.exchange.last_http_response}")
-                    
-                    try:
-                        # Attempt to parse the response
-                        response = json.loads(self.exchange.last_http_response)
-                        logging.info(f"Parsed response into a dictionary: {response}")
-                    except json.JSONDecodeError as json_error:
-                        logging.info(f"Failed to parse response: {json_error}")
+                # Print the response for debugging
+                logging.info(f"Response content: {self.exchange.last_http_response}")
                 
-                return pd.DataFrame()
-
-        logging.error(f"Failed to fetch OHLCV data after {max_retries} retries.")
-        return pd.DataFrame()
+                try:
+                    # Attempt to parse the response
+                    response = json.loads(self.exchange.last_http_response)
+                    logging.info(f"Parsed response into a dictionary: {response}")
+                except json.JSONDecodeError as json_error:
+                    logging.info(f"Failed to parse response: {json_error}")
+            
+            return pd.DataFrame()
 
     # def fetch_ohlcv(self, symbol, timeframe='1d', limit=None, max_retries=100, base_delay=10, max_delay=60):
     #     """
@@ -1649,9 +1741,27 @@ class Exchange:
             
     #         return pd.DataFrame()
 
-    def get_orderbook(self, symbol, max_retries=3, retry_delay=5) -> dict:
+    def get_orderbook_view(self, symbol, max_age=None):
+        """
+        Read-only OrderBook snapshot for symbol from the shared order book engine, fetched
+        over REST only when no book newer than max_age seconds is held. Returns None if the book is empty.
+        """
+        book = self.order_book_engine.get_fresh_book(self.exchange.id, symbol, max_age)
+        if book is None:
+            self.get_orderbook(symbol, max_age=0)
+            book = self.order_book_engine.get_fresh_book(self.exchange.id, symbol, max_age=float('inf'))
+        # The feed keeps updating the live book; callers get a copy no update can change underneath them
+        return book.snapshot() if book is not None else None
+
+    def get_orderbook(self, symbol, max_retries=3, retry_delay=5, max_age=None) -> dict:
         values = {"bids": [], "asks": []}
 
+        # Analytics within one loop share the snapshot held by the order book engine
+        if max_age != 0:
+            book = self.order_book_engine.get_fresh_book(self.exchange.id, symbol, max_age)
+            if book is not None:
+                return book.to_dict()
+
         for attempt in range(max_retries):
             try:
                 data = self.exchange.fetch_order_book(symbol)
@@ -1660,6 +1770,7 @@ class Exchange:
                         if len(data["bids"][0]) > 0 and len(data["asks"][0]) > 0:
                             values["bids"] = data["bids"]
                             values["asks"] = data["asks"]
+                            self.order_book_engine.apply_snapshot(self.exchange.id, symbol, data["bids"], data["asks"], timestamp=data.get("timestamp"), update_id=data.get("nonce"))
                 break  # if the fetch was successful, break out of the loop
 
             except HTTPError as http_err:
@@ -1850,37 +1961,30 @@ class Exchange:
         # If no 'LOT_SIZE' filter was found, return None
         return None
 
-    def get_moving_averages(self, symbol: str, timeframe: str = "1m", num_bars: int = 20, max_retries=100, retry_delay=5) -> dict:
+    def get_moving_averages(self, symbol: str, timeframe: str = "1m", num_bars: int = 20, max_retries=None, deadline=None) -> dict:
         values = {"MA_3_H": 0.0, "MA_3_L": 0.0, "MA_6_H": 0.0, "MA_6_L": 0.0}
-        for i in range(max_retries):
-            try:
-                bars = self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=num_bars)
-                if not bars:
-                    logging.info(f"No data returned for {symbol} on {timeframe}. Retrying...")
-                    time.sleep(retry_delay)
-                    continue
-                
-                df = pd.DataFrame(bars, columns=["Time", "Open", "High", "Low", "Close", "Volume"])
-                df["Time"] = pd.to_datetime(df["Time"], unit="ms")
-                df["MA_3_High"] = df["High"].rolling(3).mean()
-                df["MA_3_Low"] = df["Low"].rolling(3).mean()
-                df["MA_6_High"] = df["High"].rolling(6).mean()
-                df["MA_6_Low"] = df["Low"].rolling(6).mean()
-                
-                values["MA_3_H"] = df["MA_3_High"].iat[-1] if len(df["MA_3_High"]) > 0 else None
-                values["MA_3_L"] = df["MA_3_Low"].iat[-1] if len(df["MA_3_Low"]) > 0 else None
-                values["MA_6_H"] = df["MA_6_High"].iat[-1] if len(df["MA_6_High"]) > 0 else None
-                values["MA_6_L"] = df["MA_6_Low"].iat[-1] if len(df["MA_6_Low"]) > 0 else None
-
-                if None not in values.values():
-                    break
-            except Exception as e:
-                if i < max_retries - 1:
-                    logging.info(f"An unknown error occurred in get_moving_averages(): {e}. Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                else:
-                    logging.info(f"Failed to fetch moving averages after {max_retries} attempts: {e}")
-                    return values  # Return whatever we have, even if incomplete
+        try:
+            # Retried under the shared retry policy; past its deadline the buffered (possibly stale) bars are used
+            bars = retry_policy.call(self.candle_store.get_ohlcv, (self.exchange, symbol, timeframe, num_bars),
+                                     endpoint='fetch_ohlcv', max_attempts=max_retries, deadline=deadline,
+                                     fallback=lambda: self.candle_store.get_cached_ohlcv(self.exchange.id, symbol, timeframe, num_bars))
+            if not bars:
+                logging.info(f"No data returned for {symbol} on {timeframe}.")
+                return values
+            
+            df = pd.DataFrame(bars, columns=["Time", "Open", "High", "Low", "Close", "Volume"])
+            df["Time"] = pd.to_datetime(df["Time"], unit="ms")
+            df["MA_3_High"] = df["High"].rolling(3).mean()
+            df["MA_3_Low"] = df["Low"].rolling(3).mean()
+            df["MA_6_High"] = df["High"].rolling(6).mean()
+            df["MA_6_Low"] = df["Low"].rolling(6).mean()
+            
+            values["MA_3_H"] = df["MA_3_High"].iat[-1] if len(df["MA_3_High"]) > 0 else None
+            values["MA_3_L"] = df["MA_3_Low"].iat[-1] if len(df["MA_3_Low"]) > 0 else None
+            values["MA_6_H"] = df["MA_6_High"].iat[-1] if len(df["MA_6_High"]) > 0 else None
+            values["MA_6_L"] = df["MA_6_Low"].iat[-1] if len(df["MA_6_Low"]) > 0 else None
+        except Exception as e:
+            logging.info(f"Failed to fetch moving averages for {symbol}: {e}")
 
         return values
 
@@ -0,0 +1,299 @@
+import math
+import threading
+from collections import deque
+
+import numpy as np
+
+from ..strategies.logger import Logger
+
+logging = Logger(logger_name="FeatureEngine", filename="FeatureEngine.log", stream=True)
+
+
+class _Ema:
+    """Recursive EMA matching pandas ewm(adjust=False, min_periods=window) fed one value at a time."""
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = None
+        self.count = 0
+
+    def update(self, x):
+        if x is None or math.isnan(x):
+            return self.current()
+        if self.value is None:
+            self.value = x
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+        self.count += 1
+        return self.current()
+
+    def current(self):
+        if self.value is None or self.count < self.min_periods:
+            return math.nan
+        return self.value
+
+
+class IncrementalFeatures:
+    """
+    Lorentzian feature state for one (symbol, timeframe) series.
+
+    RSI, ADX, CCI and WaveTrend are updated with their recursive forms, so every
+    closed bar costs O(1) regardless of history length. Raw values are kept in
+    ring buffers; the min/max of each feature over the buffer is tracked with
+    monotonic deques, so bars leaving the buffer also leave the extremes.
+    Normalisation to [0, 1] is applied when the feature matrix is read, the same
+    way the Lorentzian classification script normalises against historic extremes.
+    The EMA and SMA of the close used by the trend filter are updated per bar too.
+    """
+
+    FEATURES = ('rsi', 'adx', 'cci', 'wt')
+
+    def __init__(self, maxlen=3000, rsi_length=14, adx_length=14, cci_length=20, wt_n1=10, wt_n2=11, trend_length=200):
+        self.maxlen = maxlen
+        self.rsi_length = rsi_length
+        self.adx_length = adx_length
+        self.cci_length = cci_length
+
+        self.last_timestamp = None
+        self.prev_close = None
+        self.prev_high = None
+        self.prev_low = None
+
+        # RSI (Wilder smoothing)
+        self.rsi_up = _Ema(1.0 / rsi_length, rsi_length)
+        self.rsi_down = _Ema(1.0 / rsi_length, rsi_length)
+
+        # CCI
+        self.cci_window = deque(maxlen=cci_length)
+
+        # WaveTrend
+        self.wt_ema1 = _Ema(2.0 / (wt_n1 + 1), wt_n1)
+        self.wt_ema2 = _Ema(2.0 / (wt_n1 + 1), wt_n1)
+        self.wt1_ema = _Ema(2.0 / (wt_n2 + 1), wt_n2)
+        self.wt1_window = deque(maxlen=4)
+
+        # ADX (Wilder sums)
+        self.adx_bars = 0
+        self.tr_sum = 0.0
+        self.plus_dm_sum = 0.0
+        self.minus_dm_sum = 0.0
+        self.dx_values = []
+        self.adx = math.nan
+
+        # Trend filter: EMA and SMA of the close
+        self.trend_length = trend_length
+        self.close_ema = _Ema(2.0 / (trend_length + 1), trend_length)
+        self.sma_window = deque()
+        self.sma_sum = 0.0
+        self.ema = math.nan
+        self.sma = math.nan
+
+        self.timestamps = deque(maxlen=maxlen)
+        self.highs = deque(maxlen=maxlen)
+        self.lows = deque(maxlen=maxlen)
+        self.closes = deque(maxlen=maxlen)
+        self.raw = {name: deque(maxlen=maxlen) for name in self.FEATURES}
+
+        # Monotonic deques of (bar index, value): min_windows increasing, max_windows decreasing
+        self.bar_count = 0
+        self.min_windows = {name: deque() for name in self.FEATURES}
+        self.max_windows = {name: deque() for name in self.FEATURES}
+
+    def update(self, row):
+        timestamp, _, high, low, close, _ = row[:6]
+        high, low, close = float(high), float(low), float(close)
+
+        values = {
+            'rsi': self._update_rsi(close),
+            'adx': self._update_adx(high, low, close),
+            'cci': self._update_cci(high, low, close),
+            'wt': self._update_wt((high + low + close) / 3),
+        }
+
+        index = self.bar_count
+        self.bar_count += 1
+        oldest = index - self.maxlen + 1  # Oldest bar index still in the ring buffers
+        for name, value in values.items():
+            self.raw[name].append(value)
+            self._update_extremes(self.min_windows[name], index, value, oldest, lambda last, new: last >= new)
+            self._update_extremes(self.max_windows[name], index, value, oldest, lambda last, new: last <= new)
+
+        self.ema = self.close_ema.update(close)
+        self.sma_window.append(close)
+        self.sma_sum += close
+        if len(self.sma_window) > self.trend_length:
+            self.sma_sum -= self.sma_window.popleft()
+        self.sma = self.sma_sum / self.trend_length if len(self.sma_window) == self.trend_length else math.nan
+
+        self.timestamps.append(timestamp)
+        self.highs.append(high)
+        self.lows.append(low)
+        self.closes.append(close)
+        self.prev_close, self.prev_high, self.prev_low = close, high, low
+        self.last_timestamp = timestamp
+
+    @staticmethod
+    def _update_extremes(window, index, value, oldest, dominated):
+        if not math.isnan(value):
+            while window and dominated(window[-1][1], value):
+                window.pop()
+            window.append((index, value))
+        while window and window[0][0] < oldest:
+            window.popleft()
+
+    def feature_min(self, name):
+        window = self.min_windows[name]
+        return window[0][1] if window else math.inf
+
+    def feature_max(self, name):
+        window = self.max_windows[name]
+        return window[0][1] if window else -math.inf
+
+    def _update_rsi(self, close):
+        diff = 0.0 if self.prev_close is None else close - self.prev_close
+        avg_up = self.rsi_up.update(max(diff, 0.0))
+        avg_down = self.rsi_down.update(max(-diff, 0.0))
+        if math.isnan(avg_up) or math.isnan(avg_down):
+            return math.nan
+        if avg_down == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + avg_up / avg_down)
+
+    def _update_cci(self, high, low, close):
+        self.cci_window.append((high + low + close) / 3)
+        if len(self.cci_window) < self.cci_length:
+            return math.nan
+        typical_price = self.cci_window[-1]
+        mean = sum(self.cci_window) / self.cci_length
+        mad = sum(abs(tp - mean) for tp in self.cci_window) / self.cci_length
+        if mad == 0:
+            return math.nan
+        return (typical_price - mean) / (0.015 * mad)
+
+    def _update_wt(self, hlc3):
+        ema1 = self.wt_ema1.update(hlc3)
+        if math.isnan(ema1):
+            self.wt1_window.append(math.nan)
+            return math.nan
+        ema2 = self.wt_ema2.update(abs(hlc3 - ema1))
+        ci = math.nan if math.isnan(ema2) or ema2 == 0 else (hlc3 - ema1) / (0.015 * ema2)
+        wt1 = self.wt1_ema.update(ci)
+        self.wt1_window.append(wt1)
+        if len(self.wt1_window) < 4 or any(math.isnan(v) for v in self.wt1_window):
+            return math.nan
+        return wt1 - sum(self.wt1_window) / 4
+
+    def _update_adx(self, high, low, close):
+        if self.prev_close is None:
+            return math.nan
+
+        n = self.adx_length
+        tr = max(high, self.prev_close) - min(low, self.prev_close)
+        up_move = high - self.prev_high
+        down_move = self.prev_low - low
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+
+        self.adx_bars += 1
+        if self.adx_bars <= n:
+            self.tr_sum += tr
+            self.plus_dm_sum += plus_dm
+            self.minus_dm_sum += minus_dm
+            if self.adx_bars < n:
+                return math.nan
+        else:
+            self.tr_sum = self.tr_sum - self.tr_sum / n + tr
+            self.plus_dm_sum = self.plus_dm_sum - self.plus_dm_sum / n + plus_dm
+            self.minus_dm_sum = self.minus_dm_sum - self.minus_dm_sum / n + minus_dm
+
+        if self.tr_sum == 0:
+            return self.adx
+        plus_di = 100 * self.plus_dm_sum / self.tr_sum
+        minus_di = 100 * self.minus_dm_sum / self.tr_sum
+        di_sum = plus_di + minus_di
+        dx = 0.0 if di_sum == 0 else 100 * abs(plus_di - minus_di) / di_sum
+
+        if math.isnan(self.adx):
+            self.dx_values.append(dx)
+            if len(self.dx_values) == n:
+                self.adx = sum(self.dx_values) / n
+                self.dx_values = []
+        else:
+            self.adx = (self.adx * (n - 1) + dx) / n
+        return self.adx
+
+    def feature_matrix(self):
+        """Normalised features as an (n_bars, 4) array in rsi, adx, cci, wt order."""
+        columns = []
+        for name in self.FEATURES:
+            values = np.fromiter(self.raw[name], dtype=float, count=len(self.raw[name]))
+            low, high = self.feature_min(name), self.feature_max(name)
+            if math.isinf(low) or high == low:
+                columns.append(np.full(len(values), np.nan))
+            else:
+                columns.append((values - low) / (high - low))
+        return np.column_stack(columns)
+
+    def close_array(self):
+        return np.fromiter(self.closes, dtype=float, count=len(self.closes))
+
+
+class FeatureEngine:
+    """
+    Shared registry of IncrementalFeatures keyed by (exchange, symbol, timeframe).
+
+    update() feeds only candles that closed since the last call, so callers can
+    pass the full candle window on every loop and tell from the returned count
+    whether anything needs re-evaluating. All access goes through one lock;
+    per-bar updates are cheap enough that contention is not a concern.
+    """
+
+    def __init__(self):
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def update(self, key, ohlcv, maxlen=3000):
+        """
+        :param key: (exchange_id, symbol, timeframe) tuple.
+        :param ohlcv: OHLCV rows, oldest first. The last row is the forming candle and is skipped.
+        :param maxlen: Number of closed bars to keep per series.
+        :return: Number of newly closed bars processed.
+        """
+        closed_rows = ohlcv[:-1]
+
+        with self.lock:
+            state = self.series.get(key)
+            if state is not None and closed_rows and state.last_timestamp is not None:
+                timestamps = {row[0] for row in closed_rows}
+                if state.last_timestamp not in timestamps and closed_rows[0][0] > state.last_timestamp:
+                    logging.info(f"Gap in candles for {key}, rebuilding features")
+                    state = None
+            if state is None or state.maxlen != maxlen:
+                state = IncrementalFeatures(maxlen=maxlen)
+                self.series[key] = state
+
+            new_bars = 0
+            for row in closed_rows:
+                if state.last_timestamp is None or row[0] > state.last_timestamp:
+                    state.update(row)
+                    new_bars += 1
+
+        return new_bars
+
+    def snapshot(self, key):
+        """
+        :return: (normalised feature matrix, close prices, latest raw ADX, close EMA, close SMA) for the closed bars, or None.
+        """
+        with self.lock:
+            state = self.series.get(key)
+            if state is None or not state.closes:
+                return None
+            return state.feature_matrix(), state.close_array(), state.adx, state.ema, state.sma
+
+    def reset(self, key=None):
+        with self.lock:
+            if key is None:
+                self.series.clear()
+            else:
+                self.series.pop(key, None)
@@ -0,0 +1,411 @@
+import json
+import time
+import asyncio
+import threading
+import traceback
+
+from ..strategies.logger import Logger
+
+try:
+    import ccxt.pro as ccxtpro
+except ImportError:
+    ccxtpro = None
+
+logging = Logger(logger_name="MarketFeed", filename="MarketFeed.log", stream=True)
+
+
+class MarketDataFeed:
+    """
+    Streaming market/account data for Bybit built on ccxt.pro websockets.
+
+    Public topics (ticker, orderbook, kline) are subscribed per symbol and
+    private topics (position, order, execution, wallet) once per account. Every update is
+    stored as an in-memory snapshot that strategy threads read without touching
+    the network; readers get None when a snapshot is missing or older than
+    ``stale_after`` seconds and are expected to fall back to REST. Private topics
+    only push on change, so they count as current for as long as their stream
+    stays connected.
+
+    Replay mode reads recorded events from a JSON lines file instead of opening
+    sockets, so the feed and everything reading from it can run offline. Live
+    sessions can be captured with ``record_path`` and replayed later.
+    """
+
+    ACCOUNT_TOPICS = ('position', 'order', 'execution', 'wallet')
+
+    def __init__(self, exchange, kline_timeframes=('1m', '5m'), orderbook_depth=50, stale_after=5.0,
+                 replay_path=None, replay_speed=0.0, record_path=None, reconnect_delay=5):
+        self.exchange = exchange  # Our Exchange wrapper, used for credentials and the shared candle store
+        self.exchange_id = exchange.exchange.id
+        self.kline_timeframes = list(kline_timeframes)
+        self.orderbook_depth = orderbook_depth
+        self.stale_after = stale_after
+        self.replay_path = replay_path
+        self.replay_speed = replay_speed  # 0 replays as fast as possible, 1.0 in recorded time
+        self.record_path = record_path
+        self.reconnect_delay = reconnect_delay
+
+        self.client = None
+        self.loop = None
+        self.thread = None
+        self.running = False
+        self.ready = False
+        self.symbols = set()
+        self.watched_symbols = set()
+        self.connected = {}
+        self.connected_since = {}  # Topic -> time of the first event after the stream last (re)connected
+
+        self.lock = threading.Lock()
+        self.record_lock = threading.Lock()
+        self.tickers = {}
+        self.order_books = {}
+        self.positions = {}
+        self.orders = {}
+        self.balance = None
+        self.last_update = {}
+
+    @property
+    def enabled(self):
+        return self.running
+
+    def start(self):
+        if self.running:
+            return True
+
+        if self.replay_path is None and ccxtpro is None:
+            logging.info("ccxt.pro is not available, market feed disabled. Falling back to REST polling.")
+            return False
+
+        self.running = True
+        target = self._run_replay if self.replay_path else self._run_loop
+        self.thread = threading.Thread(target=target, name="MarketDataFeed", daemon=True)
+        self.thread.start()
+        logging.info(f"Market feed started ({'replay ' + self.replay_path if self.replay_path else 'live'})")
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.loop is not None and self.client is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self.client.close(), self.loop).result(timeout=10)
+            except Exception as e:
+                logging.info(f"Error closing websocket client: {e}")
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def subscribe(self, symbol):
+        """Start streaming public topics for a symbol. Safe to call repeatedly."""
+        if not self.running or symbol in self.symbols:
+            return
+
+        self.symbols.add(symbol)
+        logging.info(f"Subscribing market feed to {symbol}")
+
+        if self.ready:
+            self._watch_symbol(symbol)
+
+    def unsubscribe(self, symbol):
+        self.symbols.discard(symbol)
+        with self.lock:
+            self.watched_symbols.discard(symbol)
+
+    def _watch_symbol(self, symbol):
+        with self.lock:
+            if symbol in self.watched_symbols:
+                return
+            self.watched_symbols.add(symbol)
+
+        self._schedule(self._watch_loop('ticker', symbol, None, self.client.watch_ticker, symbol))
+        self._schedule(self._watch_loop('orderbook', symbol, None, self.client.watch_order_book, symbol, self.orderbook_depth))
+        for timeframe in self.kline_timeframes:
+            self._schedule(self._watch_loop('kline', symbol, timeframe, self.client.watch_ohlcv, symbol, timeframe))
+
+    # Snapshot readers
+
+    def _is_fresh(self, topic, symbol):
+        if symbol is None:
+            return self.connected.get(topic, False)
+        updated = self.last_update.get((topic, symbol))
+        return updated is not None and time.time() - updated <= self.stale_after
+
+    def get_ticker(self, symbol):
+        if not self._is_fresh('ticker', symbol):
+            return None
+        return self.tickers.get(symbol)
+
+    def get_current_price(self, symbol):
+        ticker = self.get_ticker(symbol)
+        if not ticker:
+            return None
+        try:
+            bid = float(ticker['bid'])
+            ask = float(ticker['ask'])
+            return (bid + ask) / 2
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def get_orderbook(self, symbol):
+        if not self._is_fresh('orderbook', symbol):
+            return None
+        order_book = self.order_books.get(symbol)
+        if not order_book or not order_book['bids'] or not order_book['asks']:
+            return None
+        return order_book
+
+    def get_unrealized_pnl(self, symbol):
+        """
+        Same shape as BybitExchange.fetch_unrealized_pnl, or None when no position stream is live
+        or the symbol has no known position (e.g. opened before the stream and not seeded since).
+        """
+        if not self._is_fresh('position', None) or symbol not in self.positions:
+            return None
+
+        # The position topic only pushes on change, so mark the PnL to the live ticker when we have one
+        ticker = self.get_ticker(symbol)
+        mark_price = None
+        if ticker:
+            try:
+                mark_price = float(ticker.get('info', {}).get('markPrice'))
+            except (TypeError, ValueError):
+                mark_price = None
+
+        unrealized_pnl = {'long': None, 'short': None}
+        for side, info in self.positions.get(symbol, {}).items():
+            pnl = info.get('unrealisedPnl', '')
+            try:
+                size = float(info.get('size') or 0)
+                if size <= 0:
+                    # A closed leg has no PnL, like fetch_unrealized_pnl
+                    continue
+                if mark_price is not None:
+                    avg_price = float(info['avgPrice'])
+                    unrealized_pnl[side] = (mark_price - avg_price) * size if side == 'long' else (avg_price - mark_price) * size
+                else:
+                    unrealized_pnl[side] = 0.0 if pnl == '' else float(pnl)
+            except (KeyError, TypeError, ValueError):
+                unrealized_pnl[side] = None
+        return unrealized_pnl
+
+    def get_open_orders(self, symbol):
+        with self.lock:
+            return [order for order in self.orders.values() if order.get('info', {}).get('symbol') == symbol and order.get('status') == 'open']
+
+    def get_balance(self):
+        if not self._is_fresh('wallet', None):
+            return None
+        return self.balance
+
+    # Event handling
+
+    def apply_event(self, event):
+        """
+        Apply a single feed event to the snapshots.
+
+        Events are dicts with ``topic``, ``symbol``, ``timeframe`` and ``data`` keys,
+        the same format that is written to ``record_path`` and read back in replay.
+        """
+        topic = event['topic']
+        symbol = event.get('symbol')
+        data = event['data']
+        now = time.time()
+
+        with self.lock:
+            handler = self._snapshot_handlers.get(topic)
+            if handler is not None:
+                handler(self, symbol, data)
+            if topic in self.ACCOUNT_TOPICS:
+                # Account-wide topics are tracked once, not per symbol
+                symbol = None
+            self.last_update[(topic, symbol)] = now
+            if symbol is None and topic != 'kline':
+                if not self.connected.get(topic):
+                    self.connected_since[topic] = now
+                self.connected[topic] = True
+
+        self._forward_event(event)
+
+        if self.record_path and not self.replay_path:
+            self._record(event)
+
+    # Per topic snapshot updates, called with the lock held
+
+    def _apply_ticker(self, symbol, data):
+        self.tickers[symbol] = data
+
+    def _apply_orderbook(self, symbol, data):
+        self.order_books[symbol] = data
+
+    def _apply_position(self, symbol, data):
+        if not self.connected.get('position'):
+            # The topic only pushes on change: legs opened before it connected come from the account snapshot
+            self._store_positions(self._snapshot_positions())
+        self._store_positions(data)
+
+    def _apply_order(self, symbol, data):
+        for order in data:
+            if order.get('status') == 'open':
+                self.orders[order['id']] = order
+            else:
+                self.orders.pop(order['id'], None)
+
+    def _apply_wallet(self, symbol, data):
+        self.balance = data
+
+    _snapshot_handlers = {
+        'ticker': _apply_ticker,
+        'orderbook': _apply_orderbook,
+        'position': _apply_position,
+        'order': _apply_order,
+        'wallet': _apply_wallet,
+    }
+
+    def _forward_event(self, event):
+        """Pass an event on to the exchange's shared state: account snapshot, leverage, order tracker, order books and candles."""
+        topic = event['topic']
+        data = event['data']
+
+        # Private streams also keep the shared account snapshot and leverage current between REST refreshes
+        market_metadata = getattr(self.exchange, 'market_metadata', None)
+        if market_metadata is not None and topic == 'position':
+            market_metadata.update_leverage(data)
+
+        account_state = getattr(self.exchange, 'account_state', None)
+        if account_state is not None:
+            if topic == 'position':
+                account_state.apply_position_update(data)
+            elif topic == 'order':
+                account_state.apply_order_update(data)
+            elif topic == 'wallet':
+                account_state.apply_balance_update(data)
+
+        order_tracker = getattr(self.exchange, 'order_tracker', None)
+        if order_tracker is not None:
+            order_tracker.apply_event(event)
+
+        if topic == 'orderbook':
+            self.exchange.order_book_engine.apply_snapshot(self.exchange_id, event['symbol'], data['bids'], data['asks'], timestamp=data.get('timestamp'))
+
+        if topic == 'kline':
+            timeframe = event['timeframe']
+            timeframe_ms = int(self.exchange.exchange.parse_timeframe(timeframe) * 1000)
+            self.exchange.candle_store.apply_stream_update(self.exchange_id, event['symbol'], timeframe, timeframe_ms, data)
+
+    def _snapshot_positions(self):
+        account_state = getattr(self.exchange, 'account_state', None)
+        snapshot = account_state.snapshot if account_state is not None else None
+        return snapshot.positions if snapshot is not None else ()
+
+    def _store_positions(self, positions):
+        """File ccxt positions under their symbol and side."""
+        for position in positions:
+            info = position.get('info', {})
+            position_symbol = info.get('symbol')
+            side = {'buy': 'long', 'sell': 'short'}.get(info.get('side', '').lower())
+            if position_symbol is None:
+                continue
+            if side is None:
+                # Bybit reports closed hedge-mode legs with an empty side
+                side = 'long' if info.get('positionIdx') in (1, '1') else 'short'
+            sides = dict(self.positions.get(position_symbol, {}))
+            sides[side] = info
+            self.positions[position_symbol] = sides
+
+    def _record(self, event):
+        try:
+            with self.record_lock:
+                with open(self.record_path, 'a') as f:
+                    f.write(json.dumps(dict(event, ts=time.time()), default=str) + '\n')
+        except Exception as e:
+            logging.info(f"Failed to record feed event: {e}")
+
+    # Live websocket mode
+
+    def _create_client(self):
+        params = {
+            'apiKey': self.exchange.api_key,
+            'secret': self.exchange.secret_key,
+            'enableRateLimit': True,
+            'options': {
+                'defaultType': self.exchange.market_type,
+                'adjustForTimeDifference': True,
+            },
+        }
+        return getattr(ccxtpro, self.exchange_id)(params)
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.client = self._create_client()
+            self.loop.run_until_complete(self.client.load_markets())
+            self.ready = True
+
+            for symbol in list(self.symbols):
+                self._watch_symbol(symbol)
+
+            if self.exchange.api_key:
+                self._schedule(self._watch_loop('position', None, None, self.client.watch_positions))
+                self._schedule(self._watch_loop('order', None, None, self.client.watch_orders))
+                self._schedule(self._watch_loop('execution', None, None, self.client.watch_my_trades))
+                self._schedule(self._watch_loop('wallet', None, None, self.client.watch_balance))
+
+            self.loop.run_forever()
+        except Exception as e:
+            logging.info(f"Market feed loop stopped: {e}")
+            logging.info(traceback.format_exc())
+        finally:
+            self.running = False
+            self.ready = False
+
+    def _schedule(self, coro):
+        if threading.current_thread() is self.thread:
+            return self.loop.create_task(coro)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def _watch_loop(self, topic, symbol, timeframe, method, *args):
+        while self.running and (symbol is None or symbol in self.symbols):
+            try:
+                result = await method(*args)
+                self.apply_event({'topic': topic, 'symbol': symbol, 'timeframe': timeframe, 'data': self._normalize(topic, result)})
+            except Exception as e:
+                if symbol is None:
+                    self.connected[topic] = False
+                logging.info(f"Websocket {topic} stream error for {symbol}: {e}. Reconnecting in {self.reconnect_delay} seconds...")
+                await asyncio.sleep(self.reconnect_delay)
+
+    def _normalize(self, topic, result):
+        # Copy out of ccxt.pro's mutable caches so stored snapshots never change under readers
+        if topic == 'orderbook':
+            return {
+                'bids': [list(level[:2]) for level in result['bids'][:self.orderbook_depth]],
+                'asks': [list(level[:2]) for level in result['asks'][:self.orderbook_depth]],
+                'timestamp': result.get('timestamp'),
+            }
+        if topic == 'kline':
+            return [list(row) for row in result[-2:]]
+        if topic in ('position', 'order', 'execution'):
+            return [dict(item) for item in result]
+        return dict(result)
+
+    # Replay mode
+
+    def _run_replay(self):
+        previous_ts = None
+        try:
+            with open(self.replay_path) as f:
+                for line in f:
+                    if not self.running:
+                        break
+                    line = line.strip()
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    ts = event.get('ts')
+                    if self.replay_speed and previous_ts is not None and ts is not None:
+                        time.sleep(max(0.0, (ts - previous_ts) / self.replay_speed))
+                    previous_ts = ts
+                    self.apply_event(event)
+            logging.info(f"Finished replaying {self.replay_path}")
+        except Exception as e:
+            logging.info(f"Market feed replay failed: {e}")
+            logging.info(traceback.format_exc())
@@ -0,0 +1,163 @@
+import time
+import threading
+import traceback
+
+from ..strategies.logger import Logger
+
+logging = Logger(logger_name="MarketMetadata", filename="MarketMetadata.log", stream=True)
+
+
+class MarketMetadataCache:
+    """
+    In-memory market metadata (precision, limits, leverage tiers, current leverage) per exchange account.
+
+    Markets are loaded once and reloaded in the background every ``ttl`` seconds,
+    so precision and minimum quantity lookups never touch the network on the
+    trading loop. Leverage tiers are fetched per symbol on first use and kept for
+    ``leverage_tiers_ttl`` seconds. Current leverage comes from position data
+    (account snapshots and position stream events) rather than a dedicated fetch.
+    """
+
+    def __init__(self, exchange, ttl=3600, leverage_tiers_ttl=3600):
+        self.exchange = exchange  # Our Exchange wrapper
+        self.ttl = ttl
+        self.leverage_tiers_ttl = leverage_tiers_ttl
+
+        self.loaded_at = None
+        self.leverage_tiers = {}
+        self.leverage_tiers_time = {}
+        self.leverage = {}
+
+        self.lock = threading.Lock()
+        self.tiers_lock = threading.Lock()
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="MarketMetadataCache", daemon=True)
+        self.thread.start()
+        logging.info(f"Market metadata cache started, refreshing every {self.ttl} seconds")
+
+    def stop(self):
+        self.running = False
+
+    def _run(self):
+        while self.running:
+            time.sleep(self.ttl)
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.info(f"Market metadata refresh failed: {e}")
+                logging.info(traceback.format_exc())
+
+    def refresh(self):
+        """Reload markets and any leverage tiers that have expired."""
+        self.load_markets(reload=True)
+        now = time.time()
+        for symbol, fetched_at in list(self.leverage_tiers_time.items()):
+            if now - fetched_at >= self.leverage_tiers_ttl:
+                self._fetch_leverage_tiers(symbol)
+
+    def load_markets(self, reload=False):
+        with self.lock:
+            if self.loaded_at is not None and not reload:
+                return
+            try:
+                self.exchange.exchange.load_markets(reload=reload or self.exchange.exchange.markets is None)
+                self.loaded_at = time.time()
+                logging.info(f"Loaded {len(self.exchange.exchange.markets)} markets")
+            except Exception as e:
+                # Keep serving the previous markets; ccxt leaves them in place on failure
+                logging.info(f"Error loading markets: {e}")
+
+    def _ensure_started(self):
+        if self.loaded_at is None:
+            self.load_markets()
+        if not self.running:
+            self.start()
+
+    # Markets
+
+    def market(self, symbol):
+        """Market for a unified symbol or exchange id, resolved the same way as ccxt's market()."""
+        self._ensure_started()
+        try:
+            return self.exchange.exchange.market(symbol)
+        except Exception:
+            return None
+
+    def market_by_symbol(self, symbol):
+        self._ensure_started()
+        markets = self.exchange.exchange.markets or {}
+        return markets.get(symbol)
+
+    def market_by_id(self, market_id):
+        """First market with this exchange id, in the order the exchange lists them."""
+        self._ensure_started()
+        markets_by_id = self.exchange.exchange.markets_by_id or {}
+        markets = markets_by_id.get(market_id)
+        if not markets:
+            return None
+        return markets[0] if isinstance(markets, list) else markets
+
+    # Leverage tiers
+
+    def get_leverage_tiers(self, symbol):
+        with self.tiers_lock:
+            fetched_at = self.leverage_tiers_time.get(symbol)
+            if fetched_at is not None and time.time() - fetched_at < self.leverage_tiers_ttl:
+                return self.leverage_tiers.get(symbol)
+        self._ensure_started()
+        return self._fetch_leverage_tiers(symbol)
+
+    def _fetch_leverage_tiers(self, symbol):
+        try:
+            with self.exchange.general_rate_limiter:
+                tiers = self.exchange.exchange.fetch_derivatives_market_leverage_tiers(symbol, {'category': 'linear'})
+        except Exception as e:
+            logging.info(f"Error fetching leverage tiers for {symbol}: {e}")
+            with self.tiers_lock:
+                return self.leverage_tiers.get(symbol)
+
+        with self.tiers_lock:
+            self.leverage_tiers[symbol] = tiers
+            self.leverage_tiers_time[symbol] = time.time()
+        return tiers
+
+    def get_max_leverage(self, symbol):
+        tiers = self.get_leverage_tiers(symbol)
+        if not tiers:
+            return None
+        leverages = [float(tier['maxLeverage']) for tier in tiers if tier.get('maxLeverage') is not None]
+        return max(leverages) if leverages else None
+
+    # Current leverage
+
+    def update_leverage(self, positions):
+        """Record the leverage reported by unified position dicts, keyed by unified symbol and exchange id."""
+        for position in positions:
+            leverage = position.get('leverage')
+            if leverage is None:
+                leverage = position.get('info', {}).get('leverage')
+            if leverage in (None, ''):
+                continue
+            try:
+                leverage = float(leverage)
+            except (TypeError, ValueError):
+                continue
+            for key in (position.get('symbol'), position.get('info', {}).get('symbol')):
+                if key:
+                    self.leverage[key] = leverage
+
+    def set_leverage(self, symbol, leverage):
+        self.leverage[symbol] = float(leverage)
+        market = self.market(symbol)
+        if market:
+            self.leverage[market['symbol']] = float(leverage)
+            self.leverage[market['id']] = float(leverage)
+
+    def get_leverage(self, symbol):
+        return self.leverage.get(symbol)
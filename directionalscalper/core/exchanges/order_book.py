@@ -0,0 +1,316 @@
+import time
+import threading
+
+import numpy as np
+
+from ..strategies.logger import Logger
+from ..strategies.grid_levels import volume_histograms
+
+logging = Logger(logger_name="OrderBook", filename="OrderBook.log", stream=True)
+
+_EMPTY = np.empty(0, dtype=float)
+
+
+def _merge_levels(prices, sizes, update_prices, update_sizes, descending):
+    """
+    Merge L2 updates into one side of the book.
+
+    Updates replace the size at their price (the last update wins if a price
+    repeats) and a size of zero removes the level. Returns new sorted arrays.
+    """
+    all_prices = np.concatenate([prices, update_prices])
+    all_sizes = np.concatenate([sizes, update_sizes])
+    # np.unique keeps the first occurrence, so search the reversed arrays to let updates win
+    unique_prices, index = np.unique(all_prices[::-1], return_index=True)
+    unique_sizes = all_sizes[::-1][index]
+    keep = unique_sizes > 0
+    unique_prices, unique_sizes = unique_prices[keep], unique_sizes[keep]
+    if descending:
+        return unique_prices[::-1].copy(), unique_sizes[::-1].copy()
+    return unique_prices, unique_sizes
+
+
+def _to_arrays(levels):
+    if levels is None or len(levels) == 0:
+        return _EMPTY, _EMPTY
+    array = np.asarray([level[:2] for level in levels], dtype=float)
+    return array[:, 0], array[:, 1]
+
+
+class OrderBook:
+    """
+    L2 order book for one symbol held in NumPy arrays.
+
+    Bids are sorted best (highest) first and asks best (lowest) first. The book
+    is built from a snapshot and patched with deltas; every change bumps
+    ``version`` and clears the derived views, which are computed on first read
+    and then served from cache until the book changes again. Readers outside the
+    feed should work on ``snapshot()``, which no later update can change.
+    """
+
+    def __init__(self, symbol, depth=200):
+        self.symbol = symbol
+        self.depth = depth  # Levels kept per side; deeper levels are trimmed after each update
+        self.bid_prices, self.bid_sizes = _EMPTY, _EMPTY
+        self.ask_prices, self.ask_sizes = _EMPTY, _EMPTY
+        self.version = 0
+        self.update_id = None
+        self.timestamp = None
+        self.updated_at = None
+        self.views = {}
+        self.frozen = False
+        self.frozen_copy = None  # snapshot() of the current version
+        self.lock = threading.RLock()  # Views may be built from other cached views
+
+    # Updates
+
+    def apply_snapshot(self, bids, asks, timestamp=None, update_id=None):
+        bid_prices, bid_sizes = _to_arrays(bids)
+        ask_prices, ask_sizes = _to_arrays(asks)
+        with self.lock:
+            self._check_writable()
+            self.bid_prices, self.bid_sizes = _merge_levels(_EMPTY, _EMPTY, bid_prices, bid_sizes, descending=True)
+            self.ask_prices, self.ask_sizes = _merge_levels(_EMPTY, _EMPTY, ask_prices, ask_sizes, descending=False)
+            self._changed(timestamp, update_id)
+
+    def apply_delta(self, bids, asks, timestamp=None, update_id=None):
+        """
+        Apply an incremental update. Returns False if the delta is out of sequence
+        (``update_id`` not newer than the book), in which case a new snapshot is needed.
+        """
+        bid_prices, bid_sizes = _to_arrays(bids)
+        ask_prices, ask_sizes = _to_arrays(asks)
+        with self.lock:
+            self._check_writable()
+            if update_id is not None and self.update_id is not None and update_id <= self.update_id:
+                return False
+            if len(bid_prices):
+                self.bid_prices, self.bid_sizes = _merge_levels(self.bid_prices, self.bid_sizes, bid_prices, bid_sizes, descending=True)
+            if len(ask_prices):
+                self.ask_prices, self.ask_sizes = _merge_levels(self.ask_prices, self.ask_sizes, ask_prices, ask_sizes, descending=False)
+            self._changed(timestamp, update_id)
+            return True
+
+    def _changed(self, timestamp, update_id):
+        if self.depth:
+            self.bid_prices, self.bid_sizes = self.bid_prices[:self.depth], self.bid_sizes[:self.depth]
+            self.ask_prices, self.ask_sizes = self.ask_prices[:self.depth], self.ask_sizes[:self.depth]
+        self.version += 1
+        self.update_id = update_id if update_id is not None else self.update_id
+        self.timestamp = timestamp
+        self.updated_at = time.time()
+        self.views = {}
+        self.frozen_copy = None
+
+    def _check_writable(self):
+        if self.frozen:
+            raise ValueError(f"Order book snapshot for {self.symbol} is read-only")
+
+    def snapshot(self):
+        """
+        Read-only copy of the book taken under the lock.
+
+        The arrays are shared with the live book (updates always build new arrays)
+        but flagged read-only, and the copy keeps its own view cache, so readers see
+        one consistent version however the live book moves on. One copy is made per version.
+        """
+        with self.lock:
+            if self.frozen:
+                return self
+            if self.frozen_copy is None:
+                copy = OrderBook(self.symbol, depth=self.depth)
+                for name in ('bid_prices', 'bid_sizes', 'ask_prices', 'ask_sizes'):
+                    array = getattr(self, name).view()
+                    array.flags.writeable = False
+                    setattr(copy, name, array)
+                copy.version, copy.update_id = self.version, self.update_id
+                copy.timestamp, copy.updated_at = self.timestamp, self.updated_at
+                copy.views = dict(self.views)
+                copy.frozen = True
+                self.frozen_copy = copy
+            return self.frozen_copy
+
+    def age(self):
+        return None if self.updated_at is None else time.time() - self.updated_at
+
+    def _view(self, key, compute):
+        with self.lock:
+            if key not in self.views:
+                self.views[key] = compute()
+            return self.views[key]
+
+    # Derived views
+
+    def is_valid(self):
+        return len(self.bid_prices) > 0 and len(self.ask_prices) > 0
+
+    def best_bid(self):
+        return float(self.bid_prices[0]) if len(self.bid_prices) else None
+
+    def best_ask(self):
+        return float(self.ask_prices[0]) if len(self.ask_prices) else None
+
+    def mid_price(self):
+        if not self.is_valid():
+            return None
+        return (self.best_bid() + self.best_ask()) / 2
+
+    def spread(self):
+        if not self.is_valid():
+            return None
+        return self.best_ask() - self.best_bid()
+
+    def to_dict(self, depth=None):
+        """ccxt-style ``{'bids': [[price, size], ...], 'asks': [...]}`` copy of the book."""
+        def compute():
+            return {
+                'bids': np.column_stack([self.bid_prices, self.bid_sizes]).tolist(),
+                'asks': np.column_stack([self.ask_prices, self.ask_sizes]).tolist(),
+                'timestamp': self.timestamp,
+            }
+        book = self._view('dict', compute)
+        if depth is None:
+            return {'bids': list(book['bids']), 'asks': list(book['asks']), 'timestamp': book['timestamp']}
+        return {'bids': book['bids'][:depth], 'asks': book['asks'][:depth], 'timestamp': book['timestamp']}
+
+    def levels(self, side):
+        """(prices, sizes) arrays for 'buy'/'bids' or 'sell'/'asks', best level first."""
+        if side in ('buy', 'bids', 'long'):
+            return self.bid_prices, self.bid_sizes
+        if side in ('sell', 'asks', 'short'):
+            return self.ask_prices, self.ask_sizes
+        raise ValueError(f"Invalid order book side: {side}")
+
+    def cumulative_depth(self, side):
+        """(prices, cumulative sizes) walking away from the touch on one side."""
+        with self.lock:
+            prices, sizes = self.levels(side)
+            key = ('cumulative_depth', 'bids' if prices is self.bid_prices else 'asks')
+            return prices, self._view(key, lambda: np.cumsum(sizes))
+
+    def total_volume(self, side, levels=None):
+        with self.lock:
+            prices, sizes = self.levels(side)
+            key = ('total_volume', 'bids' if prices is self.bid_prices else 'asks', levels)
+            return self._view(key, lambda: float(sizes[:levels].sum()))
+
+    def imbalance(self, levels=None):
+        """Bid share of resting volume in [-1, 1]: positive when bids outweigh asks."""
+        def compute():
+            bids = self.total_volume('bids', levels)
+            asks = self.total_volume('asks', levels)
+            total = bids + asks
+            return 0.0 if total == 0 else (bids - asks) / total
+        return self._view(('imbalance', levels), compute)
+
+    def imbalance_label(self, ratio=1.5, levels=None):
+        """'buy_wall', 'sell_wall' or 'neutral', the same classification OrderBookAnalyzer uses."""
+        bids = self.total_volume('bids', levels)
+        asks = self.total_volume('asks', levels)
+        if bids > asks * ratio:
+            return "buy_wall"
+        elif asks > bids * ratio:
+            return "sell_wall"
+        return "neutral"
+
+    def volume_histograms(self, current_price, max_outer_price_distance, bins=100):
+        """
+        Bid and ask volume binned over current_price +/- max_outer_price_distance.
+
+        :return: (min_price, max_price, price_range, volume_histogram_long, volume_histogram_short)
+        """
+        def compute():
+            return volume_histograms(self.bid_prices, self.bid_sizes, self.ask_prices, self.ask_sizes,
+                                     current_price, max_outer_price_distance, bins)
+        return self._view(('volume_histograms', float(current_price), max_outer_price_distance, bins), compute)
+
+    def walls(self, threshold=5.0, sample_size=10):
+        """
+        Levels whose size exceeds ``threshold`` times the average size of the first ``sample_size`` levels.
+
+        :return: (bid_walls, ask_walls) as lists of (price, size).
+        """
+        def compute():
+            result = []
+            for prices, sizes in ((self.bid_prices, self.bid_sizes), (self.ask_prices, self.ask_sizes)):
+                avg_size = sizes[:sample_size].sum() / sample_size
+                mask = sizes > avg_size * threshold
+                result.append(list(zip(prices[mask].tolist(), sizes[mask].tolist())))
+            return tuple(result)
+        return self._view(('walls', threshold, sample_size), compute)
+
+
+class OrderBookEngine:
+    """
+    Process-wide registry of OrderBook instances keyed by (exchange, symbol).
+
+    Books are fed by REST snapshots (Exchange.get_orderbook), by the websocket
+    market feed, or by raw Bybit v5 ``orderbook`` messages via apply_message.
+    A book newer than ``max_age`` seconds is served as-is, so the analytics
+    that run within one strategy loop share a single fetch.
+    """
+
+    def __init__(self, max_age=1.0, depth=200):
+        self.max_age = max_age
+        self.depth = depth
+        self.books = {}
+        self.shared_source = None  # SharedMarketDataReader in a sharded worker process
+        self.lock = threading.Lock()
+
+    def get_book(self, exchange_id, symbol):
+        key = (exchange_id, symbol)
+        with self.lock:
+            book = self.books.get(key)
+            if book is None:
+                book = OrderBook(symbol, depth=self.depth)
+                self.books[key] = book
+            return book
+
+    def get_fresh_book(self, exchange_id, symbol, max_age=None):
+        """The book if it is valid and was updated within max_age seconds, else None."""
+        max_age = self.max_age if max_age is None else max_age
+        if self.shared_source is not None:
+            self.shared_source.refresh_book(self, exchange_id, symbol)
+        with self.lock:
+            book = self.books.get((exchange_id, symbol))
+        if book is None or not book.is_valid():
+            return None
+        age = book.age()
+        if age is None or age > max_age:
+            return None
+        return book
+
+    def apply_snapshot(self, exchange_id, symbol, bids, asks, timestamp=None, update_id=None):
+        book = self.get_book(exchange_id, symbol)
+        book.apply_snapshot(bids, asks, timestamp=timestamp, update_id=update_id)
+        return book
+
+    def apply_message(self, exchange_id, message):
+        """
+        Apply a raw Bybit v5 ``orderbook.{depth}.{symbol}`` websocket message.
+
+        Snapshots replace the book, deltas are merged. A delta arriving out of
+        sequence invalidates the book until the next snapshot.
+        """
+        data = message.get('data', {})
+        symbol = data.get('s')
+        if symbol is None:
+            return None
+
+        book = self.get_book(exchange_id, symbol)
+        update_id = data.get('u')
+        timestamp = message.get('ts')
+
+        if message.get('type') == 'snapshot' or update_id == 1:
+            # Bybit resends a snapshot with u=1 after a service restart
+            book.apply_snapshot(data.get('b', []), data.get('a', []), timestamp=timestamp, update_id=update_id)
+        elif not book.apply_delta(data.get('b', []), data.get('a', []), timestamp=timestamp, update_id=update_id):
+            logging.info(f"Out of sequence order book delta for {symbol} (u={update_id}), waiting for a snapshot")
+            book.apply_snapshot([], [], timestamp=timestamp)
+        return book
+
+    def invalidate(self, exchange_id=None, symbol=None):
+        with self.lock:
+            for key in list(self.books.keys()):
+                if (exchange_id is None or key[0] == exchange_id) and (symbol is None or key[1] == symbol):
+                    del self.books[key]
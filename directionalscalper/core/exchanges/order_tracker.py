@@ -0,0 +1,397 @@
+import json
+import time
+import threading
+
+from rate_limit import rate_budget
+from ..strategies.logger import Logger
+
+logging = Logger(logger_name="OrderTracker", filename="OrderTracker.log", stream=True)
+
+OPEN_STATES = ('new', 'partially_filled')
+TERMINAL_STATES = ('filled', 'cancelled', 'rejected')
+
+# States only move forward; an event carrying a lower-ranked state (late or out of order) leaves the state alone
+STATE_RANK = {'new': 0, 'partially_filled': 1, 'filled': 2, 'cancelled': 2, 'rejected': 2}
+
+# Bybit v5 orderStatus values, then ccxt unified statuses
+ORDER_STATUS_MAP = {
+    'Created': 'new',
+    'New': 'new',
+    'Untriggered': 'new',
+    'Triggered': 'new',
+    'PartiallyFilled': 'partially_filled',
+    'Filled': 'filled',
+    'Cancelled': 'cancelled',
+    'PartiallyFilledCanceled': 'cancelled',
+    'Deactivated': 'cancelled',
+    'Rejected': 'rejected',
+    'open': 'new',
+    'closed': 'filled',
+    'canceled': 'cancelled',
+    'expired': 'cancelled',
+    'rejected': 'rejected',
+}
+
+
+# Bybit v5 lists open orders in cursor pages of at most 50 (20 when no limit is sent)
+OPEN_ORDERS_PAGE_SIZE = 50
+MAX_OPEN_ORDER_PAGES = 20
+
+
+def _next_cursor(page):
+    # ccxt copies the response's nextPageCursor onto the first order of the page
+    if len(page) < OPEN_ORDERS_PAGE_SIZE:
+        return None
+    return page[0].get('info', {}).get('nextPageCursor') or None
+
+
+def fetch_all_open_orders(fetch, symbol=None, max_pages=MAX_OPEN_ORDER_PAGES):
+    """
+    Every open order, following Bybit's page cursor; each page is charged to the rate budget.
+
+    :param fetch: ccxt fetch_open_orders.
+    :param symbol: Symbol to list, or None for every symbol.
+    :return: (orders, complete); complete is False if ``max_pages`` ran out before the last page.
+    """
+    orders, params = [], {}
+    for _ in range(max_pages):
+        with rate_budget.endpoint('fetch_open_orders'):
+            page = fetch(symbol, None, OPEN_ORDERS_PAGE_SIZE, params)
+        orders.extend(page)
+        cursor = _next_cursor(page)
+        if cursor is None:
+            return orders, True
+        params = {'cursor': cursor}
+    return orders, False
+
+
+async def fetch_all_open_orders_async(fetch, symbol=None, max_pages=MAX_OPEN_ORDER_PAGES):
+    """fetch_all_open_orders for a ccxt.async_support fetch_open_orders."""
+    orders, params = [], {}
+    for _ in range(max_pages):
+        await rate_budget.endpoint('fetch_open_orders').acquire_async()
+        page = await fetch(symbol, None, OPEN_ORDERS_PAGE_SIZE, params)
+        orders.extend(page)
+        cursor = _next_cursor(page)
+        if cursor is None:
+            return orders, True
+        params = {'cursor': cursor}
+    return orders, False
+
+
+def _float(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class TrackedOrder:
+    """One of our orders and where it is in its life cycle (new -> partially_filled -> filled/cancelled/rejected)."""
+
+    def __init__(self, key, order_id=None, order_link_id=None):
+        self.key = key
+        self.order_id = order_id
+        self.order_link_id = order_link_id
+        self.state = 'new'
+        self.filled = 0.0
+        self.execution_ids = set()
+        self.order = {}  # Latest ccxt-style order dict, what readers get back
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    @property
+    def is_open(self):
+        return self.state in OPEN_STATES
+
+    @property
+    def amount(self):
+        return _float(self.order.get('amount'))
+
+    def transition(self, state):
+        if state is None or state == self.state:
+            return False
+        if STATE_RANK[state] < STATE_RANK[self.state] or self.state in TERMINAL_STATES:
+            return False
+        self.state = state
+        return True
+
+    def merge(self, order):
+        """Merge newer order fields, keeping what the update does not carry (e.g. bare placement responses)."""
+        merged = dict(self.order)
+        for field, value in order.items():
+            if field == 'info':
+                merged['info'] = dict(self.order.get('info') or {}, **{k: v for k, v in (value or {}).items() if v not in (None, '')})
+            elif value is not None:
+                merged[field] = value
+        self.order = merged
+        self.updated_at = time.time()
+
+    def snapshot(self):
+        order = dict(self.order)
+        order['info'] = dict(order.get('info') or {})
+        order['status'] = 'open' if self.is_open else {'filled': 'closed', 'cancelled': 'canceled'}.get(self.state, self.state)
+        order['filled'] = self.filled
+        if self.amount:
+            order['remaining'] = max(self.amount - self.filled, 0.0)
+        return order
+
+
+class OrderTracker:
+    """
+    In-memory state of our own orders per exchange account, keyed by orderLinkId
+    (or by order ID for orders placed without one).
+
+    Fed by placement, amend and cancel responses, by private order and execution
+    stream events, and by REST open-order snapshots that heal any drift: an order
+    we still think is open but the exchange no longer lists is closed locally.
+    Once the order stream is connected and a REST snapshot fetched after it
+    (re)connected has been applied, open orders can be read from here instead
+    of polling the exchange.
+    """
+
+    def __init__(self, exchange=None, keep_closed=300):
+        self.exchange = exchange  # Our Exchange wrapper, used to resolve symbols; optional for replay
+        self.keep_closed = keep_closed  # Seconds a finished order stays queryable
+        self.orders = {}
+        self.keys_by_id = {}
+        self.reconciled_at = None
+        self.lock = threading.Lock()
+
+    # Lookup
+
+    @staticmethod
+    def _link_id(order):
+        return order.get('clientOrderId') or (order.get('info') or {}).get('orderLinkId') or None
+
+    def _get_or_create(self, order_id=None, order_link_id=None):
+        key = order_link_id or (self.keys_by_id.get(order_id) if order_id else None) or f"id:{order_id}"
+        tracked = self.orders.get(key)
+        if tracked is None and order_id and order_id in self.keys_by_id:
+            # Known by ID under a different key, e.g. placed before its orderLinkId was seen
+            tracked = self.orders.pop(self.keys_by_id[order_id])
+            tracked.key = key
+        if tracked is None:
+            tracked = TrackedOrder(key, order_id, order_link_id)
+        self.orders[key] = tracked
+        if order_id:
+            tracked.order_id = order_id
+            self.keys_by_id[order_id] = key
+        if order_link_id:
+            tracked.order_link_id = order_link_id
+        return tracked
+
+    def _find(self, order_id=None, order_link_id=None):
+        if order_link_id and order_link_id in self.orders:
+            return self.orders[order_link_id]
+        key = self.keys_by_id.get(order_id)
+        return self.orders.get(key) if key else None
+
+    # Readers
+
+    def get_order(self, order_link_id=None, order_id=None):
+        with self.lock:
+            tracked = self._find(order_id, order_link_id)
+            return tracked.snapshot() if tracked else None
+
+    def get_state(self, order_link_id=None, order_id=None):
+        with self.lock:
+            tracked = self._find(order_id, order_link_id)
+            return tracked.state if tracked else None
+
+    def get_open_orders(self, symbol=None, side=None):
+        """Open orders in the ccxt format fetch_open_orders returns, optionally for one symbol and side."""
+        with self.lock:
+            orders = [tracked.snapshot() for tracked in self.orders.values() if tracked.is_open]
+        if symbol is not None:
+            orders = [order for order in orders if order.get('symbol') == symbol or order.get('info', {}).get('symbol') == symbol]
+        if side is not None:
+            orders = [order for order in orders if (order.get('side') or '').lower() == side.lower()]
+        return orders
+
+    # Updates
+
+    def apply_order_update(self, orders):
+        """Apply ccxt order dicts from the order stream or a REST fetch."""
+        with self.lock:
+            for order in orders:
+                if not order.get('id'):
+                    continue
+                tracked = self._get_or_create(order['id'], self._link_id(order))
+                if tracked.state in TERMINAL_STATES:
+                    continue
+                tracked.merge(order)
+                status = (order.get('info') or {}).get('orderStatus') or order.get('status')
+                state = ORDER_STATUS_MAP.get(status)
+                filled = order.get('filled')
+                if filled is None:
+                    filled = (order.get('info') or {}).get('cumExecQty')
+                if filled is not None:
+                    tracked.filled = max(tracked.filled, _float(filled))
+                if state == 'new' and tracked.filled > 0:
+                    state = 'partially_filled'
+                tracked.transition(state)
+            self._prune()
+
+    def apply_execution(self, trades):
+        """Apply ccxt trade dicts from the execution stream (watch_my_trades); each fill is counted once."""
+        with self.lock:
+            for trade in trades:
+                order_id = trade.get('order')
+                if not order_id:
+                    continue
+                info = trade.get('info') or {}
+                tracked = self._get_or_create(order_id, info.get('orderLinkId') or None)
+                execution_id = trade.get('id') or info.get('execId')
+                if execution_id in tracked.execution_ids or tracked.state in TERMINAL_STATES:
+                    continue
+                tracked.execution_ids.add(execution_id)
+                tracked.filled += _float(trade.get('amount', info.get('execQty')))
+                tracked.updated_at = time.time()
+                if not tracked.order:
+                    tracked.merge({'id': order_id, 'symbol': trade.get('symbol'), 'side': trade.get('side'), 'clientOrderId': info.get('orderLinkId') or None,
+                                   'info': {'symbol': info.get('symbol'), 'orderLinkId': info.get('orderLinkId')}})
+
+                leaves_qty = info.get('leavesQty')
+                done = _float(leaves_qty, None) == 0 if leaves_qty not in (None, '') else (tracked.amount and tracked.filled >= tracked.amount)
+                tracked.transition('filled' if done else 'partially_filled')
+
+    def record_placement(self, order, symbol, side, qty, price, order_link_id=None, reduce_only=False, position_idx=None):
+        """
+        Track an order from its placement response.
+
+        Bybit v5 answers a create with little more than the order ID, so the request
+        fields are filled in to give readers the same shape as a fetched order.
+        """
+        if not isinstance(order, dict) or not order.get('id'):
+            return None
+        market = self._market(symbol)
+        request = {
+            'id': order['id'],
+            'clientOrderId': order_link_id or self._link_id(order),
+            'symbol': market['symbol'] if market else symbol,
+            'type': 'limit' if price is not None else 'market',
+            'side': side,
+            'price': _float(price) if price is not None else None,
+            'amount': _float(qty),
+            'reduceOnly': bool(reduce_only),
+            'status': 'open',
+            'info': {
+                'orderId': order['id'],
+                'orderLinkId': order_link_id or self._link_id(order) or '',
+                'symbol': market['id'] if market else symbol,
+                'side': side.capitalize(),
+                'price': str(price) if price is not None else '',
+                'qty': str(qty),
+                'reduceOnly': bool(reduce_only),
+                'positionIdx': position_idx,
+                'orderStatus': 'New',
+            },
+        }
+        with self.lock:
+            tracked = self._get_or_create(order['id'], request['clientOrderId'])
+            if tracked.state in TERMINAL_STATES:
+                return tracked.key
+            # A stream event may have beaten the response here; its fields win over the request's
+            previous = tracked.order
+            tracked.order = dict(request, **{field: value for field, value in previous.items() if field != 'info'})
+            tracked.order['info'] = dict(request['info'], **(previous.get('info') or {}))
+            tracked.updated_at = time.time()
+            return tracked.key
+
+    def record_amend(self, order_id, price=None, qty=None):
+        with self.lock:
+            tracked = self._find(order_id)
+            if tracked is None or not tracked.is_open:
+                return
+            update = {'info': {}}
+            if price is not None:
+                update['price'] = _float(price)
+                update['info']['price'] = str(price)
+            if qty is not None:
+                update['amount'] = _float(qty)
+                update['info']['qty'] = str(qty)
+            tracked.merge(update)
+
+    def record_cancel(self, order_id):
+        with self.lock:
+            tracked = self._find(order_id)
+            if tracked is not None:
+                tracked.transition('cancelled')
+                tracked.updated_at = time.time()
+
+    def reconcile(self, open_orders, symbol=None, fetched_at=None, complete=True):
+        """
+        Heal drift against a REST snapshot of open orders.
+
+        Orders in the snapshot are applied as updates. Orders we hold as open that
+        are missing from it were closed while we were not listening; they are marked
+        filled if their fills cover them, cancelled otherwise. Orders changed after
+        ``fetched_at`` (when the fetch started) are left alone, the snapshot may predate them.
+
+        :param open_orders: ccxt open orders from fetch_open_orders.
+        :param symbol: Symbol the snapshot covers, or None for a snapshot of every symbol.
+        :param fetched_at: time.time() taken just before the fetch.
+        :param complete: False if the snapshot may be missing pages; its orders are applied but nothing is healed.
+        """
+        fetched_at = fetched_at or time.time()
+        self.apply_order_update(open_orders)
+        if not complete:
+            logging.info(f"Open orders snapshot of {len(open_orders)} orders may be truncated, skipping reconciliation")
+            return
+        listed = {order['id'] for order in open_orders if order.get('id')}
+        healed = []
+        with self.lock:
+            for tracked in self.orders.values():
+                if not tracked.is_open or tracked.order_id in listed or tracked.updated_at > fetched_at:
+                    continue
+                if symbol is not None and symbol not in (tracked.order.get('symbol'), tracked.order.get('info', {}).get('symbol')):
+                    continue
+                tracked.transition('filled' if tracked.amount and tracked.filled >= tracked.amount else 'cancelled')
+                healed.append(tracked.key)
+            if symbol is None:
+                self.reconciled_at = fetched_at
+        if healed:
+            logging.info(f"Reconciliation closed {len(healed)} orders no longer open on the exchange: {healed}")
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_closed
+        for key in [key for key, tracked in self.orders.items() if not tracked.is_open and tracked.updated_at < cutoff]:
+            tracked = self.orders.pop(key)
+            if tracked.order_id and self.keys_by_id.get(tracked.order_id) == key:
+                del self.keys_by_id[tracked.order_id]
+
+    def _market(self, symbol):
+        market_metadata = getattr(self.exchange, 'market_metadata', None)
+        if market_metadata is None:
+            return None
+        try:
+            return market_metadata.market(symbol)
+        except Exception:
+            return None
+
+    # Recorded events
+
+    def apply_event(self, event):
+        """Apply a market feed event (the record_path / replay format); topics other than order and execution are ignored."""
+        if event['topic'] == 'order':
+            self.apply_order_update(event['data'])
+        elif event['topic'] == 'execution':
+            self.apply_execution(event['data'])
+
+
+def replay(path, keep_closed=float('inf')):
+    """
+    Build an OrderTracker from a market feed recording (MarketDataFeed record_path).
+
+    :param path: Recording in the JSON lines format MarketDataFeed writes.
+    :param keep_closed: Seconds finished orders are kept; by default none are pruned.
+    :return: OrderTracker holding the final state of every order in the recording.
+    """
+    tracker = OrderTracker(keep_closed=keep_closed)
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                tracker.apply_event(json.loads(line))
+    return tracker
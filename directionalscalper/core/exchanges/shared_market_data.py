@@ -0,0 +1,446 @@
+import os
+import time
+import pickle
+import hashlib
+import threading
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ..strategies.logger import Logger
+from .account_state import AccountSnapshot
+
+logging = Logger(logger_name="SharedMarketData", filename="SharedMarketData.log", stream=True)
+
+# Every block starts with [version, rows, updated_at, size] as float64. The version is
+# a seqlock: odd while the coordinator is writing, so readers retry instead of copying
+# a half written block.
+HEADER = 4
+READ_ATTEMPTS = 5
+
+
+def block_name(namespace, *key):
+    """Shared memory name for a key; hashed and short because some platforms cap names at 31 characters."""
+    digest = hashlib.md5(repr(key).encode()).hexdigest()[:16]
+    return f"{namespace}_{digest}"
+
+
+def default_namespace():
+    return f"ds{os.getpid()}"
+
+
+class SharedBlock:
+    """
+    One named shared memory block: the seqlock header followed by a payload.
+
+    The coordinator creates (and finally unlinks) the blocks; workers attach to them
+    by name. Payloads are float64 arrays (candles, order books) or raw bytes (the
+    pickled account snapshot). Writes never exceed the capacity fixed at creation.
+    """
+
+    def __init__(self, name, capacity=None, create=False):
+        self.name = name
+        self.owner = create
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=(HEADER + capacity) * 8)
+        else:
+            # Attaching registers the name again with the resource tracker worker processes
+            # share with the coordinator, which is harmless: the coordinator owns the unlink
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.header = np.ndarray((HEADER,), dtype=np.float64, buffer=self.shm.buf)
+        self.capacity = self.shm.size // 8 - HEADER
+        self.values = np.ndarray((self.capacity,), dtype=np.float64, buffer=self.shm.buf, offset=HEADER * 8)
+        self.raw = np.ndarray((self.capacity * 8,), dtype=np.uint8, buffer=self.shm.buf, offset=HEADER * 8)
+        if create:
+            self.header[:] = 0
+
+    def _begin(self):
+        self.header[0] += 1
+
+    def _end(self, rows, size, updated_at):
+        self.header[1] = rows
+        self.header[2] = time.time() if updated_at is None else updated_at
+        self.header[3] = size
+        self.header[0] += 1
+
+    def write_array(self, values, rows=0, updated_at=None):
+        values = np.asarray(values, dtype=np.float64).ravel()[-self.capacity:]
+        self._begin()
+        self.values[:len(values)] = values
+        self._end(rows, len(values), updated_at)
+
+    def write_bytes(self, data, updated_at=None):
+        if len(data) > len(self.raw):
+            return False
+        self._begin()
+        self.raw[:len(data)] = np.frombuffer(data, dtype=np.uint8)
+        self._end(0, len(data), updated_at)
+        return True
+
+    def _read(self, payload):
+        """(copy, rows, updated_at, version) of a consistent payload, or None if never written or always mid-write."""
+        for _ in range(READ_ATTEMPTS):
+            version = self.header[0]
+            if version == 0:
+                return None
+            if version % 2:
+                time.sleep(0)
+                continue
+            rows, updated_at, size = int(self.header[1]), float(self.header[2]), int(self.header[3])
+            data = payload[:size].copy()
+            if self.header[0] == version:
+                return data, rows, updated_at, int(version)
+        return None
+
+    def read_array(self):
+        return self._read(self.values)
+
+    def read_bytes(self):
+        result = self._read(self.raw)
+        if result is None:
+            return None
+        data, rows, updated_at, version = result
+        return data.tobytes(), rows, updated_at, version
+
+    def version(self):
+        return int(self.header[0])
+
+    def close(self):
+        # The numpy views pin the buffer; they must go before the mapping can close
+        self.header = self.values = self.raw = None
+        try:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+        except Exception as e:
+            logging.info(f"Error closing shared block {self.name}: {e}")
+
+
+class SharedMarketDataPublisher:
+    """
+    Coordinator side of sharded mode: copies market data into shared memory for the worker processes.
+
+    Every ``interval`` seconds the candle series, order books and account snapshot
+    of the assigned symbols are copied out of the coordinator's CandleStore,
+    OrderBookEngine and AccountStateService. Those stay fed by the coordinator's
+    single websocket feed and account refresh; series a worker asks for
+    (``request_series``) are seeded and kept current here with one REST fetch for
+    all workers. Only changed books and snapshots are rewritten.
+    """
+
+    def __init__(self, exchange, namespace=None, interval=1.0, series_refresh_interval=5.0, max_candles=5000, book_depth=50,
+                 account_capacity=8 * 1024 * 1024):
+        self.exchange = exchange  # Our Exchange wrapper owning the stores and the market feed
+        self.exchange_id = exchange.exchange.id
+        self.namespace = namespace or default_namespace()
+        self.interval = interval
+        self.series_refresh_interval = series_refresh_interval  # REST cadence for requested series; streamed ones skip REST anyway
+        self.max_candles = max_candles  # Deepest window served; generate_l_signals asks for 3000, fetch_ohlcv_data for 5000
+        self.book_depth = book_depth
+        self.account_capacity = account_capacity
+
+        self.symbols = set()
+        self.requested = {}  # (symbol, timeframe) -> deepest window asked for
+        self.refreshed_at = {}
+        self.blocks = {}
+        self.series_versions = {}
+        self.book_versions = {}
+        self.account_version = None
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        account_state = getattr(self.exchange, 'account_state', None)
+        if account_state is not None:
+            account_state.start()
+        self.thread = threading.Thread(target=self._run, name="SharedMarketDataPublisher", daemon=True)
+        self.thread.start()
+        logging.info(f"Shared market data publisher started (namespace {self.namespace})")
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval * 5)
+        with self.lock:
+            blocks = list(self.blocks.values())
+            self.blocks = {}
+        for block in blocks:
+            block.close()
+        logging.info(f"Shared market data publisher stopped, {len(blocks)} blocks released")
+
+    def add_symbol(self, symbol):
+        with self.lock:
+            self.symbols.add(symbol)
+        market_feed = getattr(self.exchange, 'market_feed', None)
+        if market_feed is not None and market_feed.enabled:
+            market_feed.subscribe(symbol)
+
+    def remove_symbol(self, symbol):
+        with self.lock:
+            self.symbols.discard(symbol)
+            for key in [key for key in self.requested if key[0] == symbol]:
+                del self.requested[key]
+                self.refreshed_at.pop(key, None)
+
+    def request_series(self, symbol, timeframe, limit):
+        """Keep symbol/timeframe published with at least ``limit`` rows (capped at max_candles)."""
+        with self.lock:
+            key = (symbol, timeframe)
+            self.requested[key] = min(max(limit, self.requested.get(key, 0)), self.max_candles)
+
+    def _block(self, key, capacity):
+        block = self.blocks.get(key)
+        if block is None:
+            name = block_name(self.namespace, *key)
+            try:
+                block = SharedBlock(name, capacity, create=True)
+            except FileExistsError:
+                # Left behind by a coordinator that died with the same pid
+                stale = SharedBlock(name)
+                stale.owner = True
+                stale.close()
+                block = SharedBlock(name, capacity, create=True)
+            self.blocks[key] = block
+        return block
+
+    def _run(self):
+        while self.running:
+            try:
+                self.publish_once()
+            except Exception as e:
+                logging.info(f"Error publishing shared market data: {e}")
+                logging.info(traceback.format_exc())
+            time.sleep(self.interval)
+
+    def publish_once(self):
+        with self.lock:
+            symbols = set(self.symbols)
+            requested = dict(self.requested)
+
+        now = time.time()
+        for key, limit in requested.items():
+            if now - self.refreshed_at.get(key, 0) < self.series_refresh_interval:
+                continue
+            symbol, timeframe = key
+            try:
+                # Seeds the series, or patches it over REST while no kline stream keeps it current
+                self.exchange.candle_store.get_ohlcv(self.exchange.exchange, symbol, timeframe, limit)
+            except Exception as e:
+                logging.info(f"Error refreshing {symbol} {timeframe} candles for the workers: {e}")
+            self.refreshed_at[key] = now
+
+        # Series a worker asked for are published even for symbols it does not trade (e.g. BTC for correlation)
+        self._publish_candles(symbols | {symbol for symbol, _ in requested})
+        for symbol in symbols:
+            self._publish_book(symbol)
+        self._publish_account()
+
+    def _publish_candles(self, symbols):
+        candle_store = self.exchange.candle_store
+        for key in list(candle_store.series.keys()):
+            exchange_id, symbol, timeframe = key
+            if exchange_id != self.exchange_id or symbol not in symbols:
+                continue
+            rows = candle_store.get_cached_ohlcv(exchange_id, symbol, timeframe, self.max_candles)
+            if not rows:
+                continue
+            updated_at = max(candle_store.last_refresh_time.get(key, 0), candle_store.stream_update_time.get(key, 0))
+            if self.series_versions.get(key) == updated_at:
+                continue
+            with self.lock:
+                block = self._block(('candles', symbol, timeframe), self.max_candles * 6)
+            block.write_array(rows, rows=len(rows), updated_at=updated_at)
+            self.series_versions[key] = updated_at
+
+    def _publish_book(self, symbol):
+        book = self.exchange.order_book_engine.get_fresh_book(self.exchange_id, symbol, max_age=float('inf'))
+        if book is None or self.book_versions.get(symbol) == (id(book), book.version):
+            return
+        depth = self.book_depth
+        with book.lock:
+            bid_prices, bid_sizes = book.bid_prices[:depth], book.bid_sizes[:depth]
+            ask_prices, ask_sizes = book.ask_prices[:depth], book.ask_sizes[:depth]
+            version, updated_at = book.version, book.updated_at
+        # Fixed layout: the two counts, then each column padded to ``depth``
+        values = np.zeros(2 + depth * 4)
+        values[0], values[1] = len(bid_prices), len(ask_prices)
+        for column, levels in enumerate((bid_prices, bid_sizes, ask_prices, ask_sizes)):
+            start = 2 + column * depth
+            values[start:start + len(levels)] = levels
+        with self.lock:
+            block = self._block(('book', symbol), 2 + depth * 4)
+        block.write_array(values, rows=len(bid_prices) + len(ask_prices), updated_at=updated_at)
+        self.book_versions[symbol] = (id(book), version)
+
+    def _publish_account(self):
+        account_state = getattr(self.exchange, 'account_state', None)
+        snapshot = account_state.snapshot if account_state is not None else None
+        if snapshot is None or snapshot.version == self.account_version:
+            return
+        data = pickle.dumps(tuple(snapshot), protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            block = self._block(('account',), self.account_capacity // 8)
+        if block.write_bytes(data, updated_at=snapshot.timestamp):
+            self.account_version = snapshot.version
+        else:
+            logging.info(f"Account snapshot of {len(data)} bytes exceeds the shared block, workers keep polling REST")
+
+    def metrics(self):
+        with self.lock:
+            return {'symbols': len(self.symbols), 'series': len(self.requested), 'blocks': len(self.blocks)}
+
+
+class SharedMarketDataReader:
+    """
+    Worker side of sharded mode: serves candles, order books and account state from the coordinator's blocks.
+
+    Attached to a worker's stores with ``attach``; the stores ask it first and fall
+    back to their own REST path whenever it returns None (block not published yet,
+    too short, or older than ``max_age``). Misses are reported through
+    ``request_series`` so the coordinator starts publishing the series. The other
+    way round, ``share_symbols_data`` sends the worker's dashboard rows to the
+    coordinator through ``report_symbols_data``, since its table only sees the
+    rows of its own process.
+    """
+
+    def __init__(self, namespace, max_age=10.0, request_series=None, retry_after=2.0, report_symbols_data=None):
+        self.namespace = namespace
+        self.max_age = max_age
+        self.request_series = request_series  # Callable (symbol, timeframe, limit), e.g. a status queue put
+        self.retry_after = retry_after
+        self.report_symbols_data = report_symbols_data  # Callable ({symbol: row}), e.g. a status queue put
+        self.reported_symbols_data = None
+        self.running = False
+
+        self.blocks = {}
+        self.missing = {}  # key -> time of the last failed attach
+        self.requested = {}
+        self.book_versions = {}
+        self.account = None  # (version, AccountSnapshot)
+        self.lock = threading.Lock()
+
+    def attach(self, exchange):
+        """Route the exchange's candle store, order book engine and account state through this reader."""
+        exchange.candle_store.shared_source = self
+        exchange.order_book_engine.shared_source = self
+        account_state = getattr(exchange, 'account_state', None)
+        if account_state is not None:
+            account_state.shared_source = self
+
+    def _block(self, key):
+        with self.lock:
+            block = self.blocks.get(key)
+            if block is not None:
+                return block
+            if time.time() - self.missing.get(key, 0) < self.retry_after:
+                return None
+            try:
+                block = SharedBlock(block_name(self.namespace, *key))
+            except FileNotFoundError:
+                self.missing[key] = time.time()
+                return None
+            self.blocks[key] = block
+            return block
+
+    def _request(self, symbol, timeframe, limit):
+        if self.request_series is None:
+            return
+        now = time.time()
+        key = (symbol, timeframe)
+        if now - self.requested.get(key, 0) < self.retry_after:
+            return
+        self.requested[key] = now
+        try:
+            self.request_series(symbol, timeframe, limit)
+        except Exception as e:
+            logging.info(f"Error requesting {symbol} {timeframe} from the coordinator: {e}")
+
+    def get_ohlcv(self, symbol, timeframe, limit):
+        """The latest ``limit`` rows in ccxt format, or None if the shared series cannot serve them."""
+        block = self._block(('candles', symbol, timeframe))
+        result = block.read_array() if block is not None else None
+        if result is None:
+            self._request(symbol, timeframe, limit)
+            return None
+        values, rows, updated_at, _ = result
+        if rows < limit or rows * 6 != len(values) or time.time() - updated_at > self.max_age:
+            self._request(symbol, timeframe, limit)
+            return None
+        table = values.reshape(rows, 6)[-limit:].tolist()
+        return [[int(row[0])] + row[1:] for row in table]
+
+    def refresh_book(self, engine, exchange_id, symbol):
+        """Copy the shared book into ``engine`` if the coordinator has published a newer one."""
+        block = self._block(('book', symbol))
+        if block is None or block.version() == self.book_versions.get(symbol):
+            return
+        result = block.read_array()
+        if result is None:
+            return
+        values, _, updated_at, version = result
+        bid_count, ask_count = int(values[0]), int(values[1])
+        depth = (len(values) - 2) // 4
+        bid_prices, bid_sizes, ask_prices, ask_sizes = values[2:].reshape(4, depth)
+        bids = np.column_stack((bid_prices[:bid_count], bid_sizes[:bid_count])).tolist()
+        asks = np.column_stack((ask_prices[:ask_count], ask_sizes[:ask_count])).tolist()
+        book = engine.apply_snapshot(exchange_id, symbol, bids, asks)
+        # Age is the coordinator's, not the time of this copy
+        book.updated_at = updated_at
+        self.book_versions[symbol] = version
+
+    def get_account_snapshot(self):
+        """The coordinator's latest AccountSnapshot, or None if none has been published."""
+        block = self._block(('account',))
+        if block is None:
+            return None
+        version = block.version()
+        cached = self.account
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        result = block.read_bytes()
+        if result is None:
+            return cached[1] if cached is not None else None
+        data, _, _, version = result
+        snapshot = AccountSnapshot(*pickle.loads(data))
+        self.account = (version, snapshot)
+        return snapshot
+
+    def share_symbols_data(self, symbols_data, interval=2.0):
+        """Report ``symbols_data`` (the worker's dashboard rows) every ``interval`` seconds while it changes."""
+        if self.report_symbols_data is None or self.running:
+            return
+        self.running = True
+
+        def run():
+            while self.running:
+                self.report_symbols_data_once(symbols_data)
+                time.sleep(interval)
+
+        threading.Thread(target=run, name="SharedSymbolsData", daemon=True).start()
+
+    def report_symbols_data_once(self, symbols_data):
+        try:
+            rows = {symbol: dict(row) for symbol, row in list(symbols_data.items())}
+        except RuntimeError:
+            # Resized by a strategy thread mid-copy; the next round picks it up
+            return
+        if rows == self.reported_symbols_data:
+            return
+        try:
+            self.report_symbols_data(rows)
+            self.reported_symbols_data = rows
+        except Exception as e:
+            logging.info(f"Error reporting dashboard rows to the coordinator: {e}")
+
+    def close(self):
+        self.running = False
+        with self.lock:
+            blocks = list(self.blocks.values())
+            self.blocks = {}
+        for block in blocks:
+            block.close()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+from urllib3.util.retry import Retry
+
+from .strategies.logger import Logger
+
+logging = Logger(logger_name="HttpClient", filename="HttpClient.log", stream=True)
+
+# (connect, read) timeouts in seconds for every request that does not pass its own
+DEFAULT_TIMEOUT = (5, 30)
+
+
+class HttpClient:
+    """
+    Process-wide pooled HTTP client for the REST helpers.
+
+    One ``requests.Session`` is shared by every thread: connections are kept alive
+    and reused, so only the first request to a host pays the TCP and TLS handshakes.
+    Each host gets a pool of at most ``pool_maxsize`` connections; threads beyond that
+    wait for a free connection instead of opening more. The adapter only retries
+    failed connects (e.g. a kept-alive connection the server already closed);
+    retrying whole requests is left to the callers' own budgets.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=20, connect_retries=2, timeout=DEFAULT_TIMEOUT):
+        self.pool_connections = pool_connections  # Number of hosts with a pool of their own
+        self.pool_maxsize = pool_maxsize
+        self.connect_retries = connect_retries
+        self.timeout = timeout
+        self.session = None
+        self.lock = threading.Lock()
+
+    def get_session(self):
+        if self.session is None:
+            with self.lock:
+                if self.session is None:
+                    self.session = self._create_session()
+        return self.session
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=True,
+            max_retries=Retry(total=self.connect_retries, connect=self.connect_retries, read=0, status=0, redirect=3, backoff_factor=0.2),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        logging.info(f"HTTP session created: {self.pool_connections} host pools of up to {self.pool_maxsize} connections")
+        return session
+
+    def request(self, method, url, params=None, headers=None, json=None, timeout=None):
+        return self.get_session().request(method, url, params=params, headers=headers, json=json, timeout=timeout or self.timeout)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def close(self):
+        with self.lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+                logging.info("HTTP session closed")
+
+
+class AsyncHttpClient:
+    """
+    Async twin of HttpClient for coroutines (e.g. the asyncio runtime).
+
+    Requests run on the default executor over the same pooled session, so they
+    share its connections and per-host limits without blocking the event loop.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    async def request(self, method, url, **kwargs):
+        return await asyncio.to_thread(self.client.request, method, url, **kwargs)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+
+http_client = HttpClient()
+async_http_client = AsyncHttpClient(http_client)
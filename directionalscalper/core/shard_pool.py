@@ -0,0 +1,263 @@
+import time
+import queue
+import threading
+import traceback
+import multiprocessing
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="ShardPool", filename="ShardPool.log", stream=True)
+
+
+class ShardTask:
+    """
+    Handle for one symbol side running in a shard worker process.
+
+    Like the async runtime's SymbolTask it stands in for the (thread, thread_completed)
+    pair of the threaded runner: ``completed`` is set once the worker reports the side
+    finished, and ``cancel`` asks the worker to stop it at its next pause.
+    """
+
+    def __init__(self, pool, shard_id, key):
+        self.pool = pool
+        self.shard_id = shard_id
+        self.key = key
+        self.completed = threading.Event()
+
+    def is_alive(self):
+        return not self.completed.is_set()
+
+    def join(self, timeout=None):
+        return self.completed.wait(timeout)
+
+    def cancel(self):
+        if self.is_alive():
+            self.pool.command_queues[self.shard_id].put(('stop', self.key))
+
+
+def _run_side(run_side, key, stop_event, kwargs):
+    try:
+        run_side(key[0], key[1], stop_event, **kwargs)
+    except Exception as e:
+        logging.info(f"Side {key} failed: {e}")
+        logging.info(traceback.format_exc())
+
+
+def shard_worker_main(shard_id, setup, setup_args, command_queue, status_queue):
+    """
+    Entry point of a shard worker process.
+
+    ``setup(shard_id, status_queue, *setup_args)`` builds the worker's exchange and
+    strategies and returns ``run_side(symbol, action, stop_event, **kwargs)``, which
+    runs one symbol side until it finishes or ``stop_event`` is set. Each side gets a
+    thread of its own; finished sides are reported as ('finished', shard_id, key).
+    The outcome of setup is reported as ('ready', shard_id) or ('setup_failed', shard_id, error).
+    """
+    try:
+        run_side = setup(shard_id, status_queue, *setup_args)
+    except Exception as e:
+        logging.info(f"Shard {shard_id} failed to start: {e}")
+        logging.info(traceback.format_exc())
+        status_queue.put(('setup_failed', shard_id, f"{type(e).__name__}: {e}"))
+        return
+    status_queue.put(('ready', shard_id))
+
+    sides = {}
+    running = True
+    while running or sides:
+        try:
+            command = command_queue.get(timeout=1)
+        except queue.Empty:
+            command = None
+
+        if command is not None:
+            if command[0] == 'start':
+                _, key, kwargs = command
+                if key not in sides:
+                    stop_event = threading.Event()
+                    thread = threading.Thread(target=_run_side, args=(run_side, key, stop_event, kwargs), name=f"{key[0]}-{key[1]}", daemon=True)
+                    sides[key] = (thread, stop_event)
+                    thread.start()
+                    logging.info(f"Shard {shard_id} started {key[0]} ({key[1]})")
+            elif command[0] == 'stop' and command[1] in sides:
+                sides[command[1]][1].set()
+            elif command[0] == 'shutdown':
+                running = False
+                for _, stop_event in sides.values():
+                    stop_event.set()
+
+        for key, (thread, _) in list(sides.items()):
+            if not thread.is_alive():
+                del sides[key]
+                status_queue.put(('finished', shard_id, key))
+
+    logging.info(f"Shard {shard_id} stopped")
+
+
+class ShardPool:
+    """
+    Runs symbol sides in ``num_shards`` worker processes instead of threads of this one.
+
+    Each worker has its own interpreter (and GIL), so indicator and signal work on
+    different shards runs in parallel. Both sides of a symbol go to the same shard,
+    new symbols to the least loaded one. Workers send requests back on the shared
+    status queue: ('finished', shard_id, key) completes a ShardTask, anything else
+    is passed to ``on_message``. A worker that dies has its sides reported finished,
+    so rotation starts them again, and is restarted after a delay that doubles with
+    each restart since it last started cleanly. A shard that still fails after
+    ``max_restarts`` restarts is given up: ``on_failed`` is told why and no more sides
+    are sent to it.
+    """
+
+    def __init__(self, num_shards, setup, setup_args=(), on_message=None, on_finished=None, on_failed=None,
+                 max_restarts=5, restart_delay=1.0, max_restart_delay=60.0):
+        self.num_shards = num_shards
+        self.setup = setup  # Module level function, so it can be pickled for spawned processes
+        self.setup_args = setup_args
+        self.on_message = on_message
+        self.on_finished = on_finished  # Callable (symbol, action) run in the coordinator once a side finished
+        self.on_failed = on_failed  # Callable (shard_id, error) run in the coordinator once a shard is given up
+        self.max_restarts = max_restarts
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.restarts = [0] * num_shards  # Restarts since the shard last reported ready
+        self.restart_at = [None] * num_shards  # monotonic time a dead shard is due to be respawned
+        self.errors = {}  # shard_id -> last setup error reported by the worker
+        self.failed = {}  # shard_id -> error of a shard that was given up
+
+        # Spawned, not forked: the coordinator runs websocket and refresh threads a fork would copy mid-flight
+        self.context = multiprocessing.get_context('spawn')
+        self.status_queue = self.context.Queue()
+        self.command_queues = []
+        self.processes = []
+        self.tasks = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        for shard_id in range(self.num_shards):
+            self.command_queues.append(self.context.Queue())
+            self.processes.append(self._spawn(shard_id))
+        self.thread = threading.Thread(target=self._listen, name="ShardPool", daemon=True)
+        self.thread.start()
+        logging.info(f"Shard pool started with {self.num_shards} worker processes")
+
+    def _spawn(self, shard_id):
+        process = self.context.Process(target=shard_worker_main, name=f"Shard-{shard_id}", daemon=True,
+                                       args=(shard_id, self.setup, self.setup_args, self.command_queues[shard_id], self.status_queue))
+        process.start()
+        return process
+
+    def stop(self, timeout=30):
+        self.running = False
+        for command_queue in self.command_queues:
+            command_queue.put(('shutdown',))
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        with self.lock:
+            tasks = list(self.tasks.values())
+            self.tasks = {}
+        for task in tasks:
+            task.completed.set()
+
+    def shard_for(self, symbol):
+        """Shard already running the symbol's other side, else the one with the fewest live sides; None if all failed."""
+        with self.lock:
+            load = [0] * self.num_shards
+            for (task_symbol, _), task in self.tasks.items():
+                if task_symbol == symbol:
+                    return task.shard_id
+                load[task.shard_id] += 1
+        available = [shard_id for shard_id in range(self.num_shards) if shard_id not in self.failed]
+        if not available:
+            return None
+        return min(available, key=lambda shard_id: load[shard_id])
+
+    def submit(self, key, **kwargs):
+        """
+        Start the side ``key`` ((symbol, action)) on a worker; keyword arguments are passed to run_side.
+
+        :return: ShardTask handle, the running one if ``key`` is already active, or None if every shard failed.
+        """
+        shard_id = self.shard_for(key[0])
+        if shard_id is None:
+            logging.error(f"No shard worker left to run {key[0]} ({key[1]})")
+            return None
+        with self.lock:
+            task = self.tasks.get(key)
+            if task is not None and task.is_alive():
+                return task
+            task = ShardTask(self, shard_id, key)
+            self.tasks[key] = task
+        self.command_queues[shard_id].put(('start', key, kwargs))
+        return task
+
+    def _finish(self, key):
+        with self.lock:
+            task = self.tasks.pop(key, None)
+        if task is None:
+            return
+        task.completed.set()
+        if self.on_finished is not None:
+            self.on_finished(*key)
+
+    def _listen(self):
+        while self.running:
+            try:
+                message = self.status_queue.get(timeout=1)
+                if message[0] == 'finished':
+                    self._finish(message[2])
+                elif message[0] == 'ready':
+                    self.restarts[message[1]] = 0
+                elif message[0] == 'setup_failed':
+                    self.errors[message[1]] = message[2]
+                elif self.on_message is not None:
+                    self.on_message(message)
+            except queue.Empty:
+                pass
+            except Exception as e:
+                logging.info(f"Error handling shard message: {e}")
+                logging.info(traceback.format_exc())
+            self._check_processes()
+
+    def _check_processes(self):
+        for shard_id, process in enumerate(self.processes):
+            if not self.running or shard_id in self.failed or process.is_alive():
+                continue
+            if self.restart_at[shard_id] is None:
+                self._on_exit(shard_id, process)
+            elif time.monotonic() >= self.restart_at[shard_id]:
+                self.restart_at[shard_id] = None
+                self.processes[shard_id] = self._spawn(shard_id)
+
+    def _on_exit(self, shard_id, process):
+        with self.lock:
+            keys = [key for key, task in self.tasks.items() if task.shard_id == shard_id]
+        for key in keys:
+            self._finish(key)
+
+        error = self.errors.pop(shard_id, None) or f"exit code {process.exitcode}"
+        self.restarts[shard_id] += 1
+        if self.restarts[shard_id] > self.max_restarts:
+            self.failed[shard_id] = error
+            logging.error(f"Shard {shard_id} failed {self.restarts[shard_id]} times in a row, giving up on it: {error}")
+            if self.on_failed is not None:
+                self.on_failed(shard_id, error)
+            return
+
+        delay = min(self.max_restart_delay, self.restart_delay * 2 ** (self.restarts[shard_id] - 1))
+        self.restart_at[shard_id] = time.monotonic() + delay
+        logging.info(f"Shard {shard_id} exited ({error}), restarting it in {delay:.1f} seconds")
+
+    def metrics(self):
+        with self.lock:
+            load = [0] * self.num_shards
+            for task in self.tasks.values():
+                load[task.shard_id] += 1
+        return {'shards': self.num_shards, 'sides': sum(load), 'load': load, 'failed': dict(self.failed)}
@@ -25,7 +25,9 @@ from threading import Thread, Lock
 
 from ..bot_metrics import BotDatabase
 
-from rate_limit import RateLimit
+from rate_limit import rate_budget
+from retry_policy import retry_policy
+from .take_profit_manager import TakeProfitManager
 
 
 logging = Logger(logger_name="BaseStrategy", filename="BaseStrategy.log", stream=True)
@@ -35,29 +37,29 @@ class OrderBookAnalyzer:
         self.exchange = exchange
         self.symbol = symbol
 
-    def get_order_book(self):
+    def get_book(self):
+        # Shared NumPy book; repeated calls within a loop reuse one snapshot
         try:
-            order_book = self.exchange.fetch_order_book(self.symbol)
-            return order_book
+            return self.exchange.get_orderbook_view(self.symbol)
         except Exception as e:
             logging.error(f"Error fetching order book for {self.symbol}: {e}")
             return None
 
+    def get_order_book(self):
+        book = self.get_book()
+        return book.to_dict() if book else None
+
     def get_best_prices(self):
-        order_book = self.get_order_book()
-        if order_book:
-            best_bid_price = order_book['bids'][0][0] if order_book['bids'] else None
-            best_ask_price = order_book['asks'][0][0] if order_book['asks'] else None
-            return best_bid_price, best_ask_price
+        book = self.get_book()
+        if book:
+            return book.best_bid(), book.best_ask()
         return None, None
 
     def calculate_average_prices(self, top_n=5):
-        order_book = self.get_order_book()
-        if order_book:
-            top_asks = order_book['asks'][:top_n]
-            top_bids = order_book['bids'][:top_n]
-            avg_top_asks = sum([ask[0] for ask in top_asks]) / len(top_asks) if top_asks else None
-            avg_top_bids = sum([bid[0] for bid in top_bids]) / len(top_bids) if top_bids else None
+        book = self.get_book()
+        if book:
+            avg_top_asks = float(book.ask_prices[:top_n].mean()) if len(book.ask_prices) else None
+            avg_top_bids = float(book.bid_prices[:top_n].mean()) if len(book.bid_prices) else None
             return avg_top_asks, avg_top_bids
         return None, None
 
@@ -85,20 +87,11 @@ class OrderBookAnalyzer:
         return walls
 
     def get_order_book_imbalance(self):
-        order_book = self.get_order_book()
-        if not order_book:
+        book = self.get_book()
+        if not book:
             return None
+        return book.imbalance_label(ratio=1.5)
 
-        total_bids = sum([bid[1] for bid in order_book['bids']])
-        total_asks = sum([ask[1] for ask in order_book['asks']])
-
-        if total_bids > total_asks * 1.5:
-            return "buy_wall"
-        elif total_asks > total_bids * 1.5:
-            return "sell_wall"
-        else:
-            return "neutral"
-        
 class BaseStrategy:
     initialized_symbols = set()
     initialized_symbols_lock = threading.Lock()
@@ -165,10 +158,13 @@ class BaseStrategy:
         self.dynamic_amount_per_symbol = {}
         self.max_trade_qty_per_symbol = {}
         self.last_auto_reduce_time = {}
-        self.rate_limiter = RateLimit(10, 1)
-        self.general_rate_limiter = RateLimit(50, 1)
-        self.order_rate_limiter = RateLimit(5, 1) 
+        # Shared process-wide buckets, see rate_limit.BYBIT_RATE_LIMITS
+        self.rate_limiter = rate_budget.limiter('position')
+        self.general_rate_limiter = rate_budget.limiter('market_data')
+        self.order_rate_limiter = rate_budget.limiter('order')
         self.last_known_mas = {}
+        self.tp_manager = TakeProfitManager(exchange)
+        self.tp_use_trading_stop = False
 
         # self.bybit = self.Bybit(self)
 
@@ -1488,23 +1484,16 @@ class BaseStrategy:
         symbols = [pos.get('symbol').split(':')[0] for pos in positions if isinstance(pos, dict) and pos.get('symbol')]
         return symbols
 
-    def retry_api_call(self, function, *args, max_retries=100, base_delay=10, max_delay=60, **kwargs):
-        retries = 0
-        while retries < max_retries:
-            try:
-                with self.rate_limiter:
-                    return function(*args, **kwargs)
-            except ccxt.RateLimitExceeded as e:
-                retries += 1
-                delay = min(base_delay * (2 ** retries) + random.uniform(0, 0.1 * (2 ** retries)), max_delay)
-                logging.info(f"Rate limit exceeded: {e}. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-            except Exception as e:
-                retries += 1
-                delay = min(base_delay * (2 ** retries) + random.uniform(0, 0.1 * (2 ** retries)), max_delay)
-                logging.info(f"Error occurred: {e}. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-        raise Exception(f"Failed to execute the API function after {max_retries} retries.")
+    def retry_api_call(self, function, *args, max_retries=None, base_delay=None, max_delay=None, deadline=None, **kwargs):
+        """
+        Call an API function under the shared retry policy (see retry_policy.RetryPolicy).
+        Each attempt draws from the rate limiter; raises RetryError once the policy gives up.
+        """
+        def attempt():
+            with self.rate_limiter:
+                return function(*args, **kwargs)
+        return retry_policy.call(attempt, endpoint=getattr(function, '__name__', None), max_attempts=max_retries,
+                                 deadline=deadline, base_delay=base_delay, max_delay=max_delay)
 
     # def retry_api_call(self, function, *args, max_retries=100, base_delay=10, max_delay=60, **kwargs):
     #     retries = 0
@@ -3160,12 +3149,12 @@ class BaseStrategy:
     def cancel_all_auto_reduce_orders_bybit(self, symbol: str) -> None:
         try:
             if symbol in self.auto_reduce_orders:
-                for order_id in self.auto_reduce_orders[symbol]:
-                    try:
-                        self.exchange.cancel_order(order_id, symbol)
-                        logging.info(f"Cancelling auto-reduce order: {order_id}")
-                    except Exception as e:
-                        logging.warning(f"An error occurred while cancelling auto-reduce order {order_id}: {e}")
+                results = self.exchange.cancel_orders_by_id_bybit(symbol, self.auto_reduce_orders[symbol])
+                for result in results:
+                    if result['status'] == 'canceled':
+                        logging.info(f"Cancelling auto-reduce order: {result['id']}")
+                    else:
+                        logging.warning(f"An error occurred while cancelling auto-reduce order {result['id']}: {result['error']}")
                 self.auto_reduce_orders[symbol].clear()  # Clear the list after cancellation
             else:
                 logging.info(f"No auto-reduce orders found for {symbol}")
@@ -5300,11 +5289,8 @@ class BaseStrategy:
             return last_tp_update
 
     def update_take_profit_spread_bybit(self, symbol, pos_qty, short_take_profit, long_take_profit, short_pos_price, long_pos_price, positionIdx, order_side, next_tp_update, five_minute_distance, previous_five_minute_distance, tp_order_counts, max_retries=10):
-        # Fetch the current open TP orders and TP order counts for the symbol
-        long_tp_orders, short_tp_orders = self.exchange.get_open_tp_orders(symbol)
-        #tp_order_counts = self.exchange.get_open_tp_order_count(symbol)
-        long_tp_count = tp_order_counts['long_tp_count']
-        short_tp_count = tp_order_counts['short_tp_count']
+        # Fetch the current open TP orders for the symbol
+        long_tp_orders, short_tp_orders = self.exchange.get_open_tp_orders(self.exchange.get_open_orders(symbol))
 
         # Calculate the TP values based on the current spread
         new_short_tp, new_long_tp = self.calculate_take_profits_based_on_spread(short_pos_price, long_pos_price, symbol, five_minute_distance, previous_five_minute_distance, short_take_profit, long_take_profit)
@@ -5315,30 +5301,13 @@ class BaseStrategy:
         # Check if there's an existing TP order with a mismatched quantity
         mismatched_qty_orders = [order for order in relevant_tp_orders if order['qty'] != pos_qty]
 
-        # Cancel mismatched TP orders if any
-        for order in mismatched_qty_orders:
-            try:
-                self.exchange.cancel_order_by_id(order['id'], symbol)
-                logging.info(f"Cancelled TP order {order['id']} for update.")
-                time.sleep(0.05)
-            except Exception as e:
-                logging.info(f"Error in cancelling {order_side} TP order {order['id']}. Error: {e}")
-
         now = datetime.now()
         if now >= next_tp_update or mismatched_qty_orders:
-            # Check if a TP order already exists
-            tp_order_exists = (order_side == "sell" and long_tp_count > 0) or (order_side == "buy" and short_tp_count > 0)
-
-            # Set new TP order with updated prices only if no TP order exists
-            if not tp_order_exists:
-                new_tp_price = new_long_tp if order_side == "sell" else new_short_tp
-                try:
-                    self.exchange.create_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, new_tp_price, positionIdx=positionIdx, reduce_only=True)
-                    logging.info(f"New {order_side.capitalize()} TP set at {new_tp_price}")
-                except Exception as e:
-                    logging.info(f"Failed to set new {order_side} TP for {symbol}. Error: {e}")
-            else:
-                logging.info(f"Skipping TP update as a TP order already exists for {symbol}")
+            new_tp_price = new_long_tp if order_side == "sell" else new_short_tp
+            if new_tp_price is None:
+                logging.info(f"No TP price for {symbol} {order_side}, skipping TP update")
+                return next_tp_update
+            self.sync_take_profit(symbol, pos_qty, new_tp_price, positionIdx, order_side, relevant_tp_orders)
 
             # Calculate and return the next update time
             return self.calculate_next_update_time()
@@ -5346,6 +5315,22 @@ class BaseStrategy:
             logging.info(f"Waiting for the next update time for TP orders.")
             return next_tp_update
 
+    def sync_take_profit(self, symbol, pos_qty, tp_price, positionIdx, order_side, tp_orders, post_only=True):
+        """
+        Move the TP for a position to tp_price / pos_qty, amending the live TP order where possible.
+
+        Auto-reduce orders are reduce-only too, so they are excluded from the TP orders.
+        """
+        try:
+            return self.tp_manager.sync(
+                symbol, order_side, pos_qty, tp_price, positionIdx, tp_orders,
+                post_only=post_only,
+                exclude_ids=self.auto_reduce_order_ids.get(symbol, []),
+                trading_stop=self.tp_use_trading_stop
+            )
+        except Exception as e:
+            logging.info(f"Failed to update {order_side} TP for {symbol}. Error: {e}")
+
     def is_hedge_order(self, symbol, order_side):
         hedge_info = self.hedged_positions.get(symbol)
         return hedge_info and hedge_info['type'] == order_side
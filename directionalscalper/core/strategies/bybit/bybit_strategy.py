@@ -28,8 +28,13 @@ from ...bot_metrics import BotDatabase
 
 from directionalscalper.core.config_initializer import ConfigInitializer
 from directionalscalper.core.strategies.base_strategy import BaseStrategy
+from directionalscalper.core.strategies.grid_levels import volume_histograms_from_order_book, snap_to_significant_levels
+from directionalscalper.core.strategies.grid_levels import significant_levels as find_significant_levels
+from directionalscalper.core.strategies.grid_reconciler import plan_grid_orders, order_price, order_qty
+from directionalscalper.core.strategies.stop_loss_executor import StopLossExecutor
 
-from rate_limit import RateLimit
+from rate_limit import rate_budget
+from retry_policy import retry_policy
 
 logging = Logger(logger_name="BybitBaseStrategy", filename="BybitBaseStrategy.log", stream=True)
 
@@ -37,8 +42,8 @@ class BybitStrategy(BaseStrategy):
     def __init__(self, exchange, config, manager, symbols_allowed=None):
         super().__init__(exchange, config, manager, symbols_allowed)
         self.exchange = exchange
-        self.general_rate_limiter = RateLimit(50, 1)
-        self.order_rate_limiter = RateLimit(5, 1) 
+        self.general_rate_limiter = rate_budget.limiter('market_data')
+        self.order_rate_limiter = rate_budget.limiter('order')
         self.previous_long_pos_qty = {}
         self.previous_short_pos_qty = {}
         self.symbol_max_leverage = {}
@@ -72,6 +77,10 @@ class BybitStrategy(BaseStrategy):
         self.last_reissue_price_long = {}
         self.last_reissue_price_short = {}
         self.placed_levels = {}
+        self.grid_price_tolerance = 0.001  # Live grid orders within 0.1% of a desired level are left in place
+        self.grid_qty_tolerance = 0.001  # Quantity differences below 0.1% are not worth an amend
+        self.stop_loss_executor = StopLossExecutor(exchange, self.get_position_qty)
+        self.stop_loss_native = False
         self.last_processed_signal = {}
         self.last_processed_time_long = {}  # Dictionary to store the last processed time for long positions
         self.last_processed_time_short = {}
@@ -154,19 +163,13 @@ class BybitStrategy(BaseStrategy):
             return self.exchange.generate_l_signals(symbol)
         
     def get_market_data_with_retry(self, symbol, max_retries=5, retry_delay=5):
-        for i in range(max_retries):
-            try:
-                with self.general_rate_limiter:
-                    return self.exchange.get_market_data_bybit(symbol)
-            except Exception as e:
-                if i < max_retries - 1:
-                    logging.info(f"Error occurred while fetching market data: {e}. Retrying in {retry_delay} seconds...")
-                    logging.info(f"Call Stack: {traceback.format_exc()}")
-                    time.sleep(retry_delay)
-                else:
-                    #logging.info("Excessive call stack:\n" + "".join(traceback.format_stack()))
-                    logging.info(f"get_market_data_with_retry failure from bybit_strategy.py")
-                    raise e
+        try:
+            # Served from the exchange's market metadata cache, so no rate limit token is needed.
+            # The retry policy's deadline bounds the wait however large max_retries is.
+            return retry_policy.call(self.exchange.get_market_data_bybit, (symbol,), max_attempts=max_retries, base_delay=retry_delay)
+        except Exception as e:
+            logging.info(f"get_market_data_with_retry failure from bybit_strategy.py: {e}")
+            raise e
    
     # def get_market_data_with_retry(self, symbol, max_retries=5, initial_retry_delay=5):
     #     retry_delay = initial_retry_delay
@@ -591,10 +594,8 @@ class BybitStrategy(BaseStrategy):
             logging.info(f"An error occurred while canceling entry orders: {e}")
 
     def update_quickscalp_tp_dynamic(self, symbol, pos_qty, upnl_profit_pct, max_upnl_profit_pct, short_pos_price, long_pos_price, positionIdx, order_side, last_tp_update, tp_order_counts, open_orders):
-        # Fetch the current open TP orders and TP order counts for the symbol
+        # Fetch the current open TP orders for the symbol
         long_tp_orders, short_tp_orders = self.retry_api_call(self.exchange.get_open_tp_orders, open_orders)
-        long_tp_count = tp_order_counts['long_tp_count']
-        short_tp_count = tp_order_counts['short_tp_count']
 
         # Determine the minimum notional value for dynamic scaling
         min_notional_value = self.min_notional(symbol)
@@ -622,54 +623,31 @@ class BybitStrategy(BaseStrategy):
         # Check if there's an existing TP order with a mismatched quantity
         mismatched_qty_orders = [order for order in relevant_tp_orders if order['qty'] != pos_qty and order['id'] not in self.auto_reduce_order_ids.get(symbol, [])]
 
-        # Cancel mismatched TP orders if any
-        for order in mismatched_qty_orders:
-            try:
-                self.exchange.cancel_order_by_id(order['id'], symbol)
-                logging.info(f"Cancelled TP order {order['id']} for update.")
-            except Exception as e:
-                logging.info(f"Error in cancelling {order_side} TP order {order['id']}. Error: {e}")
-
         # Using datetime.now() for checking if update is needed
         now = datetime.now()
         if now >= last_tp_update or mismatched_qty_orders:
-            # Check if a TP order already exists
-            tp_order_exists = (order_side == "sell" and long_tp_count > 0) or (order_side == "buy" and short_tp_count > 0)
-
-            # Set new TP order with updated prices only if no TP order exists
-            if not tp_order_exists:
-                new_tp_price_min = new_long_tp_min if order_side == "sell" else new_short_tp_min
-                logging.info(f"New tp price min: {new_tp_price_min} with order side as {order_side}")
-                new_tp_price_max = new_long_tp_max if order_side == "sell" else new_short_tp_max
-                current_price = self.exchange.get_current_price(symbol)
-                order_book = self.exchange.get_orderbook(symbol)
-                best_ask_price = order_book['asks'][0][0] if 'asks' in order_book else self.last_known_ask.get(symbol)
-                best_bid_price = order_book['bids'][0][0] if 'bids' in order_book else self.last_known_bid.get(symbol)
+            new_tp_price_min = new_long_tp_min if order_side == "sell" else new_short_tp_min
+            logging.info(f"New tp price min: {new_tp_price_min} with order side as {order_side}")
+            new_tp_price_max = new_long_tp_max if order_side == "sell" else new_short_tp_max
+            if new_tp_price_min is None or new_tp_price_max is None:
+                logging.info(f"No TP price for {symbol} {order_side}, skipping TP update")
+                return last_tp_update
+            current_price = self.exchange.get_current_price(symbol)
 
-                # Ensure TP setting checks are correct for direction
-                if (order_side == "sell" and current_price >= new_tp_price_min) or (order_side == "buy" and current_price <= new_tp_price_max):
-                    # Check if current price has already surpassed the max TP price
-                    if (order_side == "sell" and current_price > new_tp_price_max) or (order_side == "buy" and current_price < new_tp_price_min):
-                        try:
-                            tp_price = best_ask_price if order_side == "sell" else best_bid_price
-                            self.exchange.create_normal_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, tp_price, positionIdx=positionIdx, reduce_only=True)
-                            logging.info(f"New {order_side.capitalize()} TP set at current/best price {tp_price} as current price has surpassed the max TP")
-                        except Exception as e:
-                            logging.info(f"Failed to set new {order_side} TP for {symbol} at current/best price. Error: {e}")
-                    else:
-                        try:
-                            self.exchange.create_normal_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, new_tp_price_min, positionIdx=positionIdx, reduce_only=True)
-                            logging.info(f"New {order_side.capitalize()} TP set at {new_tp_price_min} using a normal limit order")
-                        except Exception as e:
-                            logging.info(f"Failed to set new {order_side} TP for {symbol} using a normal limit order. Error: {e}")
+            # Ensure TP setting checks are correct for direction
+            if (order_side == "sell" and current_price >= new_tp_price_min) or (order_side == "buy" and current_price <= new_tp_price_max):
+                # Check if current price has already surpassed the max TP price
+                if (order_side == "sell" and current_price > new_tp_price_max) or (order_side == "buy" and current_price < new_tp_price_min):
+                    order_book = self.exchange.get_orderbook(symbol)
+                    best_ask_price = order_book['asks'][0][0] if 'asks' in order_book else self.last_known_ask.get(symbol)
+                    best_bid_price = order_book['bids'][0][0] if 'bids' in order_book else self.last_known_bid.get(symbol)
+                    tp_price = best_ask_price if order_side == "sell" else best_bid_price
+                    logging.info(f"{order_side.capitalize()} TP for {symbol} at current/best price {tp_price} as current price has surpassed the max TP")
+                    self.sync_take_profit(symbol, pos_qty, tp_price, positionIdx, order_side, relevant_tp_orders, post_only=False)
                 else:
-                    try:
-                        self.exchange.create_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, new_tp_price_max, positionIdx=positionIdx, reduce_only=True)
-                        logging.info(f"New {order_side.capitalize()} TP set at {new_tp_price_max} using a post-only order")
-                    except Exception as e:
-                        logging.info(f"Failed to set new {order_side} TP for {symbol} using a post-only order. Error: {e}")
+                    self.sync_take_profit(symbol, pos_qty, new_tp_price_min, positionIdx, order_side, relevant_tp_orders, post_only=False)
             else:
-                logging.info(f"Skipping TP update as a TP order already exists for {symbol}")
+                self.sync_take_profit(symbol, pos_qty, new_tp_price_max, positionIdx, order_side, relevant_tp_orders, post_only=True)
 
             # Calculate and return the next update time
             return self.calculate_next_update_time()
@@ -678,10 +656,8 @@ class BybitStrategy(BaseStrategy):
             return last_tp_update
         
     def update_quickscalp_tp(self, symbol, pos_qty, upnl_profit_pct, short_pos_price, long_pos_price, positionIdx, order_side, last_tp_update, tp_order_counts, open_orders, max_retries=10):
-        # Fetch the current open TP orders and TP order counts for the symbol
+        # Fetch the current open TP orders for the symbol
         long_tp_orders, short_tp_orders = self.exchange.get_open_tp_orders(open_orders)
-        long_tp_count = tp_order_counts['long_tp_count']
-        short_tp_count = tp_order_counts['short_tp_count']
 
         # Calculate the new TP values using quickscalp method
         new_short_tp = self.calculate_quickscalp_short_take_profit(short_pos_price, symbol, upnl_profit_pct)
@@ -693,40 +669,17 @@ class BybitStrategy(BaseStrategy):
         # Check if there's an existing TP order with a mismatched quantity
         mismatched_qty_orders = [order for order in relevant_tp_orders if order['qty'] != pos_qty and order['id'] not in self.auto_reduce_order_ids.get(symbol, [])]
 
-        # Cancel mismatched TP orders if any
-        for order in mismatched_qty_orders:
-            try:
-                self.exchange.cancel_order_by_id(order['id'], symbol)
-                logging.info(f"Cancelled TP order {order['id']} for update.")
-            except Exception as e:
-                logging.info(f"Error in cancelling {order_side} TP order {order['id']}. Error: {e}")
-
         now = datetime.now()
         if now >= last_tp_update or mismatched_qty_orders:
-            # Check if a TP order already exists
-            tp_order_exists = (order_side == "sell" and long_tp_count > 0) or (order_side == "buy" and short_tp_count > 0)
-
-            # Set new TP order with updated prices only if no TP order exists
-            if not tp_order_exists:
-                new_tp_price = new_long_tp if order_side == "sell" else new_short_tp
-                current_price = self.exchange.get_current_price(symbol)
+            new_tp_price = new_long_tp if order_side == "sell" else new_short_tp
+            if new_tp_price is None:
+                logging.info(f"No TP price for {symbol} {order_side}, skipping TP update")
+                return last_tp_update
+            current_price = self.exchange.get_current_price(symbol)
 
-                if (order_side == "sell" and current_price >= new_tp_price) or (order_side == "buy" and current_price <= new_tp_price):
-                    # If the current price has surpassed the new TP price, use a normal limit order
-                    try:
-                        self.exchange.create_normal_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, new_tp_price, positionIdx=positionIdx, reduce_only=True)
-                        logging.info(f"New {order_side.capitalize()} TP set at {new_tp_price} using a normal limit order")
-                    except Exception as e:
-                        logging.info(f"Failed to set new {order_side} TP for {symbol} using a normal limit order. Error: {e}")
-                else:
-                    # If the current price hasn't surpassed the new TP price, use a post-only order
-                    try:
-                        self.exchange.create_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, new_tp_price, positionIdx=positionIdx, reduce_only=True)
-                        logging.info(f"New {order_side.capitalize()} TP set at {new_tp_price} using a post-only order")
-                    except Exception as e:
-                        logging.info(f"Failed to set new {order_side} TP for {symbol} using a post-only order. Error: {e}")
-            else:
-                logging.info(f"Skipping TP update as a TP order already exists for {symbol}")
+            # If the current price has surpassed the new TP price, use a normal limit order, otherwise a post-only order
+            post_only = not ((order_side == "sell" and current_price >= new_tp_price) or (order_side == "buy" and current_price <= new_tp_price))
+            self.sync_take_profit(symbol, pos_qty, new_tp_price, positionIdx, order_side, relevant_tp_orders, post_only=post_only)
 
             # Calculate and return the next update time
             return self.calculate_next_update_time()
@@ -907,15 +860,12 @@ class BybitStrategy(BaseStrategy):
         logging.info(f"Final rounded short TP for {symbol}: {rounded_tp}")
         return rounded_tp
     def detect_order_book_walls(self, symbol, threshold=5.0):
-        order_book = self.exchange.get_orderbook(symbol)
-        bids = order_book['bids']
-        asks = order_book['asks']
-
-        avg_bid_size = sum([bid[1] for bid in bids[:10]]) / 10
-        bid_walls = [(price, size) for price, size in bids if size > avg_bid_size * threshold]
+        book = self.exchange.get_orderbook_view(symbol)
+        if book is None:
+            return [], []
 
-        avg_ask_size = sum([ask[1] for ask in asks[:10]]) / 10
-        ask_walls = [(price, size) for price, size in asks if size > avg_ask_size * threshold]
+        # Cached on the book until it changes
+        bid_walls, ask_walls = book.walls(threshold=threshold, sample_size=10)
 
         if bid_walls:
             logging.info(f"Detected buy walls at {bid_walls} for {symbol}")
@@ -1400,11 +1350,8 @@ class BybitStrategy(BaseStrategy):
             logging.info(f"Error in updating take profit: {e}")
 
     def update_dynamic_quickscalp_tp(self, symbol, best_ask_price, best_bid_price, pos_qty, upnl_profit_pct, short_pos_price, long_pos_price, positionIdx, order_side, last_tp_update, tp_order_counts, max_retries=10):
-        # Fetch the current open TP orders and TP order counts for the symbol
-        long_tp_orders, short_tp_orders = self.exchange.get_open_tp_orders(symbol)
-
-        long_tp_count = tp_order_counts['long_tp_count']
-        short_tp_count = tp_order_counts['short_tp_count']
+        # Fetch the current open TP orders for the symbol
+        long_tp_orders, short_tp_orders = self.exchange.get_open_tp_orders(self.exchange.get_open_orders(symbol))
 
         # Calculate the new TP values using quickscalp method w/ dynamic
         new_short_tp = self.calculate_dynamic_short_take_profit(
@@ -1427,30 +1374,13 @@ class BybitStrategy(BaseStrategy):
         # Check if there's an existing TP order with a mismatched quantity
         mismatched_qty_orders = [order for order in relevant_tp_orders if order['qty'] != pos_qty]
 
-        # Cancel mismatched TP orders if any
-        for order in mismatched_qty_orders:
-            try:
-                self.exchange.cancel_order_by_id(order['id'], symbol)
-                logging.info(f"Cancelled TP order {order['id']} for update.")
-                time.sleep(0.05)
-            except Exception as e:
-                logging.info(f"Error in cancelling {order_side} TP order {order['id']}. Error: {e}")
-
         now = datetime.now()
         if now >= last_tp_update or mismatched_qty_orders:
-            # Check if a TP order already exists
-            tp_order_exists = (order_side == "sell" and long_tp_count > 0) or (order_side == "buy" and short_tp_count > 0)
-
-            # Set new TP order with updated prices only if no TP order exists
-            if not tp_order_exists:
-                new_tp_price = new_long_tp if order_side == "sell" else new_short_tp
-                try:
-                    self.exchange.create_take_profit_order_bybit(symbol, "limit", order_side, pos_qty, new_tp_price, positionIdx=positionIdx, reduce_only=True)
-                    logging.info(f"New {order_side.capitalize()} TP set at {new_tp_price}")
-                except Exception as e:
-                    logging.info(f"Failed to set new {order_side} TP for {symbol}. Error: {e}")
-            else:
-                logging.info(f"Skipping TP update as a TP order already exists for {symbol}")
+            new_tp_price = new_long_tp if order_side == "sell" else new_short_tp
+            if new_tp_price is None:
+                logging.info(f"No TP price for {symbol} {order_side}, skipping TP update")
+                return last_tp_update
+            self.sync_take_profit(symbol, pos_qty, new_tp_price, positionIdx, order_side, relevant_tp_orders)
 
             # Calculate and return the next update time
             return self.calculate_next_update_time()
@@ -2885,9 +2815,8 @@ class BybitStrategy(BaseStrategy):
         :param limit: The number of data points to fetch
         :return: The ATRP value as a percentage of the current price
         """
-        # Fetch OHLCV data
-        ohlcv_data = self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=limit)
-        df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
+        # Fetch OHLCV data (served from the shared candle store)
+        df = self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=limit)
         
         # Calculate the True Range (TR)
         df['high_low'] = df['high'] - df['low']
@@ -3099,8 +3028,8 @@ class BybitStrategy(BaseStrategy):
         :param strength: Strength factor for grid level spacing
         :return: A list of grid levels
         """
-        # Fetch the order book data
-        order_book = self.exchange.get_orderbook(symbol)
+        # Shared order book; reuses this loop's snapshot if another analysis already fetched it
+        book = self.exchange.get_orderbook_view(symbol)
 
         # Calculate dynamic outer price distance using ATR
         atrp_timeframe = "1m"
@@ -3108,12 +3037,7 @@ class BybitStrategy(BaseStrategy):
         atrp = self.get_atrp(symbol, timeframe=atrp_timeframe, period=atrp_period)
         dynamic_distance = self.calculate_dynamic_outer_price_distance_atr(atrp, min_outer_price_distance, max_outer_price_distance)
 
-        if side == 'buy':
-            price_points = [order[0] for order in order_book['bids'][:levels]]
-        elif side == 'sell':
-            price_points = [order[0] for order in order_book['asks'][:levels]]
-
-        if not price_points:
+        if book is None or not len(book.levels(side)[0]):
             raise ValueError(f"No {side} orders available in the order book for {symbol}")
 
         # Calculate the price range for the grid levels
@@ -3136,14 +3060,8 @@ class BybitStrategy(BaseStrategy):
         logging.info(f"Initial grid levels ({side}): {initial_grid_levels}")
 
         # Adjust grid levels to fit within the actual order book volume levels
-        if side == 'buy':
-            total_volume = sum(float(bid[1]) for bid in order_book['bids'])
-            cumulative_volumes = np.cumsum([float(bid[1]) for bid in order_book['bids']])
-            price_levels = [float(bid[0]) for bid in order_book['bids']]
-        elif side == 'sell':
-            total_volume = sum(float(ask[1]) for ask in order_book['asks'])
-            cumulative_volumes = np.cumsum([float(ask[1]) for ask in order_book['asks']])
-            price_levels = [float(ask[0]) for ask in order_book['asks']]
+        price_levels, cumulative_volumes = book.cumulative_depth(side)
+        total_volume = book.total_volume(side)
 
         adjusted_grid_levels = []
         target_volumes = np.linspace(0, total_volume, levels) ** strength
@@ -3847,67 +3765,33 @@ class BybitStrategy(BaseStrategy):
             best_bid_price = order_book['bids'][0][0] if 'bids' in order_book else self.last_known_bid.get(symbol, current_price)
 
             # Analyze orderbook depth and identify significant price levels
-            min_price = current_price - max_outer_price_distance * current_price
-            max_price = current_price + max_outer_price_distance * current_price
-
-            # Create a histogram of orderbook volume within the price range
-            price_range = np.arange(min_price, max_price, (max_price - min_price) / 100)
-            volume_histogram_long = np.zeros_like(price_range)
-            volume_histogram_short = np.zeros_like(price_range)
-
-            for order in order_book['bids']:
-                price, volume = order[0], order[1]
-                if min_price <= price <= current_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_long[index] += volume
+            min_price, max_price, price_range, volume_histogram_long, volume_histogram_short = volume_histograms_from_order_book(order_book, current_price, max_outer_price_distance)
 
-            for order in order_book['asks']:
-                price, volume = order[0], order[1]
-                if current_price <= price <= max_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_short[index] += volume
-
-            # Identify significant price levels based on volume histogram
-            volume_threshold_long = np.mean(volume_histogram_long) * 1.5  # Adjust the threshold as needed
-            significant_levels_long = price_range[volume_histogram_long >= volume_threshold_long]
-
-            volume_threshold_short = np.mean(volume_histogram_short) * 1.5  # Adjust the threshold as needed
-            significant_levels_short = price_range[volume_histogram_short >= volume_threshold_short]
+            volume_threshold_long, significant_levels_long = find_significant_levels(volume_histogram_long, price_range)
+            volume_threshold_short, significant_levels_short = find_significant_levels(volume_histogram_short, price_range)
 
             # Calculate grid levels based on dynamic_outer_price_distance
             grid_levels_long = [current_price - i * dynamic_outer_price_distance * current_price for i in range(1, levels + 1)]
             grid_levels_short = [current_price + i * dynamic_outer_price_distance * current_price for i in range(1, levels + 1)]
 
-            # Function to find the nearest significant level
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            return sig_level
-                return level
-
             # Adjust grid levels to align with significant levels
             tolerance = 0.01  # 1% tolerance, adjust as needed
-            grid_levels_long = [
-                find_nearest_significant_level(
-                    level,
-                    significant_levels_long,
-                    tolerance,
-                    buffer_distance_long / current_price,
-                    min_outer_price_distance,
-                    current_price
-                ) for level in grid_levels_long
-            ]
-            grid_levels_short = [
-                find_nearest_significant_level(
-                    level,
-                    significant_levels_short,
-                    tolerance,
-                    buffer_distance_short / current_price,
-                    min_outer_price_distance,
-                    current_price
-                ) for level in grid_levels_short
-            ]
+            grid_levels_long = snap_to_significant_levels(
+                grid_levels_long,
+                significant_levels_long,
+                tolerance,
+                buffer_distance_long / current_price,
+                min_outer_price_distance,
+                current_price
+            )
+            grid_levels_short = snap_to_significant_levels(
+                grid_levels_short,
+                significant_levels_short,
+                tolerance,
+                buffer_distance_short / current_price,
+                min_outer_price_distance,
+                current_price
+            )
 
             # Ensure the grid levels are within the buffer distances and respect min/max outer price distance
             grid_levels_long = [
@@ -4642,30 +4526,11 @@ class BybitStrategy(BaseStrategy):
             best_ask_price = order_book['asks'][0][0] if 'asks' in order_book else self.last_known_ask.get(symbol, current_price)
             best_bid_price = order_book['bids'][0][0] if 'bids' in order_book else self.last_known_bid.get(symbol, current_price)
 
-            min_price = current_price - max_outer_price_distance * current_price
-            max_price = current_price + max_outer_price_distance * current_price
+            # Histogram of orderbook volume within the price range and its significant levels
+            min_price, max_price, price_range, volume_histogram_long, volume_histogram_short = volume_histograms_from_order_book(order_book, current_price, max_outer_price_distance)
 
-            price_range = np.arange(min_price, max_price, (max_price - min_price) / 100)
-            volume_histogram_long = np.zeros_like(price_range)
-            volume_histogram_short = np.zeros_like(price_range)
-
-            for order in order_book['bids']:
-                price, volume = order[0], order[1]
-                if min_price <= price <= current_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_long[index] += volume
-
-            for order in order_book['asks']:
-                price, volume = order[0], order[1]
-                if current_price <= price <= max_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_short[index] += volume
-
-            volume_threshold_long = np.mean(volume_histogram_long) * 1.5
-            significant_levels_long = price_range[volume_histogram_long >= volume_threshold_long]
-
-            volume_threshold_short = np.mean(volume_histogram_short) * 1.5
-            significant_levels_short = price_range[volume_histogram_short >= volume_threshold_short]
+            volume_threshold_long, significant_levels_long = find_significant_levels(volume_histogram_long, price_range)
+            volume_threshold_short, significant_levels_short = find_significant_levels(volume_histogram_short, price_range)
 
             initial_entry_long = current_price - buffer_distance_long
             initial_entry_short = current_price + buffer_distance_short
@@ -4692,45 +4557,29 @@ class BybitStrategy(BaseStrategy):
                     for i in range(levels)
                 ]
 
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
-                                return sig_level
-                return level
-
             tolerance = 0.01
-            adjusted_grid_levels_long = []
-            adjusted_grid_levels_short = []
-
-            for i, level in enumerate(grid_levels_long):
-                previous_level = adjusted_grid_levels_long[-1] if adjusted_grid_levels_long else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_long,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price - max_outer_price_distance * current_price <= adjusted_level <= current_price - buffer_distance_long:
-                    adjusted_grid_levels_long.append(adjusted_level)
-
-            for i, level in enumerate(grid_levels_short):
-                previous_level = adjusted_grid_levels_short[-1] if adjusted_grid_levels_short else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_short,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price + buffer_distance_short <= adjusted_level <= current_price + max_outer_price_distance * current_price:
-                    adjusted_grid_levels_short.append(adjusted_level)
+            # Consecutive levels snap to significant levels at least one grid step apart
+            level_spacing = max_outer_price_distance * current_price / levels
+            adjusted_grid_levels_long = snap_to_significant_levels(
+                grid_levels_long,
+                significant_levels_long,
+                tolerance,
+                min_outer_price_distance,
+                max_outer_price_distance,
+                current_price,
+                spacing=level_spacing,
+                accept=lambda level: current_price - max_outer_price_distance * current_price <= level <= current_price - buffer_distance_long
+            )
+            adjusted_grid_levels_short = snap_to_significant_levels(
+                grid_levels_short,
+                significant_levels_short,
+                tolerance,
+                min_outer_price_distance,
+                max_outer_price_distance,
+                current_price,
+                spacing=level_spacing,
+                accept=lambda level: current_price + buffer_distance_short <= level <= current_price + max_outer_price_distance * current_price
+            )
 
             grid_levels_long = adjusted_grid_levels_long
             grid_levels_short = adjusted_grid_levels_short
@@ -5189,29 +5038,7 @@ class BybitStrategy(BaseStrategy):
 
     def calculate_price_range_and_volume_histograms(self, order_book, current_price, max_outer_price_distance):
         try:
-            # Ensure current_price is a float
-            current_price = float(current_price)
-            
-            min_price = current_price - max_outer_price_distance * current_price
-            max_price = current_price + max_outer_price_distance * current_price
-
-            price_range = np.arange(min_price, max_price, (max_price - min_price) / 100)
-            volume_histogram_long = np.zeros_like(price_range)
-            volume_histogram_short = np.zeros_like(price_range)
-
-            for order in order_book['bids']:
-                price, volume = float(order[0]), float(order[1])  # Convert price and volume to float
-                if min_price <= price <= current_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_long[index] += volume
-
-            for order in order_book['asks']:
-                price, volume = float(order[0]), float(order[1])  # Convert price and volume to float
-                if current_price <= price <= max_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_short[index] += volume
-
-            return min_price, max_price, price_range, volume_histogram_long, volume_histogram_short
+            return volume_histograms_from_order_book(order_book, current_price, max_outer_price_distance)
         except Exception as e:
             logging.info(f"Exception in calculate_price_range_and_volume_histograms: {e}")
             logging.info("Traceback: %s", traceback.format_exc())
@@ -5243,9 +5070,7 @@ class BybitStrategy(BaseStrategy):
     #         logging.info("Traceback: %s", traceback.format_exc())
 
     def calculate_volume_thresholds_and_significant_levels(self, volume_histogram, price_range):
-        volume_threshold = np.mean(volume_histogram) * 1.5
-        significant_levels = price_range[volume_histogram >= volume_threshold]
-        return volume_threshold, significant_levels
+        return find_significant_levels(volume_histogram, price_range)
 
     def calculate_initial_entries(self, current_price, buffer_distance_long, buffer_distance_short):
         initial_entry_long = current_price - buffer_distance_long
@@ -5277,30 +5102,15 @@ class BybitStrategy(BaseStrategy):
         return grid_levels_long, grid_levels_short
 
     def adjust_grid_levels(self, grid_levels, significant_levels, tolerance, min_outer_price_distance, max_outer_price_distance, current_price, levels):
-        def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
-            for sig_level in significant_levels:
-                if abs(level - sig_level) / level < tolerance:
-                    if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                        if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
-                            return sig_level
-            return level
-
-        adjusted_grid_levels = []
-
-        for i, level in enumerate(grid_levels):
-            previous_level = adjusted_grid_levels[-1] if adjusted_grid_levels else None
-            adjusted_level = find_nearest_significant_level(
-                level,
-                significant_levels,
-                tolerance,
-                min_outer_price_distance,
-                max_outer_price_distance,
-                current_price,
-                previous_level
-            )
-            adjusted_grid_levels.append(adjusted_level)
-
-        return adjusted_grid_levels
+        return snap_to_significant_levels(
+            grid_levels,
+            significant_levels,
+            tolerance,
+            min_outer_price_distance,
+            max_outer_price_distance,
+            current_price,
+            spacing=max_outer_price_distance * current_price / levels
+        )
 
     def finalize_grid_levels(self, adjusted_grid_levels_long, adjusted_grid_levels_short, levels, current_price, buffer_distance_long, buffer_distance_short, max_outer_price_distance, initial_entry_long, initial_entry_short):
         if len(adjusted_grid_levels_long) < levels:
@@ -5438,66 +5248,58 @@ class BybitStrategy(BaseStrategy):
                         logging.info(f"[{symbol}] Short position safe. Current price is {stop_loss_price_short - current_price:.2f} below stop-loss price.")
 
                 # Stop-loss logic for long positions
-                if long_pos_qty > 0 and current_price <= stop_loss_price_long:
-                    logging.info(f"[{symbol}] Long position hit stop-loss level at {stop_loss_price_long}. Issuing reduce-only limit order.")
-                    retry_counter = 0
-                    max_retries = 50  # Maximum number of retries
-                    while long_pos_qty > 0.00001 and retry_counter < max_retries:
-                        try:
-                            # Place a stop-loss order using create_normal_stop_loss_order_bybit
-                            self.create_normal_stop_loss_order_bybit(symbol, order_type='limit', side='sell', 
-                                                                    amount=long_pos_qty, price=stop_loss_price_long, 
-                                                                    positionIdx=1, reduce_only=True)
-                            logging.info(f"[{symbol}] Issued stop-loss limit order to sell {long_pos_qty} at {stop_loss_price_long}")
-                            time.sleep(5)  # Wait for some time to allow order to be filled
-
-                            long_pos_qty = self.get_position_qty(symbol, 'long')
-                            logging.info(f"[{symbol}] Long position quantity after stop-loss attempt: {long_pos_qty}, retry attempt: {retry_counter + 1}")
-
-                        except Exception as e:
-                            logging.error(f"[{symbol}] Error during stop-loss attempt for long position: {e}")
-                            break
+                stop_status = self.stop_loss_executor.pop_finished(symbol, 'long')
+                if stop_status is not None and stop_status.state == 'done':
+                    logging.info(f"[{symbol}] Long position fully closed at stop-loss.")
+                    self.clear_grid(symbol, 'buy')
+                    logging.info(f"[{symbol}] Cleared long grid for symbol {symbol}")
+                    self.active_long_grids.discard(symbol)
+                    logging.info(f"[{symbol}] Removed from active long grids")
+                elif stop_status is not None:
+                    logging.info(f"[{symbol}] Long stop-loss did not close the position: {stop_status.remaining} left, last error {stop_status.error}")
 
-                        retry_counter += 1
+                if long_pos_qty > 0 and self.stop_loss_native:
+                    self.stop_loss_executor.arm_native(symbol, 'long', stop_loss_price_long, positionIdx=1)
+                elif long_pos_qty == 0:
+                    self.stop_loss_executor.disarm_native(symbol, 'long')
 
-                    if long_pos_qty <= 0.00001:
-                        logging.info(f"[{symbol}] Long position fully closed at stop-loss.")
-                        self.clear_grid(symbol, 'buy')
-                        logging.info(f"[{symbol}] Cleared long grid for symbol {symbol}")
-                        self.active_long_grids.discard(symbol)
-                        logging.info(f"[{symbol}] Removed from active long grids")
+                if long_pos_qty > 0 and current_price <= stop_loss_price_long:
+                    # The executor places, re-prices and escalates the close in the background; this loop only polls it
+                    logging.info(f"[{symbol}] Long position hit stop-loss level at {stop_loss_price_long}. Handing it to the stop-loss executor.")
+                    already_stopping = self.stop_loss_executor.is_active(symbol, 'long')
+                    stop_status = self.stop_loss_executor.trigger(symbol, 'long', long_pos_qty, stop_loss_price_long, positionIdx=1)
+                    logging.info(f"[{symbol}] Long stop-loss {stop_status.state}, {stop_status.remaining} left after {stop_status.attempts} attempts")
+                    if not already_stopping:
+                        # Grid entries would add to the position the stop is closing
+                        self.clear_grid_entries(symbol, 'buy')
                 else:
                     logging.info(f"[{symbol}] Long position did not hit stop-loss level. Current price is {current_price}, stop-loss price is {stop_loss_price_long}.")
 
                 # Stop-loss logic for short positions
+                stop_status = self.stop_loss_executor.pop_finished(symbol, 'short')
+                if stop_status is not None and stop_status.state == 'done':
+                    logging.info(f"[{symbol}] Short position fully closed at stop-loss.")
+                    self.clear_grid(symbol, 'sell')
+                    logging.info(f"[{symbol}] Cleared short grid for symbol {symbol}")
+                    self.active_short_grids.discard(symbol)
+                    logging.info(f"[{symbol}] Removed from active short grids")
+                elif stop_status is not None:
+                    logging.info(f"[{symbol}] Short stop-loss did not close the position: {stop_status.remaining} left, last error {stop_status.error}")
+
+                if short_pos_qty > 0 and self.stop_loss_native:
+                    self.stop_loss_executor.arm_native(symbol, 'short', stop_loss_price_short, positionIdx=2)
+                elif short_pos_qty == 0:
+                    self.stop_loss_executor.disarm_native(symbol, 'short')
+
                 if short_pos_qty > 0 and current_price >= stop_loss_price_short:
-                    logging.info(f"[{symbol}] Short position hit stop-loss level at {stop_loss_price_short}. Issuing reduce-only limit order.")
-                    retry_counter = 0
-                    max_retries = 50
-                    while short_pos_qty > 0.00001 and retry_counter < max_retries:
-                        try:
-                            # Place a stop-loss order using create_normal_stop_loss_order_bybit
-                            self.create_normal_stop_loss_order_bybit(symbol, order_type='limit', side='buy', 
-                                                                    amount=short_pos_qty, price=stop_loss_price_short, 
-                                                                    positionIdx=2, reduce_only=True)
-                            logging.info(f"[{symbol}] Issued stop-loss limit order to buy {short_pos_qty} at {stop_loss_price_short}")
-                            time.sleep(5)
-
-                            short_pos_qty = self.get_position_qty(symbol, 'short')
-                            logging.info(f"[{symbol}] Short position quantity after stop-loss attempt: {short_pos_qty}, retry attempt: {retry_counter + 1}")
-
-                        except Exception as e:
-                            logging.error(f"[{symbol}] Error during stop-loss attempt for short position: {e}")
-                            break
-
-                        retry_counter += 1
-
-                    if short_pos_qty <= 0.00001:
-                        logging.info(f"[{symbol}] Short position fully closed at stop-loss.")
-                        self.clear_grid(symbol, 'sell')
-                        logging.info(f"[{symbol}] Cleared short grid for symbol {symbol}")
-                        self.active_short_grids.discard(symbol)
-                        logging.info(f"[{symbol}] Removed from active short grids")
+                    # The executor places, re-prices and escalates the close in the background; this loop only polls it
+                    logging.info(f"[{symbol}] Short position hit stop-loss level at {stop_loss_price_short}. Handing it to the stop-loss executor.")
+                    already_stopping = self.stop_loss_executor.is_active(symbol, 'short')
+                    stop_status = self.stop_loss_executor.trigger(symbol, 'short', short_pos_qty, stop_loss_price_short, positionIdx=2)
+                    logging.info(f"[{symbol}] Short stop-loss {stop_status.state}, {stop_status.remaining} left after {stop_status.attempts} attempts")
+                    if not already_stopping:
+                        # Grid entries would add to the position the stop is closing
+                        self.clear_grid_entries(symbol, 'sell')
                 else:
                     logging.info(f"[{symbol}] Short position did not hit stop-loss level. Current price is {current_price}, stop-loss price is {stop_loss_price_short}.")
             else:
@@ -5584,11 +5386,15 @@ class BybitStrategy(BaseStrategy):
                 Safely issue grid orders, ensuring no duplicates and handling errors gracefully.
                 """
                 try:
+                    if self.stop_loss_executor.is_active(symbol, side):
+                        logging.info(f"[{symbol}] {side.capitalize()} stop-loss in progress, not issuing {side} grid orders.")
+                        return
+
                     grid_set = self.active_long_grids if side == 'long' else self.active_short_grids
                     order_side = 'buy' if side == 'long' else 'sell'
 
-                    # Cancel existing grids for the side before issuing new ones
-                    self.clear_grid(symbol, order_side)
+                    # issue_grid_orders reconciles against the live orders, so nothing is cancelled up front
+                    grid_set.discard(symbol)
 
                     # Initialize filled_levels if not already done
                     if symbol not in self.filled_levels:
@@ -5658,7 +5464,6 @@ class BybitStrategy(BaseStrategy):
                     if entry_during_autoreduce or not self.auto_reduce_active_long.get(symbol, False):
                         if symbol in self.active_long_grids and "buy" in self.filled_levels[symbol] and has_open_long_order:
                             logging.info(f"[{symbol}] Reissuing long orders due to price movement beyond the threshold.")
-                            self.clear_grid(symbol, 'buy')
                             self.active_long_grids.discard(symbol)
                             logging.info(f"[{symbol}] Placing new long orders.")
                             issue_grid_safely('long', grid_levels_long, amounts_long)
@@ -5669,7 +5474,6 @@ class BybitStrategy(BaseStrategy):
                     if entry_during_autoreduce or not self.auto_reduce_active_short.get(symbol, False):
                         if symbol in self.active_short_grids and "sell" in self.filled_levels[symbol] and has_open_short_order:
                             logging.info(f"[{symbol}] Reissuing short orders due to price movement beyond the threshold.")
-                            self.clear_grid(symbol, 'sell')
                             self.active_short_grids.discard(symbol)
                             logging.info(f"[{symbol}] Placing new short orders.")
                             issue_grid_safely('short', grid_levels_short, amounts_short)
@@ -5693,7 +5497,6 @@ class BybitStrategy(BaseStrategy):
                 try:
                     if fresh_signal.lower() == "long" and long_mode and not has_open_long_position and not graceful_stop_long and symbol not in self.active_long_grids and symbol not in self.max_qty_reached_symbol_long:
                         logging.info(f"[{symbol}] Creating new long position based on MFIRSI long signal")
-                        self.clear_grid(symbol, 'buy')
                         
                         # Make a copy of grid_levels_long to safely modify
                         modified_grid_levels_long = grid_levels_long.copy()
@@ -5720,7 +5523,6 @@ class BybitStrategy(BaseStrategy):
 
                             if long_pos_qty < 0.00001 and retry_counter < max_retries:
                                 logging.info(f"[{symbol}] Retrying long grid orders due to MFIRSI signal long.")
-                                self.clear_grid(symbol, 'buy')
                                 modified_grid_levels_long[0] = best_bid_price
                                 issue_grid_safely('long', modified_grid_levels_long, amounts_long)
                                 time.sleep(2)
@@ -5733,7 +5535,6 @@ class BybitStrategy(BaseStrategy):
 
                     elif fresh_signal.lower() == "short" and short_mode and not has_open_short_position and not graceful_stop_short and symbol not in self.active_short_grids and symbol not in self.max_qty_reached_symbol_short:
                         logging.info(f"[{symbol}] Creating new short position based on MFIRSI short signal")
-                        self.clear_grid(symbol, 'sell')
 
                         # Make a copy of grid_levels_short to safely modify
                         modified_grid_levels_short = grid_levels_short.copy()
@@ -5760,7 +5561,6 @@ class BybitStrategy(BaseStrategy):
 
                             if short_pos_qty < 0.00001 and retry_counter < max_retries:
                                 logging.info(f"[{symbol}] Retrying short grid orders due to MFIRSI signal short.")
-                                self.clear_grid(symbol, 'sell')
                                 modified_grid_levels_short[0] = best_ask_price
                                 issue_grid_safely('short', modified_grid_levels_short, amounts_short)
                                 time.sleep(2)
@@ -6033,30 +5833,11 @@ class BybitStrategy(BaseStrategy):
             best_ask_price = order_book['asks'][0][0] if 'asks' in order_book else self.last_known_ask.get(symbol, current_price)
             best_bid_price = order_book['bids'][0][0] if 'bids' in order_book else self.last_known_bid.get(symbol, current_price)
 
-            min_price = current_price - max_outer_price_distance * current_price
-            max_price = current_price + max_outer_price_distance * current_price
-
-            price_range = np.arange(min_price, max_price, (max_price - min_price) / 100)
-            volume_histogram_long = np.zeros_like(price_range)
-            volume_histogram_short = np.zeros_like(price_range)
-
-            for order in order_book['bids']:
-                price, volume = order[0], order[1]
-                if min_price <= price <= current_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_long[index] += volume
-
-            for order in order_book['asks']:
-                price, volume = order[0], order[1]
-                if current_price <= price <= max_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_short[index] += volume
+            # Histogram of orderbook volume within the price range and its significant levels
+            min_price, max_price, price_range, volume_histogram_long, volume_histogram_short = volume_histograms_from_order_book(order_book, current_price, max_outer_price_distance)
 
-            volume_threshold_long = np.mean(volume_histogram_long) * 1.5
-            significant_levels_long = price_range[volume_histogram_long >= volume_threshold_long]
-
-            volume_threshold_short = np.mean(volume_histogram_short) * 1.5
-            significant_levels_short = price_range[volume_histogram_short >= volume_threshold_short]
+            volume_threshold_long, significant_levels_long = find_significant_levels(volume_histogram_long, price_range)
+            volume_threshold_short, significant_levels_short = find_significant_levels(volume_histogram_short, price_range)
 
             initial_entry_long = current_price - buffer_distance_long
             initial_entry_short = current_price + buffer_distance_short
@@ -6083,45 +5864,29 @@ class BybitStrategy(BaseStrategy):
                     for i in range(levels)
                 ]
 
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
-                                return sig_level
-                return level
-
             tolerance = 0.01
-            adjusted_grid_levels_long = []
-            adjusted_grid_levels_short = []
-
-            for i, level in enumerate(grid_levels_long):
-                previous_level = adjusted_grid_levels_long[-1] if adjusted_grid_levels_long else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_long,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price - max_outer_price_distance * current_price <= adjusted_level <= current_price - buffer_distance_long:
-                    adjusted_grid_levels_long.append(adjusted_level)
-
-            for i, level in enumerate(grid_levels_short):
-                previous_level = adjusted_grid_levels_short[-1] if adjusted_grid_levels_short else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_short,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price + buffer_distance_short <= adjusted_level <= current_price + max_outer_price_distance * current_price:
-                    adjusted_grid_levels_short.append(adjusted_level)
+            # Consecutive levels snap to significant levels at least one grid step apart
+            level_spacing = max_outer_price_distance * current_price / levels
+            adjusted_grid_levels_long = snap_to_significant_levels(
+                grid_levels_long,
+                significant_levels_long,
+                tolerance,
+                min_outer_price_distance,
+                max_outer_price_distance,
+                current_price,
+                spacing=level_spacing,
+                accept=lambda level: current_price - max_outer_price_distance * current_price <= level <= current_price - buffer_distance_long
+            )
+            adjusted_grid_levels_short = snap_to_significant_levels(
+                grid_levels_short,
+                significant_levels_short,
+                tolerance,
+                min_outer_price_distance,
+                max_outer_price_distance,
+                current_price,
+                spacing=level_spacing,
+                accept=lambda level: current_price + buffer_distance_short <= level <= current_price + max_outer_price_distance * current_price
+            )
 
             grid_levels_long = adjusted_grid_levels_long
             grid_levels_short = adjusted_grid_levels_short
@@ -6518,30 +6283,11 @@ class BybitStrategy(BaseStrategy):
             best_ask_price = order_book['asks'][0][0] if 'asks' in order_book else self.last_known_ask.get(symbol, current_price)
             best_bid_price = order_book['bids'][0][0] if 'bids' in order_book else self.last_known_bid.get(symbol, current_price)
 
-            min_price = current_price - max_outer_price_distance * current_price
-            max_price = current_price + max_outer_price_distance * current_price
-
-            price_range = np.arange(min_price, max_price, (max_price - min_price) / 100)
-            volume_histogram_long = np.zeros_like(price_range)
-            volume_histogram_short = np.zeros_like(price_range)
-
-            for order in order_book['bids']:
-                price, volume = order[0], order[1]
-                if min_price <= price <= current_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_long[index] += volume
+            # Histogram of orderbook volume within the price range and its significant levels
+            min_price, max_price, price_range, volume_histogram_long, volume_histogram_short = volume_histograms_from_order_book(order_book, current_price, max_outer_price_distance)
 
-            for order in order_book['asks']:
-                price, volume = order[0], order[1]
-                if current_price <= price <= max_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_short[index] += volume
-
-            volume_threshold_long = np.mean(volume_histogram_long) * 1.5
-            significant_levels_long = price_range[volume_histogram_long >= volume_threshold_long]
-
-            volume_threshold_short = np.mean(volume_histogram_short) * 1.5
-            significant_levels_short = price_range[volume_histogram_short >= volume_threshold_short]
+            volume_threshold_long, significant_levels_long = find_significant_levels(volume_histogram_long, price_range)
+            volume_threshold_short, significant_levels_short = find_significant_levels(volume_histogram_short, price_range)
 
             initial_entry_long = current_price - buffer_distance_long
             initial_entry_short = current_price + buffer_distance_short
@@ -6568,45 +6314,29 @@ class BybitStrategy(BaseStrategy):
                     for i in range(levels)
                 ]
 
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
-                                return sig_level
-                return level
-
             tolerance = 0.01
-            adjusted_grid_levels_long = []
-            adjusted_grid_levels_short = []
-
-            for i, level in enumerate(grid_levels_long):
-                previous_level = adjusted_grid_levels_long[-1] if adjusted_grid_levels_long else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_long,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price - max_outer_price_distance * current_price <= adjusted_level <= current_price - buffer_distance_long:
-                    adjusted_grid_levels_long.append(adjusted_level)
-
-            for i, level in enumerate(grid_levels_short):
-                previous_level = adjusted_grid_levels_short[-1] if adjusted_grid_levels_short else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_short,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price + buffer_distance_short <= adjusted_level <= current_price + max_outer_price_distance * current_price:
-                    adjusted_grid_levels_short.append(adjusted_level)
+            # Consecutive levels snap to significant levels at least one grid step apart
+            level_spacing = max_outer_price_distance * current_price / levels
+            adjusted_grid_levels_long = snap_to_significant_levels(
+                grid_levels_long,
+                significant_levels_long,
+                tolerance,
+                min_outer_price_distance,
+                max_outer_price_distance,
+                current_price,
+                spacing=level_spacing,
+                accept=lambda level: current_price - max_outer_price_distance * current_price <= level <= current_price - buffer_distance_long
+            )
+            adjusted_grid_levels_short = snap_to_significant_levels(
+                grid_levels_short,
+                significant_levels_short,
+                tolerance,
+                min_outer_price_distance,
+                max_outer_price_distance,
+                current_price,
+                spacing=level_spacing,
+                accept=lambda level: current_price + buffer_distance_short <= level <= current_price + max_outer_price_distance * current_price
+            )
 
             grid_levels_long = adjusted_grid_levels_long
             grid_levels_short = adjusted_grid_levels_short
@@ -7086,30 +6816,11 @@ class BybitStrategy(BaseStrategy):
             best_ask_price = order_book['asks'][0][0] if 'asks' in order_book else self.last_known_ask.get(symbol, current_price)
             best_bid_price = order_book['bids'][0][0] if 'bids' in order_book else self.last_known_bid.get(symbol, current_price)
 
-            min_price = current_price - max_outer_price_distance * current_price
-            max_price = current_price + max_outer_price_distance * current_price
+            # Histogram of orderbook volume within the price range and its significant levels
+            min_price, max_price, price_range, volume_histogram_long, volume_histogram_short = volume_histograms_from_order_book(order_book, current_price, max_outer_price_distance)
 
-            price_range = np.arange(min_price, max_price, (max_price - min_price) / 100)
-            volume_histogram_long = np.zeros_like(price_range)
-            volume_histogram_short = np.zeros_like(price_range)
-
-            for order in order_book['bids']:
-                price, volume = order[0], order[1]
-                if min_price <= price <= current_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_long[index] += volume
-
-            for order in order_book['asks']:
-                price, volume = order[0], order[1]
-                if current_price <= price <= max_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_short[index] += volume
-
-            volume_threshold_long = np.mean(volume_histogram_long) * 1.5
-            significant_levels_long = price_range[volume_histogram_long >= volume_threshold_long]
-
-            volume_threshold_short = np.mean(volume_histogram_short) * 1.5
-            significant_levels_short = price_range[volume_histogram_short >= volume_threshold_short]
+            volume_threshold_long, significant_levels_long = find_significant_levels(volume_histogram_long, price_range)
+            volume_threshold_short, significant_levels_short = find_significant_levels(volume_histogram_short, price_range)
 
             initial_entry_long = current_price - buffer_distance_long
             initial_entry_short = current_price + buffer_distance_short
@@ -7136,45 +6847,29 @@ class BybitStrategy(BaseStrategy):
                     for i in range(levels)
                 ]
 
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
-                                return sig_level
-                return level
-
             tolerance = 0.01
-            adjusted_grid_levels_long = []
-            adjusted_grid_levels_short = []
-
-            for i, level in enumerate(grid_levels_long):
-                previous_level = adjusted_grid_levels_long[-1] if adjusted_grid_levels_long else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_long,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price - max_outer_price_distance * current_price <= adjusted_level <= current_price - buffer_distance_long:
-                    adjusted_grid_levels_long.append(adjusted_level)
-
-            for i, level in enumerate(grid_levels_short):
-                previous_level = adjusted_grid_levels_short[-1] if adjusted_grid_levels_short else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_short,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price + buffer_distance_short <= adjusted_level <= current_price + max_outer_price_distance * current_price:
-                    adjusted_grid_levels_short.append(adjusted_level)
+            # Consecutive levels snap to significant levels at least one grid step apart
+            level_spacing = max_outer_price_distance * current_price / levels
+            adjusted_grid_levels_long = snap_to_significant_levels(
+                grid_levels_long,
+                significant_levels_long,
+                tolerance,
+                min_outer_price_distance,
+                max_outer_price_distance,
+                current_price,
+                spacing=level_spacing,
+                accept=lambda level: current_price - max_outer_price_distance * current_price <= level <= current_price - buffer_distance_long
+            )
+            adjusted_grid_levels_short = snap_to_significant_levels(
+                grid_levels_short,
+                significant_levels_short,
+                tolerance,
+                min_outer_price_distance,
+                max_outer_price_distance,
+                current_price,
+                spacing=level_spacing,
+                accept=lambda level: current_price + buffer_distance_short <= level <= current_price + max_outer_price_distance * current_price
+            )
 
             grid_levels_long = adjusted_grid_levels_long
             grid_levels_short = adjusted_grid_levels_short
@@ -7528,67 +7223,33 @@ class BybitStrategy(BaseStrategy):
             best_bid_price = order_book['bids'][0][0] if 'bids' in order_book else self.last_known_bid.get(symbol, current_price)
 
             # Analyze orderbook depth and identify significant price levels
-            min_price = current_price - max_outer_price_distance * current_price
-            max_price = current_price + max_outer_price_distance * current_price
-
-            # Create a histogram of orderbook volume within the price range
-            price_range = np.arange(min_price, max_price, (max_price - min_price) / 100)
-            volume_histogram_long = np.zeros_like(price_range)
-            volume_histogram_short = np.zeros_like(price_range)
-
-            for order in order_book['bids']:
-                price, volume = order[0], order[1]
-                if min_price <= price <= current_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_long[index] += volume
+            min_price, max_price, price_range, volume_histogram_long, volume_histogram_short = volume_histograms_from_order_book(order_book, current_price, max_outer_price_distance)
 
-            for order in order_book['asks']:
-                price, volume = order[0], order[1]
-                if current_price <= price <= max_price:
-                    index = int((price - min_price) / (max_price - min_price) * 100)
-                    volume_histogram_short[index] += volume
-
-            # Identify significant price levels based on volume histogram
-            volume_threshold_long = np.mean(volume_histogram_long) * 1.5  # Adjust the threshold as needed
-            significant_levels_long = price_range[volume_histogram_long >= volume_threshold_long]
-
-            volume_threshold_short = np.mean(volume_histogram_short) * 1.5  # Adjust the threshold as needed
-            significant_levels_short = price_range[volume_histogram_short >= volume_threshold_short]
+            volume_threshold_long, significant_levels_long = find_significant_levels(volume_histogram_long, price_range)
+            volume_threshold_short, significant_levels_short = find_significant_levels(volume_histogram_short, price_range)
 
             # Calculate grid levels based on dynamic_outer_price_distance
             grid_levels_long = [current_price - i * dynamic_outer_price_distance * current_price for i in range(1, levels + 1)]
             grid_levels_short = [current_price + i * dynamic_outer_price_distance * current_price for i in range(1, levels + 1)]
 
-            # Function to find the nearest significant level
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            return sig_level
-                return level
-
             # Adjust grid levels to align with significant levels
             tolerance = 0.01  # 1% tolerance, adjust as needed
-            grid_levels_long = [
-                find_nearest_significant_level(
-                    level, 
-                    significant_levels_long, 
-                    tolerance, 
-                    buffer_distance_long / current_price, 
-                    min_outer_price_distance, 
-                    current_price
-                ) for level in grid_levels_long
-            ]
-            grid_levels_short = [
-                find_nearest_significant_level(
-                    level, 
-                    significant_levels_short, 
-                    tolerance, 
-                    buffer_distance_short / current_price, 
-                    min_outer_price_distance, 
-                    current_price
-                ) for level in grid_levels_short
-            ]
+            grid_levels_long = snap_to_significant_levels(
+                grid_levels_long,
+                significant_levels_long,
+                tolerance,
+                buffer_distance_long / current_price,
+                min_outer_price_distance,
+                current_price
+            )
+            grid_levels_short = snap_to_significant_levels(
+                grid_levels_short,
+                significant_levels_short,
+                tolerance,
+                buffer_distance_short / current_price,
+                min_outer_price_distance,
+                current_price
+            )
 
             # Ensure the grid levels are within the buffer distances and respect min/max outer price distance
             grid_levels_long = [
@@ -13011,6 +12672,17 @@ class BybitStrategy(BaseStrategy):
             self.active_short_grids.discard(symbol)  # Remove the symbol from active short grids
         
         logging.info(f"Cleared {side} grid for {symbol}.")
+
+    def clear_grid_entries(self, symbol, side):
+        """Cancel the entry orders of one grid side, leaving reduce-only orders (TPs, stop losses) in place."""
+        try:
+            results = self.exchange.cancel_orders_filtered_bybit(symbol, side=side, reduce_only=False)
+            canceled = sum(1 for result in results if result['status'] == 'canceled')
+            logging.info(f"Canceled {canceled} {side} grid entries for {symbol}")
+        except Exception as e:
+            logging.error(f"Exception when cancelling {side} grid entries for {symbol}: {e}")
+        self.filled_levels.get(symbol, {}).get(side, set()).clear()
+        (self.active_long_grids if side == 'buy' else self.active_short_grids).discard(symbol)
     
 
     def generate_order_link_id(self, symbol, side, level):
@@ -13019,33 +12691,34 @@ class BybitStrategy(BaseStrategy):
         """
         timestamp = int(time.time() * 1000) % 100000  # Use last 5 digits of current timestamp for uniqueness
         level_str = f"{level:.5f}".replace('.', '')[:5]  # Convert level to string, remove '.', and use first 5 characters
-        unique_id = f"{symbol[:3]}_{side[0]}_{level_str}_{timestamp}"  # Build a compact OrderLinkedID
+        unique_id = f"{self.grid_order_link_id_prefix(symbol, side)}{level_str}_{timestamp}"  # Build a compact OrderLinkedID
         return unique_id[:45]  # Ensure the ID does not exceed 45 characters
 
     def issue_grid_orders(self, symbol: str, side: str, grid_levels: list, amounts: list, is_long: bool, filled_levels: set):
         """
-        Check the status of existing grid orders and place new orders for unfilled levels.
+        Bring the grid on one side in line with grid_levels and amounts.
+
+        Live grid orders already at a level are left alone, moved orders are amended
+        in place, and only obsolete levels are cancelled and missing ones created.
         """
         try:
-            # Fetch open orders from the exchange
+            # Fresh open orders: the plan below amends and cancels by order ID, so a stale snapshot would duplicate levels
             open_orders = self.retry_api_call(self.exchange.get_open_orders, symbol)
 
-            # Get the current price to update last reissue prices
-            current_price = self.exchange.get_current_price(symbol)
+            # Get the current price to update last reissue prices, from the websocket feed if it is running
+            market_feed = getattr(self.exchange, 'market_feed', None)
+            current_price = market_feed.get_current_price(symbol) if market_feed else None
+            if current_price is None:
+                current_price = self.exchange.get_current_price(symbol)
 
-            # Clear existing grid before placing new orders
             if is_long:
-                logging.info(f"Clearing existing long grid for {symbol} before issuing new orders. (line: {inspect.currentframe().f_lineno})")
-                self.clear_grid(symbol, 'buy')
                 self.last_reissue_price_long[symbol] = current_price
                 logging.info(f"Updated last reissue price for long orders of {symbol} to {current_price}")
             else:
-                logging.info(f"Clearing existing short grid for {symbol} before issuing new orders. (line: {inspect.currentframe().f_lineno})")
-                self.clear_grid(symbol, 'sell')
                 self.last_reissue_price_short[symbol] = current_price
                 logging.info(f"Updated last reissue price for short orders of {symbol} to {current_price}")
 
-            # Clear the filled_levels set before placing new orders
+            # Rebuilt below from the levels that end up with a live order
             filled_levels.clear()
 
             # Add logging to verify types before the zip operation
@@ -13063,28 +12736,96 @@ class BybitStrategy(BaseStrategy):
             for amount in amounts:
                 assert isinstance(amount, (float, int)), f"Each amount in amounts should be a float or int, but got {type(amount)}"
 
-            # Place new grid orders for unfilled levels
-            for level, amount in zip(grid_levels, amounts):
-                order_exists = any(order['price'] == level and order['side'].lower() == side.lower() for order in open_orders)
-                if not order_exists:
-                    order_link_id = self.generate_order_link_id(symbol, side, level)
-                    position_idx = 1 if is_long else 2
-                    try:
-                        order = self.exchange.create_tagged_limit_order_bybit(symbol, side, amount, level, positionIdx=position_idx, orderLinkId=order_link_id)
-                        if order and 'id' in order:
-                            logging.info(f"Placed {side} order at level {level} for {symbol} with amount {amount}")
-                            filled_levels.add(level)  # Add the level to filled_levels
-                        else:
-                            logging.info(f"Failed to place {side} order at level {level} for {symbol} with amount {amount}")
-                    except Exception as e:
-                        logging.error(f"Exception when placing {side} order at level {level} for {symbol}: {e}")
-                else:
-                    logging.info(f"Skipping {side} order at level {level} for {symbol} as it already exists.")
+            # Diff the desired grid against the live one and touch only the levels that changed
+            amounts = [self.round_grid_amount(symbol, amount) for amount in amounts]
+            plan = plan_grid_orders(
+                grid_levels, amounts, open_orders, side,
+                order_link_id_prefix=self.grid_order_link_id_prefix(symbol, side),
+                price_tolerance=self.grid_price_tolerance,
+                qty_tolerance=self.grid_qty_tolerance,
+                cancel_untagged=True
+            )
+            logging.info(f"[{symbol}] {side.capitalize()} grid reconciliation: {plan.summary()}")
+            self.apply_grid_plan(symbol, side, plan, 1 if is_long else 2, filled_levels)
 
             logging.info(f"[{symbol}] {side.capitalize()} grid orders issued for unfilled levels.")
         except Exception as e:
             logging.error(f"Exception in issue_grid_orders: {e}")
 
+    def grid_order_link_id_prefix(self, symbol, side):
+        """
+        The orderLinkId prefix generate_order_link_id gives every grid order for symbol and side.
+
+        Built from the whole market ID (BTC/USDT:USDT -> BTCUSDT), so symbols sharing
+        their first letters (BTCUSDT, BTCDOMUSDT) never claim each other's orders.
+        """
+        market_id = symbol.split(':')[0].replace('/', '')
+        return f"{market_id}_{side[0]}_"
+
+    def round_grid_amount(self, symbol, amount):
+        """Amount rounded the way the exchange will round it, so unchanged levels compare equal."""
+        try:
+            return float(self.exchange.exchange.amount_to_precision(symbol, amount))
+        except Exception:
+            return amount
+
+    def apply_grid_plan(self, symbol, side, plan, position_idx, filled_levels):
+        """
+        Send the order actions of a GridPlan: cancels first, then amends, then creates.
+
+        :param filled_levels: Set that receives every level left with a live order.
+        """
+        for action in plan.keep:
+            filled_levels.add(action.level)
+
+        if plan.cancel:
+            try:
+                results = self.exchange.cancel_orders_by_id_bybit(symbol, [order['id'] for order in plan.cancel])
+                for result in results:
+                    if result['status'] == 'canceled':
+                        logging.info(f"Canceled obsolete {side} grid order {result['id']} for {symbol}")
+            except Exception as e:
+                logging.error(f"Exception when cancelling obsolete {side} grid orders for {symbol}: {e}")
+
+        if plan.amend:
+            amendments = []
+            for action in plan.amend:
+                amendment = {"id": action.order['id'], "side": side}
+                if action.price != order_price(action.order):
+                    amendment["price"] = action.price
+                if action.amount != order_qty(action.order):
+                    amendment["qty"] = action.amount
+                amendments.append(amendment)
+            try:
+                results = self.exchange.amend_orders_bybit(symbol, amendments)
+                for action, result in zip(plan.amend, results):
+                    if result['status'] == 'amended':
+                        logging.info(f"Amended {side} grid order {action.order['id']} for {symbol} to price {action.price} with amount {action.amount}")
+                        filled_levels.add(action.level)
+                    else:
+                        # The order may have filled or been cancelled meanwhile; place the level afresh
+                        logging.info(f"Failed to amend {side} grid order {action.order['id']} for {symbol}: {result['error']}")
+                        plan.create.append(action._replace(order=None, price=action.level))
+            except Exception as e:
+                logging.error(f"Exception when amending {side} grid orders for {symbol}: {e}")
+
+        if plan.create:
+            grid_orders = []
+            for action in plan.create:
+                order_link_id = self.generate_order_link_id(symbol, side, action.level)
+                grid_orders.append({"symbol": symbol, "side": side, "qty": action.amount, "price": action.price, "positionIdx": position_idx, "orderLinkId": order_link_id})
+            try:
+                results = self.exchange.create_tagged_limit_orders_bybit(grid_orders)
+                for result in results:
+                    level, amount = result['request']['price'], result['request']['qty']
+                    if result['status'] == 'placed':
+                        logging.info(f"Placed {side} order at level {level} for {symbol} with amount {amount}")
+                        filled_levels.add(level)  # Add the level to filled_levels
+                    else:
+                        logging.info(f"Failed to place {side} order at level {level} for {symbol} with amount {amount}: {result['error']}")
+            except Exception as e:
+                logging.error(f"Exception when placing {side} grid orders for {symbol}: {e}")
+
     # def issue_grid_orders(self, symbol: str, side: str, grid_levels: list, amounts: list, is_long: bool, filled_levels: set):
     #     """
     #     Check the status of existing grid orders and place new orders for unfilled levels.
@@ -13228,14 +12969,14 @@ class BybitStrategy(BaseStrategy):
 
     def cancel_grid_orders(self, symbol: str, side: str):
         try:
-            open_orders = self.retry_api_call(self.exchange.get_open_orders, symbol)
+            # One fetch and one batch cancel per call instead of a request per order
+            results = self.exchange.cancel_orders_filtered_bybit(symbol, side=side)
 
             orders_canceled = 0
-            for order in open_orders:
-                if order['side'].lower() == side.lower():
-                    self.exchange.cancel_order_by_id(order['id'], symbol)
+            for result in results:
+                if result['status'] == 'canceled':
                     orders_canceled += 1
-                    logging.info(f"Canceled order {order['id']} for {symbol}")
+                    logging.info(f"Canceled order {result['id']} for {symbol}")
 
             if orders_canceled > 0:
                 logging.info(f"Canceled {orders_canceled} {side} grid orders for {symbol}")
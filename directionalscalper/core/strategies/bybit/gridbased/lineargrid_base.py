@@ -13,7 +13,7 @@ from directionalscalper.core.strategies.bybit.bybit_strategy import BybitStrateg
 from directionalscalper.core.exchanges.bybit import BybitExchange
 from directionalscalper.core.strategies.logger import Logger
 from live_table_manager import shared_symbols_data
-from rate_limit import RateLimit
+from rate_limit import rate_budget
 logging = Logger(logger_name="LinearGridBase", filename="LinearGridBase.log", stream=True)
 
 symbol_locks = {}
@@ -21,9 +21,9 @@ symbol_locks = {}
 class LinearGridBaseFutures(BybitStrategy):
     def __init__(self, exchange, manager, config, symbols_allowed=None, rotator_symbols_standardized=None, mfirsi_signal=None):
         super().__init__(exchange, config, manager, symbols_allowed)
-        self.rate_limiter = RateLimit(10, 1)
-        self.general_rate_limiter = RateLimit(50, 1)
-        self.order_rate_limiter = RateLimit(5, 1) 
+        self.rate_limiter = rate_budget.limiter('position')
+        self.general_rate_limiter = rate_budget.limiter('market_data')
+        self.order_rate_limiter = rate_budget.limiter('order')
         self.mfirsi_signal = mfirsi_signal
         self.is_order_history_populated = False
         self.last_health_check_time = time.time()
@@ -35,6 +35,7 @@ class LinearGridBaseFutures(BybitStrategy):
         self.helper_interval = 1
         self.running_long = False
         self.running_short = False
+        self.graceful_stop_sides = {'long': False, 'short': False}  # Set by rotation for engines trading both sides
         self.last_known_equity = 0.0
         self.last_known_upnl = {}
         self.last_known_mas = {}
@@ -47,7 +48,30 @@ class LinearGridBaseFutures(BybitStrategy):
             if standardized_symbol not in symbol_locks:
                 symbol_locks[standardized_symbol] = {'long': threading.Lock(), 'short': threading.Lock()}
 
+    def set_graceful_stop(self, graceful_stop_long, graceful_stop_short):
+        """Rotation's graceful stop per side for an engine running action "both"; combined with the config flags."""
+        self.graceful_stop_sides = {'long': graceful_stop_long, 'short': graceful_stop_short}
+
+    def graceful_stops(self, config_graceful_stop_long, config_graceful_stop_short):
+        """The graceful stop of each side: the config's, or rotation's when set_graceful_stop stopped that side."""
+        return (config_graceful_stop_long or self.graceful_stop_sides['long'],
+                config_graceful_stop_short or self.graceful_stop_sides['short'])
+
     def run(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+        for delay in self.run_steps(symbol, rotator_symbols_standardized, mfirsi_signal, action):
+            time.sleep(delay)
+
+    def run_steps(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+        """
+        Generator form of run: yields the seconds to wait between trading steps instead of sleeping.
+
+        The threaded runner sleeps on each yielded delay, the asyncio runtime awaits it, so
+        a symbol side only holds a thread while a step is actually working. Closing the
+        generator stops trading at the current pause and releases the symbol lock.
+
+        With action "both" one engine takes both side locks and trades the long and
+        short side from the same data fetch per tick.
+        """
         try:
             standardized_symbol = symbol.upper()
             logging.info(f"Standardized symbol: {standardized_symbol}")
@@ -56,17 +80,21 @@ class LinearGridBaseFutures(BybitStrategy):
             if standardized_symbol not in symbol_locks:
                 symbol_locks[standardized_symbol] = {'long': threading.Lock(), 'short': threading.Lock()}
 
-            if symbol_locks[standardized_symbol][action].acquire(blocking=False):
+            sides = ["long", "short"] if action == "both" else [action]
+            acquired = [side for side in sides if symbol_locks[standardized_symbol][side].acquire(blocking=False)]
+            if len(acquired) == len(sides):
                 logging.info(f"Lock acquired for symbol {standardized_symbol} action {action} by thread {current_thread_id}")
                 try:
-                    if action == "long":
-                        self.run_long_trades(standardized_symbol, rotator_symbols_standardized, mfirsi_signal)
-                    elif action == "short":
-                        self.run_short_trades(standardized_symbol, rotator_symbols_standardized, mfirsi_signal)
+                    self.running_long = "long" in sides
+                    self.running_short = "short" in sides
+                    yield from self.trading_steps(standardized_symbol, rotator_symbols_standardized, mfirsi_signal, action)
                 finally:
-                    symbol_locks[standardized_symbol][action].release()
-                    logging.info(f"Lock released for symbol {standardized_symbol} action {action} by thread {current_thread_id}")
+                    for side in acquired:
+                        symbol_locks[standardized_symbol][side].release()
+                    logging.info(f"Lock released for symbol {standardized_symbol} action {action} by thread {threading.get_ident()}")
             else:
+                for side in acquired:
+                    symbol_locks[standardized_symbol][side].release()
                 logging.info(f"Failed to acquire lock for symbol {standardized_symbol} action {action}")
         except Exception as e:
             logging.error(f"Exception in run function: {e}")
@@ -81,6 +109,11 @@ class LinearGridBaseFutures(BybitStrategy):
         self.run_single_symbol(symbol, rotator_symbols_standardized, mfirsi_signal, "short")
 
     def run_single_symbol(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+        for delay in self.trading_steps(symbol, rotator_symbols_standardized, mfirsi_signal, action):
+            time.sleep(delay)
+
+    def trading_steps(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+        """Trading loop for one symbol side; every pause between steps is yielded as a delay in seconds."""
         try:
             logging.info(f"Starting to process symbol: {symbol}")
             logging.info(f"Initializing default values for symbol: {symbol}")
@@ -168,8 +201,8 @@ class LinearGridBaseFutures(BybitStrategy):
             max_qty_percent_short = self.config.linear_grid['max_qty_percent_short']
             min_outer_price_distance = self.config.linear_grid['min_outer_price_distance']
             max_outer_price_distance = self.config.linear_grid['max_outer_price_distance']
-            graceful_stop_long = self.config.linear_grid['graceful_stop_long']
-            graceful_stop_short = self.config.linear_grid['graceful_stop_short']
+            config_graceful_stop_long = self.config.linear_grid['graceful_stop_long']
+            config_graceful_stop_short = self.config.linear_grid['graceful_stop_short']
             additional_entries_from_signal = self.config.linear_grid['additional_entries_from_signal']
             stop_loss_long = self.config.linear_grid['stop_loss_long']
             stop_loss_short = self.config.linear_grid['stop_loss_short']
@@ -223,6 +256,14 @@ class LinearGridBaseFutures(BybitStrategy):
             logging.info("Setting up exchange")
             self.exchange.setup_exchange_bybit(symbol)
 
+            # Websocket snapshots for price, order book, klines and positions. Falls back to REST when stale.
+            market_feed = None
+            if self.config.linear_grid.get('websocket_feed', False) and hasattr(self.exchange, 'get_market_feed'):
+                market_feed = self.exchange.get_market_feed()
+                if market_feed:
+                    market_feed.subscribe(symbol)
+            logging.info(f"Market feed for {symbol}: {'websocket' if market_feed else 'REST polling'}")
+
             previous_one_minute_distance = None
             previous_five_minute_distance = None
 
@@ -357,7 +398,7 @@ class LinearGridBaseFutures(BybitStrategy):
                     # If total_equity is still None (which it shouldn't be), log an error and skip the iteration
                     if total_equity is None:
                         logging.error("This should not happen as total_equity should never be None. Skipping this iteration.")
-                        time.sleep(10)  # wait for a short period before retrying
+                        yield 10  # wait for a short period before retrying
                         continue
                     
                 blacklist = self.config.blacklist
@@ -368,9 +409,13 @@ class LinearGridBaseFutures(BybitStrategy):
                 funding_check = self.is_funding_rate_acceptable(symbol)
                 logging.info(f"Funding check on {symbol} : {funding_check}")
 
-                current_price = self.exchange.get_current_price(symbol)
+                current_price = market_feed.get_current_price(symbol) if market_feed else None
+                if current_price is None:
+                    current_price = self.exchange.get_current_price(symbol)
 
-                order_book = self.exchange.get_orderbook(symbol)
+                order_book = market_feed.get_orderbook(symbol) if market_feed else None
+                if order_book is None:
+                    order_book = self.exchange.get_orderbook(symbol)
                 # best_ask_price = self.exchange.get_orderbook(symbol)['asks'][0][0]
                 # best_bid_price = self.exchange.get_orderbook(symbol)['bids'][0][0]
 
@@ -535,7 +580,7 @@ class LinearGridBaseFutures(BybitStrategy):
                     logging.info("Both long and short operations have ended. Preparing to exit loop.")
                     shared_symbols_data.pop(symbol, None)  # Remove the symbol from shared_symbols_data
 
-                time.sleep(2)
+                yield 2
 
                 # If the symbol is in rotator_symbols and either it's already being traded or trading is allowed.
                 if symbol in rotator_symbols_standardized or (symbol in open_symbols or trading_allowed): # and instead of or
@@ -826,10 +871,13 @@ class LinearGridBaseFutures(BybitStrategy):
 
                     logging.info(f"Open TP order count {tp_order_counts}")
 
+                    unrealized_pnl = market_feed.get_unrealized_pnl(symbol) if market_feed else None
+
                     # Check for long position
                     if long_pos_qty > 0:
                         try:
-                            unrealized_pnl = self.exchange.fetch_unrealized_pnl(symbol)
+                            if unrealized_pnl is None:
+                                unrealized_pnl = self.exchange.fetch_unrealized_pnl(symbol)
                             long_upnl = unrealized_pnl.get('long')
                             self.last_known_upnl[symbol] = self.last_known_upnl.get(symbol, {})
                             self.last_known_upnl[symbol]['long'] = long_upnl  # Store the last known long uPNL
@@ -842,7 +890,8 @@ class LinearGridBaseFutures(BybitStrategy):
                     # Check for short position
                     if short_pos_qty > 0:
                         try:
-                            unrealized_pnl = self.exchange.fetch_unrealized_pnl(symbol)
+                            if unrealized_pnl is None:
+                                unrealized_pnl = self.exchange.fetch_unrealized_pnl(symbol)
                             short_upnl = unrealized_pnl.get('short')
                             self.last_known_upnl[symbol] = self.last_known_upnl.get(symbol, {})
                             self.last_known_upnl[symbol]['short'] = short_upnl  # Store the last known short uPNL
@@ -855,6 +904,8 @@ class LinearGridBaseFutures(BybitStrategy):
                     long_tp_counts = tp_order_counts['long_tp_count']
                     short_tp_counts = tp_order_counts['short_tp_count']
 
+                    graceful_stop_long, graceful_stop_short = self.graceful_stops(config_graceful_stop_long, config_graceful_stop_short)
+
                     try:
                         self.lineargrid_base(
                             symbol,
@@ -982,7 +1033,7 @@ class LinearGridBaseFutures(BybitStrategy):
                     # self.cancel_entries_bybit(symbol, best_ask_price, moving_averages["ma_1m_3_high"], moving_averages["ma_5m_3_high"])
                     # self.cancel_stale_orders_bybit(symbol)
                     
-                time.sleep(5)
+                yield 5
 
                 dashboard_path = os.path.join(self.config.shared_data_path, "shared_data.json")
                 
@@ -1053,7 +1104,7 @@ class LinearGridBaseFutures(BybitStrategy):
                 iteration_duration = iteration_end_time - iteration_start_time
                 logging.info(f"Iteration for symbol {symbol} took {iteration_duration:.2f} seconds")
 
-                time.sleep(3)
+                yield 3
         except Exception as e:
             traceback_info = traceback.format_exc()  # Get the full traceback
             logging.info(f"Exception caught in quickscalp strategy '{symbol}': {e}\nTraceback:\n{traceback_info}")
\ No newline at end of file
@@ -0,0 +1,206 @@
+import time
+
+import numpy as np
+
+
+def volume_histograms(bid_prices, bid_sizes, ask_prices, ask_sizes, current_price, max_outer_price_distance, bins=100):
+    """
+    Bin bid volume below and ask volume above current_price into ``bins`` equal price buckets.
+
+    Uses the same buckets as the per-order loops it replaces: bucket i starts at
+    ``min_price + i * step``. A level exactly on ``max_price`` is counted in the
+    last bucket instead of raising IndexError.
+
+    :return: (min_price, max_price, price_range, volume_histogram_long, volume_histogram_short)
+    """
+    current_price = float(current_price)
+    min_price = current_price - max_outer_price_distance * current_price
+    max_price = current_price + max_outer_price_distance * current_price
+    span = max_price - min_price
+
+    price_range = np.arange(min_price, max_price, span / bins)
+    volume_histogram_long = np.zeros_like(price_range)
+    volume_histogram_short = np.zeros_like(price_range)
+
+    for prices, sizes, histogram, low, high in (
+        (bid_prices, bid_sizes, volume_histogram_long, min_price, current_price),
+        (ask_prices, ask_sizes, volume_histogram_short, current_price, max_price),
+    ):
+        prices = np.asarray(prices, dtype=float)
+        sizes = np.asarray(sizes, dtype=float)
+        mask = (prices >= low) & (prices <= high)
+        if not mask.any():
+            continue
+        index = ((prices[mask] - min_price) / span * bins).astype(int)
+        np.clip(index, 0, len(histogram) - 1, out=index)
+        histogram += np.bincount(index, weights=sizes[mask], minlength=len(histogram))[:len(histogram)]
+
+    return min_price, max_price, price_range, volume_histogram_long, volume_histogram_short
+
+
+def _levels_to_array(levels):
+    try:
+        array = np.asarray(levels, dtype=float)
+    except ValueError:
+        # Ragged rows (some exchanges append order counts); keep price and size only
+        array = np.asarray([level[:2] for level in levels], dtype=float)
+    return array.reshape(-1, array.shape[1] if array.ndim == 2 else 2)[:, :2]
+
+
+def volume_histograms_from_order_book(order_book, current_price, max_outer_price_distance, bins=100):
+    """volume_histograms() for a ccxt-style ``{'bids': [[price, size], ...], 'asks': [...]}`` dict."""
+    bids = _levels_to_array(order_book['bids'])
+    asks = _levels_to_array(order_book['asks'])
+    return volume_histograms(bids[:, 0], bids[:, 1], asks[:, 0], asks[:, 1], current_price, max_outer_price_distance, bins)
+
+
+def significant_levels(volume_histogram, price_range, factor=1.5):
+    """
+    Price buckets holding at least ``factor`` times the average bucket volume.
+
+    :return: (volume_threshold, significant_levels), levels in ascending price order.
+    """
+    volume_threshold = np.mean(volume_histogram) * factor
+    return volume_threshold, price_range[volume_histogram >= volume_threshold]
+
+
+def _match_window(significant_levels, min_distance, max_distance, current_price):
+    levels = np.asarray(significant_levels, dtype=float)
+    low = current_price - max_distance * current_price
+    high = current_price - min_distance * current_price
+    return levels[(levels >= low) & (levels <= high)]
+
+
+def snap_to_significant_levels(grid_levels, significant_levels, tolerance, min_distance, max_distance, current_price, spacing=None, accept=None):
+    """
+    Move grid levels onto nearby high-volume price levels.
+
+    Each level is replaced by the first significant level (in ascending price
+    order) that lies within ``tolerance`` (a fraction of the level) and inside
+    ``[current_price - max_distance * current_price, current_price - min_distance * current_price]``;
+    levels without a match are kept as they are.
+
+    Without ``spacing`` all levels are matched at once with np.searchsorted. With
+    ``spacing``, a significant level closer than ``spacing`` to the previously
+    kept level is skipped, so levels are resolved in order; ``accept`` then
+    decides which adjusted levels are kept (and count as the previous level).
+
+    :param grid_levels: Grid prices to adjust.
+    :param significant_levels: Significant prices in ascending order, e.g. from significant_levels().
+    :param tolerance: Maximum relative distance between a grid level and its match.
+    :param min_distance: Closest a match may be to current_price, as a fraction of it.
+    :param max_distance: Furthest a match may be from current_price, as a fraction of it.
+    :param current_price: The current price of the symbol.
+    :param spacing: Minimum absolute distance between consecutive kept levels, or None.
+    :param accept: Predicate on an adjusted level; rejected levels are dropped. Only used with spacing.
+    :return: List of adjusted grid levels.
+    """
+    levels = np.asarray(grid_levels, dtype=float)
+    window = _match_window(significant_levels, min_distance, max_distance, current_price)
+
+    if spacing is None:
+        if len(window) == 0 or len(levels) == 0:
+            return levels.tolist()
+        adjusted = levels.copy()
+        matched = np.zeros(len(levels), dtype=bool)
+        start = np.searchsorted(window, levels - tolerance * levels, side='left')
+        # The bound above can be off by one element through rounding, so confirm with the exact test
+        for offset in (-1, 0, 1):
+            candidate = start + offset
+            valid = (candidate >= 0) & (candidate < len(window)) & ~matched
+            candidate = np.clip(candidate, 0, len(window) - 1)
+            prices = window[candidate]
+            hit = valid & (np.abs(levels - prices) / levels < tolerance)
+            adjusted[hit] = prices[hit]
+            matched |= hit
+        return adjusted.tolist()
+
+    kept = []
+    for level in levels:
+        previous_level = kept[-1] if kept else None
+        adjusted = level
+        if len(window):
+            start = max(int(np.searchsorted(window, level - tolerance * level, side='left')) - 1, 0)
+            stop = min(int(np.searchsorted(window, level + tolerance * level, side='right')) + 1, len(window))
+            candidates = window[start:stop]
+            mask = np.abs(level - candidates) / level < tolerance
+            if previous_level is not None:
+                mask &= np.abs(candidates - previous_level) > spacing
+            if mask.any():
+                adjusted = candidates[np.argmax(mask)]
+        adjusted = float(adjusted)
+        if accept is None or accept(adjusted):
+            kept.append(adjusted)
+    return kept
+
+
+# Reference implementations of the loops replaced above, kept for the benchmark and the parity tests
+
+def _volume_histograms_loop(order_book, current_price, max_outer_price_distance):
+    min_price = current_price - max_outer_price_distance * current_price
+    max_price = current_price + max_outer_price_distance * current_price
+    price_range = np.arange(min_price, max_price, (max_price - min_price) / 100)
+    volume_histogram_long = np.zeros_like(price_range)
+    volume_histogram_short = np.zeros_like(price_range)
+    for order in order_book['bids']:
+        price, volume = float(order[0]), float(order[1])
+        if min_price <= price <= current_price:
+            volume_histogram_long[int((price - min_price) / (max_price - min_price) * 100)] += volume
+    for order in order_book['asks']:
+        price, volume = float(order[0]), float(order[1])
+        if current_price <= price < max_price:
+            volume_histogram_short[int((price - min_price) / (max_price - min_price) * 100)] += volume
+    return min_price, max_price, price_range, volume_histogram_long, volume_histogram_short
+
+
+def _find_nearest_significant_level_loop(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None, spacing=None):
+    for sig_level in significant_levels:
+        if abs(level - sig_level) / level < tolerance:
+            if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
+                if previous_level is None or spacing is None or abs(sig_level - previous_level) > spacing:
+                    return sig_level
+    return level
+
+
+def benchmark(depth=50000, levels=50, repeat=20, seed=1):
+    """
+    Time the vectorised histogram and level snapping against the original loops on a synthetic deep book.
+
+    Run with ``python -m directionalscalper.core.strategies.grid_levels``.
+    """
+    rng = np.random.default_rng(seed)
+    current_price = 100.0
+    max_outer_price_distance = 0.05
+    tick = current_price * max_outer_price_distance / depth
+    order_book = {
+        'bids': [[current_price - (i + 0.5) * tick, float(size)] for i, size in enumerate(rng.exponential(1.0, depth))],
+        'asks': [[current_price + (i + 0.5) * tick, float(size)] for i, size in enumerate(rng.exponential(1.0, depth))],
+    }
+    grid = [current_price - (i + 1) * 0.001 * current_price for i in range(levels)]
+    # Fine-grained significant levels make the linear scan long, as with a dense histogram
+    significant = np.sort(rng.uniform(current_price * 0.9, current_price, depth // 10))
+
+    def timed(function):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = function()
+        return (time.perf_counter() - start) / repeat, result
+
+    bids, asks = np.asarray(order_book['bids']), np.asarray(order_book['asks'])
+
+    loop_hist_time, _ = timed(lambda: _volume_histograms_loop(order_book, current_price, max_outer_price_distance))
+    dict_hist_time, _ = timed(lambda: volume_histograms_from_order_book(order_book, current_price, max_outer_price_distance))
+    # Books held by the order book engine are already arrays, so this is the cost on the trading loop
+    array_hist_time, _ = timed(lambda: volume_histograms(bids[:, 0], bids[:, 1], asks[:, 0], asks[:, 1], current_price, max_outer_price_distance))
+
+    loop_snap_time, _ = timed(lambda: [_find_nearest_significant_level_loop(level, significant, 0.01, 0.0, 0.1, current_price) for level in grid])
+    vec_snap_time, _ = timed(lambda: snap_to_significant_levels(grid, significant, 0.01, 0.0, 0.1, current_price))
+
+    print(f"Book depth {depth} per side, {levels} grid levels, {len(significant)} significant levels")
+    print(f"Volume histograms:   loop {loop_hist_time * 1000:.2f} ms, from dict {dict_hist_time * 1000:.2f} ms ({loop_hist_time / dict_hist_time:.1f}x), "
+          f"from arrays {array_hist_time * 1000:.2f} ms ({loop_hist_time / array_hist_time:.1f}x)")
+    print(f"Significant levels:  loop {loop_snap_time * 1000:.2f} ms, vectorised {vec_snap_time * 1000:.2f} ms ({loop_snap_time / vec_snap_time:.1f}x)")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,149 @@
+from collections import namedtuple
+
+# One grid level in a plan: the desired level and amount, the live order it maps to (None for creates)
+# and the order price to send, which is the live price when only the quantity is amended
+GridLevelAction = namedtuple('GridLevelAction', ['level', 'amount', 'order', 'price'])
+
+
+class GridPlan(namedtuple('GridPlan', ['keep', 'amend', 'cancel', 'create'])):
+    """
+    Orders to touch to turn the live grid into the desired one.
+
+    keep:   GridLevelActions whose live order already matches (left alone, queue priority kept)
+    amend:  GridLevelActions whose live order is moved to ``price`` / resized to ``amount`` in place
+    cancel: live orders no desired level maps to
+    create: GridLevelActions for desired levels without a live order
+    """
+
+    __slots__ = ()
+
+    def request_count(self):
+        return len(self.amend) + len(self.cancel) + len(self.create)
+
+    def is_empty(self):
+        return self.request_count() == 0
+
+    def summary(self):
+        return f"keep {len(self.keep)}, amend {len(self.amend)}, cancel {len(self.cancel)}, create {len(self.create)}"
+
+
+def order_price(order):
+    price = order.get('price')
+    if price is None:
+        price = order.get('info', {}).get('price')
+    return float(price or 0)
+
+
+def order_qty(order):
+    qty = order.get('amount')
+    if qty is None:
+        qty = order.get('info', {}).get('qty')
+    return float(qty or 0)
+
+
+def order_link_id(order):
+    return order.get('clientOrderId') or order.get('info', {}).get('orderLinkId') or ''
+
+
+def is_grid_order(order, side, order_link_id_prefix=None):
+    """True for open entry (non reduce-only) orders on ``side``, optionally tagged with ``order_link_id_prefix``."""
+    if (order.get('side') or '').lower() != side.lower():
+        return False
+    reduce_only = order.get('reduceOnly')
+    if reduce_only is None:
+        reduce_only = order.get('info', {}).get('reduceOnly')
+    if reduce_only:
+        return False
+    if order_link_id_prefix is not None and not order_link_id(order).startswith(order_link_id_prefix):
+        return False
+    return True
+
+
+def _pair_nearest(levels, orders, price_tolerance=None):
+    """
+    Pair desired levels with live orders, closest prices first.
+
+    :param levels: List of (index, level) tuples.
+    :param orders: List of (index, order) tuples.
+    :param price_tolerance: Maximum relative distance for a pair, or None for no limit.
+    :return: List of (level index, order index) pairs; every level and order is used at most once.
+    """
+    candidates = []
+    for level_index, level in levels:
+        for order_index, order in orders:
+            distance = abs(order_price(order) - level)
+            if price_tolerance is None or distance <= price_tolerance * level:
+                candidates.append((distance, level_index, order_index))
+    candidates.sort()
+
+    pairs = []
+    used_levels, used_orders = set(), set()
+    for _, level_index, order_index in candidates:
+        if level_index in used_levels or order_index in used_orders:
+            continue
+        used_levels.add(level_index)
+        used_orders.add(order_index)
+        pairs.append((level_index, order_index))
+    return pairs
+
+
+def plan_grid_orders(grid_levels, amounts, open_orders, side, order_link_id_prefix=None, price_tolerance=0.001, qty_tolerance=0.001, amend=True, cancel_untagged=False):
+    """
+    Work out the minimal set of order actions that turns the live grid into ``grid_levels``.
+
+    Live grid orders are the open entry orders on ``side`` (tagged with
+    ``order_link_id_prefix`` when given). Each desired level first claims the
+    closest live order within ``price_tolerance``; such an order is kept, or has
+    only its quantity amended if it differs by more than ``qty_tolerance``, so it
+    stays at the same price and keeps its place in the queue. Remaining desired
+    levels then take over the remaining live orders, closest first, through a
+    price and quantity amend. Whatever is left is cancelled or created.
+
+    Nothing here talks to the exchange, so a plan can be checked on plain dicts.
+
+    :param grid_levels: Desired grid prices.
+    :param amounts: Desired order amounts, one per level.
+    :param open_orders: ccxt-style open orders for the symbol.
+    :param side: 'buy' or 'sell'.
+    :param order_link_id_prefix: Only orders whose orderLinkId starts with this prefix belong to the grid.
+    :param price_tolerance: Maximum relative distance for a live order to count as already at a level.
+    :param qty_tolerance: Maximum relative quantity difference before the quantity is amended.
+    :param amend: If False, orders that would be moved are cancelled and their levels created instead.
+    :param cancel_untagged: Also cancel entry orders on ``side`` that lack the prefix, as clearing the grid would.
+    :return: GridPlan.
+    """
+    live_orders = [order for order in open_orders if is_grid_order(order, side, order_link_id_prefix)]
+    desired = [(index, float(level)) for index, level in enumerate(grid_levels)]
+    live = list(enumerate(live_orders))
+
+    keep, amended, create = [], [], []
+    matched_levels, matched_orders = set(), set()
+
+    for level_index, order_index in _pair_nearest(desired, live, price_tolerance):
+        matched_levels.add(level_index)
+        matched_orders.add(order_index)
+        level, amount, order = float(grid_levels[level_index]), float(amounts[level_index]), live_orders[order_index]
+        if abs(order_qty(order) - amount) > qty_tolerance * amount:
+            # Same price, new size: amend the quantity only
+            amended.append(GridLevelAction(level, amount, order, order_price(order)))
+        else:
+            keep.append(GridLevelAction(level, amount, order, order_price(order)))
+
+    unmatched_levels = [(index, level) for index, level in desired if index not in matched_levels]
+    unmatched_orders = [(index, order) for index, order in live if index not in matched_orders]
+
+    if amend:
+        for level_index, order_index in _pair_nearest(unmatched_levels, unmatched_orders):
+            matched_levels.add(level_index)
+            matched_orders.add(order_index)
+            level = float(grid_levels[level_index])
+            amended.append(GridLevelAction(level, float(amounts[level_index]), live_orders[order_index], level))
+
+    cancel = [order for index, order in live if index not in matched_orders]
+    if cancel_untagged and order_link_id_prefix is not None:
+        cancel.extend(order for order in open_orders if is_grid_order(order, side) and not is_grid_order(order, side, order_link_id_prefix))
+    for index, level in desired:
+        if index not in matched_levels:
+            create.append(GridLevelAction(level, float(amounts[index]), None, level))
+
+    return GridPlan(keep=keep, amend=amended, cancel=cancel, create=create)
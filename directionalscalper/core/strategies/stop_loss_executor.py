@@ -0,0 +1,224 @@
+import time
+import threading
+import traceback
+from collections import namedtuple
+
+from .logger import Logger
+
+logging = Logger(logger_name="StopLossExecutor", filename="StopLossExecutor.log", stream=True)
+
+# What the strategy loop sees of a stop; a fresh tuple per read, never mutated
+StopLossStatus = namedtuple('StopLossStatus', [
+    'symbol', 'side', 'state', 'qty', 'remaining', 'stop_price', 'order_id', 'attempts', 'started_at', 'updated_at', 'error'
+])
+
+ACTIVE_STATES = ('pending', 'working', 'market')
+FINISHED_STATES = ('done', 'failed')
+
+
+class StopLossExecutor:
+    """
+    Closes positions that hit their stop loss on a background thread.
+
+    ``trigger`` only registers the stop and returns at once, so the strategy loop
+    keeps managing grids and TPs meanwhile. The executor places a reduce-only limit
+    order at the stop price, re-prices it to the touch every ``reprice_after``
+    seconds while the position is still open, and switches to reduce-only market
+    orders once ``market_after`` seconds have passed. The loop polls ``status`` or
+    ``pop_finished``, both plain dict lookups.
+
+    ``arm_native`` additionally attaches the stop to the position on the exchange
+    (trading-stop endpoint), so it triggers even if the bot is down.
+    """
+
+    def __init__(self, exchange, get_position_qty, reprice_after=5, market_after=30, timeout=250, poll_interval=1.0, min_qty=0.00001):
+        self.exchange = exchange  # Our Exchange wrapper
+        self.get_position_qty = get_position_qty  # Callable (symbol, 'long'|'short') -> open quantity
+        self.reprice_after = reprice_after
+        self.market_after = market_after
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.min_qty = min_qty
+
+        self.jobs = {}
+        self.native_stops = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="StopLossExecutor", daemon=True)
+        self.thread.start()
+        logging.info("Stop loss executor started")
+
+    def stop(self):
+        self.running = False
+
+    # Strategy-facing API
+
+    def trigger(self, symbol, side, qty, stop_price, positionIdx):
+        """
+        Start closing ``qty`` of the ``side`` ('long' or 'short') position. A stop already
+        in progress for the same position is left alone.
+
+        :return: StopLossStatus of the (new or running) stop.
+        """
+        with self.lock:
+            job = self.jobs.get((symbol, side))
+            if job is None or job['state'] in FINISHED_STATES:
+                now = time.time()
+                job = {
+                    'symbol': symbol, 'side': side, 'state': 'pending', 'qty': qty, 'remaining': qty,
+                    'stop_price': stop_price, 'positionIdx': positionIdx, 'order_id': None, 'attempts': 0,
+                    'started_at': now, 'updated_at': now, 'placed_at': None, 'error': None,
+                }
+                self.jobs[(symbol, side)] = job
+                logging.info(f"[{symbol}] {side.capitalize()} stop loss triggered for {qty} at {stop_price}")
+            status = self._status(job)
+
+        if not self.running:
+            self.start()
+        return status
+
+    def status(self, symbol, side):
+        with self.lock:
+            job = self.jobs.get((symbol, side))
+            return self._status(job) if job else None
+
+    def is_active(self, symbol, side):
+        with self.lock:
+            job = self.jobs.get((symbol, side))
+            return job is not None and job['state'] in ACTIVE_STATES
+
+    def pop_finished(self, symbol, side):
+        """Status of a finished ('done' or 'failed') stop, removing it; None while none has finished."""
+        with self.lock:
+            job = self.jobs.get((symbol, side))
+            if job is None or job['state'] not in FINISHED_STATES:
+                return None
+            del self.jobs[(symbol, side)]
+            return self._status(job)
+
+    def arm_native(self, symbol, side, stop_price, positionIdx):
+        """Keep an exchange-side stop loss on the position at stop_price; only calls the exchange when the price changes."""
+        if self.native_stops.get((symbol, side)) == stop_price:
+            return
+        result = self.exchange.set_stop_loss_trading_stop_bybit(symbol, stop_price, positionIdx)
+        if result['status'] == 'set':
+            self.native_stops[(symbol, side)] = stop_price
+
+    def disarm_native(self, symbol, side):
+        """Forget the native stop of a closed position; Bybit drops a position's stop with the position."""
+        if self.native_stops.pop((symbol, side), None) is not None:
+            logging.info(f"[{symbol}] {side.capitalize()} position closed, native stop loss disarmed")
+
+    @staticmethod
+    def _status(job):
+        return StopLossStatus(job['symbol'], job['side'], job['state'], job['qty'], job['remaining'], job['stop_price'],
+                              job['order_id'], job['attempts'], job['started_at'], job['updated_at'], job['error'])
+
+    # Background work
+
+    def _run(self):
+        while self.running:
+            with self.lock:
+                jobs = [job for job in self.jobs.values() if job['state'] in ACTIVE_STATES]
+            for job in jobs:
+                try:
+                    self._step(job)
+                except Exception as e:
+                    logging.info(f"[{job['symbol']}] Error working {job['side']} stop loss: {e}")
+                    logging.info(traceback.format_exc())
+                    self._update(job, error=str(e))
+            time.sleep(self.poll_interval)
+
+    def _update(self, job, **fields):
+        with self.lock:
+            job.update(fields, updated_at=time.time())
+
+    def _step(self, job):
+        symbol, side = job['symbol'], job['side']
+        order_side = 'sell' if side == 'long' else 'buy'
+        now = time.time()
+
+        remaining = self.get_position_qty(symbol, side)
+        self._update(job, remaining=remaining)
+        if remaining <= self.min_qty:
+            logging.info(f"[{symbol}] {side.capitalize()} position closed by stop loss after {job['attempts']} attempts")
+            self._update(job, state='done')
+            return
+
+        if now - job['started_at'] > self.timeout:
+            logging.info(f"[{symbol}] {side.capitalize()} stop loss gave up after {self.timeout} seconds with {remaining} left")
+            if job['state'] == 'working' and job['order_id']:
+                # Leave no reduce-only order resting once the strategy takes the position back
+                self._cancel_live_order(job)
+            self._update(job, state='failed')
+            return
+
+        if job['state'] == 'pending' and now - (job['placed_at'] or 0) >= self.reprice_after:
+            order = self.exchange.create_limit_order_bybit(symbol, order_side, remaining, job['stop_price'], positionIdx=job['positionIdx'], params={'reduceOnly': True})
+            self._placed(job, order, 'working', job['stop_price'])
+        elif job['state'] == 'working' and now - job['started_at'] >= self.market_after:
+            # Out of patience: take whatever liquidity there is
+            if job['order_id']:
+                self.exchange.cancel_orders_by_id_bybit(symbol, [job['order_id']])
+            order = self.exchange.create_reduce_only_market_order_bybit(symbol, order_side, remaining, positionIdx=job['positionIdx'])
+            self._placed(job, order, 'market', None)
+        elif job['state'] == 'working' and now - (job['placed_at'] or 0) >= self.reprice_after:
+            self._reprice(job, order_side, remaining)
+        elif job['state'] == 'market' and now - (job['placed_at'] or 0) >= self.reprice_after:
+            # A market order that left something open (e.g. rejected for slippage) is simply repeated
+            order = self.exchange.create_reduce_only_market_order_bybit(symbol, order_side, remaining, positionIdx=job['positionIdx'])
+            self._placed(job, order, 'market', None)
+
+    def _cancel_live_order(self, job):
+        symbol = job['symbol']
+        try:
+            result = self.exchange.cancel_orders_by_id_bybit(symbol, [job['order_id']])[0]
+        except Exception as e:
+            result = {'status': 'failed', 'error': str(e)}
+        if result['status'] == 'canceled':
+            logging.info(f"[{symbol}] Cancelled {job['side']} stop loss order {job['order_id']}")
+            self._update(job, order_id=None)
+        else:
+            logging.info(f"[{symbol}] Failed to cancel {job['side']} stop loss order {job['order_id']}: {result['error']}")
+            self._update(job, error=result['error'])
+
+    def _reprice(self, job, order_side, remaining):
+        symbol = job['symbol']
+        price = self._touch_price(symbol, order_side)
+        if price is None:
+            return
+        if job['order_id']:
+            result = self.exchange.amend_orders_bybit(symbol, [{'id': job['order_id'], 'side': order_side, 'price': price, 'qty': remaining}])[0]
+            if result['status'] == 'amended':
+                logging.info(f"[{symbol}] Re-priced {job['side']} stop loss order {job['order_id']} to {price}")
+                self._update(job, attempts=job['attempts'] + 1, placed_at=time.time())
+                return
+        # No live order (rejected, filled in part and gone): place a fresh one at the touch
+        order = self.exchange.create_limit_order_bybit(symbol, order_side, remaining, price, positionIdx=job['positionIdx'], params={'reduceOnly': True})
+        self._placed(job, order, 'working', price)
+
+    def _touch_price(self, symbol, order_side):
+        """Best bid when selling, best ask when buying: crossing the spread gets the stop filled now."""
+        try:
+            book = self.exchange.get_orderbook_view(symbol)
+            if book is not None and book.is_valid():
+                return book.best_bid() if order_side == 'sell' else book.best_ask()
+        except Exception as e:
+            logging.info(f"[{symbol}] Order book unavailable for stop loss re-pricing: {e}")
+        return self.exchange.get_current_price(symbol)
+
+    def _placed(self, job, order, state, price):
+        order_id = order.get('id') if isinstance(order, dict) else None
+        if order_id is None:
+            error = order.get('error') if isinstance(order, dict) else "no response"
+            logging.info(f"[{job['symbol']}] {job['side'].capitalize()} stop loss order failed: {error}")
+            self._update(job, attempts=job['attempts'] + 1, placed_at=time.time(), error=error)
+            return
+        logging.info(f"[{job['symbol']}] {job['side'].capitalize()} stop loss order {order_id} placed ({state}) at {price if price is not None else 'market'}")
+        self._update(job, state=state, order_id=order_id, attempts=job['attempts'] + 1, placed_at=time.time(), error=None)
@@ -0,0 +1,146 @@
+import math
+import threading
+
+from .logger import Logger
+
+logging = Logger(logger_name="TakeProfitManager", filename="TakeProfitManager.log", stream=True)
+
+
+class TakeProfitManager:
+    """
+    Keeps one take-profit order per (symbol, order side) and moves it with amends.
+
+    The live TP order ID is tracked per (symbol, side). When the target price or
+    quantity changes, the order is amended in place, so the position is never
+    left without a TP. Cancel and create is only used when the amend is rejected
+    (e.g. the order filled or a post-only price would cross). With
+    ``trading_stop`` the TP is set on the position itself via the trading-stop
+    endpoint instead of a reduce-only limit order.
+
+    Prices and quantities are compared after rounding to the market's tick and lot
+    size, since the exchange rounds them the same way and the raw targets drift
+    in the last decimals between loops.
+    """
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.live_orders = {}  # (symbol, order_side) -> {'id', 'price', 'qty'}; id is None for a trading stop
+        self.lock = threading.Lock()
+
+    def get_live_order(self, symbol, order_side):
+        with self.lock:
+            return self.live_orders.get((symbol, order_side))
+
+    def forget(self, symbol, order_side=None):
+        """Drop tracked TP orders for a symbol, e.g. once its position is closed."""
+        with self.lock:
+            for key in list(self.live_orders.keys()):
+                if key[0] == symbol and (order_side is None or key[1] == order_side):
+                    del self.live_orders[key]
+
+    def _track(self, symbol, order_side, order_id, price, qty):
+        with self.lock:
+            if order_id is None:
+                self.live_orders.pop((symbol, order_side), None)
+            else:
+                self.live_orders[(symbol, order_side)] = {'id': order_id, 'price': price, 'qty': qty}
+
+    def _round(self, symbol, price, qty):
+        """Price and qty rounded the way the exchange will round them."""
+        client = self.exchange.exchange
+        try:
+            price = float(client.price_to_precision(symbol, price))
+        except Exception:
+            price = float(price)
+        try:
+            qty = float(client.amount_to_precision(symbol, qty))
+        except Exception:
+            qty = float(qty)
+        return price, qty
+
+    @staticmethod
+    def _same(a, b):
+        return a is not None and b is not None and math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+
+    def sync(self, symbol, order_side, qty, price, positionIdx, tp_orders, post_only=True, exclude_ids=(), trading_stop=False):
+        """
+        Make the TP for (symbol, order_side) a single order for ``qty`` at ``price``.
+
+        :param symbol: The symbol of the position.
+        :param order_side: 'sell' for a long position's TP, 'buy' for a short's.
+        :param qty: Position quantity the TP should close.
+        :param price: Target TP price.
+        :param positionIdx: 1 for the long side, 2 for the short side in hedge mode.
+        :param tp_orders: Open TP orders on this side as returned by get_open_tp_orders (id, qty, price).
+        :param post_only: Whether a newly created TP order should be post-only.
+        :param exclude_ids: Order IDs that are not TP orders of ours (e.g. auto-reduce orders) and are left alone.
+        :param trading_stop: Set the TP on the position with the trading-stop endpoint instead of a limit order.
+        :return: ID of the live TP order, or None if there is none (or the TP is a trading stop).
+        """
+        price, qty = self._round(symbol, price, qty)
+        tp_orders = [order for order in tp_orders if order['id'] not in exclude_ids]
+        tracked = self.get_live_order(symbol, order_side)
+
+        live = None
+        if tp_orders:
+            live = next((order for order in tp_orders if tracked and order['id'] == tracked['id']), tp_orders[0])
+
+        # One TP per side: anything besides the order we keep is cancelled
+        extras = [order['id'] for order in tp_orders if live is None or trading_stop or order['id'] != live['id']]
+        if extras:
+            self.exchange.cancel_orders_by_id_bybit(symbol, extras)
+            logging.info(f"Cancelled extra {order_side} TP orders for {symbol}: {extras}")
+
+        if trading_stop:
+            return self._set_trading_stop(symbol, order_side, qty, price, positionIdx, tracked)
+
+        if live is not None:
+            live_price, live_qty = self._round(symbol, live['price'], live['qty'])
+            if self._same(live_price, price) and self._same(live_qty, qty):
+                self._track(symbol, order_side, live['id'], price, qty)
+                return live['id']
+
+            amendment = {"id": live['id'], "side": order_side}
+            if not self._same(live_price, price):
+                amendment["price"] = price
+            if not self._same(live_qty, qty):
+                amendment["qty"] = qty
+            result = self.exchange.amend_orders_bybit(symbol, [amendment])[0]
+            if result['status'] == 'amended':
+                logging.info(f"Amended {order_side} TP order {live['id']} for {symbol} to {qty} at {price}")
+                self._track(symbol, order_side, live['id'], price, qty)
+                return live['id']
+
+            logging.info(f"Amend of {order_side} TP order {live['id']} for {symbol} rejected ({result['error']}), replacing it")
+            self.exchange.cancel_orders_by_id_bybit(symbol, [live['id']])
+
+        return self._create(symbol, order_side, qty, price, positionIdx, post_only)
+
+    def _set_trading_stop(self, symbol, order_side, qty, price, positionIdx, tracked):
+        # The position TP does not depend on qty, so only a new price needs a request
+        if tracked is not None and tracked['id'] is None and self._same(tracked['price'], price):
+            return None
+
+        result = self.exchange.set_take_profit_trading_stop_bybit(symbol, price, positionIdx)
+        with self.lock:
+            if result.get('status') == 'set':
+                self.live_orders[(symbol, order_side)] = {'id': None, 'price': price, 'qty': qty}
+            else:
+                # Forget the TP so the next sync tries again
+                logging.info(f"Failed to set {order_side} trading stop TP for {symbol} at {price}: {result.get('error')}")
+                self.live_orders.pop((symbol, order_side), None)
+        return None
+
+    def _create(self, symbol, order_side, qty, price, positionIdx, post_only):
+        if post_only:
+            order = self.exchange.create_take_profit_order_bybit(symbol, "limit", order_side, qty, price, positionIdx=positionIdx, reduce_only=True)
+        else:
+            order = self.exchange.create_normal_take_profit_order_bybit(symbol, "limit", order_side, qty, price, positionIdx=positionIdx, reduce_only=True)
+
+        order_id = order.get('id') if isinstance(order, dict) else None
+        if order_id is None:
+            logging.info(f"Failed to create {order_side} TP for {symbol}: {order.get('error') if isinstance(order, dict) else order}")
+        else:
+            logging.info(f"New {order_side.capitalize()} TP order {order_id} for {symbol}: {qty} at {price}")
+        self._track(symbol, order_side, order_id, price, qty)
+        return order_id
@@ -6,10 +6,13 @@ import logging
 import time
 import random
 from collections import OrderedDict
+from functools import partial
 from urllib.parse import urlencode
 
 import requests  # type: ignore
 
+from directionalscalper.core.http_client import http_client
+
 log = logging.getLogger(__name__)
 
 
@@ -60,24 +63,19 @@ def dispatch_request(
     signature: str = "",
     timestamp: int = -1,
 ):
-    session = requests.Session()
-    session.headers.update(
-        {
-            "Content-Type": "application/json;charset=utf-8",
-            "X-MBX-APIKEY": f"{key}",
-            "X-BAPI-API-KEY": f"{key}",
-            "X-BAPI-SIGN": f"{signature}",
-            "X-BAPI-SIGN-TYPE": "2",
-            "X-BAPI-TIMESTAMP": f"{timestamp}",
-            "X-BAPI-RECV-WINDOW": "5000",
-        }
-    )
-    return {
-        "GET": session.get,
-        "DELETE": session.delete,
-        "PUT": session.put,
-        "POST": session.post,
-    }.get(http_method, "GET")
+    # Signing headers go on the request, the pooled session is shared by every caller
+    headers = {
+        "Content-Type": "application/json;charset=utf-8",
+        "X-MBX-APIKEY": f"{key}",
+        "X-BAPI-API-KEY": f"{key}",
+        "X-BAPI-SIGN": f"{signature}",
+        "X-BAPI-SIGN-TYPE": "2",
+        "X-BAPI-TIMESTAMP": f"{timestamp}",
+        "X-BAPI-RECV-WINDOW": "5000",
+    }
+    if http_method not in ("GET", "DELETE", "PUT", "POST"):
+        http_method = "GET"
+    return partial(http_client.request, http_method, headers=headers)
 
 def send_public_request(
     url: str,
@@ -86,7 +84,7 @@ def send_public_request(
     payload: dict | None = None,
     json_in: dict | None = None,
     json_out: bool = True,
-    max_retries: int = 10000,
+    max_retries: int = 10,
     base_delay: float = 0.5  # base delay for exponential backoff
 ):
     if url_path is not None:
@@ -100,7 +98,7 @@ def send_public_request(
     attempt = 0
     while attempt < max_retries:
         try:
-            response = requests.request(method, url, json=json_in, timeout=30)
+            response = http_client.request(method, url, json=json_in)
             if not json_out:
                 return response.headers, response.text
 
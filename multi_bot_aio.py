@@ -1,6 +1,8 @@
 import sys
 import os
 import time
+import asyncio
+import functools
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from concurrent.futures import Future
 import threading
@@ -35,14 +37,22 @@ from live_table_manager import LiveTableManager, shared_symbols_data
 
 from directionalscalper.core.strategies.logger import Logger
 
-from rate_limit import RateLimit
+from rate_limit import rate_budget
+from retry_policy import retry_policy
+from directionalscalper.core.async_runtime import AsyncRuntime
+from directionalscalper.core.shard_pool import ShardPool
+from directionalscalper.core.exchanges.shared_market_data import SharedMarketDataPublisher, SharedMarketDataReader
 
 from collections import deque
 
-general_rate_limiter = RateLimit(50, 1)
-order_rate_limiter = RateLimit(5, 1) 
+general_rate_limiter = rate_budget.limiter('market_data')
+order_rate_limiter = rate_budget.limiter('order')
 
 thread_management_lock = threading.Lock()
+async_runtime = None  # Set when linear_grid.async_runtime is enabled; symbol sides then run as coroutines
+symbol_engine_mode = False  # linear_grid.symbol_engine: one engine per symbol trades both sides
+shard_pool = None  # Set when linear_grid.shard_workers > 0; symbol sides then run in worker processes
+market_data_publisher = None  # Shares this process's candles, order books and account state with the shard workers
 thread_to_symbol = {}
 thread_to_symbol_lock = threading.Lock()
 active_symbols = set()
@@ -198,6 +208,9 @@ class DirectionalMarketMaker:
         else:
             self.exchange = exchange_class(api_key, secret_key, passphrase)
 
+        self.exchange.use_feature_engine = config.bot.linear_grid.get('incremental_features', False)
+        self.engines = {}  # symbol -> strategy trading both sides of it (action "both")
+
     def run_strategy(self, symbol, strategy_name, config, account_name, symbols_to_trade=None, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
         logging.info(f"Received rotator symbols in run_strategy for {symbol}: {rotator_symbols_standardized}")
         
@@ -213,14 +226,8 @@ class DirectionalMarketMaker:
             except Exception as e:
                 logging.error(f"Error in printing info: {e}")
 
-        strategy_classes = {
-            'qstrendobdynamictp': gridbased.BybitQuickScalpTrendDynamicTP,
-            'qsgridob': gridbased.LinearGridBaseFutures
-        }
-
-        strategy_class = strategy_classes.get(strategy_name.lower())
-        if strategy_class:
-            strategy = strategy_class(self.exchange, self.manager, config.bot, symbols_allowed)
+        strategy = self.build_strategy(strategy_name, config, symbols_allowed)
+        if strategy is not None:
             try:
                 logging.info(f"Running strategy for symbol {symbol} with action {action}")
                 if action == "long":
@@ -231,6 +238,10 @@ class DirectionalMarketMaker:
                     future_short = Future()
                     Thread(target=self.run_with_future, args=(strategy, symbol, rotator_symbols_standardized, mfirsi_signal, "short", future_short)).start()
                     return future_short
+                elif action == "both":
+                    future_both = Future()
+                    Thread(target=self.run_with_future, args=(strategy, symbol, rotator_symbols_standardized, mfirsi_signal, "both", future_both)).start()
+                    return future_both
                 else:
                     future = Future()
                     future.set_result(True)
@@ -246,12 +257,40 @@ class DirectionalMarketMaker:
             return future
 
 
+    def build_strategy(self, strategy_name, config, symbols_allowed):
+        strategy_classes = {
+            'qstrendobdynamictp': gridbased.BybitQuickScalpTrendDynamicTP,
+            'qsgridob': gridbased.LinearGridBaseFutures
+        }
+
+        strategy_class = strategy_classes.get(strategy_name.lower())
+        if strategy_class is None:
+            return None
+        return strategy_class(self.exchange, self.manager, config.bot, symbols_allowed)
+
     def run_with_future(self, strategy, symbol, rotator_symbols_standardized, mfirsi_signal, action, future):
+        if action == "both":
+            self.register_engine(symbol, strategy)
         try:
             strategy.run(symbol, rotator_symbols_standardized=rotator_symbols_standardized, mfirsi_signal=mfirsi_signal, action=action)
             future.set_result(True)
         except Exception as e:
             future.set_exception(e)
+        finally:
+            self.unregister_engine(symbol, strategy)
+
+    def register_engine(self, symbol, strategy):
+        self.engines[symbol] = strategy
+
+    def unregister_engine(self, symbol, strategy):
+        if self.engines.get(symbol) is strategy:
+            del self.engines[symbol]
+
+    def update_engine_graceful_stops(self, graceful_stop_long, graceful_stop_short):
+        """Pass rotation's per-side graceful stop to the engines trading both sides of a symbol."""
+        for strategy in list(self.engines.values()):
+            if hasattr(strategy, 'set_graceful_stop'):
+                strategy.set_graceful_stop(graceful_stop_long, graceful_stop_short)
 
     def get_balance(self, quote, market_type=None, sub_type=None):
         if self.exchange_name == 'bitget':
@@ -337,6 +376,41 @@ class DirectionalMarketMaker:
         with general_rate_limiter:
             return self.exchange.generate_l_signals(symbol)
 
+    def screen_signals(self, symbols, max_workers=8):
+        """
+        Compute entry signals for a batch of symbols concurrently.
+
+        Candle fetches share the exchange and general rate limiters, so the batch
+        runs as fast as the rate budget allows instead of one symbol at a time.
+
+        :return: List of {'symbol', 'signal', 'strength'} dicts, actionable signals first,
+                 strongest Lorentzian vote first within each group.
+        """
+        results = []
+
+        def screen(symbol):
+            # The signal getters take their own general_rate_limiter token
+            if self.entry_signal_type == 'lorentzian':
+                with general_rate_limiter:
+                    signal, prediction = self.exchange.generate_l_signals(symbol, with_prediction=True)
+                logging.info(f"Generated signal for {symbol}: {signal}")
+                return signal, abs(prediction)
+            return self.get_signal(symbol), 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(screen, symbol): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    signal, strength = future.result()
+                except Exception as e:
+                    logging.info(f"Signal screening failed for {symbol}: {e}")
+                    signal, strength = "neutral", 0
+                results.append({'symbol': symbol, 'signal': signal, 'strength': strength})
+
+        results.sort(key=lambda row: (row['signal'] == "neutral", -row['strength']))
+        return results
+
     def get_mfirsi_signal(self, symbol):
         # Retrieve the MFI/RSI signal
         with general_rate_limiter:
@@ -402,7 +476,7 @@ def run_bot(symbol, args, market_maker, manager, account_name, symbols_allowed,
         try:
             if not orders_canceled and hasattr(market_maker.exchange, 'cancel_all_open_orders_bybit'):
                 market_maker.exchange.cancel_all_open_orders_bybit()
-                logging.info(f"Cleared all open orders on the exchange upon initialization.")
+                logging.info("Cleared all open orders on the exchange upon initialization.")
                 orders_canceled = True
         except Exception as e:
             logging.error(f"Exception caught while cancelling orders: {e}")
@@ -431,6 +505,189 @@ def run_bot(symbol, args, market_maker, manager, account_name, symbols_allowed,
         logging.info(f"Thread for symbol {symbol} with action {action} has completed.")
         thread_completed.set()
 
+async def run_bot_async(symbol, args, market_maker, manager, account_name, symbols_allowed, rotator_symbols_standardized, mfirsi_signal, action):
+    """
+    Coroutine counterpart of run_bot for the asyncio runtime.
+
+    Blocking setup runs on the runtime's worker pool and the strategy is driven through
+    its run_steps generator, so the symbol side holds no thread while it waits. Cancelling
+    the task (remove_thread_for_symbol) stops it at its next pause.
+    """
+    global orders_canceled, unique_active_symbols, active_long_symbols, active_short_symbols
+    current_task = asyncio.current_task()
+    try:
+        if not args.config.startswith('configs/'):
+            config_file_path = Path('configs/' + args.config)
+        else:
+            config_file_path = Path(args.config)
+
+        logging.info(f"Loading config from: {config_file_path}")
+
+        account_file_path = Path('configs/account.json')
+        config = await async_runtime.run_blocking(load_config, config_file_path, account_file_path)
+
+        logging.info(f"Trading symbol: {symbol} ({action}) on the async runtime")
+
+        market_maker.manager = manager
+
+        await rate_budget.acquire_async('market_data')
+        open_position_data = await async_runtime.run_blocking(getattr(manager.exchange, f"get_all_open_positions_{args.exchange.lower()}"))
+        open_position_symbols = {standardize_symbol(pos['symbol']) for pos in open_position_data}
+
+        current_long_positions = [standardize_symbol(pos['symbol']) for pos in open_position_data if pos['side'].lower() == 'long']
+        current_short_positions = [standardize_symbol(pos['symbol']) for pos in open_position_data if pos['side'].lower() == 'short']
+
+        with thread_to_symbol_lock:
+            is_open_position = symbol in open_position_symbols
+            if not is_open_position and len(unique_active_symbols) >= symbols_allowed and symbol not in unique_active_symbols:
+                logging.info(f"Symbols allowed limit reached. Skipping new symbol {symbol}.")
+                return
+
+            thread_to_symbol[current_task] = symbol
+            active_symbols.add(symbol)
+            unique_active_symbols.add(symbol)
+            if action == "long" or symbol in current_long_positions:
+                active_long_symbols.add(symbol)
+            elif action == "short" or symbol in current_short_positions:
+                active_short_symbols.add(symbol)
+
+        try:
+            if not orders_canceled and hasattr(market_maker.exchange, 'cancel_all_open_orders_bybit'):
+                orders_canceled = True
+                await async_runtime.run_blocking(market_maker.exchange.cancel_all_open_orders_bybit)
+                logging.info("Cleared all open orders on the exchange upon initialization.")
+        except Exception as e:
+            logging.error(f"Exception caught while cancelling orders: {e}")
+
+        await asyncio.sleep(2)
+
+        await rate_budget.acquire_async('market_data')
+        signal = await async_runtime.run_blocking(market_maker.get_signal, symbol)
+        strategy = await async_runtime.run_blocking(market_maker.build_strategy, args.strategy, config, symbols_allowed)
+        if strategy is None:
+            logging.error(f"Strategy {args.strategy} not found.")
+            return
+
+        logging.info(f"Running strategy for symbol {symbol} with action {action}")
+        if action == "both":
+            market_maker.register_engine(symbol, strategy)
+        try:
+            if hasattr(strategy, 'run_steps'):
+                await async_runtime.drive_steps(strategy.run_steps(symbol, rotator_symbols_standardized=latest_rotator_symbols, mfirsi_signal=signal, action=action))
+            else:
+                # Strategies without run_steps keep one worker for as long as they run
+                await async_runtime.run_blocking(functools.partial(strategy.run, symbol, rotator_symbols_standardized=latest_rotator_symbols, mfirsi_signal=signal, action=action))
+        finally:
+            market_maker.unregister_engine(symbol, strategy)
+
+    except Exception as e:
+        logging.info(f"An error occurred in run_bot_async for symbol {symbol}: {e}")
+        logging.info(traceback.format_exc())
+    finally:
+        with thread_to_symbol_lock:
+            thread_to_symbol.pop(current_task, None)
+            active_symbols.discard(symbol)
+            unique_active_symbols.discard(symbol)
+            active_long_symbols.discard(symbol)
+            active_short_symbols.discard(symbol)
+        logging.info(f"Task for symbol {symbol} with action {action} has completed.")
+
+def setup_shard_worker(shard_id, status_queue, args, namespace, num_shards):
+    """
+    Build the exchange and strategies of a shard worker process (see ShardPool).
+
+    The worker opens no websocket feed and runs no account refresh of its own: candles,
+    order books and the account snapshot come from the coordinator's shared memory,
+    and REST is only used for what is not published there. Its rate budget is one
+    share of the account's, the coordinator keeping another.
+
+    :return: run_side(symbol, action, stop_event, rotator_symbols) for the worker's side threads.
+    """
+    config_file_path = Path('configs/' + args.config) if not args.config.startswith('configs/') else Path(args.config)
+    account_file_path = Path('configs/account.json')
+    config = load_config(config_file_path, account_file_path)
+    config.bot.linear_grid['websocket_feed'] = False
+
+    rate_budget.scale(1 / (num_shards + 1))
+
+    market_maker = DirectionalMarketMaker(config, args.exchange, args.account_name)
+    manager = Manager(
+        market_maker.exchange,
+        exchange_name=args.exchange,
+        data_source_exchange=config.api.data_source_exchange,
+        api=config.api.mode,
+        path=Path("data", config.api.filename),
+        url=f"{config.api.url}{config.api.filename}"
+    )
+    market_maker.manager = manager
+
+    reader = SharedMarketDataReader(namespace, request_series=lambda symbol, timeframe, limit: status_queue.put(('series', shard_id, symbol, timeframe, limit)),
+                                    report_symbols_data=lambda rows: status_queue.put(('symbols_data', shard_id, rows)))
+    reader.attach(market_maker.exchange)
+    # The dashboard runs in the coordinator; the strategies here fill this process's copy of shared_symbols_data
+    reader.share_symbols_data(shared_symbols_data)
+
+    for exch in config.exchanges:
+        if exch.name == args.exchange and exch.account_name == args.account_name:
+            symbols_allowed = exch.symbols_allowed
+            break
+    else:
+        symbols_allowed = 10
+
+    def run_side(symbol, action, stop_event, rotator_symbols=None):
+        with general_rate_limiter:
+            signal = market_maker.get_signal(symbol)
+        strategy = market_maker.build_strategy(args.strategy, config, symbols_allowed)
+        if strategy is None:
+            logging.error(f"Strategy {args.strategy} not found.")
+            return
+
+        logging.info(f"Running strategy for symbol {symbol} with action {action} on shard {shard_id}")
+        if hasattr(strategy, 'run_steps'):
+            steps = strategy.run_steps(symbol, rotator_symbols_standardized=rotator_symbols, mfirsi_signal=signal, action=action)
+            try:
+                for delay in steps:
+                    if stop_event.wait(delay):
+                        break
+            finally:
+                steps.close()
+        else:
+            strategy.run(symbol, rotator_symbols_standardized=rotator_symbols, mfirsi_signal=signal, action=action)
+
+    logging.info(f"Shard {shard_id} ready")
+    return run_side
+
+shard_symbols = {}  # shard_id -> symbols whose dashboard rows came from that shard
+
+def handle_shard_message(message):
+    if message[0] == 'series':
+        _, shard_id, symbol, timeframe, limit = message
+        market_data_publisher.request_series(symbol, timeframe, limit)
+    elif message[0] == 'symbols_data':
+        _, shard_id, rows = message
+        # Each report is the shard's full set, so rows it no longer has were dropped by its strategies
+        for symbol in shard_symbols.get(shard_id, set()) - set(rows):
+            shared_symbols_data.pop(symbol, None)
+        shared_symbols_data.update(rows)
+        shard_symbols[shard_id] = set(rows)
+
+def report_failed_shard(shard_id, error):
+    """Coordinator side of a shard worker the pool gave up on; its sides move to the remaining shards."""
+    logging.error(f"Shard worker {shard_id} keeps failing and was stopped: {error}")
+    if len(shard_pool.failed) == shard_pool.num_shards:
+        logging.error("Every shard worker failed, no symbol sides can be started until the bot is restarted")
+
+def finish_sharded_side(symbol, action):
+    """Coordinator bookkeeping once a shard worker reports a side finished, as run_bot does on exit."""
+    with thread_to_symbol_lock:
+        active_symbols.discard(symbol)
+        unique_active_symbols.discard(symbol)
+        active_long_symbols.discard(symbol)
+        active_short_symbols.discard(symbol)
+    if not any(symbol in threads and threads[symbol][0].is_alive() for threads in (long_threads, short_threads)):
+        market_data_publisher.remove_symbol(symbol)
+    logging.info(f"Shard side for symbol {symbol} with action {action} has completed.")
+
 def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
     global latest_rotator_symbols, long_threads, short_threads, active_symbols, active_long_symbols, active_short_symbols, last_rotator_update_time, unique_active_symbols
 
@@ -456,6 +713,7 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
     config_auto_graceful_stop = config.bot.linear_grid.get('auto_graceful_stop', False)
     target_coins_mode = config.bot.linear_grid.get('target_coins_mode', False)
     whitelist = set(config.bot.whitelist) if target_coins_mode else None
+    signal_screening_workers = config.bot.linear_grid.get('signal_screening_workers', 8)
 
     logging.info(f"Target coins mode is {'enabled' if target_coins_mode else 'disabled'}")
 
@@ -519,12 +777,21 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
                 else:
                     logging.info(f"GS Auto Check: Current short positions: {current_short_positions}, Unique active symbols: {len(unique_active_symbols)}. Graceful stop short: {graceful_stop_short}")
 
+            if symbol_engine_mode:
+                market_maker.update_engine_graceful_stops(graceful_stop_long, graceful_stop_short)
+
             if not latest_rotator_symbols or current_time - last_rotator_update_time >= 60:
                 with general_rate_limiter:
                     latest_rotator_symbols = fetch_updated_symbols(args, manager, whitelist)
                 last_rotator_update_time = current_time
                 processed_symbols.clear()
                 logging.info(f"Refreshed latest rotator symbols: {latest_rotator_symbols}")
+                logging.info(f"Rate limiter wait metrics: {rate_budget.metrics()}")
+                logging.info(f"Retry policy metrics: {retry_policy.metrics()}")
+                if async_runtime is not None:
+                    logging.info(f"Async runtime metrics: {async_runtime.metrics()}")
+                if shard_pool is not None:
+                    logging.info(f"Shard pool metrics: {shard_pool.metrics()}, shared market data: {market_data_publisher.metrics()}")
             else:
                 logging.debug(f"No refresh needed yet. Last update was at {last_rotator_update_time}, less than 60 seconds ago.")
 
@@ -611,22 +878,35 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
                     logging.info(f"Unique active symbols are less than allowed, processing symbols from {'whitelist' if target_coins_mode else 'latest_rotator symbols'}")
                     logging.info(f"Symbols to process: {symbols_to_process}")
 
-                    for symbol in symbols_to_process:
-                        if symbol not in processed_symbols and symbol not in unique_active_symbols:
+                    can_open_long = len(active_long_symbols) < symbols_allowed and not graceful_stop_long
+                    can_open_short = len(active_short_symbols) < symbols_allowed and not graceful_stop_short
+
+                    candidate_symbols = [symbol for symbol in symbols_to_process if symbol not in processed_symbols and symbol not in unique_active_symbols]
+
+                    if candidate_symbols and ((can_open_long and long_mode) or (can_open_short and short_mode)):
+                        # Screen the whole candidate set at once, then act on the strongest signals first
+                        signal_table = market_maker.screen_signals(candidate_symbols, max_workers=signal_screening_workers)
+                        logging.info(f"Screened signals: {[(row['symbol'], row['signal'], row['strength']) for row in signal_table]}")
+
+                        for row in signal_table:
+                            symbol = row['symbol']
                             if len(unique_active_symbols) >= symbols_allowed:
-                                logging.info(f"Reached symbols_allowed limit. Stopping processing of new symbols.")
+                                logging.info("Reached symbols_allowed limit. Stopping processing of new symbols.")
                                 break
 
+                            processed_symbols.add(symbol)
+                            if row['signal'] == "neutral":
+                                continue
+
                             can_open_long = len(active_long_symbols) < symbols_allowed and not graceful_stop_long
                             can_open_short = len(active_short_symbols) < symbols_allowed and not graceful_stop_short
 
                             if (can_open_long and long_mode) or (can_open_short and short_mode):
-                                signal_futures.append(signal_executor.submit(process_signal, symbol, args, market_maker, manager, symbols_allowed, open_position_data, False, can_open_long, can_open_short, graceful_stop_long, graceful_stop_short))
-                                logging.info(f"Submitted signal processing for new symbol {symbol}.")
-                                processed_symbols.add(symbol)
+                                signal_futures.append(signal_executor.submit(process_signal, symbol, args, market_maker, manager, symbols_allowed, open_position_data, False, can_open_long, can_open_short, graceful_stop_long, graceful_stop_short, row['signal']))
+                                logging.info(f"Submitted signal processing for new symbol {symbol} with signal {row['signal']}.")
                                 time.sleep(2)
                 else:
-                    logging.info(f"Unique active symbols are at or above the allowed limit, not processing new symbols")
+                    logging.info("Unique active symbols are at or above the allowed limit, not processing new symbols")
 
                 process_futures(open_position_futures + signal_futures)
 
@@ -763,9 +1043,10 @@ def process_signal_for_open_position(symbol, args, market_maker, manager, symbol
     else:
         logging.info(f"No action taken for open position symbol {symbol}.")
 
-def process_signal(symbol, args, market_maker, manager, symbols_allowed, open_position_data, is_open_position, long_mode, short_mode, graceful_stop_long, graceful_stop_short):
+def process_signal(symbol, args, market_maker, manager, symbols_allowed, open_position_data, is_open_position, long_mode, short_mode, graceful_stop_long, graceful_stop_short, signal=None):
     market_maker.manager = manager
-    signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
+    if signal is None:
+        signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
 
     if signal == "neutral":  # Check for neutral signal
         logging.info(f"Skipping signal processing for {symbol} due to neutral signal.")
@@ -1055,7 +1336,11 @@ def remove_thread_for_symbol(symbol):
         return
 
     if thread:
-        thread_completed.set()
+        if hasattr(thread, 'cancel'):
+            # Async runtime task or shard side: stopped at its next pause
+            thread.cancel()
+        else:
+            thread_completed.set()
         thread.join()
         logging.info(f"Removed thread for symbol {symbol}.")
 
@@ -1119,37 +1404,80 @@ def start_thread_for_open_symbol(symbol, args, manager, mfirsi_signal, has_open_
     
     return action_taken
 
-def start_thread_for_symbol(symbol, args, manager, mfirsi_signal, action, has_open_long, has_open_short):
-    global unique_active_symbols, long_threads, short_threads, active_long_symbols, active_short_symbols, active_symbols
-    
+def resolve_thread_action(symbol, action, has_open_long, has_open_short):
+    """
+    The side a new thread for ``symbol`` should trade, or None when none should start.
+
+    :param action: The signal's action: "long", "short" or "neutral".
+    :return: "long", "short", "both" for a symbol engine, or None.
+    """
+    # One engine per symbol: it trades both sides, so a running engine covers either action
+    if symbol_engine_mode:
+        if any(symbol in threads and threads[symbol][0].is_alive() for threads in (long_threads, short_threads)):
+            logging.info(f"Engine already running for symbol {symbol}. Skipping.")
+            return None
+        if action == "neutral" and not (has_open_long or has_open_short):
+            logging.info(f"No engine started for symbol {symbol} with neutral signal.")
+            return None
+        return "both"
+
     # Check if a long thread is already running for this symbol
     if action == "long":
         if symbol in long_threads and long_threads[symbol][0].is_alive():
             logging.info(f"Long thread already running for symbol {symbol}. Skipping.")
-            return False
+            return None
 
     # Check if a short thread is already running for this symbol
     elif action == "short":
         if symbol in short_threads and short_threads[symbol][0].is_alive():
             logging.info(f"Short thread already running for symbol {symbol}. Skipping.")
-            return False
+            return None
 
     # Handle neutral signals explicitly (threads for neutral signals should manage open positions)
     elif action == "neutral":
         logging.info(f"Handling neutral signal for {symbol}, managing open positions.")
         if not (symbol in long_threads and long_threads[symbol][0].is_alive()) and has_open_long:
             logging.info(f"Starting long thread for symbol {symbol} based on neutral signal.")
-            action = "long"
-        elif not (symbol in short_threads and short_threads[symbol][0].is_alive()) and has_open_short:
+            return "long"
+        if not (symbol in short_threads and short_threads[symbol][0].is_alive()) and has_open_short:
             logging.info(f"Starting short thread for symbol {symbol} based on neutral signal.")
-            action = "short"
-        else:
-            logging.info(f"No thread started for symbol {symbol} with neutral signal.")
-            return False
+            return "short"
+        logging.info(f"No thread started for symbol {symbol} with neutral signal.")
+        return None
+
+    return action
+
+def create_symbol_thread(symbol, args, manager, mfirsi_signal, action):
+    """
+    A thread running the bot for ``symbol``, or its coroutine on the async runtime or side on a shard.
 
-    # Initialize thread and event
+    :return: (thread, thread_completed), or (None, None) when no shard can take the symbol.
+    """
+    if async_runtime is not None:
+        thread = async_runtime.submit((symbol, action), run_bot_async, symbol, args, market_maker, manager, args.account_name, symbols_allowed, latest_rotator_symbols, mfirsi_signal, action)
+        return thread, thread.completed
+    if shard_pool is not None:
+        market_data_publisher.add_symbol(symbol)
+        thread = shard_pool.submit((symbol, action), rotator_symbols=latest_rotator_symbols)
+        if thread is None:
+            return None, None
+        return thread, thread.completed
     thread_completed = threading.Event()
     thread = threading.Thread(target=run_bot, args=(symbol, args, market_maker, manager, args.account_name, symbols_allowed, latest_rotator_symbols, thread_completed, mfirsi_signal, action))
+    return thread, thread_completed
+
+def start_thread_for_symbol(symbol, args, manager, mfirsi_signal, action, has_open_long, has_open_short):
+    global unique_active_symbols, long_threads, short_threads, active_long_symbols, active_short_symbols, active_symbols
+    signal_action = action
+
+    action = resolve_thread_action(symbol, action, has_open_long, has_open_short)
+    if action is None:
+        return False
+
+    # Initialize thread and event, or a coroutine on the async runtime
+    thread, thread_completed = create_symbol_thread(symbol, args, manager, mfirsi_signal, action)
+    if thread is None:
+        return False
 
     # Add thread to the appropriate dictionary
     if action == "long":
@@ -1158,11 +1486,18 @@ def start_thread_for_symbol(symbol, args, manager, mfirsi_signal, action, has_op
     elif action == "short":
         short_threads[symbol] = (thread, thread_completed)
         active_short_symbols.add(symbol)
+    elif action == "both":
+        long_threads[symbol] = short_threads[symbol] = (thread, thread_completed)
+        if signal_action == "long" or has_open_long:
+            active_long_symbols.add(symbol)
+        if signal_action == "short" or has_open_short:
+            active_short_symbols.add(symbol)
 
     # Start thread and log the action
     active_symbols.add(symbol)
     unique_active_symbols.add(symbol)
-    thread.start()
+    if async_runtime is None and shard_pool is None:
+        thread.start()
     logging.info(f"Started thread for symbol {symbol} with action {action} based on MFIRSI signal.")
     return True
 
@@ -1171,7 +1506,7 @@ def fetch_updated_symbols(args, manager, whitelist=None):
     
     # Check if the cached data is still valid
     if current_time - rotator_symbols_cache['timestamp'] < CACHE_DURATION:
-        logging.info(f"Using cached rotator symbols")
+        logging.info("Using cached rotator symbols")
         return rotator_symbols_cache['symbols']
     
     # Fetch new data if cache is expired
@@ -1301,7 +1636,7 @@ if __name__ == '__main__':
         config = load_config(config_file_path, account_path)
     except Exception as e:
         logging.error(f"Failed to load configuration: {str(e)}")
-        logging.error(f"There is probably an issue with your path try using --config configs/config.json")
+        logging.error("There is probably an issue with your path try using --config configs/config.json")
         sys.exit(1)
 
     exchange_name = args.exchange
@@ -1328,13 +1663,38 @@ if __name__ == '__main__':
 
     for exch in config.exchanges:
         if exch.name == exchange_name and exch.account_name == args.account_name:
-            logging.info(f"Symbols allowed changed to symbols_allowed from config")
+            logging.info("Symbols allowed changed to symbols_allowed from config")
             symbols_allowed = exch.symbols_allowed
             break
     else:
-        logging.info(f"Symbols allowed defaulted to 10")
+        logging.info("Symbols allowed defaulted to 10")
         symbols_allowed = 10
 
+    symbol_engine_mode = config.bot.linear_grid.get('symbol_engine', False)
+    if symbol_engine_mode:
+        logging.info("Running one engine per symbol for both sides")
+
+    if config.bot.linear_grid.get('async_runtime', False):
+        async_runtime = AsyncRuntime(market_maker.exchange, max_workers=config.bot.linear_grid.get('async_runtime_workers', 16))
+        async_runtime.start()
+        logging.info("Running symbol sides as coroutines on the async runtime")
+    elif config.bot.linear_grid.get('shard_workers', 0) > 0:
+        shard_workers = config.bot.linear_grid['shard_workers']
+        # This process keeps rotation, the websocket feed and account state; the workers run the strategies
+        rate_budget.scale(1 / (shard_workers + 1))
+        if config.bot.linear_grid.get('websocket_feed', False) and hasattr(market_maker.exchange, 'get_market_feed'):
+            market_maker.exchange.get_market_feed()
+        market_data_publisher = SharedMarketDataPublisher(market_maker.exchange)
+        market_data_publisher.start()
+        shard_pool = ShardPool(shard_workers, setup_shard_worker, (args, market_data_publisher.namespace, shard_workers),
+                               on_message=handle_shard_message, on_finished=finish_sharded_side, on_failed=report_failed_shard)
+        shard_pool.start()
+        if hasattr(market_maker.exchange, 'cancel_all_open_orders_bybit'):
+            market_maker.exchange.cancel_all_open_orders_bybit()
+            orders_canceled = True
+            logging.info("Cleared all open orders on the exchange upon initialization.")
+        logging.info(f"Running symbol sides in {shard_workers} shard worker processes")
+
     table_manager = LiveTableManager()
     display_thread = threading.Thread(target=table_manager.display_table)
     display_thread.daemon = True
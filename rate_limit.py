@@ -1,26 +1,223 @@
 import time
+import asyncio
 import threading
 from pathlib import Path
 from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-class RateLimit:
+# Bybit v5 request budgets as (tokens per second, burst capacity).
+# 'ip' is the per-IP ceiling (600 requests per 5 seconds) that every category also draws from.
+# 'order' covers create/amend/cancel, 'order_query' the open order reads, 'position' the position
+# list and leverage, 'account' the wallet balance, 'market_data' the public endpoints
+# (klines, tickers, order books).
+BYBIT_RATE_LIMITS = {
+    'ip': (120, 600),
+    'order': (10, 10),
+    'order_query': (50, 50),
+    'position': (50, 50),
+    'account': (50, 50),
+    'market_data': (50, 50),
+}
+
+# Cost of one REST call as (category, tokens per unit). Bybit counts a batch request once per
+# order it carries and serves at most 1000 klines per request, so callers pass the number of
+# orders or pages as the unit count.
+BYBIT_ENDPOINT_WEIGHTS = {
+    'fetch_ohlcv': ('market_data', 1),  # per 1000-bar page
+    'fetch_order_book': ('market_data', 1),
+    'fetch_ticker': ('market_data', 1),
+    'fetch_tickers': ('market_data', 5),  # the whole linear category in one response
+    'load_markets': ('market_data', 10),  # instruments info for every category, paged
+    'fetch_open_orders': ('order_query', 1),
+    'fetch_positions': ('position', 1),
+    'fetch_balance': ('account', 1),
+    'create_order': ('order', 1),
+    'edit_order': ('order', 1),
+    'cancel_order': ('order', 1),
+    'cancel_all_orders': ('order', 1),
+    'trading_stop': ('order', 1),
+    'create_orders': ('order', 1),  # per order in the batch
+    'amend_orders': ('order', 1),  # per order in the batch
+    'cancel_orders': ('order', 1),  # per order in the batch
+}
+
+KLINE_PAGE_SIZE = 1000
+
+
+class TokenBucket:
+    """
+    Weighted token bucket with FIFO reservations.
+
+    A caller takes its tokens immediately (the balance may go negative) and is
+    told how long to wait for the debt to be repaid, so the lock is only held for
+    the bookkeeping and callers are served strictly in arrival order. Usable as
+    a context manager from threads (``with``) or coroutines (``async with``).
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+        self.calls = 0
+        self.waited_calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def reserve(self, weight=1):
+        """Take ``weight`` tokens and return the number of seconds to wait before proceeding."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= weight
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            self._record(wait)
+            return wait
+
+    def _record(self, wait):
+        self.calls += 1
+        if wait > 0:
+            self.waited_calls += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def acquire(self, weight=1):
+        wait = self.reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, weight=1):
+        wait = self.reserve(weight)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def metrics(self):
+        with self.lock:
+            return {
+                'calls': self.calls,
+                'waited_calls': self.waited_calls,
+                'total_wait': round(self.total_wait, 3),
+                'avg_wait': round(self.total_wait / self.calls, 4) if self.calls else 0.0,
+                'max_wait': round(self.max_wait, 3),
+            }
+
+    def __enter__(self):
+        self.acquire()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def __aenter__(self):
+        await self.acquire_async()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class RateLimit(TokenBucket):
+    """Allow ``calls`` requests per ``period`` seconds. Kept for existing callers."""
+
     def __init__(self, calls, period):
-        self.calls = calls
+        super().__init__(calls / period, calls)
+        self.calls_allowed = calls
         self.period = period
-        self.lock = threading.Lock()
-        self.call_times = deque()
+
+
+class CategoryLimiter:
+    """Context manager drawing ``weight`` tokens from one category of a RateBudget."""
+
+    def __init__(self, budget, category, weight=1):
+        self.budget = budget
+        self.category = category
+        self.weight = weight
+
+    def acquire(self, weight=None):
+        self.budget.acquire(self.category, self.weight if weight is None else weight)
+
+    async def acquire_async(self, weight=None):
+        await self.budget.acquire_async(self.category, self.weight if weight is None else weight)
 
     def __enter__(self):
-        with self.lock:
-            now = time.time()
-            while self.call_times and now - self.call_times[0] > self.period:
-                self.call_times.popleft()
-            if len(self.call_times) >= self.calls:
-                time_to_wait = self.period - (now - self.call_times[0])
-                if time_to_wait > 0:
-                    time.sleep(time_to_wait)
-            self.call_times.append(now)
+        self.acquire()
 
     def __exit__(self, exc_type, exc_value, traceback):
         pass
+
+    async def __aenter__(self):
+        await self.acquire_async()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class RateBudget:
+    """
+    Process-wide set of per-category token buckets sharing a global IP bucket.
+
+    Exchanges, strategies and the bot runner all draw from the same buckets, so the
+    combined request rate stays inside the exchange limits no matter how many
+    symbol threads are running.
+    """
+
+    def __init__(self, limits=None, global_category='ip', endpoint_weights=None):
+        limits = limits or BYBIT_RATE_LIMITS
+        self.global_category = global_category
+        self.endpoint_weights = endpoint_weights or BYBIT_ENDPOINT_WEIGHTS
+        self.buckets = {category: TokenBucket(rate, capacity) for category, (rate, capacity) in limits.items()}
+
+    def _reserve(self, category, weight):
+        if category not in self.buckets:
+            raise ValueError(f"Unknown rate limit category: {category}")
+        wait = self.buckets[category].reserve(weight)
+        if self.global_category in self.buckets and category != self.global_category:
+            wait = max(wait, self.buckets[self.global_category].reserve(weight))
+        return wait
+
+    def acquire(self, category, weight=1):
+        wait = self._reserve(category, weight)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, category, weight=1):
+        wait = self._reserve(category, weight)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def limiter(self, category, weight=1):
+        if category not in self.buckets:
+            raise ValueError(f"Unknown rate limit category: {category}")
+        return CategoryLimiter(self, category, weight)
+
+    def endpoint(self, name, count=1):
+        """
+        Limiter charging one call to ``name`` at its weight in BYBIT_ENDPOINT_WEIGHTS.
+
+        :param name: ccxt method name of the endpoint.
+        :param count: Orders in a batch or pages in a paged read.
+        """
+        if name not in self.endpoint_weights:
+            raise ValueError(f"Unknown rate limit endpoint: {name}")
+        category, weight = self.endpoint_weights[name]
+        return self.limiter(category, weight * max(1, count))
+
+    @staticmethod
+    def kline_pages(limit):
+        """Number of kline requests ccxt makes for ``limit`` bars."""
+        return max(1, -(-(limit or 1) // KLINE_PAGE_SIZE))
+
+    def scale(self, fraction):
+        """Shrink every bucket to ``fraction`` of its limit, for one of several processes trading the same account."""
+        for bucket in self.buckets.values():
+            with bucket.lock:
+                bucket.rate *= fraction
+                bucket.capacity = max(1.0, bucket.capacity * fraction)
+                bucket.tokens = min(bucket.tokens, bucket.capacity)
+
+    def metrics(self):
+        return {category: bucket.metrics() for category, bucket in self.buckets.items()}
+
+
+rate_budget = RateBudget()
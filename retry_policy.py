@@ -0,0 +1,252 @@
+import time
+import random
+import threading
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="RetryPolicy", filename="RetryPolicy.log", stream=True)
+
+# Error classes by exception class name, checked along the exception's MRO so ccxt,
+# requests and builtin exceptions are covered without importing the libraries here.
+# 'rate_limit' and 'network' are retried, 'rejected' (the exchange understood the
+# request and refused it) is raised at once, and so is 'exhausted' (a nested policy
+# call that already gave up), so retries never multiply. Anything else is 'unknown' and retried.
+# Only 'rate_limit' and 'network' errors say the endpoint itself is failing, so only they count
+# toward its circuit breaker; an 'unknown' error (e.g. a KeyError for one bad symbol) must not
+# short-circuit the endpoint for every other symbol thread.
+BREAKER_ERRORS = ('rate_limit', 'network')
+RATE_LIMIT_ERRORS = ('RateLimitExceeded', 'DDoSProtection')
+NETWORK_ERRORS = ('NetworkError', 'RequestTimeout', 'ExchangeNotAvailable', 'OnMaintenance', 'InvalidNonce',
+                  'ConnectionError', 'Timeout', 'TimeoutError', 'ChunkedEncodingError')
+REJECTED_ERRORS = ('ExchangeError', 'BadRequest', 'BadSymbol', 'InvalidOrder', 'InsufficientFunds',
+                   'AuthenticationError', 'PermissionDenied', 'AccountSuspended', 'ArgumentsRequired', 'NotSupported')
+EXHAUSTED_ERRORS = ('RetryError', 'CircuitOpenError')
+
+
+def classify_error(error):
+    """'rate_limit', 'network', 'rejected', 'exhausted' or 'unknown' for an exception raised by an API call."""
+    names = [cls.__name__ for cls in type(error).__mro__]
+    # ccxt's rate limit errors derive from NetworkError, so the most specific class decides
+    for name in names:
+        if name in EXHAUSTED_ERRORS:
+            return 'exhausted'
+        if name in RATE_LIMIT_ERRORS:
+            return 'rate_limit'
+        if name in NETWORK_ERRORS:
+            return 'network'
+        if name in REJECTED_ERRORS:
+            return 'rejected'
+    return 'unknown'
+
+
+class RetryError(Exception):
+    """An API call that gave up: attempts or deadline exhausted, or its circuit is open."""
+
+    def __init__(self, endpoint, reason, last_error=None):
+        self.endpoint = endpoint
+        self.reason = reason
+        self.last_error = last_error
+        super().__init__(f"{endpoint} failed ({reason}): {last_error}")
+
+
+class CircuitOpenError(RetryError):
+    def __init__(self, endpoint, retry_in):
+        self.retry_in = retry_in
+        super().__init__(endpoint, f"circuit open, next probe in {retry_in:.1f}s")
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint breaker shared by every thread calling the endpoint.
+
+    After ``failure_threshold`` consecutive retryable failures the breaker opens
+    and calls fail at once. After ``reset_timeout`` seconds one probe call is let
+    through (half open); its success closes the breaker, its failure reopens it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go out now; in half open state only a single probe is allowed."""
+        with self.lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self.probe_in_flight = False
+            if self.state == 'half_open' and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def retry_in(self):
+        with self.lock:
+            if self.state != 'open':
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self.lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        """Count a retryable failure; returns True if this failure opened the breaker."""
+        with self.lock:
+            self.failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self.probe_in_flight = False
+                return True
+            return False
+
+    def release_probe(self):
+        """Let another probe through after one that ended without a verdict (e.g. a rejection)."""
+        with self.lock:
+            self.probe_in_flight = False
+
+
+class RetryPolicy:
+    """
+    Process-wide retry policy for exchange API calls.
+
+    Every call gets a deadline and an attempt cap; retryable errors back off
+    exponentially with jitter (rate limit errors from a higher floor), never
+    sleeping past the deadline. Rejections, and RetryErrors from nested calls, are raised at once. Each endpoint has a
+    circuit breaker shared across threads, so once an endpoint is down the other
+    symbol threads fail fast instead of each retrying into it. Giving up raises
+    RetryError, or returns ``fallback()`` when a fallback is given.
+    """
+
+    def __init__(self, deadline=30.0, max_attempts=6, base_delay=0.5, max_delay=8.0, rate_limit_delay=1.0,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limit_delay = rate_limit_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.breakers = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def breaker(self, endpoint):
+        with self.lock:
+            if endpoint not in self.breakers:
+                self.breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[endpoint]
+
+    def _count(self, endpoint, key, amount=1):
+        with self.lock:
+            stats = self.stats.setdefault(endpoint, {
+                'calls': 0, 'successes': 0, 'retries': 0, 'gave_up': 0, 'rejected': 0, 'exhausted': 0,
+                'short_circuited': 0, 'fallbacks': 0, 'rate_limit': 0, 'network': 0, 'unknown': 0,
+            })
+            stats[key] += amount
+
+    def backoff(self, attempt, error_class, base_delay=None, max_delay=None):
+        """Jittered exponential delay before retry number ``attempt`` (1-based)."""
+        base_delay = self.base_delay if base_delay is None else base_delay
+        max_delay = self.max_delay if max_delay is None else max_delay
+        if error_class == 'rate_limit':
+            base_delay = max(base_delay, self.rate_limit_delay)
+        delay = min(max_delay, base_delay * (2 ** (attempt - 1)))
+        return random.uniform(delay / 2, delay)
+
+    def call(self, function, args=(), kwargs=None, endpoint=None, deadline=None, max_attempts=None,
+             base_delay=None, max_delay=None, fallback=None):
+        """
+        Call ``function(*args, **kwargs)`` under the policy.
+
+        :param function: The API call.
+        :param args: Positional arguments for the call.
+        :param kwargs: Keyword arguments for the call.
+        :param endpoint: Breaker and metrics key; defaults to the function name.
+        :param deadline: Seconds after which no further attempt is started.
+        :param max_attempts: Maximum number of attempts, including the first.
+        :param base_delay: Delay before the first retry, doubled for each further one.
+        :param max_delay: Upper bound for a single delay.
+        :param fallback: Callable whose result is returned instead of raising RetryError.
+        :return: The call's result, or ``fallback()`` after giving up.
+        """
+        kwargs = kwargs or {}
+        endpoint = endpoint or getattr(function, '__name__', repr(function))
+        deadline = self.deadline if deadline is None else deadline
+        max_attempts = self.max_attempts if max_attempts is None else max_attempts
+        deadline_at = time.monotonic() + deadline
+        breaker = self.breaker(endpoint)
+        self._count(endpoint, 'calls')
+
+        attempt = 0
+        last_error = None
+        reason = 'attempts exhausted'
+        while attempt < max_attempts:
+            if not breaker.allow():
+                self._count(endpoint, 'short_circuited')
+                return self._give_up(CircuitOpenError(endpoint, breaker.retry_in()), fallback)
+
+            attempt += 1
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                error_class = classify_error(e)
+                if error_class in ('rejected', 'exhausted'):
+                    breaker.release_probe()
+                    self._count(endpoint, error_class)
+                    raise
+
+                last_error = e
+                self._count(endpoint, error_class)
+                if error_class not in BREAKER_ERRORS:
+                    breaker.release_probe()
+                elif breaker.record_failure():
+                    logging.info(f"Circuit opened for {endpoint} after {breaker.failures} failures: {e}")
+                    reason = 'circuit opened'
+                    break
+                if attempt >= max_attempts:
+                    break
+
+                delay = self.backoff(attempt, error_class, base_delay, max_delay)
+                if time.monotonic() + delay >= deadline_at:
+                    reason = f"deadline of {deadline}s reached"
+                    break
+                self._count(endpoint, 'retries')
+                logging.info(f"{error_class} error in {endpoint} (attempt {attempt}/{max_attempts}): {e}. Retrying in {delay:.2f} seconds...")
+                time.sleep(delay)
+                continue
+
+            breaker.record_success()
+            self._count(endpoint, 'successes')
+            return result
+
+        self._count(endpoint, 'gave_up')
+        logging.info(f"Giving up on {endpoint} after {attempt} attempts ({reason}): {last_error}")
+        return self._give_up(RetryError(endpoint, reason, last_error), fallback)
+
+    def _give_up(self, error, fallback):
+        if fallback is None:
+            raise error
+        self._count(error.endpoint, 'fallbacks')
+        return fallback()
+
+    def metrics(self):
+        with self.lock:
+            stats = {endpoint: dict(values) for endpoint, values in self.stats.items()}
+            breakers = dict(self.breakers)
+        for endpoint, breaker in breakers.items():
+            stats.setdefault(endpoint, {})['breaker'] = breaker.state
+        return stats
+
+
+retry_policy = RetryPolicy()
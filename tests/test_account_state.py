@@ -0,0 +1,133 @@
+import time
+import asyncio
+
+import pytest
+
+pytest.importorskip("ccxt")
+
+from directionalscalper.core.exchanges.account_state import AccountStateService
+from rate_limit import rate_budget
+
+
+class FakeClient:
+    def __init__(self):
+        self.positions = [{'symbol': 'BTC/USDT:USDT', 'contracts': 1, 'side': 'long', 'info': {'positionIdx': 1}}]
+        self.open_orders = []
+        self.balance = {'total': {'USDT': 100}}
+        self.failing = set()
+        self.during_fetch = None
+        self.calls = 0
+
+    def _result(self, name):
+        self.calls += 1
+        if name in self.failing:
+            raise Exception(f"{name} unavailable")
+        if self.during_fetch is not None:
+            self.during_fetch(name)
+        return getattr(self, name)
+
+    def fetch_positions(self, params=None):
+        return self._result('positions')
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        return self._result('open_orders')
+
+    def fetch_balance(self, params=None):
+        return self._result('balance')
+
+
+class FakeExchange:
+    market_type = 'swap'
+
+    def __init__(self):
+        self.exchange = FakeClient()
+
+
+@pytest.fixture
+def service():
+    service = AccountStateService(FakeExchange(), retries=1, delay_factor=0, max_delay=0, deadline=0.05)
+    service.running = True  # Drive refreshes from the test instead of the thread
+    return service
+
+
+def test_nothing_published_until_every_part_succeeds(service):
+    service.exchange.exchange.failing = {'balance'}
+    service.refresh()
+    assert service.snapshot is None
+    assert service.get_balance() is None
+    assert service.get_open_positions() == []
+
+    service.exchange.exchange.failing = set()
+    service.refresh()
+    snapshot = service.snapshot
+    assert snapshot.version == 1
+    assert snapshot.balance == {'total': {'USDT': 100}}
+
+
+def test_failed_part_keeps_its_own_timestamp(service):
+    service.refresh()
+    first = service.snapshot
+    time.sleep(0.01)
+    service.exchange.exchange.failing = {'open_orders'}
+    service.refresh()
+    second = service.snapshot
+    assert second.open_orders_time == first.open_orders_time
+    assert second.positions_time > first.positions_time
+    assert second.timestamp == second.open_orders_time
+
+
+def test_readers_never_fetch(service):
+    service.refresh()
+    calls = service.exchange.exchange.calls
+    service.snapshot = service.snapshot._replace(timestamp=0)
+    assert service.get_open_positions()
+    assert service.exchange.exchange.calls == calls
+
+
+def test_rest_result_does_not_overwrite_newer_stream_patch(service):
+    service.refresh()
+    client = service.exchange.exchange
+    closed = {'symbol': 'BTC/USDT:USDT', 'contracts': 0, 'side': 'long', 'info': {'positionIdx': 1}}
+
+    def patch_while_fetching(name):
+        if name == 'positions':
+            service.apply_position_update([closed])
+
+    client.during_fetch = patch_while_fetching
+    service.refresh()
+    assert service.snapshot.positions == ()
+    # The other parts of the same refresh are still published
+    assert service.snapshot.balance == client.balance
+
+    client.during_fetch = None
+    service.refresh()
+    assert len(service.snapshot.positions) == 1
+
+
+def test_stream_patches_before_first_snapshot_are_ignored(service):
+    service.apply_balance_update({'total': {'USDT': 5}})
+    assert service.snapshot is None
+    service.refresh()
+    assert service.snapshot.balance == {'total': {'USDT': 100}}
+
+
+class AsyncClient:
+    def __init__(self, client):
+        self.client = client
+
+    async def fetch_positions(self, params=None):
+        return self.client.fetch_positions(params)
+
+    async def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        return self.client.fetch_open_orders(symbol, since, limit, params)
+
+    async def fetch_balance(self, params=None):
+        return self.client.fetch_balance(params)
+
+
+def test_async_refresh_draws_from_each_part_bucket(service):
+    before = {category: rate_budget.buckets[category].calls for category in ('position', 'order_query', 'account')}
+    asyncio.run(service.refresh_async(AsyncClient(service.exchange.exchange)))
+    assert service.snapshot.version == 1
+    for category, calls in before.items():
+        assert rate_budget.buckets[category].calls == calls + 1
@@ -0,0 +1,75 @@
+import pytest
+
+pytest.importorskip("ccxt")
+
+from directionalscalper.core.exchanges.bybit import BybitExchange
+from directionalscalper.core.exchanges.order_tracker import OrderTracker
+
+
+class FakeClient:
+    """create_orders answers like ccxt's Bybit parse: rejected rows keep their slot, with no id and retExtInfo's code."""
+
+    def __init__(self):
+        self.batches = []
+        self.singles = []
+        self.rejected = set()
+        self.batch_down = False
+
+    def create_orders(self, requests):
+        self.batches.append(requests)
+        if self.batch_down:
+            raise Exception("batch endpoint unavailable")
+        rows = []
+        for request in requests:
+            link_id = request['params'].get('orderLinkId')
+            if link_id in self.rejected:
+                rows.append({'id': None, 'info': {'orderLinkId': link_id, 'code': 110007, 'msg': 'insufficient balance'}})
+            else:
+                rows.append({'id': f"id-{link_id}", 'info': {'orderLinkId': link_id, 'code': 0, 'msg': 'OK'}})
+        return rows
+
+    def create_order(self, symbol, type, side, amount, price, params):
+        self.singles.append(params['orderLinkId'])
+        return {'id': f"single-{params['orderLinkId']}", 'info': {'orderLinkId': params['orderLinkId']}}
+
+
+def orders(count):
+    return [{'symbol': 'BTCUSDT', 'side': 'buy', 'qty': 0.01, 'price': 60000 - i, 'positionIdx': 1, 'orderLinkId': f"level{i}"}
+            for i in range(count)]
+
+
+@pytest.fixture
+def exchange():
+    exchange = BybitExchange.__new__(BybitExchange)
+    exchange.exchange = FakeClient()
+    exchange.batch_order_size = 10
+    exchange.order_tracker = OrderTracker()
+    exchange.last_active_long_order_time = {}
+    exchange.last_active_short_order_time = {}
+    return exchange
+
+
+def test_rejected_row_is_reported_in_place(exchange):
+    exchange.exchange.rejected = {'level1'}
+    results = exchange.create_tagged_limit_orders_bybit(orders(3))
+    assert [result['status'] for result in results] == ['placed', 'failed', 'placed']
+    assert results[1]['error'] == 'insufficient balance'
+    assert results[1]['request']['orderLinkId'] == 'level1'
+    assert exchange.order_tracker.get_state(order_id='id-level0') == 'new'
+    assert exchange.order_tracker.get_state(order_link_id='level1') is None
+
+
+def test_orders_are_sent_in_chunks(exchange):
+    results = exchange.create_tagged_limit_orders_bybit(orders(23), batch_size=10)
+    assert [len(batch) for batch in exchange.exchange.batches] == [10, 10, 3]
+    assert [result['order']['id'] for result in results] == [f"id-level{i}" for i in range(23)]
+    assert exchange.exchange.batches[2][0]['params'] == {'positionIdx': 1, 'timeInForce': 'PostOnly', 'orderLinkId': 'level20'}
+
+
+def test_failed_batch_falls_back_to_single_orders(exchange):
+    exchange.exchange.batch_down = True
+    results = exchange.create_tagged_limit_orders_bybit(orders(3))
+    assert exchange.exchange.singles == ['level0', 'level1', 'level2']
+    assert [result['status'] for result in results] == ['placed'] * 3
+    assert results[0]['order']['id'] == 'single-level0'
+    assert exchange.order_tracker.get_state(order_id='single-level2') == 'new'
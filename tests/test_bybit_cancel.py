@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("ccxt")
+
+from directionalscalper.core.exchanges.bybit import BybitExchange
+from directionalscalper.core.exchanges.order_tracker import OrderTracker
+
+
+class FakeClient:
+    def __init__(self):
+        self.canceled = []
+        self.rejected = set()
+
+    def cancel_orders(self, ids, symbol):
+        self.canceled.extend(ids)
+        # Like ccxt's parse of Bybit's batch cancel: a rejected row keeps its position with an empty orderId
+        return [{'id': '' if order_id in self.rejected else order_id,
+                 'info': {'orderId': '' if order_id in self.rejected else order_id, 'orderLinkId': ''}} for order_id in ids]
+
+
+def order(order_id, status='open', reduce_only=False):
+    return {'id': order_id, 'status': status, 'reduceOnly': reduce_only, 'side': 'buy', 'info': {'positionIdx': 1}}
+
+
+@pytest.fixture
+def exchange():
+    exchange = BybitExchange.__new__(BybitExchange)
+    exchange.exchange = FakeClient()
+    exchange.batch_order_size = 10
+    exchange.order_tracker = OrderTracker()
+    return exchange
+
+
+def test_cancel_all_entries_only_cancels_open_entries(exchange):
+    orders = [
+        order('open-entry'),
+        order('partial-entry', status='partially_filled'),
+        order('take-profit', reduce_only=True),
+        order('closed-entry', status='closed'),
+        order('canceled-entry', status='canceled'),
+    ]
+    exchange.get_open_orders = lambda symbol: orders
+    exchange.cancel_all_entries_bybit('BTC/USDT:USDT')
+    assert exchange.exchange.canceled == ['open-entry', 'partial-entry']
+
+
+def test_status_filter_is_optional(exchange):
+    orders = [order('a'), order('b', status='closed')]
+    assert exchange.cancel_orders_filtered_bybit('BTC/USDT:USDT', reduce_only=False, open_orders=orders)
+    assert exchange.exchange.canceled == ['a', 'b']
+
+
+def test_rejected_cancel_is_reported_and_stays_tracked(exchange):
+    exchange.order_tracker.apply_order_update([
+        {'id': order_id, 'clientOrderId': f"link-{order_id}", 'symbol': 'BTC/USDT:USDT', 'side': 'buy', 'price': 100.0,
+         'amount': 1.0, 'filled': 0.0, 'status': 'open', 'info': {'orderStatus': 'New'}}
+        for order_id in ('a', 'b')
+    ])
+    exchange.exchange.rejected = {'b'}
+    results = exchange.cancel_orders_by_id_bybit('BTC/USDT:USDT', ['a', 'b'])
+    assert [(result['id'], result['status']) for result in results] == [('a', 'canceled'), ('b', 'failed')]
+    assert exchange.order_tracker.get_state(order_id='a') == 'cancelled'
+    assert exchange.order_tracker.get_state(order_id='b') == 'new'
@@ -0,0 +1,134 @@
+import time
+
+import pytest
+
+pytest.importorskip("ccxt")
+
+from directionalscalper.core.exchanges import candle_store
+from directionalscalper.core.exchanges.candle_store import CandleStore
+
+MINUTE = 60_000
+
+
+class FakeExchange:
+    """1m candles ending with the one forming now; ``fetches`` records (since, limit) of every request."""
+
+    id = 'bybit'
+
+    def __init__(self, history=5000):
+        self.now = int(time.time() * 1000) // MINUTE * MINUTE
+        self.history = history
+        self.fetches = []
+
+    def parse_timeframe(self, timeframe):
+        return 60
+
+    def candle(self, timestamp, close=None):
+        close = close if close is not None else timestamp / MINUTE
+        return [timestamp, close, close + 1, close - 1, close, 1.0]
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.fetches.append((since, limit))
+        first = self.now - (self.history - 1) * MINUTE
+        timestamps = range(max(first, since if since is not None else first), self.now + 1, MINUTE)
+        rows = [self.candle(timestamp) for timestamp in timestamps]
+        if since is not None:
+            return rows[:limit]
+        return rows[-limit:]
+
+    def advance(self, minutes):
+        self.now += minutes * MINUTE
+
+
+class Clock:
+    """Stands in for the time module in candle_store, a few seconds into the exchange's forming candle."""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+
+    def time(self):
+        return self.exchange.now / 1000 + 5
+
+
+@pytest.fixture
+def exchange(monkeypatch):
+    exchange = FakeExchange()
+    monkeypatch.setattr(candle_store, 'time', Clock(exchange))
+    return exchange
+
+
+@pytest.fixture
+def store():
+    return CandleStore(min_refresh_interval=0)
+
+
+def test_first_request_is_a_full_fetch(store, exchange):
+    rows = store.get_ohlcv(exchange, 'BTCUSDT', '1m', 100)
+    assert exchange.fetches == [(None, 100)]
+    assert len(rows) == 100
+    assert rows[-1][0] == exchange.now
+
+
+def test_refresh_fetches_from_the_forming_candle_and_replaces_it(store, exchange):
+    store.get_ohlcv(exchange, 'BTCUSDT', '1m', 100)
+    forming = exchange.now
+    exchange.advance(2)
+
+    rows = store.get_ohlcv(exchange, 'BTCUSDT', '1m', 100)
+    since, limit = exchange.fetches[-1]
+    assert since == forming
+    assert limit == 4  # The old forming bar, the two after it and one spare
+    assert [row[0] for row in rows[-3:]] == [forming, forming + MINUTE, forming + 2 * MINUTE]
+    assert len(rows) == 100
+    assert len({row[0] for row in rows}) == 100
+
+
+def test_deeper_window_triggers_a_full_refetch(store, exchange):
+    store.get_ohlcv(exchange, 'BTCUSDT', '1m', 100)
+    rows = store.get_ohlcv(exchange, 'BTCUSDT', '1m', 300)
+    assert exchange.fetches == [(None, 100), (None, 300)]
+    assert len(rows) == 300
+
+    # A shallower window is served from the deeper buffer, patched but not refetched
+    assert len(store.get_ohlcv(exchange, 'BTCUSDT', '1m', 50)) == 50
+    assert exchange.fetches[-1][0] is not None
+
+
+def test_buffer_too_far_behind_is_refetched(store, exchange):
+    store.get_ohlcv(exchange, 'BTCUSDT', '1m', 100)
+    exchange.advance(150)
+    store.get_ohlcv(exchange, 'BTCUSDT', '1m', 100)
+    assert exchange.fetches[-1] == (None, 100)
+
+
+def test_stream_updates_merge_and_skip_rest(store, exchange):
+    store.get_ohlcv(exchange, 'BTCUSDT', '1m', 100)
+    forming = exchange.now
+    store.apply_stream_update('bybit', 'BTCUSDT', '1m', MINUTE,
+                              [exchange.candle(forming, close=1.5), exchange.candle(forming + MINUTE, close=2.5)])
+
+    cached = store.get_cached_ohlcv('bybit', 'BTCUSDT', '1m')
+    assert [row[4] for row in cached[-2:]] == [1.5, 2.5]
+    assert len(cached) == 100
+
+    fetches = len(exchange.fetches)
+    assert store.get_ohlcv(exchange, 'BTCUSDT', '1m', 100) == cached
+    assert len(exchange.fetches) == fetches
+
+
+def test_stream_updates_with_a_gap_or_unseeded_series_are_ignored(store, exchange):
+    store.apply_stream_update('bybit', 'BTCUSDT', '1m', MINUTE, [exchange.candle(exchange.now)])
+    assert store.get_cached_ohlcv('bybit', 'BTCUSDT', '1m') == []
+
+    store.get_ohlcv(exchange, 'BTCUSDT', '1m', 100)
+    before = store.get_cached_ohlcv('bybit', 'BTCUSDT', '1m')
+    store.apply_stream_update('bybit', 'BTCUSDT', '1m', MINUTE, [exchange.candle(exchange.now + 5 * MINUTE)])
+    assert store.get_cached_ohlcv('bybit', 'BTCUSDT', '1m') == before
+
+
+def test_cached_rows_are_copies(store, exchange):
+    store.get_ohlcv(exchange, 'BTCUSDT', '1m', 10)
+    rows = store.get_cached_ohlcv('bybit', 'BTCUSDT', '1m', 5)
+    assert len(rows) == 5
+    rows[-1][4] = -1
+    assert store.get_cached_ohlcv('bybit', 'BTCUSDT', '1m', 1)[0][4] != -1
@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+import pytest
+
+pytest.importorskip("ccxt")
+
+from directionalscalper.core.exchanges.feature_engine import FeatureEngine, IncrementalFeatures
+
+
+def make_candles(count, seed=0, start=0, step=180_000):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(scale=0.5, size=count))
+    rows = []
+    for i, close in enumerate(closes):
+        high = close + abs(rng.normal(scale=0.3))
+        low = close - abs(rng.normal(scale=0.3))
+        rows.append([start + i * step, close, high, low, close, 1.0])
+    return rows
+
+
+def ewm(values, span, min_periods):
+    """pandas ewm(span, adjust=False, min_periods).mean() for a series without NaN."""
+    alpha = 2.0 / (span + 1)
+    out = np.full(len(values), np.nan)
+    value = None
+    for i, x in enumerate(values):
+        value = x if value is None else (1 - alpha) * value + alpha * x
+        if i + 1 >= min_periods:
+            out[i] = value
+    return out
+
+
+def test_extremes_follow_the_window():
+    state = IncrementalFeatures(maxlen=50)
+    for row in make_candles(400, seed=1):
+        state.update(row)
+        for name in IncrementalFeatures.FEATURES:
+            values = np.array(state.raw[name], dtype=float)
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                assert math.isinf(state.feature_min(name))
+                continue
+            assert state.feature_min(name) == values.min()
+            assert state.feature_max(name) == values.max()
+
+
+def test_feature_matrix_normalises_over_the_window():
+    state = IncrementalFeatures(maxlen=100)
+    for row in make_candles(300, seed=2):
+        state.update(row)
+
+    features = state.feature_matrix()
+    assert features.shape == (100, 4)
+    for column, name in enumerate(IncrementalFeatures.FEATURES):
+        values = np.array(state.raw[name], dtype=float)
+        expected = (values - np.nanmin(values)) / (np.nanmax(values) - np.nanmin(values))
+        np.testing.assert_allclose(features[:, column], expected)
+
+
+def test_trend_averages_match_windowed_values():
+    rows = make_candles(500, seed=3)
+    state = IncrementalFeatures(maxlen=3000, trend_length=200)
+    for row in rows:
+        state.update(row)
+
+    closes = np.array([row[4] for row in rows])
+    assert state.sma == pytest.approx(closes[-200:].mean())
+    assert state.ema == pytest.approx(ewm(closes, 200, 200)[-1])
+
+
+def test_update_only_feeds_newly_closed_bars():
+    engine = FeatureEngine()
+    key = ('bybit', 'BTCUSDT', '3m')
+    rows = make_candles(300, seed=4)
+
+    assert engine.update(key, rows[:250], maxlen=3000) == 249
+    assert engine.update(key, rows[:250], maxlen=3000) == 0
+    assert engine.update(key, rows[:253], maxlen=3000) == 3
+
+    features, closes, adx, ema, sma = engine.snapshot(key)
+    assert len(closes) == 252
+    assert closes[-1] == rows[251][4]
+    assert sma == pytest.approx(np.mean([row[4] for row in rows[52:252]]))
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from directionalscalper.core.strategies.grid_levels import (
+    _find_nearest_significant_level_loop,
+    _volume_histograms_loop,
+    snap_to_significant_levels,
+    volume_histograms,
+    volume_histograms_from_order_book,
+)
+
+CURRENT_PRICE = 100.0
+
+
+def synthetic_book(rng, depth=2000, max_outer_price_distance=0.05):
+    tick = CURRENT_PRICE * max_outer_price_distance / depth
+    return {
+        'bids': [[CURRENT_PRICE - (i + 0.5) * tick, float(size)] for i, size in enumerate(rng.exponential(1.0, depth))],
+        'asks': [[CURRENT_PRICE + (i + 0.5) * tick, float(size)] for i, size in enumerate(rng.exponential(1.0, depth))],
+    }
+
+
+def snap_loop(grid, significant, tolerance, min_distance, max_distance, spacing, accept):
+    """The strategies' original loop: each level snaps away from the previously kept one, then accept filters it."""
+    kept = []
+    for level in grid:
+        previous_level = kept[-1] if kept else None
+        adjusted = _find_nearest_significant_level_loop(level, significant, tolerance, min_distance, max_distance, CURRENT_PRICE,
+                                                         previous_level, spacing)
+        if accept(adjusted):
+            kept.append(adjusted)
+    return kept
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_histograms_match_the_loop(seed):
+    order_book = synthetic_book(np.random.default_rng(seed))
+    expected = _volume_histograms_loop(order_book, CURRENT_PRICE, 0.05)
+
+    bids, asks = np.asarray(order_book['bids']), np.asarray(order_book['asks'])
+    for result in (volume_histograms_from_order_book(order_book, CURRENT_PRICE, 0.05),
+                   volume_histograms(bids[:, 0], bids[:, 1], asks[:, 0], asks[:, 1], CURRENT_PRICE, 0.05)):
+        assert np.allclose(expected[2], result[2])
+        assert np.allclose(expected[3], result[3])
+        assert np.allclose(expected[4], result[4])
+
+
+def test_ragged_book_rows_use_price_and_size():
+    order_book = {'bids': [[99.0, 2.0, 3], [98.0, 1.0]], 'asks': [[101.0, 4.0, 1], [102.0, 0.5]]}
+    plain = {'bids': [[99.0, 2.0], [98.0, 1.0]], 'asks': [[101.0, 4.0], [102.0, 0.5]]}
+    ragged = volume_histograms_from_order_book(order_book, CURRENT_PRICE, 0.05)
+    expected = volume_histograms_from_order_book(plain, CURRENT_PRICE, 0.05)
+    assert np.allclose(ragged[3], expected[3]) and np.allclose(ragged[4], expected[4])
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_snap_matches_the_loop(seed):
+    rng = np.random.default_rng(seed)
+    grid = [CURRENT_PRICE - (i + 1) * 0.001 * CURRENT_PRICE for i in range(50)]
+    significant = np.sort(rng.uniform(CURRENT_PRICE * 0.9, CURRENT_PRICE, 200))
+
+    expected = [_find_nearest_significant_level_loop(level, significant, 0.01, 0.01, 0.04, CURRENT_PRICE) for level in grid]
+    assert np.allclose(snap_to_significant_levels(grid, significant, 0.01, 0.01, 0.04, CURRENT_PRICE), expected)
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_spaced_snap_matches_the_loop(seed):
+    rng = np.random.default_rng(seed)
+    grid = [CURRENT_PRICE - (i + 1) * 0.002 * CURRENT_PRICE for i in range(30)]
+    significant = np.sort(rng.uniform(CURRENT_PRICE * 0.9, CURRENT_PRICE, 60))
+    spacing = 0.1 * CURRENT_PRICE / 30
+    buffer_distance = 0.01 * CURRENT_PRICE
+
+    def accept(level):
+        return CURRENT_PRICE - 0.1 * CURRENT_PRICE <= level <= CURRENT_PRICE - buffer_distance
+
+    expected = snap_loop(grid, significant, 0.01, 0.0, 0.1, spacing, accept)
+    result = snap_to_significant_levels(grid, significant, 0.01, 0.0, 0.1, CURRENT_PRICE, spacing=spacing, accept=accept)
+    assert len(result) == len(expected)
+    assert np.allclose(result, expected)
+
+
+def test_spacing_skips_significant_levels_near_the_previous_kept_level():
+    grid = [99.0, 98.8]
+    significant = [98.7, 98.9, 99.05]
+
+    # Without spacing both levels snap to the first significant level within tolerance
+    assert snap_to_significant_levels(grid, significant, 0.01, 0.0, 0.1, CURRENT_PRICE) == [98.7, 98.7]
+    # 98.7 is taken, so the second level moves on to 98.9, more than 0.1 away
+    assert snap_to_significant_levels(grid, significant, 0.01, 0.0, 0.1, CURRENT_PRICE, spacing=0.1) == pytest.approx([98.7, 98.9])
+    # Nothing is more than 0.5 away from 98.7, so the second level keeps its price
+    assert snap_to_significant_levels(grid, significant, 0.01, 0.0, 0.1, CURRENT_PRICE, spacing=0.5) == pytest.approx([98.7, 98.8])
+
+
+def test_rejected_levels_are_dropped_and_do_not_count_as_previous():
+    grid = [99.0, 98.8, 98.6]
+    significant = [98.7, 98.9]
+
+    def accept(level):
+        return level != 98.9
+
+    result = snap_to_significant_levels(grid, significant, 0.01, 0.0, 0.1, CURRENT_PRICE, spacing=0.1, accept=accept)
+    expected = snap_loop(grid, significant, 0.01, 0.0, 0.1, 0.1, accept)
+    # 98.8 snaps to 98.9 and is dropped, so 98.6 is spaced from 98.7 and lands on 98.9, dropped again
+    assert result == expected == [98.7]
@@ -0,0 +1,68 @@
+from directionalscalper.core.strategies.grid_reconciler import plan_grid_orders
+
+PREFIX = 'BTCUSDT_b_'
+
+
+def order(order_id, price, qty, side='buy', link_id=PREFIX, reduce_only=False):
+    return {'id': order_id, 'price': price, 'amount': qty, 'side': side, 'reduceOnly': reduce_only,
+            'clientOrderId': f"{link_id}{order_id}"}
+
+
+def plan(levels, amounts, orders, **kwargs):
+    return plan_grid_orders(levels, amounts, orders, 'buy', order_link_id_prefix=PREFIX, **kwargs)
+
+
+def test_unchanged_grid_is_kept():
+    result = plan([100.0, 99.0], [1.0, 1.0], [order('a', 100.0, 1.0), order('b', 99.0, 1.0)])
+    assert result.is_empty()
+    assert [action.order['id'] for action in result.keep] == ['a', 'b']
+
+
+def test_qty_only_amend_keeps_the_live_price_and_records_the_level():
+    # Within the price tolerance of the level but resized
+    result = plan([100.0], [2.0], [order('a', 100.05, 1.0)])
+    assert result.summary() == "keep 0, amend 1, cancel 0, create 0"
+    action = result.amend[0]
+    assert action.level == 100.0
+    assert action.price == 100.05
+    assert action.amount == 2.0
+
+
+def test_moved_level_is_amended_to_the_new_price():
+    result = plan([95.0], [1.0], [order('a', 100.0, 1.0)])
+    action = result.amend[0]
+    assert (action.level, action.price, action.order['id']) == (95.0, 95.0, 'a')
+    assert not result.cancel and not result.create
+
+
+def test_moved_level_without_amend_is_cancelled_and_created():
+    result = plan([95.0], [1.0], [order('a', 100.0, 1.0)], amend=False)
+    assert [o['id'] for o in result.cancel] == ['a']
+    assert [(action.level, action.price, action.order) for action in result.create] == [(95.0, 95.0, None)]
+
+
+def test_surplus_orders_are_cancelled_and_missing_levels_created():
+    result = plan([100.0], [1.0], [order('a', 100.0, 1.0), order('b', 90.0, 1.0)], amend=False)
+    assert [o['id'] for o in result.cancel] == ['b']
+
+    result = plan([100.0, 99.0, 98.0], [1.0, 1.0, 1.0], [order('a', 100.0, 1.0)])
+    assert [action.level for action in result.create] == [99.0, 98.0]
+    assert result.request_count() == 2
+
+
+def test_other_symbols_and_reduce_only_orders_are_ignored():
+    orders = [
+        order('dom', 100.0, 1.0, link_id='BTCDOMUSDT_b_'),
+        order('tp', 100.0, 1.0, reduce_only=True),
+        order('short', 100.0, 1.0, side='sell'),
+    ]
+    result = plan([100.0], [1.0], orders)
+    assert not result.keep and not result.amend and not result.cancel
+    assert len(result.create) == 1
+
+
+def test_untagged_entries_are_cancelled_on_request():
+    untagged = order('manual', 100.0, 1.0, link_id='')
+    result = plan([100.0], [1.0], [untagged], cancel_untagged=True)
+    assert [o['id'] for o in result.cancel] == ['manual']
+    assert len(result.create) == 1
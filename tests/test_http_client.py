@@ -0,0 +1,80 @@
+import json
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from directionalscalper.core.http_client import AsyncHttpClient, HttpClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so the pool can reuse the connection
+    connections = set()
+
+    def do_GET(self):
+        Handler.connections.add(self.client_address)
+        body = json.dumps([{"Asset": "BTCUSDT"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.connections = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/data.json"
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_is_shared_between_threads():
+    client = HttpClient()
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(client.get_session())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(session is sessions[0] for session in sessions)
+
+    adapter = sessions[0].get_adapter("https://api.quantumvoid.org/")
+    assert adapter._pool_maxsize == client.pool_maxsize
+    assert adapter.max_retries.connect == client.connect_retries
+    client.close()
+    assert client.session is None
+
+
+def test_requests_reuse_the_pooled_connection(server):
+    client = HttpClient()
+    for _ in range(3):
+        response = client.get(server)
+        assert response.status_code == 200
+        assert response.json() == [{"Asset": "BTCUSDT"}]
+    assert len(Handler.connections) == 1
+    client.close()
+
+
+def test_async_client_shares_the_pooled_session(server):
+    client = HttpClient()
+    async_client = AsyncHttpClient(client)
+
+    async def fetch_all():
+        return await asyncio.gather(*(async_client.get(server) for _ in range(4)))
+
+    responses = asyncio.run(fetch_all())
+    assert [response.json() for response in responses] == [[{"Asset": "BTCUSDT"}]] * 4
+    assert client.session is not None
+    # Concurrent requests may each need a connection, but never more than the pool allows
+    assert 1 <= len(Handler.connections) <= client.pool_maxsize
+    client.close()
@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip("ccxt")
+pytest.importorskip("pytz")
+pytest.importorskip("colorama")
+pytest.importorskip("rich")
+pytest.importorskip("keyboard")
+
+from directionalscalper.core.strategies.bybit.gridbased import lineargrid_base
+from directionalscalper.core.strategies.bybit.gridbased.lineargrid_base import LinearGridBaseFutures
+
+
+class FakeEngine(LinearGridBaseFutures):
+    """Runs run_steps over a trading loop that records the sides and graceful stops it sees each step."""
+
+    def __init__(self):
+        self.running_long = False
+        self.running_short = False
+        self.graceful_stop_sides = {'long': False, 'short': False}
+        self.steps = []
+
+    def trading_steps(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+        while True:
+            self.steps.append((self.running_long, self.running_short, self.graceful_stops(False, False)))
+            yield 1
+
+
+@pytest.fixture(autouse=True)
+def symbol_locks(monkeypatch):
+    locks = {}
+    monkeypatch.setattr(lineargrid_base, 'symbol_locks', locks)
+    return locks
+
+
+def test_engine_running_both_holds_both_side_locks(symbol_locks):
+    engine = FakeEngine()
+    steps = engine.run_steps('btcusdt', action="both")
+    assert next(steps) == 1
+    assert engine.steps == [(True, True, (False, False))]
+    assert symbol_locks['BTCUSDT']['long'].locked() and symbol_locks['BTCUSDT']['short'].locked()
+
+    steps.close()
+    assert not symbol_locks['BTCUSDT']['long'].locked() and not symbol_locks['BTCUSDT']['short'].locked()
+
+
+def test_engine_refuses_to_start_next_to_a_side_thread(symbol_locks):
+    side = FakeEngine()
+    side_steps = side.run_steps('BTCUSDT', action="long")
+    next(side_steps)
+
+    engine = FakeEngine()
+    assert list(engine.run_steps('BTCUSDT', action="both")) == []
+    assert engine.steps == []
+    # The short lock it did get is given back, and the side thread keeps the long one
+    assert not symbol_locks['BTCUSDT']['short'].locked()
+    assert symbol_locks['BTCUSDT']['long'].locked()
+    side_steps.close()
+
+
+def test_side_thread_refuses_to_start_next_to_an_engine(symbol_locks):
+    engine = FakeEngine()
+    engine_steps = engine.run_steps('BTCUSDT', action="both")
+    next(engine_steps)
+
+    side = FakeEngine()
+    assert list(side.run_steps('BTCUSDT', action="short")) == []
+    assert side.steps == []
+    engine_steps.close()
+
+
+def test_graceful_stop_is_applied_per_side_while_running(symbol_locks):
+    engine = FakeEngine()
+    steps = engine.run_steps('BTCUSDT', action="both")
+    next(steps)
+
+    engine.set_graceful_stop(True, False)
+    next(steps)
+    assert engine.steps[-1] == (True, True, (True, False))
+
+    engine.set_graceful_stop(False, True)
+    next(steps)
+    assert engine.steps[-1] == (True, True, (False, True))
+    steps.close()
+
+    # A side stopped in the config stays stopped whatever rotation says
+    assert engine.graceful_stops(True, False) == (True, True)
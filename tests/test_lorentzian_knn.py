@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("ccxt")
+pytest.importorskip("pandas")
+
+from directionalscalper.core.exchanges.exchange import Exchange
+from directionalscalper.core.exchanges.feature_engine import FeatureEngine
+
+
+def loop_prediction(feature_series, feature_arrays, y_train_series, neighbors_count=8):
+    """The kNN loop generate_l_signals used before lorentzian_prediction."""
+    predictions = []
+    distances = []
+    lastDistance = -1
+
+    for i in range(len(feature_arrays)):
+        if i % 4 == 0:
+            d = np.log(1 + np.abs(feature_series - feature_arrays[i])).sum()
+            if d >= lastDistance:
+                lastDistance = d
+                distances.append(d)
+                predictions.append(y_train_series[i])
+                if len(predictions) > neighbors_count:
+                    lastDistance = distances[int(neighbors_count * 3 / 4)]
+                    distances.pop(0)
+                    predictions.pop(0)
+
+    return np.sum(predictions)
+
+
+@pytest.fixture
+def exchange():
+    return Exchange.__new__(Exchange)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_compat_prediction_matches_loop(exchange, seed):
+    rng = np.random.default_rng(seed)
+    rows = int(rng.integers(1, 400))
+    feature_arrays = rng.normal(size=(rows, 5))
+    feature_series = rng.normal(size=5)
+    y_train_series = rng.choice([1, -1], size=rows)
+    neighbors_count = int(rng.integers(1, 12))
+
+    expected = loop_prediction(feature_series, feature_arrays, y_train_series, neighbors_count)
+    actual = exchange.lorentzian_prediction(feature_series, feature_arrays, y_train_series, neighbors_count, compat=True)
+
+    assert actual == expected
+
+
+def test_nearest_prediction_sums_k_closest_sampled_bars(exchange):
+    feature_series = np.zeros(2)
+    # Sampled bars (every 4th) are at distance 0, 1, 2, 3, 4; the others are closer but skipped
+    feature_arrays = np.zeros((20, 2))
+    for n, i in enumerate(range(0, 20, 4)):
+        feature_arrays[i] = np.exp(n / 2) - 1
+    y_train_series = np.array([1, -1, -1, -1] * 5)
+    y_train_series[8] = -1
+
+    assert exchange.lorentzian_prediction(feature_series, feature_arrays, y_train_series, neighbors_count=3, compat=False) == 1
+    assert exchange.lorentzian_prediction(feature_series, feature_arrays[:0], y_train_series[:0], compat=False) == 0
+
+
+class FakeCandleStore:
+    def __init__(self, count):
+        rng = np.random.default_rng(1)
+        closes = 100 + np.cumsum(rng.normal(scale=0.5, size=count + 10))
+        self.rows = [[i * 180_000, close, close + 0.2, close - 0.2, close, 1.0] for i, close in enumerate(closes)]
+        self.count = count
+
+    def get_ohlcv(self, exchange, symbol, timeframe, limit):
+        return self.rows[:self.count][-limit:]
+
+
+@pytest.fixture
+def signal_exchange(exchange, monkeypatch):
+    exchange.exchange = SimpleNamespace(id='bybit')
+    exchange.candle_store = FakeCandleStore(400)
+    exchange.feature_engine = FeatureEngine()
+    exchange.l_signal_cache = {}
+    calls = []
+    predict = exchange.lorentzian_prediction
+    monkeypatch.setattr(exchange, 'lorentzian_prediction', lambda *args, **kwargs: calls.append(args[3]) or predict(*args, **kwargs))
+    return exchange, calls
+
+
+def test_cached_signal_is_kept_per_settings(signal_exchange):
+    exchange, calls = signal_exchange
+    exchange.generate_l_signal_incremental('BTCUSDT', limit=300, neighbors_count=8)
+    exchange.generate_l_signal_incremental('BTCUSDT', limit=300, neighbors_count=4)
+    exchange.generate_l_signal_incremental('BTCUSDT', limit=300, neighbors_count=8)
+    assert calls == [8, 4]
+
+    exchange.generate_l_signal_incremental('BTCUSDT', limit=300, neighbors_count=8, timeframe='5m')
+    assert calls == [8, 4, 8]
+
+
+def test_new_bar_consumed_by_another_setting_still_refreshes_the_signal(signal_exchange):
+    exchange, calls = signal_exchange
+    exchange.generate_l_signal_incremental('BTCUSDT', limit=300, neighbors_count=8)
+    exchange.candle_store.count += 1
+    exchange.generate_l_signal_incremental('BTCUSDT', limit=300, neighbors_count=4)
+    exchange.generate_l_signal_incremental('BTCUSDT', limit=300, neighbors_count=8)
+    assert calls == [8, 4, 8]
@@ -0,0 +1,74 @@
+import json
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("pandas")
+
+import api.manager as manager_module
+from api.manager import Manager
+
+URL = "https://api.quantumvoid.org/volumedata/rotatorsymbols_bybit.json"
+
+
+class Response:
+    def __init__(self, data):
+        self.status_code = 200
+        self.headers = {}
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeHttpClient:
+    def __init__(self):
+        self.calls = 0
+        self.failing = True
+
+    def get(self, url, headers=None):
+        self.calls += 1
+        if self.failing:
+            raise Exception("connection refused")
+        return Response([{"Asset": "BTCUSDT"}])
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    client = FakeHttpClient()
+    monkeypatch.setattr(manager_module, 'http_client', client)
+    path = tmp_path / "quantdatav2_bybit.json"
+    path.write_text(json.dumps([]))
+    manager = Manager(None, api="local", path=path)
+    manager.stop_refresher()
+    manager.start_refresher = lambda: None  # Drive refreshes from the test instead of the thread
+    yield manager, client
+
+
+def test_failed_first_fetch_returns_empty_without_retrying_in_the_caller(manager):
+    manager, client = manager
+    started = time.time()
+    assert manager.get_url_entry(URL)['data'] == []
+    assert time.time() - started < 1
+    assert client.calls == 1
+
+    # Within the backoff callers neither fetch nor wait
+    assert manager.get_url_entry(URL)['data'] == []
+    assert client.calls == 1
+
+
+def test_refresher_retries_never_fetched_urls_after_their_backoff(manager):
+    manager, client = manager
+    manager.get_url_entry(URL)
+    entry = manager.url_cache[URL]
+    assert entry['fetched_at'] is None and entry['retry_at'] > time.time()
+
+    client.failing = False
+    entry['retry_at'] = 0.0
+    manager._refresh_due()
+    assert client.calls == 2
+    assert manager.get_url_entry(URL)['symbols'] == ['BTCUSDT']
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("ccxt")
+
+from directionalscalper.core.exchanges.market_feed import MarketDataFeed
+
+
+def position(symbol, side, size, pnl):
+    return {'symbol': symbol, 'info': {'symbol': symbol, 'side': side, 'size': str(size), 'avgPrice': '100',
+                                       'unrealisedPnl': str(pnl), 'positionIdx': 1 if side == 'Buy' else 2}}
+
+
+class FakeAccountState:
+    def __init__(self, positions):
+        self.snapshot = SimpleNamespace(positions=tuple(positions)) if positions is not None else None
+
+    def apply_position_update(self, positions):
+        pass
+
+
+def make_feed(snapshot_positions=None):
+    exchange = SimpleNamespace(exchange=SimpleNamespace(id='bybit'), account_state=FakeAccountState(snapshot_positions))
+    return MarketDataFeed(exchange)
+
+
+def test_unknown_symbol_falls_back_to_rest():
+    feed = make_feed()
+    feed.apply_event({'topic': 'position', 'symbol': None, 'data': [position('ETHUSDT', 'Buy', 1, 2.5)]})
+    assert feed.get_unrealized_pnl('ETHUSDT') == {'long': 2.5, 'short': None}
+    assert feed.get_unrealized_pnl('BTCUSDT') is None
+
+
+def test_legs_opened_before_the_stream_are_seeded_from_the_account_snapshot():
+    feed = make_feed([position('BTCUSDT', 'Sell', 0.5, -1.25)])
+    feed.apply_event({'topic': 'position', 'symbol': None, 'data': [position('ETHUSDT', 'Buy', 1, 2.5)]})
+    assert feed.get_unrealized_pnl('BTCUSDT') == {'long': None, 'short': -1.25}
+
+    # A stream update for the seeded leg replaces it
+    feed.apply_event({'topic': 'position', 'symbol': None, 'data': [position('BTCUSDT', 'Sell', 0.5, -2.0)]})
+    assert feed.get_unrealized_pnl('BTCUSDT') == {'long': None, 'short': -2.0}
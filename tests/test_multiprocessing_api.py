@@ -0,0 +1,162 @@
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pidfile")
+pytest.importorskip("ta")
+pytest.importorskip("directionalscalper.api.exchanges")  # The scraper runs with api/ deployed as directionalscalper.api
+
+from api import multiprocessing_api
+from api.multiprocessing_api import BASE_CANDLES, TIMEFRAME_MS, CombinedScraper
+
+MINUTE = TIMEFRAME_MS["1m"]
+FIVE_MINUTES = TIMEFRAME_MS["5m"]
+START = 1_700_000_000_000 // TIMEFRAME_MS["4h"] * TIMEFRAME_MS["4h"]  # Opening of a 4h candle
+
+
+class Clock:
+    """Stands in for the time module in multiprocessing_api."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now / 1000
+
+
+class FakeExchange:
+    """get_futures_kline over a clock; ``open_candle`` says whether the open candle is returned (Binance) or not (Bybit)."""
+
+    def __init__(self, clock, open_candle):
+        self.clock = clock
+        self.open_candle = open_candle
+        self.fetches = []
+
+    def get_futures_kline(self, symbol, interval, limit):
+        self.fetches.append((interval, limit))
+        period = TIMEFRAME_MS[interval]
+        last = self.clock.now - self.clock.now % period
+        if not self.open_candle:
+            last -= period
+        # The open candle's close moves with the clock, closed candles keep theirs
+        return [candle(timestamp, close=self.clock.now if timestamp + period > self.clock.now else timestamp)
+                for timestamp in range(last - (limit - 1) * period, last + 1, period)]
+
+
+def candle(timestamp, close, volume=1.0):
+    return {"timestamp": timestamp, "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": volume}
+
+
+def series(first, count, period=FIVE_MINUTES):
+    return [candle(first + i * period, close=i, volume=i + 1) for i in range(count)]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(START + 5_000)  # A few seconds into the candles opened at START
+    monkeypatch.setattr(multiprocessing_api, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def scraper():
+    scraper = CombinedScraper.__new__(CombinedScraper)
+    scraper.symbol_states = {}
+    return scraper
+
+
+def assert_contiguous(buffers):
+    for timeframe, bars in buffers.items():
+        assert len(bars) == BASE_CANDLES[timeframe]
+        timestamps = [bar["timestamp"] for bar in bars]
+        assert timestamps == list(range(timestamps[0], timestamps[-1] + 1, TIMEFRAME_MS[timeframe]))
+
+
+def test_base_candles_are_grouped_on_timeframe_boundaries(scraper, clock):
+    # Closed 5m candles from 30 minutes before START to START
+    candles = series(START - 6 * FIVE_MINUTES, 6)
+    resampled = scraper.resample_candles(candles, "5m", "15m")
+    assert [group["timestamp"] for group in resampled] == [START - 6 * FIVE_MINUTES, START - 3 * FIVE_MINUTES]
+    assert resampled[1] == {"timestamp": START - 3 * FIVE_MINUTES, "open": 3, "high": 6, "low": 2, "close": 5, "volume": 4 + 5 + 6}
+
+
+def test_partial_first_group_is_dropped(scraper, clock):
+    candles = series(START - 5 * FIVE_MINUTES, 5)  # The first 15m group only has its last two 5m candles
+    resampled = scraper.resample_candles(candles, "5m", "15m")
+    assert [group["timestamp"] for group in resampled] == [START - 3 * FIVE_MINUTES]
+    assert resampled[0]["open"] == 2
+
+
+def test_incomplete_last_group_is_dropped_when_closed_only(scraper, clock):
+    # Bybit: the last 5m candle is closed, but the 15m candle it belongs to is not
+    clock.now = START + 2 * FIVE_MINUTES + 5_000
+    candles = series(START - 3 * FIVE_MINUTES, 5)
+    resampled = scraper.resample_candles(candles, "5m", "15m")
+    assert [group["timestamp"] for group in resampled] == [START - 3 * FIVE_MINUTES]
+
+
+def test_incomplete_last_group_is_kept_when_its_last_candle_is_open(scraper, clock):
+    # Binance: the series ends with the open 5m candle, so the 15m group is the open 15m candle
+    candles = series(START - 3 * FIVE_MINUTES, 4)
+    resampled = scraper.resample_candles(candles, "5m", "15m")
+    assert [group["timestamp"] for group in resampled] == [START - 3 * FIVE_MINUTES, START]
+    assert resampled[-1] == {"timestamp": START, "open": 3, "high": 4, "low": 2, "close": 3, "volume": 4}
+
+
+def test_empty_series_resamples_to_nothing(scraper, clock):
+    assert scraper.resample_candles([], "5m", "1h") == []
+
+
+def test_empty_state_fetches_every_buffer_in_full(scraper, clock):
+    scraper.exchange = FakeExchange(clock, open_candle=False)
+    state = {}
+    buffers = scraper.update_candles("BTCUSDT", state)
+    assert scraper.exchange.fetches == list(BASE_CANDLES.items())
+    assert_contiguous(buffers)
+    assert state["open_last"] == {timeframe: False for timeframe in BASE_CANDLES}
+
+
+def test_closed_only_buffers_fetch_the_candles_closed_since(scraper, clock):
+    # Bybit: the last candle is closed, so of the candles opened since only the open one is not needed
+    scraper.exchange = FakeExchange(clock, open_candle=False)
+    state = {}
+    scraper.update_candles("BTCUSDT", state)
+
+    scraper.exchange.fetches.clear()
+    scraper.update_candles("BTCUSDT", state)
+    assert scraper.exchange.fetches == []  # Only the candle opened at START is new, and it is still open
+
+    clock.now += 3 * MINUTE
+    buffers = scraper.update_candles("BTCUSDT", state)
+    assert scraper.exchange.fetches == [("1m", 3)]  # 4 opened since the last, minus the open one
+    assert buffers["1m"][-1]["timestamp"] == START + 2 * MINUTE
+    assert_contiguous(buffers)
+
+
+def test_open_last_buffers_refetch_the_open_candle(scraper, clock):
+    # Binance: the last candle was open, so it is fetched again along with every candle opened since
+    scraper.exchange = FakeExchange(clock, open_candle=True)
+    state = {}
+    scraper.update_candles("BTCUSDT", state)
+    assert state["open_last"] == {timeframe: True for timeframe in BASE_CANDLES}
+
+    scraper.exchange.fetches.clear()
+    clock.now += 3 * MINUTE
+    buffers = scraper.update_candles("BTCUSDT", state)
+    assert scraper.exchange.fetches == [("1m", 4), ("5m", 1), ("4h", 1)]  # 3 opened since, plus the previously open one
+    assert [bar["timestamp"] for bar in buffers["1m"][-4:]] == [START + i * MINUTE for i in range(4)]
+    assert buffers["1m"][-4]["close"] == START  # Closed since the last update, so refreshed to its final close
+    assert buffers["5m"][-1]["close"] == clock.now
+    assert_contiguous(buffers)
+
+
+def test_buffer_older_than_its_length_is_fetched_in_full(scraper, clock):
+    scraper.exchange = FakeExchange(clock, open_candle=False)
+    state = {}
+    scraper.update_candles("BTCUSDT", state)
+
+    scraper.exchange.fetches.clear()
+    clock.now += 2 * BASE_CANDLES["1m"] * MINUTE
+    buffers = scraper.update_candles("BTCUSDT", state)
+    assert scraper.exchange.fetches[0] == ("1m", BASE_CANDLES["1m"])
+    assert buffers["1m"][-1]["timestamp"] == clock.now - clock.now % MINUTE - MINUTE
+    assert_contiguous(buffers)
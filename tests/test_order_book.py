@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ccxt")
+
+from directionalscalper.core.exchanges.order_book import OrderBook
+
+
+@pytest.fixture
+def book():
+    book = OrderBook('BTCUSDT')
+    book.apply_snapshot([[100, 1], [99, 2]], [[101, 3], [102, 4]], update_id=1)
+    return book
+
+
+def test_snapshot_does_not_move_with_the_live_book(book):
+    snapshot = book.snapshot()
+    before = snapshot.to_dict()
+    book.apply_delta([[100.5, 5]], [[101, 0]], update_id=2)
+
+    assert snapshot.to_dict() == before
+    assert snapshot.best_bid() == 100
+    assert snapshot.version == 1
+    assert book.best_bid() == 100.5
+    assert book.best_ask() == 102
+
+
+def test_snapshot_is_read_only(book):
+    snapshot = book.snapshot()
+    with pytest.raises(ValueError):
+        snapshot.apply_delta([[98, 1]], [], update_id=2)
+    prices, _ = snapshot.levels('bids')
+    with pytest.raises(ValueError):
+        prices[0] = 1.0
+    assert book.best_bid() == 100
+
+
+def test_one_snapshot_per_version(book):
+    first = book.snapshot()
+    assert book.snapshot() is first
+    assert first.snapshot() is first
+    book.apply_delta([[98, 1]], [], update_id=2)
+    second = book.snapshot()
+    assert second is not first
+    np.testing.assert_array_equal(second.levels('bids')[0], [100, 99, 98])
@@ -0,0 +1,131 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("ccxt")
+
+from directionalscalper.core.exchanges.bybit import BybitExchange
+from directionalscalper.core.exchanges.order_tracker import OrderTracker, fetch_all_open_orders, replay
+
+RECORDING = os.path.join(os.path.dirname(__file__), 'fixtures', 'order_stream.jsonl')
+
+
+@pytest.fixture
+def tracker():
+    return replay(RECORDING)
+
+
+def test_replay_final_states(tracker):
+    assert tracker.get_state(order_link_id='BTCUSDT_b_60000_11111') == 'filled'
+    assert tracker.get_state(order_link_id='BTCUSDT_b_59500_22222') == 'cancelled'
+    assert tracker.get_state(order_id='1003') == 'new'
+    assert tracker.get_state(order_link_id='ETHUSDT_b_30000_33333') == 'partially_filled'
+
+
+def test_replay_counts_each_fill_once(tracker):
+    filled = tracker.get_order(order_link_id='BTCUSDT_b_60000_11111')
+    assert filled['filled'] == pytest.approx(0.02)
+    assert filled['status'] == 'closed'
+
+
+def test_replay_open_orders(tracker):
+    open_orders = tracker.get_open_orders()
+    assert sorted(order['id'] for order in open_orders) == ['1003', '1004']
+    assert [order['id'] for order in tracker.get_open_orders(symbol='ETH/USDT:USDT')] == ['1004']
+    eth = tracker.get_open_orders(side='buy')[0]
+    assert eth['remaining'] == pytest.approx(0.5)
+
+
+def test_reconcile_closes_orders_the_exchange_no_longer_lists(tracker):
+    fetched_at = time.time()
+    eth_order = tracker.get_order(order_id='1004')
+    tracker.reconcile([eth_order], fetched_at=fetched_at)
+    assert tracker.get_state(order_id='1003') == 'cancelled'
+    assert tracker.get_state(order_id='1004') == 'partially_filled'
+    assert tracker.reconciled_at == fetched_at
+
+
+class FakeFeed:
+    enabled = True
+
+    def __init__(self):
+        self.connected = {}
+        self.connected_since = {}
+
+    def connect(self, at):
+        self.connected['order'] = True
+        self.connected_since['order'] = at
+
+
+def test_order_stream_needs_a_reconcile_after_every_reconnect():
+    exchange = BybitExchange.__new__(BybitExchange)
+    exchange.order_tracker = OrderTracker()
+    exchange.market_feed = FakeFeed()
+    assert not exchange.order_stream_live()
+
+    exchange.market_feed.connect(at=100.0)
+    assert not exchange.order_stream_live()
+    exchange.order_tracker.reconcile([], fetched_at=101.0)
+    assert exchange.order_stream_live()
+
+    # Drop and reconnect: the earlier reconcile no longer counts
+    exchange.market_feed.connected['order'] = False
+    assert not exchange.order_stream_live()
+    exchange.market_feed.connect(at=200.0)
+    assert not exchange.order_stream_live()
+    exchange.order_tracker.reconcile([], symbol='BTC/USDT:USDT', fetched_at=201.0)
+    assert not exchange.order_stream_live()  # A per-symbol fetch does not cover every order
+    exchange.order_tracker.reconcile([], fetched_at=201.0)
+    assert exchange.order_stream_live()
+
+
+class PagedClient:
+    """Bybit v5 open orders: 20 per response without a limit, otherwise pages of ``limit`` behind a cursor."""
+
+    def __init__(self, orders):
+        self.orders = orders
+        self.calls = []
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        params = params or {}
+        self.calls.append((limit, params.get('cursor')))
+        start = int(params.get('cursor') or 0)
+        end = start + (limit or 20)
+        page = [dict(order, info=dict(order['info'])) for order in self.orders[start:end]]
+        if page:
+            page[0]['info']['nextPageCursor'] = str(end) if end < len(self.orders) else ''
+        return page
+
+
+def resting_orders(count):
+    return [{'id': str(2000 + i), 'clientOrderId': f"BTCUSDT_b_{60000 - i}_{i}", 'symbol': 'BTC/USDT:USDT', 'side': 'buy',
+             'price': 60000.0 - i, 'amount': 0.01, 'filled': 0.0, 'status': 'open', 'info': {'orderStatus': 'New'}}
+            for i in range(count)]
+
+
+def test_reconcile_covers_every_page_of_open_orders():
+    orders = resting_orders(120)
+    tracker = OrderTracker()
+    tracker.apply_order_update(orders)
+    client = PagedClient(orders)
+
+    fetched_at = time.time()
+    open_orders, complete = fetch_all_open_orders(client.fetch_open_orders)
+    assert complete and len(open_orders) == 120
+    assert [limit for limit, _ in client.calls] == [50, 50, 50]
+    tracker.reconcile(open_orders, fetched_at=fetched_at, complete=complete)
+    assert len(tracker.get_open_orders()) == 120
+
+
+def test_truncated_snapshot_heals_nothing():
+    orders = resting_orders(120)
+    tracker = OrderTracker()
+    tracker.apply_order_update(orders)
+
+    fetched_at = time.time()
+    open_orders, complete = fetch_all_open_orders(PagedClient(orders).fetch_open_orders, max_pages=1)
+    assert not complete and len(open_orders) == 50
+    tracker.reconcile(open_orders, fetched_at=fetched_at, complete=complete)
+    assert len(tracker.get_open_orders()) == 120
+    assert tracker.reconciled_at is None
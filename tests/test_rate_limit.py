@@ -0,0 +1,51 @@
+import pytest
+
+from rate_limit import BYBIT_RATE_LIMITS, RateBudget
+
+
+def spent(budget, category):
+    bucket = budget.buckets[category]
+    return bucket.capacity - bucket.tokens
+
+
+def test_kline_pages():
+    assert RateBudget.kline_pages(None) == 1
+    assert RateBudget.kline_pages(200) == 1
+    assert RateBudget.kline_pages(1000) == 1
+    assert RateBudget.kline_pages(1001) == 2
+    assert RateBudget.kline_pages(3000) == 3
+
+
+def test_klines_draw_from_market_data_only():
+    budget = RateBudget()
+    with budget.endpoint('fetch_ohlcv', budget.kline_pages(3000)):
+        pass
+    assert spent(budget, 'market_data') == pytest.approx(3, abs=0.01)
+    assert spent(budget, 'ip') == pytest.approx(3, abs=0.01)
+    assert spent(budget, 'position') == 0
+    assert spent(budget, 'order') == 0
+
+
+def test_batch_is_charged_per_order():
+    budget = RateBudget()
+    with budget.endpoint('create_orders', 7):
+        pass
+    assert spent(budget, 'order') == pytest.approx(7, abs=0.01)
+
+
+def test_private_reads_have_their_own_buckets():
+    budget = RateBudget()
+    for name, category in (('fetch_open_orders', 'order_query'), ('fetch_positions', 'position'), ('fetch_balance', 'account')):
+        with budget.endpoint(name):
+            pass
+        assert spent(budget, category) == pytest.approx(1, abs=0.01)
+    assert spent(budget, 'order') == 0
+
+
+def test_every_endpoint_maps_to_a_known_category():
+    budget = RateBudget()
+    for name, (category, weight) in budget.endpoint_weights.items():
+        assert category in BYBIT_RATE_LIMITS
+        assert weight >= 1
+    with pytest.raises(ValueError):
+        budget.endpoint('fetch_everything')
@@ -0,0 +1,85 @@
+import pytest
+
+from retry_policy import CircuitOpenError, RetryError, RetryPolicy, classify_error
+
+
+class NetworkError(Exception):
+    pass
+
+
+class RateLimitExceeded(NetworkError):
+    pass
+
+
+class InvalidOrder(Exception):
+    pass
+
+
+def test_classify_error():
+    assert classify_error(RateLimitExceeded()) == 'rate_limit'
+    assert classify_error(NetworkError()) == 'network'
+    assert classify_error(InvalidOrder()) == 'rejected'
+    assert classify_error(ValueError()) == 'unknown'
+    assert classify_error(RetryError('inner', 'attempts exhausted')) == 'exhausted'
+    assert classify_error(CircuitOpenError('inner', 5.0)) == 'exhausted'
+
+
+def flaky(errors):
+    calls = []
+
+    def function():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return 'ok'
+    return function, calls
+
+
+def test_network_errors_are_retried():
+    policy = RetryPolicy(base_delay=0, max_delay=0)
+    function, calls = flaky([NetworkError(), NetworkError()])
+    assert policy.call(function, endpoint='retried') == 'ok'
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize("error", [InvalidOrder(), RetryError('inner', 'attempts exhausted'), CircuitOpenError('inner', 5.0)])
+def test_non_retryable_errors_are_raised_at_once(error):
+    policy = RetryPolicy(base_delay=0, max_delay=0)
+    function, calls = flaky([error])
+    with pytest.raises(type(error)):
+        policy.call(function, endpoint='raised')
+    assert len(calls) == 1
+    assert policy.breaker('raised').state == 'closed'
+
+
+def test_nested_policy_calls_do_not_multiply_retries():
+    policy = RetryPolicy(base_delay=0, max_delay=0, max_attempts=3, failure_threshold=100)
+    function, calls = flaky([NetworkError()] * 20)
+
+    def outer():
+        return policy.call(function, endpoint='inner')
+
+    with pytest.raises(RetryError):
+        policy.call(outer, endpoint='outer')
+    assert len(calls) == 3
+    assert policy.metrics()['outer']['exhausted'] == 1
+
+
+def test_open_circuit_fails_fast_with_fallback():
+    policy = RetryPolicy(base_delay=0, max_delay=0, failure_threshold=2, reset_timeout=60)
+    function, calls = flaky([NetworkError()] * 20)
+    assert policy.call(function, endpoint='down', fallback=lambda: 'cached') == 'cached'
+    assert policy.breaker('down').state == 'open'
+    assert policy.call(function, endpoint='down', fallback=lambda: 'cached') == 'cached'
+    assert len(calls) == 2
+
+
+def test_unknown_errors_do_not_open_the_circuit():
+    policy = RetryPolicy(base_delay=0, max_delay=0, max_attempts=3, failure_threshold=2)
+    function, calls = flaky([KeyError('BADUSDT')] * 6)
+    for _ in range(2):
+        with pytest.raises(RetryError):
+            policy.call(function, endpoint='shared')
+    assert len(calls) == 6
+    assert policy.breaker('shared').state == 'closed'
+    assert policy.call(function, endpoint='shared') == 'ok'
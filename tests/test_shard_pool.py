@@ -0,0 +1,34 @@
+import time
+
+from directionalscalper.core.shard_pool import ShardPool
+
+
+def failing_setup(shard_id, status_queue):
+    raise RuntimeError("config missing")
+
+
+def wait_for(condition, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def test_failing_worker_is_restarted_with_backoff_then_given_up():
+    failures = []
+    pool = ShardPool(1, failing_setup, on_failed=lambda shard_id, error: failures.append((shard_id, error)),
+                     max_restarts=2, restart_delay=0.2)
+    spawned = []
+    spawn = pool._spawn
+    pool._spawn = lambda shard_id: spawned.append(time.monotonic()) or spawn(shard_id)
+    pool.start()
+    try:
+        wait_for(lambda: failures)
+        assert failures == [(0, "RuntimeError: config missing")]
+        assert len(spawned) == 3
+        # The second restart waits twice as long as the first
+        assert spawned[2] - spawned[1] >= 0.4
+        assert pool.submit(('BTCUSDT', 'long')) is None
+        assert pool.metrics()['failed'] == {0: "RuntimeError: config missing"}
+    finally:
+        pool.stop(timeout=5)
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+pytest.importorskip("ccxt")
+
+from directionalscalper.core.exchanges.candle_store import DEFAULT_KLINE_LIMIT, CandleStore
+from directionalscalper.core.exchanges.order_book import OrderBookEngine
+from directionalscalper.core.exchanges.shared_market_data import SharedMarketDataPublisher, SharedMarketDataReader
+
+
+class FakeClient:
+    id = 'bybit'
+
+    def __init__(self):
+        self.fetches = []
+
+    def parse_timeframe(self, timeframe):
+        return 180
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.fetches.append(limit)
+        now = int(time.time() // 180 * 180 * 1000)
+        count = limit or DEFAULT_KLINE_LIMIT
+        return [[now - (count - 1 - i) * 180000, 1.0, 2.0, 0.5, 1.5, 10.0] for i in range(count)]
+
+
+class FakeExchange:
+    def __init__(self):
+        self.exchange = FakeClient()
+        self.candle_store = CandleStore()
+        self.order_book_engine = OrderBookEngine()
+
+
+@pytest.fixture
+def shared():
+    coordinator = FakeExchange()
+    publisher = SharedMarketDataPublisher(coordinator, namespace=f"dstest{int(time.time() * 1000) % 100000}")
+    requests = []
+    reader = SharedMarketDataReader(publisher.namespace, retry_after=0, request_series=lambda *request: requests.append(request))
+    yield publisher, reader, requests
+    reader.close()
+    publisher.stop()
+
+
+def test_signal_window_is_served_from_shared_memory(shared):
+    publisher, reader, requests = shared
+    worker = FakeExchange()
+    reader.attach(worker)
+
+    worker.candle_store.get_ohlcv(worker.exchange, 'BTC/USDT:USDT', '3m', 3000)
+    assert requests == [('BTC/USDT:USDT', '3m', 3000)]
+    publisher.request_series(*requests[0])
+    publisher.publish_once()
+
+    fetches = len(worker.exchange.fetches)
+    rows = worker.candle_store.get_ohlcv(worker.exchange, 'BTC/USDT:USDT', '3m', 3000)
+    assert len(rows) == 3000
+    assert len(worker.exchange.fetches) == fetches
+
+
+def test_request_without_limit_goes_through_the_reader(shared):
+    publisher, reader, requests = shared
+    worker = FakeExchange()
+    reader.attach(worker)
+
+    worker.candle_store.get_ohlcv(worker.exchange, 'BTC/USDT:USDT', '1d', None)
+    assert requests == [('BTC/USDT:USDT', '1d', DEFAULT_KLINE_LIMIT)]
+    publisher.request_series(*requests[0])
+    publisher.publish_once()
+
+    fetches = len(worker.exchange.fetches)
+    assert len(worker.candle_store.get_ohlcv(worker.exchange, 'BTC/USDT:USDT', '1d', None)) == DEFAULT_KLINE_LIMIT
+    assert len(worker.exchange.fetches) == fetches
+
+
+def test_dashboard_rows_are_reported_when_they_change():
+    reports = []
+    reader = SharedMarketDataReader('unused', report_symbols_data=reports.append)
+    symbols_data = {'BTCUSDT': {'symbol': 'BTCUSDT', 'long_upnl': 1.0}}
+    reader.report_symbols_data_once(symbols_data)
+    reader.report_symbols_data_once(symbols_data)
+    assert reports == [{'BTCUSDT': {'symbol': 'BTCUSDT', 'long_upnl': 1.0}}]
+
+    symbols_data.pop('BTCUSDT')
+    reader.report_symbols_data_once(symbols_data)
+    assert reports[-1] == {}
@@ -0,0 +1,81 @@
+import time
+
+from directionalscalper.core.strategies.stop_loss_executor import StopLossExecutor
+
+
+class FakeExchange:
+    def __init__(self):
+        self.limit_orders = []
+        self.cancels = []
+        self.trading_stops = []
+        self.trading_stop_status = 'set'
+
+    def create_limit_order_bybit(self, symbol, side, qty, price, positionIdx=0, params=None):
+        self.limit_orders.append((side, qty, price))
+        return {'id': f"sl{len(self.limit_orders)}"}
+
+    def cancel_orders_by_id_bybit(self, symbol, order_ids):
+        self.cancels.extend(order_ids)
+        return [{'id': order_id, 'status': 'canceled', 'error': None} for order_id in order_ids]
+
+    def set_stop_loss_trading_stop_bybit(self, symbol, stop_loss, positionIdx=1):
+        self.trading_stops.append(stop_loss)
+        return {'status': self.trading_stop_status, 'error': None, 'response': None}
+
+
+def make_executor(qty=1.0, **kwargs):
+    positions = {('BTCUSDT', 'long'): qty}
+    executor = StopLossExecutor(FakeExchange(), lambda symbol, side: positions[(symbol, side)], **kwargs)
+    executor.running = True  # Step jobs from the test instead of the thread
+    return executor, positions
+
+
+def step(executor):
+    for job in list(executor.jobs.values()):
+        executor._step(job)
+
+
+def test_stop_places_a_reduce_only_order_and_finishes_when_flat():
+    executor, positions = make_executor()
+    executor.trigger('BTCUSDT', 'long', 1.0, 95.0, positionIdx=1)
+    assert executor.is_active('BTCUSDT', 'long')
+    step(executor)
+    assert executor.exchange.limit_orders == [('sell', 1.0, 95.0)]
+    assert executor.status('BTCUSDT', 'long').state == 'working'
+
+    positions[('BTCUSDT', 'long')] = 0.0
+    step(executor)
+    assert not executor.is_active('BTCUSDT', 'long')
+    assert executor.pop_finished('BTCUSDT', 'long').state == 'done'
+
+
+def test_timeout_cancels_the_resting_order_before_failing():
+    executor, _ = make_executor(timeout=10)
+    executor.trigger('BTCUSDT', 'long', 1.0, 95.0, positionIdx=1)
+    step(executor)
+    executor.jobs[('BTCUSDT', 'long')]['started_at'] = time.time() - 11
+    step(executor)
+    status = executor.pop_finished('BTCUSDT', 'long')
+    assert status.state == 'failed'
+    assert status.order_id is None
+    assert executor.exchange.cancels == ['sl1']
+
+
+def test_native_stop_is_rearmed_after_the_position_closed():
+    executor, _ = make_executor()
+    executor.arm_native('BTCUSDT', 'long', 95.0, positionIdx=1)
+    executor.arm_native('BTCUSDT', 'long', 95.0, positionIdx=1)
+    assert executor.exchange.trading_stops == [95.0]
+
+    executor.disarm_native('BTCUSDT', 'long')
+    executor.arm_native('BTCUSDT', 'long', 95.0, positionIdx=1)
+    assert executor.exchange.trading_stops == [95.0, 95.0]
+
+
+def test_failed_native_stop_is_retried():
+    executor, _ = make_executor()
+    executor.exchange.trading_stop_status = 'failed'
+    executor.arm_native('BTCUSDT', 'long', 95.0, positionIdx=1)
+    executor.exchange.trading_stop_status = 'set'
+    executor.arm_native('BTCUSDT', 'long', 95.0, positionIdx=1)
+    assert executor.exchange.trading_stops == [95.0, 95.0]
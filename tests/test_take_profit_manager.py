@@ -0,0 +1,76 @@
+from directionalscalper.core.strategies.take_profit_manager import TakeProfitManager
+
+
+class FakeClient:
+    def price_to_precision(self, symbol, price):
+        return f"{round(price / 0.01) * 0.01:.2f}"
+
+    def amount_to_precision(self, symbol, amount):
+        return f"{int(amount * 1000) / 1000:.3f}"
+
+
+class FakeExchange:
+    def __init__(self, trading_stop_status='set'):
+        self.exchange = FakeClient()
+        self.amends = []
+        self.creates = []
+        self.cancels = []
+        self.trading_stops = []
+        self.trading_stop_status = trading_stop_status
+
+    def amend_orders_bybit(self, symbol, amendments):
+        self.amends.extend(amendments)
+        return [{'amendment': amendment, 'status': 'amended', 'error': None} for amendment in amendments]
+
+    def cancel_orders_by_id_bybit(self, symbol, order_ids):
+        self.cancels.extend(order_ids)
+        return [{'id': order_id, 'status': 'canceled', 'error': None} for order_id in order_ids]
+
+    def create_take_profit_order_bybit(self, symbol, order_type, side, qty, price, positionIdx=1, reduce_only=True):
+        self.creates.append((qty, price))
+        return {'id': f"tp{len(self.creates)}"}
+
+    def set_take_profit_trading_stop_bybit(self, symbol, take_profit, positionIdx=1):
+        self.trading_stops.append(take_profit)
+        if self.trading_stop_status == 'set':
+            return {'status': 'set', 'error': None, 'response': {}}
+        return {'status': 'failed', 'error': 'rejected', 'response': None}
+
+
+def test_unrounded_target_matching_the_live_order_is_not_amended():
+    exchange = FakeExchange()
+    manager = TakeProfitManager(exchange)
+    live = [{'id': 'tp', 'qty': 0.5, 'price': 101.23}]
+    assert manager.sync('BTCUSDT', 'sell', 0.5000001, 101.2300004, 1, live) == 'tp'
+    assert exchange.amends == []
+    assert exchange.creates == []
+
+
+def test_only_the_changed_field_is_amended():
+    exchange = FakeExchange()
+    manager = TakeProfitManager(exchange)
+    live = [{'id': 'tp', 'qty': 0.5, 'price': 101.23}]
+    manager.sync('BTCUSDT', 'sell', 0.75, 101.231, 1, live)
+    assert exchange.amends == [{'id': 'tp', 'side': 'sell', 'qty': 0.75}]
+
+
+def test_trading_stop_is_only_resent_when_the_price_moves():
+    exchange = FakeExchange()
+    manager = TakeProfitManager(exchange)
+    manager.sync('BTCUSDT', 'sell', 0.5, 101.23, 1, [], trading_stop=True)
+    manager.sync('BTCUSDT', 'sell', 0.7, 101.2301, 1, [], trading_stop=True)
+    assert exchange.trading_stops == [101.23]
+    manager.sync('BTCUSDT', 'sell', 0.7, 102.0, 1, [], trading_stop=True)
+    assert exchange.trading_stops == [101.23, 102.0]
+
+
+def test_failed_trading_stop_is_retried_on_the_next_sync():
+    exchange = FakeExchange(trading_stop_status='failed')
+    manager = TakeProfitManager(exchange)
+    manager.sync('BTCUSDT', 'sell', 0.5, 101.23, 1, [], trading_stop=True)
+    assert manager.get_live_order('BTCUSDT', 'sell') is None
+
+    exchange.trading_stop_status = 'set'
+    manager.sync('BTCUSDT', 'sell', 0.5, 101.23, 1, [], trading_stop=True)
+    assert exchange.trading_stops == [101.23, 101.23]
+    assert manager.get_live_order('BTCUSDT', 'sell')['price'] == 101.23